@@ -8,10 +8,14 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 # 백테스트 엔진 임포트
-from backtest.engine import BacktestEngine
-from backtest.models import BacktestRequest, BacktestResult
+from backtest.engine import BacktestEngine, get_engine
+from backtest.models import (
+    BacktestExtendRequest, BacktestRequest, BacktestResult, BacktestSweepRequest, BacktestWalkForwardRequest
+)
+from backtest.optimizer import ParameterSweep
+from backtest.walk_forward import WalkForwardOptimizer
 from backtest.preflight import preflight_check
-from indicators.calculator import IndicatorCalculator
+from backtest.result_cache import result_cache
 
 router = APIRouter()
 
@@ -53,11 +57,11 @@ async def validate_strategy(request: Dict[str, Any]):
         }
     """
     try:
-        calculator = IndicatorCalculator()
+        calculator = get_engine().indicator_calculator
 
         # 전략 로드 또는 config 직접 사용
         if 'strategy_id' in request:
-            engine = BacktestEngine()
+            engine = get_engine()
             strategy = await engine.strategy_manager.get_strategy(request['strategy_id'])
             if not strategy:
                 raise HTTPException(status_code=404, detail="Strategy not found")
@@ -101,7 +105,7 @@ async def run_backtest(request: BacktestRequest):
         print(f"[API] Backtest request received for strategy: {request.strategy_id}")
 
         # 1. 전략 로드
-        engine = BacktestEngine()
+        engine = get_engine()
         strategy = await engine.strategy_manager.get_strategy(request.strategy_id)
         if not strategy:
             raise HTTPException(status_code=404, detail=f"Strategy {request.strategy_id} not found")
@@ -113,7 +117,7 @@ async def run_backtest(request: BacktestRequest):
         print(f"[DEBUG] Strategy config keys: {list(strategy_config.keys()) if isinstance(strategy_config, dict) else 'NOT A DICT'}")
         print(f"[DEBUG] Strategy config indicators: {strategy_config.get('indicators') if isinstance(strategy_config, dict) else 'N/A'}")
         try:
-            calculator = IndicatorCalculator()
+            calculator = get_engine().indicator_calculator
             report = await preflight_check(
                 strategy_config=strategy_config,
                 calculator=calculator,
@@ -162,6 +166,8 @@ async def run_backtest(request: BacktestRequest):
                 'sharpe_ratio': result.get('sharpe_ratio'),  # 샤프 비율
                 'sortino_ratio': result.get('sortino_ratio'),  # 소르티노 비율
                 'treynor_ratio': result.get('treynor_ratio'),  # 트레이너 비율
+                'calmar_ratio': (result.get('risk_metrics') or {}).get('calmar_ratio'),  # 칼마 비율
+                'beta': (result.get('risk_metrics') or {}).get('beta'),  # KOSPI 대비 베타
                 'total_trades': result.get('total_trades', 0),
                 'winning_trades': result.get('winning_trades', 0),
                 'losing_trades': result.get('losing_trades', 0),
@@ -192,7 +198,10 @@ async def run_backtest(request: BacktestRequest):
             'winning_trades': result.get('winning_trades'),
             'losing_trades': result.get('losing_trades'),
             'trades': result.get('trades', []),
-            'daily_values': result.get('daily_values', [])
+            'daily_values': result.get('daily_values', []),
+            'risk_metrics': result.get('risk_metrics'),  # 칼마/낙폭 기간/베타·알파/롤링 샤프
+            'monte_carlo': result.get('monte_carlo'),  # 수익률/MDD/샤프 분포
+            'cache_hit': result.get('cache_hit', False)
         }
 
         print(f"[API] Response prepared. Total return: {api_response['summary']['total_return']:.2f}%")
@@ -213,7 +222,7 @@ async def quick_backtest(request: Dict[str, Any]):
     빠른 백테스트 (전략 저장 없이)
     """
     try:
-        engine = BacktestEngine()
+        engine = get_engine()
 
         # 임시 전략으로 실행
         result = await engine.run_with_config(
@@ -227,6 +236,132 @@ async def quick_backtest(request: Dict[str, Any]):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/extend")
+async def extend_backtest(request: BacktestExtendRequest):
+    """
+    저장된 백테스트 증분 연장 (persist_state=True로 실행한 결과만 가능)
+
+    저장 종료일 이후 추가된 일봉만 처리해 전체 기간 결과를 반환
+    """
+    try:
+        engine = get_engine()
+        return await engine.extend(request.backtest_id, request.end_date, workers=request.workers)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _resolve_strategy_config(engine: BacktestEngine, request: BacktestSweepRequest) -> Dict[str, Any]:
+    """요청의 strategy_config 또는 strategy_id로 전략 설정 조회"""
+    if request.strategy_config is not None:
+        return request.strategy_config
+    if request.strategy_id:
+        strategy = await engine.strategy_manager.get_strategy(request.strategy_id)
+        if not strategy:
+            raise HTTPException(status_code=404, detail=f"Strategy {request.strategy_id} not found")
+        return strategy.get('config', {})
+    raise HTTPException(status_code=400, detail="Provide either strategy_id or strategy_config")
+
+
+@router.post("/sweep")
+async def sweep_backtest(request: BacktestSweepRequest):
+    """
+    파라미터 스윕 (그리드 서치)
+
+    가격 데이터와 지표는 한 번씩만 계산하고, 그리드 포인트별 결과를
+    수익률/MDD/샤프/승률 순위표로 반환
+    """
+    try:
+        engine = get_engine()
+        strategy_config = await _resolve_strategy_config(engine, request)
+
+        print(f"[API] Sweep request: {len(request.parameters)} parameters, {len(request.stock_codes)} stocks")
+
+        return await ParameterSweep(engine).run(
+            strategy_config=strategy_config,
+            parameters=request.parameters,
+            stock_codes=request.stock_codes,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            initial_capital=request.initial_capital,
+            commission=request.commission,
+            slippage=request.slippage,
+            workers=request.workers,
+            sort_by=request.sort_by,
+            top_n=request.top_n
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/walk-forward")
+async def walk_forward_backtest(request: BacktestWalkForwardRequest):
+    """
+    워크포워드 최적화
+
+    학습 구간마다 파라미터 그리드 중 최적 설정을 고르고 다음 검증 구간에 적용한 결과를 반환
+    """
+    try:
+        engine = get_engine()
+        strategy_config = await _resolve_strategy_config(engine, request)
+
+        print(f"[API] Walk-forward request: {len(request.parameters)} parameters, "
+              f"{request.in_sample_days}/{request.out_of_sample_days} days")
+
+        return await WalkForwardOptimizer(engine).run(
+            strategy_config=strategy_config,
+            parameters=request.parameters,
+            stock_codes=request.stock_codes,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            in_sample_days=request.in_sample_days,
+            out_of_sample_days=request.out_of_sample_days,
+            step_days=request.step_days,
+            anchored=request.anchored,
+            initial_capital=request.initial_capital,
+            commission=request.commission,
+            slippage=request.slippage,
+            workers=request.workers,
+            sort_by=request.sort_by
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache/stats")
+async def get_result_cache_stats():
+    """백테스트 결과 캐시 상태 (항목 수, 적중/미스, 무효화 수)"""
+    return result_cache.stats()
+
+@router.post("/cache/invalidate")
+async def invalidate_result_cache(request: Dict[str, Any]):
+    """
+    백테스트 결과 캐시 무효화
+
+    Args:
+        request: {"stock_codes": ["005930"]} (생략하면 전체 삭제)
+    """
+    stock_codes = request.get('stock_codes')
+    if stock_codes:
+        return {"invalidated": result_cache.invalidate_symbols(stock_codes)}
+    result_cache.clear()
+    return {"invalidated": "all"}
+
 @router.get("/results/{user_id}")
 async def get_user_results(user_id: str, limit: int = 10):
     """
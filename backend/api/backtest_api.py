@@ -22,6 +22,8 @@ import pandas as pd시
 import numpy as np
 from api.kiwoom_data_api import KiwoomDataAPI
 from api.indicator_processor import IndicatorProcessor
+from data.provider import fetch_price_rows
+from data.price_reader import concat_price_chunks
 
 # .env 파일 경로를 명시적으로 지정 (프로젝트 루트에서 찾기)
 # backend/api/backtest_api.py -> D:\Dev\auto_stock\.env
@@ -122,18 +124,18 @@ class BacktestEngine:
         # KiwoomDataAPI 싱글톤 인스턴스 사용
         kiwoom_api = self.kiwoom_api
         
+        # 1. Supabase에서 일괄 조회 (kw_price_daily 테이블, 종목 묶음(in_) x 페이지 동시 요청)
+        fetched = await fetch_price_rows(self.supabase, list(stock_codes), start_date, end_date,
+                                         columns='stock_code,trade_date,open,high,low,close,volume,change_rate', decode=True)
+        all_rows = concat_price_chunks(fetched.pop('chunks'))
+        groups = dict(tuple(all_rows.groupby('stock_code', sort=False))) if not all_rows.empty else {}
+        print(f"📦 kw_price_daily 일괄 조회: {len(all_rows)}개 레코드, {fetched['requests']}회 요청, "
+              f"{fetched['seconds']:.2f}초")
+
         for code in stock_codes:
-            # 1. Supabase에서 데이터 조회 (kw_price_daily 테이블)
-            response = self.supabase.table('kw_price_daily').select('*').eq(
-                'stock_code', code
-            ).gte(
-                'trade_date', start_date
-            ).lte(
-                'trade_date', end_date
-            ).order('trade_date').execute()
-            
-            if response.data and len(response.data) > 0:
-                df = pd.DataFrame(response.data)
+            group = groups.get(code)
+            if group is not None and len(group) > 0:
+                df = group.sort_values('trade_date', kind='stable').reset_index(drop=True)
                 # trade_date를 date로 변환
                 df['date'] = pd.to_datetime(df['trade_date'])
                 df.set_index('date', inplace=True)
@@ -11,6 +11,10 @@ import logging
 import asyncio
 
 from indicators.calculator import IndicatorCalculator
+from indicators.catalog import indicator_catalog
+from indicators.store import indicator_store
+from indicators.sandbox_pool import sandbox_pool
+from indicators.streaming import stream_store
 from data.provider import DataProvider
 
 router = APIRouter(prefix="/api/indicators", tags=["indicators"])
@@ -119,50 +123,52 @@ async def calculate_indicators(request: CalculateRequest):
         calculator = get_calculator()
         result_indicators = {}
 
-        for indicator_req in request.indicators:
-            indicator_name = indicator_req.name
-            params = indicator_req.params or {}
-
-            try:
-                # IndicatorCalculator는 config 딕셔너리를 받음
-                config = {
-                    'name': indicator_name,
-                    'params': params
-                }
-
-                # 지표 계산 (Supabase indicators 테이블 사용)
-                result = calculator.calculate(
-                    df=df.copy(),
-                    config=config,
-                    stock_code=request.stock_code
-                )
-
-                # IndicatorResult 객체에서 데이터 추출
-                if result and result.columns:
-                    # columns는 Dict[str, pd.Series]
-                    for col_name, col_series in result.columns.items():
-                        if col_name not in ['trade_date', 'open', 'high', 'low', 'close', 'volume']:
-                            # ma의 경우 period를 붙임: ma_20
-                            if indicator_name == 'ma' and 'period' in params:
-                                key = f"{indicator_name}_{params['period']}"
-                            else:
-                                key = col_name
-
-                            # Series의 마지막 값 추출
-                            latest_value = col_series.iloc[-1] if len(col_series) > 0 else None
-                            if latest_value is not None and not pd.isna(latest_value):
-                                result_indicators[key] = float(latest_value)
-
-                    logger.info(f"✅ Calculated {indicator_name}: {list(result_indicators.keys())}")
-                else:
-                    logger.warning(f"⚠️ {indicator_name} returned no data")
-
-            except Exception as e:
-                logger.error(f"❌ Error calculating {indicator_name}: {str(e)}")
-                import traceback
-                logger.error(traceback.format_exc())
-                # 개별 지표 실패 시 계속 진행
-                continue
+        # 요청된 지표들이 EMA/SMA 등 중간 시계열을 공유하도록 한 범위에서 계산
+        with calculator.shared_intermediates(df):
+            for indicator_req in request.indicators:
+                indicator_name = indicator_req.name
+                params = indicator_req.params or {}
+
+                try:
+                    # IndicatorCalculator는 config 딕셔너리를 받음
+                    config = {
+                        'name': indicator_name,
+                        'params': params
+                    }
+
+                    # 지표 계산 (Supabase indicators 테이블 사용, 저장된 구간 이후 봉만 계산)
+                    result = calculator.calculate_stored(
+                        df=df,  # calculator가 읽기 전용 뷰로 샌드박스에 전달하므로 복사 불필요
+                        config=config,
+                        stock_code=request.stock_code
+                    )
+
+                    # IndicatorResult 객체에서 데이터 추출
+                    if result and result.columns:
+                        # columns는 Dict[str, pd.Series]
+                        for col_name, col_series in result.columns.items():
+                            if col_name not in ['trade_date', 'open', 'high', 'low', 'close', 'volume']:
+                                # ma의 경우 period를 붙임: ma_20
+                                if indicator_name == 'ma' and 'period' in params:
+                                    key = f"{indicator_name}_{params['period']}"
+                                else:
+                                    key = col_name
+
+                                # Series의 마지막 값 추출
+                                latest_value = col_series.iloc[-1] if len(col_series) > 0 else None
+                                if latest_value is not None and not pd.isna(latest_value):
+                                    result_indicators[key] = float(latest_value)
+
+                        logger.info(f"✅ Calculated {indicator_name}: {list(result_indicators.keys())}")
+                    else:
+                        logger.warning(f"⚠️ {indicator_name} returned no data")
+
+                except Exception as e:
+                    logger.error(f"❌ Error calculating {indicator_name}: {str(e)}")
+                    import traceback
+                    logger.error(traceback.format_exc())
+                    # 개별 지표 실패 시 계속 진행
+                    continue
 
         # 3. close 값 추가 (현재가)
         if 'close' in df.columns:
@@ -190,6 +196,54 @@ async def calculate_indicators(request: CalculateRequest):
         )
 
 
+@router.get("/code-cache/stats")
+async def code_cache_stats():
+    """컴파일된 지표 코드 캐시 통계 (적중/미스/검증 실패)"""
+    return IndicatorCalculator.code_cache_stats()
+
+
+@router.get("/execution-cache/stats")
+async def execution_cache_stats():
+    """지표 결과 캐시 통계 (적중/미스/제거/상주 바이트) - INDICATOR_CACHE_MAX_MB 산정용"""
+    return get_calculator().execution_cache_stats()
+
+
+@router.get("/store/stats")
+async def indicator_store_stats():
+    """지표 디스크 저장소 통계 (전체 적중/꼬리 계산/미스/쓰기 횟수)"""
+    return indicator_store.stats()
+
+
+@router.get("/store/{stock_code}")
+async def indicator_store_manifest(stock_code: str):
+    """종목별 저장 항목 manifest (원천 최대 trade_date, 수식 해시, 행 수 등)"""
+    return {'stock_code': stock_code, 'entries': indicator_store.manifest(stock_code)}
+
+
+@router.get("/streaming/stats")
+async def streaming_stats():
+    """실시간 증분 지표 스트림 통계 (종목 수/커널 수/추가·수정·재시드 횟수)"""
+    return stream_store.stats()
+
+
+@router.get("/catalog/stats")
+async def catalog_stats():
+    """지표 정의 카탈로그 상태 (지표 수/버전/로드 출처/마지막 로드 시각)"""
+    return indicator_catalog.stats()
+
+
+@router.post("/catalog/invalidate")
+async def invalidate_catalog():
+    """지표 정의 즉시 다시 로드 (Supabase indicators 테이블 수정 직후 호출)"""
+    return await asyncio.to_thread(indicator_catalog.invalidate)
+
+
+@router.get("/sandbox/stats")
+async def sandbox_pool_stats():
+    """샌드박스 워커 풀 통계 (워커 수/실행/타임아웃/메모리 초과/재시작 횟수)"""
+    return sandbox_pool.stats()
+
+
 @router.get("/health")
 async def health_check():
     """API 상태 확인"""
@@ -13,6 +13,10 @@ from supabase import create_client
 
 # 키움 API 클라이언트
 from .kiwoom_client import get_kiwoom_client
+from backtest.result_cache import result_cache
+from data.local_cache import price_cache
+from data.panel_store import panel_store
+from data.price_reader import read_price_history
 
 router = APIRouter()
 
@@ -165,37 +169,20 @@ async def get_historical_data(
     try:
         supabase = get_supabase_client()
 
-        # 기본 쿼리
-        query = supabase.table('kw_price_daily') \
-            .select('trade_date,open,high,low,close,volume') \
-            .eq('stock_code', stock_code) \
-            .order('trade_date', desc=False)
+        # 키셋 페이지 스트리밍 (서버 max-rows 제한에 잘리지 않고 limit개까지 조회)
+        history = read_price_history(supabase, [stock_code], start_date, end_date, limit=limit)
 
-        # 날짜 필터
-        if start_date:
-            query = query.gte('trade_date', start_date)
-        if end_date:
-            query = query.lte('trade_date', end_date)
-
-        # 제한
-        query = query.limit(limit)
-
-        response = query.execute()
-
-        if not response.data:
+        if history.empty:
             raise HTTPException(status_code=404, detail=f"No historical data for {stock_code}")
 
         # 데이터 정제
-        data = []
-        for row in response.data:
-            data.append({
-                'date': row['trade_date'],
-                'open': float(row['open']),
-                'high': float(row['high']),
-                'low': float(row['low']),
-                'close': float(row['close']),
-                'volume': int(row['volume'])
-            })
+        data = [
+            {'date': date, 'open': float(o), 'high': float(h), 'low': float(l), 'close': float(c), 'volume': int(v)}
+            for date, o, h, l, c, v in zip(
+                history['trade_date'].dt.strftime('%Y-%m-%d'), history['open'], history['high'],
+                history['low'], history['close'], history['volume']
+            )
+        ]
 
         return HistoricalDataResponse(
             stock_code=stock_code,
@@ -593,6 +580,24 @@ async def get_global_indices():
     return GLOBAL_INDICES_CACHE
 
 
+@router.get("/price-cache/stats")
+async def price_cache_stats():
+    """로컬 일봉 캐시 통계 (적중/부분 적중/미스, Supabase 요청 수/받은 행 수)"""
+    return price_cache.stats()
+
+
+@router.get("/price-cache/{stock_code}")
+async def price_cache_manifest(stock_code: str):
+    """종목별 로컬 일봉 캐시 manifest (covered_from, synced_through, last_trade_date, 행 수)"""
+    return {'stock_code': stock_code, 'entries': price_cache.manifest(stock_code)}
+
+
+@router.get("/panel-store/stats")
+async def panel_store_stats():
+    """날짜 x 종목 메모리 맵 패널 상태 (현재 버전의 기간/종목 수/크기)"""
+    return panel_store.stats()
+
+
 # --- [Backfill & Daily Close Logic] ---
 class SyncHistoryRequest(BaseModel):
     stock_codes: List[str]
@@ -647,6 +652,8 @@ async def sync_history(request: SyncHistoryRequest):
             # Upsert to Supabase
             # Note: Supabase bulk upsert matches on Primary Key (assumed: stock_code + trade_date)
             response = supabase.table('kw_price_daily').upsert(records).execute()
+            result_cache.invalidate_symbols([code])  # 해당 종목 포함 백테스트 결과 캐시 무효화
+            price_cache.invalidate([code], since=records[0]['trade_date'])  # 로컬 일봉 캐시는 백필 구간부터 다시 받음
             
             results["success"].append({"code": code, "count": len(records)})
             print(f"[Market] Backfilled {code}: {len(records)} rows")
@@ -721,6 +728,8 @@ async def daily_close_batch():
             
             if records:
                 supabase.table('kw_price_daily').upsert(records).execute()
+                result_cache.invalidate_symbols([code])
+                price_cache.invalidate([code], since=records[0]['trade_date'])
                 results["success"].append(code)
                 
         except Exception as e:
@@ -5,7 +5,7 @@ n8n 워크플로우에서 호출하여 매매 신호 생성
 
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import pandas as pd
 import os
@@ -14,10 +14,13 @@ import asyncio
 import math
 
 # 지표 계산기 임포트 (실제 사용 파일)
-from indicators.calculator import IndicatorCalculator, ExecOptions
+from indicators.calculator import ExecOptions
 
 # 키움 API 클라이언트
 from .kiwoom_client import get_kiwoom_client
+from data.local_cache import price_cache
+from data.panel_store import panel_store, read_recent_frame
+from data.price_reader import read_price_frame
 
 router = APIRouter()
 
@@ -38,10 +41,11 @@ def get_supabase_client():
 _indicator_calculator = None
 
 def get_indicator_calculator():
-    """지표 계산기 싱글톤"""
+    """지표 계산기 싱글톤 (공유 엔진의 계산기 - 지표 실행 캐시 공유)"""
     global _indicator_calculator
     if _indicator_calculator is None:
-        _indicator_calculator = IndicatorCalculator()
+        from backtest.engine import get_engine
+        _indicator_calculator = get_engine().indicator_calculator
     return _indicator_calculator
 
 
@@ -191,7 +195,7 @@ async def verify_all_strategies():
         
         # n8n 워크플로우와 동일한 엔진 로직 사용
         print("[VerifyAll] Importing BacktestEngine...")
-        from backtest.engine import BacktestEngine
+        from backtest.engine import get_engine
         
         # 1. 활성 전략 + 유니버스 조회 (RPC 사용)
         print("[VerifyAll] Calling RPC: get_active_strategies_with_universe")
@@ -206,106 +210,23 @@ async def verify_all_strategies():
         # RPC returns flattened list: strategy info + 1 filtered_stocks array per filter
         
         # 2. 검증 루프
-        engine = BacktestEngine()
-        
-        # 성능을 위해 전체 대상 종목의 현재가 한 번에 조회? 
-        # API 구조상 275개 조회는 루프로 처리하되, 너무 느리면 최적화 필요.
-        # 일단 순차 처리 (안정성 우선).
-        
-        engine = BacktestEngine()
+        engine = get_engine()
         
         # 동시성 제어 (Supabase 연결 제한 고려: 50 -> 20으로 감소)
         # 너무 많은 동시 연결은 DB Pool 고갈을 유발할 수 있음 (총 550개 쿼리 발생)
         sem = asyncio.Semaphore(20)
 
-        async def process_single_stock(stock_code: str, strategy_name: str, strategy_config: dict) -> Optional[StrategyVerificationResult]:
-            async with sem:
-                try:
-                    # 1. 과거 데이터 조회 (Blocking I/O - Worker Thread 실행)
-                    def fetch_data():
-                        # 200일 치 데이터 조회
-                        p_resp = supabase.table('kw_price_daily').select('trade_date,open,high,low,close,volume').eq('stock_code', stock_code).order('trade_date', desc=False).limit(200).execute()
-                        # 실시간 현재가 조회
-                        c_resp = supabase.table('kw_price_current').select('*').eq('stock_code', stock_code).limit(1).execute()
-                        return p_resp, c_resp
-                        
-                    price_response, curr_resp = await asyncio.to_thread(fetch_data)
-
-                    if not price_response.data or len(price_response.data) < 20:
-                        return None
-
-                    # DataFrame 변환
-                    df = pd.DataFrame(price_response.data)
-                    df['trade_date'] = pd.to_datetime(df['trade_date'])
-                    df.set_index('trade_date', inplace=True)
-                    for col in ['open', 'high', 'low', 'close', 'volume']:
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
-
-                    # 현재가 병합 로직
-                    current_price = 0.0
-                    stock_name = stock_code
-                    
-                    if curr_resp.data and len(curr_resp.data) > 0:
-                        row = curr_resp.data[0]
-                        current_price = float(row.get('current_price') or 0)
-                        stock_name = row.get('stock_name', stock_code)
-                        
-                        if current_price > 0:
-                            try:
-                                now = datetime.now()
-                                last_date = df.index[-1]
-                                if last_date.date() < now.date():
-                                    new_row = pd.DataFrame([{
-                                        'open': current_price, 'high': current_price, 'low': current_price, 
-                                        'close': current_price, 'volume': 0
-                                    }], index=[pd.Timestamp(now)])
-                                    df = pd.concat([df, new_row])
-                                elif last_date.date() == now.date():
-                                    df.iloc[-1, df.columns.get_loc('close')] = current_price
-                            except Exception as e:
-                                # print(f"DF Error {stock_code}: {e}")
-                                pass
-                    
-                    # Fallback Price
-                    if current_price <= 0:
-                        if not df.empty:
-                            current_price = df.iloc[-1]['close']
-                        else:
-                            return None
-                            
-                    # 엔진 평가 (Async)
-                    eval_result = await engine.evaluate_snapshot(stock_code, df, strategy_config)
-                    
-                    # 결과 포맷팅 (Safety Checks)
-                    score = eval_result.get('score', 0)
-                    if not isinstance(score, (int, float)) or isinstance(score, float) and (math.isnan(score) or math.isinf(score)):
-                        score = 0.0
-                        
-                    signal = eval_result.get('signal', 'hold').upper()
-                    if signal == 'CONFLICT': signal = 'HOLD'
-                    
-                    # 데이터 정제
-                    safe_stock_name = stock_name or stock_code or "Unknown"
-                    if not isinstance(current_price, (int, float)) or isinstance(current_price, float) and (math.isnan(current_price) or math.isinf(current_price)):
-                        current_price = 0.0
-                    
-                    return StrategyVerificationResult(
-                        strategy_name=strategy_name or "Unknown Strategy",
-                        stock_code=stock_code,
-                        stock_name=safe_stock_name,
-                        current_price=float(current_price),
-                        signal_type=signal,
-                        score=float(score),
-                        details={
-                            'reasons': eval_result.get('reasons', []),
-                            'indicators': _sanitize_for_json(eval_result.get('indicators', {}))
-                        }
-                    )
-                except Exception as e:
-                    print(f"[Verify] Error processing {stock_code}: {e}")
-                    return None
+        # 여러 전략에 포함된 종목은 한 번만 조회
+        loaded: Dict[str, asyncio.Future] = {}
+        universe = set()
+        history: Dict[str, Tuple[pd.DataFrame, str]] = {}  # 패널 저장소 이력 (작업 실행 전에 채움)
+
+        def load(stock_code: str) -> asyncio.Future:
+            if stock_code not in loaded:
+                loaded[stock_code] = asyncio.ensure_future(
+                    _load_snapshot_frame(supabase, stock_code, sem, '[Verify]', history.get(stock_code)))
+            return loaded[stock_code]
 
-            
         # 디버깅: 파일로 데이터 구조 저장
         try:
             with open("debug_strategy_data.log", "w", encoding="utf-8") as f:
@@ -365,19 +286,19 @@ async def verify_all_strategies():
             
             # 중복 제거
             target_stocks = list(set(target_stocks))
+            universe.update(target_stocks)
             print(f"[VerifyAll] Target stocks (unique): {len(target_stocks)}")
             
-            for stock_code in target_stocks:
-                # process_single_stock 호출 (비동기 엔진 사용, 내부에서 to_thread)
-                tasks.append(process_single_stock(stock_code, strategy_name, strategy_config))
+            # 전략 단위로 유니버스 전체 지표를 한 번에 계산 (종목 조회는 내부에서 to_thread)
+            tasks.append(_verify_universe(engine, strategy_name, strategy_config, target_stocks, load))
                 
+        history.update(await asyncio.to_thread(_panel_history, sorted(universe), '[VerifyAll]'))
         print(f"[VerifyAll] processing {len(tasks)} items concurrently...")
         
         # 병렬 실행
         if tasks:
             results_raw = await asyncio.gather(*tasks)
-            # None 제외 (타임아웃 등 고려)
-            results = [r for r in results_raw if r is not None]
+            results = [r for strategy_results in results_raw for r in strategy_results]
         
         print(f"[VerifyAll] Completed. Total results: {len(results)}")
         
@@ -388,6 +309,137 @@ async def verify_all_strategies():
         
     return results
 
+SNAPSHOT_BARS = 200  # 신호 검증용 일봉 수
+
+
+def _panel_history(stock_codes: List[str], log_prefix: str) -> Dict[str, Tuple[pd.DataFrame, str]]:
+    """
+    유니버스 조회용 패널 저장소 이력 {종목: (최근 일봉, 원천에서 다시 받을 시작일)}
+
+    패널 이후 봉과 원천 수정 구간(price_cache.revision_from)만 kw_price_daily에서 받음
+    패널이 없거나 이력이 부족한 종목은 빠지며 기존 조회로 처리
+    """
+    try:
+        history = panel_store.recent_history(stock_codes, SNAPSHOT_BARS, price_cache.revision_from())
+    except Exception as e:
+        print(f"{log_prefix} Panel store unavailable: {e}")
+        return {}
+    if history:
+        print(f"{log_prefix} Panel store history for {len(history)}/{len(stock_codes)} stocks")
+    return history
+
+
+async def _load_snapshot_frame(supabase, stock_code: str, sem: asyncio.Semaphore, log_prefix: str,
+                               history: Optional[Tuple[pd.DataFrame, str]] = None
+                               ) -> Optional[Tuple[pd.DataFrame, float, str]]:
+    """
+    신호 검증용 종목 데이터: 일봉 200개 + kw_price_current 현재가 병합
+
+    history(_panel_history 항목)가 있으면 패널 이력에 그 이후 봉만 원천에서 받아 이어 붙임
+
+    Returns:
+        (OHLCV DataFrame, 현재가, 종목명) 또는 데이터 부족/오류 시 None
+    """
+    async with sem:
+        try:
+            # 1. 과거 데이터 조회 (Blocking I/O - Worker Thread 실행)
+            def fetch_data():
+                # 200일 치 데이터 조회 (필요 컬럼만, 고정 dtype 배열로 바로 디코딩)
+                price_df = read_recent_frame(supabase, stock_code, SNAPSHOT_BARS, history, index_name='trade_date')
+                # 실시간 현재가 조회
+                c_resp = supabase.table('kw_price_current').select('*').eq('stock_code', stock_code).limit(1).execute()
+                return price_df, c_resp
+
+            df, curr_resp = await asyncio.to_thread(fetch_data)
+
+            if len(df) < 20:
+                return None
+
+            # 현재가 병합 로직
+            current_price = 0.0
+            stock_name = stock_code
+
+            if curr_resp.data and len(curr_resp.data) > 0:
+                row = curr_resp.data[0]
+                current_price = float(row.get('current_price') or 0)
+                stock_name = row.get('stock_name', stock_code)
+
+                if current_price > 0:
+                    try:
+                        now = datetime.now()
+                        last_date = df.index[-1]
+                        if last_date.date() < now.date():
+                            new_row = pd.DataFrame([{
+                                'open': current_price, 'high': current_price, 'low': current_price,
+                                'close': current_price, 'volume': 0
+                            }], index=[pd.Timestamp(now.date())])
+                            df = pd.concat([df, new_row])
+                        elif last_date.date() == now.date():
+                            df.iloc[-1, df.columns.get_loc('close')] = current_price
+                    except Exception:
+                        pass
+
+            # Fallback Price
+            if current_price <= 0:
+                if df.empty:
+                    return None
+                current_price = df.iloc[-1]['close']
+
+            return df, current_price, stock_name
+        except Exception as e:
+            print(f"{log_prefix} Error loading {stock_code}: {e}")
+            return None
+
+
+def _verification_result(strategy_name: str, stock_code: str, stock_name: str, current_price: Any,
+                         eval_result: Dict[str, Any]) -> StrategyVerificationResult:
+    """엔진 스냅샷 평가 결과 → 검증 응답 (NaN/Infinity 정리)"""
+    score = eval_result.get('score', 0)
+    if not isinstance(score, (int, float)) or isinstance(score, float) and (math.isnan(score) or math.isinf(score)):
+        score = 0.0
+
+    signal = eval_result.get('signal', 'hold').upper()
+    if signal == 'CONFLICT': signal = 'HOLD'
+
+    safe_stock_name = stock_name or stock_code or "Unknown"
+    if not isinstance(current_price, (int, float)) or isinstance(current_price, float) and (math.isnan(current_price) or math.isinf(current_price)):
+        current_price = 0.0
+
+    return StrategyVerificationResult(
+        strategy_name=strategy_name or "Unknown Strategy",
+        stock_code=stock_code,
+        stock_name=safe_stock_name,
+        current_price=float(current_price),
+        signal_type=signal,
+        score=float(score),
+        details={
+            'reasons': eval_result.get('reasons', []),
+            'indicators': _sanitize_for_json(eval_result.get('indicators', {}))
+        }
+    )
+
+
+async def _verify_universe(engine, strategy_name: str, strategy_config: Dict[str, Any],
+                           stock_codes: List[str], load) -> List[StrategyVerificationResult]:
+    """
+    한 전략의 유니버스 검증: 종목 데이터를 모두 조회한 뒤 engine.evaluate_snapshots로
+    batch 지원 지표(RSI/MACD/볼린저 등)를 종목 x 날짜 패널에서 한 번에 계산
+    """
+    loaded = await asyncio.gather(*(load(code) for code in stock_codes))
+    data = {code: item for code, item in zip(stock_codes, loaded) if item is not None}
+    # 지표 컬럼은 전략마다 다르므로 전략별 프레임 사본 사용 (여러 전략이 같은 조회 결과 공유)
+    evaluations = await engine.evaluate_snapshots({code: item[0].copy() for code, item in data.items()}, strategy_config)
+
+    results = []
+    for code, eval_result in evaluations.items():
+        _, current_price, stock_name = data[code]
+        try:
+            results.append(_verification_result(strategy_name, code, stock_name, current_price, eval_result))
+        except Exception as e:
+            print(f"[Verify] Error formatting {code}: {e}")
+    return results
+
+
 def _sanitize_for_json(data: Any) -> Any:
     """JSON 직렬화를 위해 NaN, Infinity 등을 None으로 변환"""
     import math
@@ -415,7 +467,7 @@ async def check_strategy_signal(request: StrategySignalRequest):
     """
     try:
         supabase = get_supabase_client()
-        from backtest.engine import BacktestEngine
+        from backtest.engine import get_engine
 
         # 1. 전략 정보 조회
         strategy_response = supabase.table('strategies') \
@@ -438,15 +490,10 @@ async def check_strategy_signal(request: StrategySignalRequest):
         # 지표 계산을 위해 최소 200일 이상 권장
         required_bars = 200 # 넉넉하게 고정
 
-        price_response = supabase.table('kw_price_daily') \
-            .select('trade_date,open,high,low,close,volume') \
-            .eq('stock_code', request.stock_code) \
-            .order('trade_date', desc=False) \
-            .limit(required_bars) \
-            .execute()
+        df = read_price_frame(supabase, request.stock_code, limit=required_bars, index_name='trade_date')
 
-        if not price_response.data or len(price_response.data) < 20:
-             print(f"[Strategy] Insufficient historical data for {request.stock_code} (Count: {len(price_response.data) if price_response.data else 0}). Returning HOLD.")
+        if len(df) < 20:
+             print(f"[Strategy] Insufficient historical data for {request.stock_code} (Count: {len(df)}). Returning HOLD.")
              return StrategySignalResponse(
                 strategy_id=request.strategy_id,
                 strategy_name=strategy.get('name', 'Unknown'),
@@ -462,10 +509,7 @@ async def check_strategy_signal(request: StrategySignalRequest):
                 debug_info={'reason': 'Insufficient historical data'}
             )
 
-        # DataFrame 생성
-        df = pd.DataFrame(price_response.data)
-        df['trade_date'] = pd.to_datetime(df['trade_date'])
-        df.set_index('trade_date', inplace=True)
+        # 지표 계산용 float 변환
         df = df.astype(float)
 
         # 3. 현재가 확인 및 데이터 추가
@@ -526,7 +570,7 @@ async def check_strategy_signal(request: StrategySignalRequest):
                 'low': current_price, 
                 'close': current_price, 
                 'volume': 0 # 거래량은 알 수 없으므로 0 또는 직전값
-            }], index=[pd.Timestamp(now)])
+            }], index=[pd.Timestamp(now.date())])
             df = pd.concat([df, new_row])
         elif last_date.date() == now.date():
             # 오늘 데이터가 이미 있으면 종가(close)를 현재가로 업데이트
@@ -538,7 +582,7 @@ async def check_strategy_signal(request: StrategySignalRequest):
                  df.iloc[-1, df.columns.get_loc('low')] = current_price
 
         # 4. BacktestEngine을 이용한 신호 평가
-        engine = BacktestEngine()
+        engine = get_engine()
         result = await engine.evaluate_snapshot(request.stock_code, df, strategy_config)
 
         # 5. 응답 구성
@@ -621,7 +665,7 @@ async def batch_check_strategies(request: BatchSignalRequest):
     try:
         supabase = get_supabase_client()
         import math
-        from backtest.engine import BacktestEngine
+        from backtest.engine import get_engine
         
         # 1. 전략 정보 조회
         strategy_response = supabase.table('strategies') \
@@ -643,97 +687,16 @@ async def batch_check_strategies(request: BatchSignalRequest):
             return []
             
         # 2. 검증 엔진 초기화
-        engine = BacktestEngine()
+        engine = get_engine()
         sem = asyncio.Semaphore(20) # 동시성 제어
 
-        # 3. 개별 종목 처리 함수 (Internal Helper)
-        async def process_single_stock(stock_code: str) -> Optional[StrategyVerificationResult]:
-            async with sem:
-                try:
-                    # 1. 과거 데이터 조회
-                    def fetch_data():
-                        p_resp = supabase.table('kw_price_daily').select('trade_date,open,high,low,close,volume').eq('stock_code', stock_code).order('trade_date', desc=False).limit(200).execute()
-                        c_resp = supabase.table('kw_price_current').select('*').eq('stock_code', stock_code).limit(1).execute()
-                        return p_resp, c_resp
-                        
-                    price_response, curr_resp = await asyncio.to_thread(fetch_data)
-
-                    if not price_response.data or len(price_response.data) < 20:
-                        return None
-
-                    # DataFrame 변환
-                    df = pd.DataFrame(price_response.data)
-                    df['trade_date'] = pd.to_datetime(df['trade_date'])
-                    df.set_index('trade_date', inplace=True)
-                    for col in ['open', 'high', 'low', 'close', 'volume']:
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
-
-                    # 현재가 병합
-                    current_price = 0.0
-                    stock_name = stock_code
-                    
-                    if curr_resp.data and len(curr_resp.data) > 0:
-                        row = curr_resp.data[0]
-                        current_price = float(row.get('current_price') or 0)
-                        stock_name = row.get('stock_name', stock_code)
-                        
-                        if current_price > 0:
-                            try:
-                                now = datetime.now()
-                                last_date = df.index[-1]
-                                if last_date.date() < now.date():
-                                    new_row = pd.DataFrame([{
-                                        'open': current_price, 'high': current_price, 'low': current_price, 
-                                        'close': current_price, 'volume': 0
-                                    }], index=[pd.Timestamp(now)])
-                                    df = pd.concat([df, new_row])
-                                elif last_date.date() == now.date():
-                                    df.iloc[-1, df.columns.get_loc('close')] = current_price
-                            except Exception:
-                                pass
-                    
-                    # Fallback Price
-                    if current_price <= 0:
-                        if not df.empty:
-                            current_price = df.iloc[-1]['close']
-                        else:
-                            return None
-                            
-                    # 엔진 평가
-                    eval_result = await engine.evaluate_snapshot(stock_code, df, strategy_config)
-                    
-                    # 결과 포맷팅
-                    score = eval_result.get('score', 0)
-                    if not isinstance(score, (int, float)) or isinstance(score, float) and (math.isnan(score) or math.isinf(score)):
-                        score = 0.0
-                        
-                    signal = eval_result.get('signal', 'hold').upper()
-                    if signal == 'CONFLICT': signal = 'HOLD'
-                    
-                    safe_stock_name = stock_name or stock_code or "Unknown"
-                    if not isinstance(current_price, (int, float)) or isinstance(current_price, float) and (math.isnan(current_price) or math.isinf(current_price)):
-                        current_price = 0.0
-                    
-                    return StrategyVerificationResult(
-                        strategy_name=strategy_name,
-                        stock_code=stock_code,
-                        stock_name=safe_stock_name,
-                        current_price=float(current_price),
-                        signal_type=signal,
-                        score=float(score),
-                        details={
-                            'reasons': eval_result.get('reasons', []),
-                            'indicators': _sanitize_for_json(eval_result.get('indicators', {}))
-                        }
-                    )
-                except Exception as e:
-                    print(f"[Batch] Error processing {stock_code}: {e}")
-                    return None
+        # 3. 종목 조회 후 유니버스 일괄 평가
+        history = await asyncio.to_thread(_panel_history, stock_codes, '[Batch]')
+
+        def load(stock_code: str):
+            return _load_snapshot_frame(supabase, stock_code, sem, '[Batch]', history.get(stock_code))
 
-        # 4. 병렬 실행
-        tasks = [process_single_stock(code) for code in stock_codes]
-        results_raw = await asyncio.gather(*tasks)
-        results = [r for r in results_raw if r is not None]
+        results = await _verify_universe(engine, strategy_name, strategy_config, stock_codes, load)
         
         return results
 
@@ -2,6 +2,8 @@
 백테스트 엔진 핵심 모듈
 """
 
+import asyncio
+import threading
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
@@ -12,11 +14,27 @@ from dataclasses import dataclass, field
 from strategies.manager import StrategyManager
 from indicators.calculator import IndicatorCalculator
 from data.provider import DataProvider
+from .metrics import benchmark_cache, compute_risk_metrics
 from .models import BacktestResult, Position, Trade
+from .monte_carlo import DEFAULT_PATHS, run_monte_carlo
+from .parallel import compute_signal_frames, resolve_worker_count
+from .incremental import BacktestState, state_store
+from .portfolio import PortfolioSimulator, SimulatorSnapshot
+from .result_cache import cache_key, data_fingerprint, result_cache
+from .signals import (
+    ConditionCompiler, SignalFrame, StagedSignalEvaluator, UncompilableCondition,
+    SIGNAL_COLUMNS, STAGED_SIGNAL_COLUMNS, staged_signal_payload
+)
 
 class BacktestEngine:
     """백테스트 엔진"""
 
+    # 결과마다 붙는 몬테카를로 분석 경로 수 (0이면 생략)
+    monte_carlo_paths = DEFAULT_PATHS
+
+    # 실시간 스냅샷에서 EMA/RSI/MACD 등은 종목별 증분 상태로 마지막 봉만 갱신
+    streaming_snapshots = True
+
     def __init__(self):
         self.strategy_manager = StrategyManager()
         self.indicator_calculator = IndicatorCalculator()
@@ -36,7 +54,8 @@ class BacktestEngine:
 
         # 기본 OHLCV 및 시스템 컬럼은 제외
         exclude_columns = {'open', 'high', 'low', 'close', 'volume', 'date', 'stock_code',
-                          'buy_signal', 'sell_signal', 'position', 'returns', 'buy_reason'}
+                          'buy_signal', 'sell_signal', 'position', 'returns', 'buy_reason',
+                          *STAGED_SIGNAL_COLUMNS}
 
         # DataFrame의 모든 컬럼을 순회하면서 지표 값 수집
         for col_name in row.index:
@@ -62,6 +81,9 @@ class BacktestEngine:
         initial_capital: float = 10000000,
         commission: float = 0.00015,
         slippage: float = 0.001,
+        workers: Optional[int] = None,
+        use_cache: bool = True,
+        persist_state: bool = False,
         **kwargs
     ) -> Dict[str, Any]:
         """
@@ -75,6 +97,9 @@ class BacktestEngine:
             initial_capital: 초기 자본금
             commission: 수수료율
             slippage: 슬리피지
+            workers: 지표/신호 계산 프로세스 수 (None이면 BACKTEST_WORKERS, 0 이하면 전체 코어)
+            use_cache: 동일 입력/데이터 버전의 이전 결과 재사용 여부
+            persist_state: 종료 상태를 저장해 extend()로 새 일봉만 이어서 계산할 수 있게 함
 
         Returns:
             백테스트 결과
@@ -88,23 +113,11 @@ class BacktestEngine:
         if not strategy:
             raise ValueError(f"Strategy not found: {strategy_id}")
 
-        # 데이터 로드
-        price_data = await self._load_price_data(stock_codes, start_date, end_date)
-        if not price_data:
-            raise ValueError("No price data available")
-
-        # 백테스트 실행
-        results = await self._run_backtest(
-            strategy=strategy,
-            price_data=price_data,
-            initial_capital=initial_capital,
-            commission=commission,
-            slippage=slippage
+        return await self._run_cached(
+            strategy, strategy_id, stock_codes, start_date, end_date,
+            initial_capital, commission, slippage, workers, use_cache, persist_state
         )
 
-        # 결과 정리
-        return self._prepare_results(results, strategy_id, start_date, end_date)
-
     async def run_with_config(
         self,
         strategy_config: Dict[str, Any],
@@ -113,7 +126,10 @@ class BacktestEngine:
         end_date: str,
         initial_capital: float = 10000000,
         commission: float = 0.00015,
-        slippage: float = 0.001
+        slippage: float = 0.001,
+        workers: Optional[int] = None,
+        use_cache: bool = True,
+        persist_state: bool = False
     ) -> Dict[str, Any]:
         """
         설정으로 직접 백테스트 실행 (전략 저장 없이)
@@ -125,22 +141,133 @@ class BacktestEngine:
             'config': strategy_config
         }
 
-        # 데이터 로드
-        price_data = await self._load_price_data(stock_codes, start_date, end_date)
-        if not price_data:
-            raise ValueError("No price data available")
+        return await self._run_cached(
+            temp_strategy, temp_strategy['id'], stock_codes, start_date, end_date,
+            initial_capital, commission, slippage, workers, use_cache, persist_state
+        )
+
+    async def _run_cached(
+        self,
+        strategy: Dict[str, Any],
+        strategy_id: str,
+        stock_codes: List[str],
+        start_date: str,
+        end_date: str,
+        initial_capital: float,
+        commission: float,
+        slippage: float,
+        workers: Optional[int],
+        use_cache: bool,
+        persist_state: bool = False
+    ) -> Dict[str, Any]:
+        """
+        결과 캐시 조회 → (미스 시) 백테스트/결과 정리 후 캐시 저장
+
+        결과 키는 읽은 일봉 내용 해시를 포함하므로 보통 가격을 먼저 읽지만,
+        최근(BACKTEST_CACHE_FRESH_SECONDS) 같은 요청이 있었고 그 뒤 무효화가 없으면 가격을 다시 읽지 않음
+        """
+        price_data = None
+        key = None
+        # 상태 저장 실행은 새 backtest_id로 상태를 남겨야 하므로 캐시를 거치지 않음
+        if use_cache and not persist_state and result_cache.enabled:
+            inputs = (strategy.get('config', {}), stock_codes, start_date, end_date, initial_capital, commission, slippage)
+            extra = {'monte_carlo_paths': self.monte_carlo_paths}
+            request_key = cache_key(*inputs, data_version=f"request|{result_cache.generation_stamp(stock_codes)}",
+                                    extra=extra)
+            key = result_cache.recent_key(request_key)
+            cached = result_cache.get(key) if key is not None else None
+            if cached is None:
+                price_data = await self._load_price_data(stock_codes, start_date, end_date)
+                if not price_data:
+                    raise ValueError("No price data available")
+                key = cache_key(*inputs, data_version=data_fingerprint(price_data), extra=extra)
+                result_cache.remember_request(request_key, key)
+                cached = result_cache.get(key)
+            if cached is not None:
+                print(f"[Engine] Result cache hit: {key[:12]}")
+                return {**cached, 'strategy_id': strategy_id, 'cache_hit': True}
+
+        if price_data is None:
+            price_data = await self._load_price_data(stock_codes, start_date, end_date)
+            if not price_data:
+                raise ValueError("No price data available")
 
         # 백테스트 실행
         results = await self._run_backtest(
-            strategy=temp_strategy,
+            strategy=strategy,
             price_data=price_data,
             initial_capital=initial_capital,
             commission=commission,
-            slippage=slippage
+            slippage=slippage,
+            workers=workers,
+            capture_state=persist_state
         )
 
         # 결과 정리
-        return self._prepare_results(results, temp_strategy['id'], start_date, end_date)
+        final_results = self._prepare_results(results, strategy_id, start_date, end_date)
+        if key is not None:
+            result_cache.put(key, stock_codes, final_results)
+        if persist_state:
+            state_store.save(BacktestState(
+                backtest_id=final_results['backtest_id'], strategy=strategy, strategy_id=strategy_id,
+                start_date=start_date, end_date=end_date, initial_capital=initial_capital,
+                commission=commission, slippage=slippage,
+                price_data=BacktestState.compact_prices(price_data), snapshot=results['snapshot']
+            ))
+        return final_results
+
+    async def extend(
+        self,
+        backtest_id: str,
+        end_date: str,
+        workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        저장된 백테스트를 새 종료일까지 증분 연장
+
+        저장 시점 이후의 일봉만 불러와 이어 붙이고, 시뮬레이션은 새 거래일부터 재개한다.
+        결과(거래/일별 평가액/성과지표)는 같은 기간 전체 재실행과 동일하다.
+
+        Args:
+            backtest_id: persist_state=True로 실행한 백테스트 ID
+            end_date: 새 종료일
+
+        Returns:
+            전체 기간(start_date ~ end_date) 결과 (backtest_id 유지, 상태도 갱신)
+        """
+        state = state_store.load(backtest_id)
+        if state is None:
+            raise ValueError(f"No saved state for backtest: {backtest_id}")
+        if pd.Timestamp(end_date) <= pd.Timestamp(state.end_date):
+            raise ValueError(f"end_date must be after {state.end_date}")
+
+        # 1. 저장 종료일 다음 날부터의 일봉만 로드
+        new_start = (pd.Timestamp(state.end_date) + timedelta(days=1)).strftime('%Y-%m-%d')
+        new_data = await self._load_price_data(list(state.price_data), new_start, end_date)
+        price_data = state.merge_new_bars(new_data)
+        added = sum(len(price_data[code]) - len(state.price_data[code]) for code in price_data)
+        print(f"[Engine] Extending backtest {backtest_id}: {state.end_date} -> {end_date}, {added} new bars")
+
+        # 2. 지표/신호는 전체 이력, 시뮬레이션은 저장된 상태에서 재개
+        results = await self._run_backtest(
+            strategy=state.strategy,
+            price_data=price_data,
+            initial_capital=state.initial_capital,
+            commission=state.commission,
+            slippage=state.slippage,
+            workers=workers,
+            resume=state.snapshot,
+            capture_state=True
+        )
+
+        final_results = self._prepare_results(results, state.strategy_id, state.start_date, end_date)
+        final_results['backtest_id'] = backtest_id
+
+        state.end_date = end_date
+        state.price_data = price_data
+        state.snapshot = results['snapshot']
+        state_store.save(state)
+        return final_results
 
     async def evaluate_snapshot(
         self,
@@ -165,8 +292,54 @@ class BacktestEngine:
             
         # 1. 지표 계산
         # print(f"[Engine] Calculating indicators for snapshot: {stock_code}")
-        df = await self._calculate_indicators(df, strategy_config, stock_code)
-        
+        df = await self._calculate_snapshot_indicators(df, strategy_config, stock_code)
+        return await self._snapshot_result(stock_code, df, strategy_config)
+
+    async def evaluate_snapshots(
+        self,
+        frames: Dict[str, pd.DataFrame],
+        strategy_config: Dict[str, Any]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        여러 종목의 현시점 신호 일괄 평가 (검증 전체 실행용)
+        batch 지원 지표는 종목 x 날짜 패널에서 한 번에 계산하고, 나머지 지표와 신호 평가는 종목별로 수행
+
+        Returns:
+            {종목 코드: evaluate_snapshot과 같은 형식의 결과}
+        """
+        frames = {code: df for code, df in frames.items() if not df.empty}
+        indicators = strategy_config.get('indicators', [])
+        try:
+            batched, remaining = self.indicator_calculator.calculate_panel(frames, indicators)
+        except Exception as e:
+            print(f"[Engine] Batch indicator calculation failed, falling back to per-symbol: {e}")
+            batched, remaining = {}, indicators
+        if batched:
+            print(f"[Engine] Batch-calculated {len(indicators) - len(remaining)}/{len(indicators)} "
+                  f"indicators for {len(batched)} symbols")
+
+        results = {}
+        for code, df in frames.items():
+            try:
+                if code in batched:
+                    for col_name, col_data in batched[code].items():
+                        df[col_name] = col_data.to_numpy()  # 같은 날짜 인덱스 (패널에서 종목 봉만 추출)
+                    if remaining:
+                        df = await self._calculate_snapshot_indicators(df, dict(strategy_config, indicators=remaining), code)
+                else:
+                    df = await self._calculate_snapshot_indicators(df, strategy_config, code)
+                results[code] = await self._snapshot_result(code, df, strategy_config)
+            except Exception as e:
+                print(f"[Engine] Snapshot evaluation failed for {code}: {e}")
+        return results
+
+    async def _snapshot_result(
+        self,
+        stock_code: str,
+        df: pd.DataFrame,
+        strategy_config: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """지표가 계산된 프레임의 마지막 봉 신호 평가"""
         # 2. 신호 평가
         # print(f"[Engine] Evaluating signals for snapshot: {stock_code}")
         use_stage_based = strategy_config.get('useStageBasedStrategy', False)
@@ -198,7 +371,7 @@ class BacktestEngine:
         }
         
         # 매수 신호 확인
-        buy_signal = last_row.get('buy_signal')
+        buy_signal = staged_signal_payload(last_row, 'buy')
         if buy_signal:
             result['signal'] = 'buy'
             result['action'] = 'buy'
@@ -211,7 +384,7 @@ class BacktestEngine:
                 result['reasons'].append(last_row.get('buy_reason', 'Buy Signal'))
                 
         # 매도 신호 확인 (보유 중이라고 가정하고 체크할 수도 있음)
-        sell_signal = last_row.get('sell_signal')
+        sell_signal = staged_signal_payload(last_row, 'sell')
         if sell_signal:
             # 매수보다 매도 신호가 있으면 매도 우선 (보유 중이라면)
             # 하지만 스냅샷 평가는 주로 진입 여부를 보므로, 매수는 진입, 매도는 '진입 금지' 또는 '청산' 의미
@@ -238,19 +411,9 @@ class BacktestEngine:
         start_date: str,
         end_date: str
     ) -> Dict[str, pd.DataFrame]:
-        """주가 데이터 로드"""
-        price_data = {}
-
-        for code in stock_codes:
-            df = await self.data_provider.get_historical_data(
-                stock_code=code,
-                start_date=start_date,
-                end_date=end_date
-            )
-            if df is not None and not df.empty:
-                price_data[code] = df
-
-        return price_data
+        """주가 데이터 로드 (종목 묶음 단위 일괄 조회)"""
+        frames = await self.data_provider.get_bulk_historical_data(stock_codes, start_date, end_date)
+        return {code: df for code, df in frames.items() if df is not None and not df.empty}
 
     async def _run_backtest(
         self,
@@ -258,14 +421,17 @@ class BacktestEngine:
         price_data: Dict[str, pd.DataFrame],
         initial_capital: float,
         commission: float,
-        slippage: float
+        slippage: float,
+        workers: Optional[int] = None,
+        resume: Optional[SimulatorSnapshot] = None,
+        capture_state: bool = False
     ) -> Dict[str, Any]:
-        """백테스트 핵심 로직"""
+        """
+        백테스트 핵심 로직
 
-        capital = initial_capital
-        positions = {}  # 현재 보유 포지션
-        trades = []  # 거래 기록
-        daily_values = []  # 일별 자산 가치
+        resume: 저장된 시뮬레이터 상태 (증분 연장 시)
+        capture_state: 결과에 종료 시점 상태(snapshot) 포함
+        """
 
         strategy_config = strategy.get('config', {})
         use_stage_based = strategy_config.get('useStageBasedStrategy', False)
@@ -275,387 +441,92 @@ class BacktestEngine:
             buy_stages = strategy_config.get('buyStageStrategy', {}).get('stages', [])
             sell_stages = strategy_config.get('sellStageStrategy', {}).get('stages', [])
             print(f"Using stage-based strategy with {len(buy_stages)} buy stages and {len(sell_stages)} sell stages")
+        elif not strategy_config.get('buyConditions', []) or not strategy_config.get('sellConditions', []):
+            raise ValueError("Strategy must have both buy and sell conditions")
+
+        # 종목별 지표/신호 계산 (workers > 1이면 프로세스 풀에서 병렬 실행)
+        # 순차 실행도 CPU 작업이므로 asyncio.to_thread로 이벤트 루프 밖에서 계산
+        worker_count = resolve_worker_count(workers)
+        if worker_count > 1 and len(price_data) > 1:
+            print(f"[Engine] Step 1-2: Calculating indicators and signals with {worker_count} workers...")
+            prepared = await compute_signal_frames(price_data, strategy_config, worker_count)
         else:
-            buy_conditions = strategy_config.get('buyConditions', [])
-            sell_conditions = strategy_config.get('sellConditions', [])
-
-            if not buy_conditions or not sell_conditions:
-                raise ValueError("Strategy must have both buy and sell conditions")
-
-        # 각 종목별 백테스트
-        for stock_code, df in price_data.items():
-            print(f"[Engine] Processing {stock_code} with {len(df)} rows")
-
-            # 지표 계산
-            print(f"[Engine] Step 1: Calculating indicators...")
-            print(f"[Engine] DEBUG: strategy_config.get('indicators') = {strategy_config.get('indicators', [])}")
-            df = await self._calculate_indicators(df, strategy_config, stock_code)
-            print(f"[Engine] DEBUG: After _calculate_indicators, columns = {list(df.columns)}")
-
-            # Preflight 검증 (첫 종목에서만 수행)
-            if stock_code == list(price_data.keys())[0]:
-                print(f"[Engine] Step 1.5: Validating strategy conditions...")
-                validation_result = self._validate_strategy_conditions(
-                    strategy_config,
-                    list(df.columns)
+            prepared = {}
+            for stock_code, df in price_data.items():
+                prepared[stock_code] = await asyncio.to_thread(
+                    self._prepare_signal_frame_sync, df, strategy_config, stock_code
                 )
 
-                if not validation_result['valid']:
-                    raise ValueError(
-                        f"Strategy validation failed:\n" +
-                        "\n".join(validation_result['errors'])
-                    )
+        # Preflight 검증 (첫 종목 기준)
+        print(f"[Engine] Step 1.5: Validating strategy conditions...")
+        _, indicator_columns = next(iter(prepared.values()))
+        validation_result = self._validate_strategy_conditions(strategy_config, indicator_columns)
+        if not validation_result['valid']:
+            raise ValueError(
+                f"Strategy validation failed:\n" +
+                "\n".join(validation_result['errors'])
+            )
 
-            # 신호 생성
-            print(f"[Engine] Step 2: Evaluating signals...")
-            if use_stage_based:
-                df = await self._evaluate_staged_signals(df, buy_stages, sell_stages, positions, stock_code)
-            else:
-                df = await self._evaluate_signals(df, buy_conditions, sell_conditions, positions, stock_code)
-
-            # 거래 실행
-            print(f"[Engine] Step 3: Executing trades...")
-            trade_count = 0
-            for idx, row in df.iterrows():
-                trade_count += 1
-                if trade_count % 50 == 0:  # 50일마다 진행상황 출력
-                    print(f"[Engine] Processed {trade_count}/{len(df)} days")
-                date = idx
-                price = row['close']
-
-                # 매도 체크 - 목표수익률과 지표 조건 OR 처리
-                if stock_code in positions:
-                    position = positions[stock_code]
-                    should_exit = False
-                    exit_reason = None
-                    exit_ratio = 0  # 최대 비율을 선택
-                    exit_reasons = []
-
-                    # 1. 목표수익률/손절 체크
-                    target_profit_config = strategy_config.get('targetProfit')
-                    stop_loss_config = strategy_config.get('stopLoss')
-
-                    profit_exit, profit_reason, profit_exit_ratio = self._check_profit_based_exit(
-                        position, price, target_profit_config, stop_loss_config
-                    )
+        signal_frames = {code: df for code, (df, _) in prepared.items()}
+        benchmark = await self._load_benchmark(signal_frames)
+        return await asyncio.to_thread(
+            self._simulate_portfolio,
+            strategy_config, signal_frames, price_data, initial_capital, commission, slippage, benchmark,
+            resume=resume, capture_state=capture_state
+        )
 
-                    # 2. 시그널 기반 매도 체크 (단계별 매도)
-                    sell_signal_info = row.get('sell_signal')
-                    signal_exit = False
-                    signal_reason = None
-                    signal_exit_ratio = 0
-
-                    if sell_signal_info:
-                        if isinstance(sell_signal_info, dict):
-                            # 단계별 매도 (dict 형태)
-                            signal_exit = True
-                            signal_reason = sell_signal_info.get('reason', 'Signal')
-                            signal_exit_ratio = sell_signal_info.get('exitPercent', 100)
-                        else:
-                            # 기존 boolean 형태 (하위 호환성)
-                            signal_exit = True
-                            signal_reason = row.get('sell_reason', 'Signal')
-                            signal_exit_ratio = 100
-
-                    # 3. OR 조건: 목표수익률 OR 지표 조건 중 큰 비율 선택
-                    # 손절은 항상 최우선 (100% 매도)
-                    if profit_exit and 'Stop loss' in profit_reason:
-                        # 손절은 무조건 100% 매도
-                        should_exit = True
-                        exit_reason = profit_reason
-                        exit_ratio = 100
-                    else:
-                        # 목표수익률과 지표 조건 중 큰 비율 선택
-                        if profit_exit:
-                            exit_reasons.append(profit_reason)
-                            exit_ratio = max(exit_ratio, profit_exit_ratio)
-
-                        if signal_exit:
-                            exit_reasons.append(signal_reason)
-                            exit_ratio = max(exit_ratio, signal_exit_ratio)
-
-                        if exit_ratio > 0:
-                            should_exit = True
-                            exit_reason = ' OR '.join(exit_reasons)
-
-                    # 매도 실행
-                    if should_exit:
-                        # 매도 수량 계산 (exit_ratio 적용)
-                        sell_quantity = int(position['quantity'] * exit_ratio / 100)
-
-                        if sell_quantity > 0:
-                            # 슬리피지 적용 (매도 시 불리한 가격)
-                            sell_price = price * (1 - slippage)
-                            sell_amount = sell_quantity * sell_price
-                            commission_fee = sell_amount * commission
-
-                            # 수익 계산 (매도한 비율만큼의 원가 계산)
-                            sold_cost = position['total_cost'] * (sell_quantity / position['quantity'])
-                            # 매도 금액에서 수수료를 뺀 실수령액
-                            net_sell_amount = sell_amount - commission_fee
-                            # 수익 = 실수령액 - 원가 (원가에는 이미 매수 수수료 포함)
-                            profit = net_sell_amount - sold_cost
-                            profit_rate = profit / sold_cost * 100
-
-                            # 거래 기록
-                            print(f"[Engine] Recording sell trade: stock={stock_code}, reason={exit_reason}, ratio={exit_ratio}%")
-
-                            # 거래 시점의 모든 지표 값 기록
-                            indicators_at_trade = self._collect_indicators_at_trade(row)
-
-                            trades.append({
-                                'trade_id': str(uuid.uuid4()),
-                                'date': date,
-                                'stock_code': stock_code,
-                                'type': 'sell',
-                                'quantity': sell_quantity,
-                                'price': sell_price,
-                                'amount': sell_amount,
-                                'commission': commission_fee,
-                                'profit': profit,
-                                'profit_rate': profit_rate,
-                                'reason': exit_reason,
-                                'exit_ratio': exit_ratio,
-                                'indicators': indicators_at_trade  # 거래 시점 RSI 기록
-                            })
-
-                            # 자본금 업데이트 (실수령액 = 매도금액 - 수수료)
-                            capital += net_sell_amount
-
-                            # 포지션 업데이트 또는 제거
-                            if exit_ratio >= 100:
-                                # 전량 매도
-                                del positions[stock_code]
-                            else:
-                                # 부분 매도: 포지션 업데이트
-                                remaining_quantity = position['quantity'] - sell_quantity
-                                remaining_cost = position['total_cost'] - sold_cost
-
-                                positions[stock_code] = {
-                                    'quantity': remaining_quantity,
-                                    'avg_price': position['avg_price'],  # 평단가 유지
-                                    'total_cost': remaining_cost,
-                                    'entry_date': position['entry_date'],
-                                    'executed_exit_stages': position.get('executed_exit_stages', []),
-                                    'highest_stage_reached': position.get('highest_stage_reached', 0)
-                                }
-
-                                # 단계별 매도인 경우 실행된 단계 기록
-                                if 'stage_' in exit_reason:
-                                    stage_num = int(exit_reason.split('_')[1])
-                                    if stage_num not in positions[stock_code]['executed_exit_stages']:
-                                        positions[stock_code]['executed_exit_stages'].append(stage_num)
-
-                # 매수 체크 - 단일 매수 또는 분할 매수
-                buy_signal_info = row.get('buy_signal')
-
-                if buy_signal_info:
-                    # 분할 매수 처리 (단계별)
-                    if isinstance(buy_signal_info, dict) and 'stage' in buy_signal_info:
-                        stage_num = buy_signal_info['stage']
-                        position_ratio = buy_signal_info.get('positionPercent', 30) / 100.0
-
-                        # 이미 진입한 포지션이 있는 경우
-                        if stock_code in positions:
-                            position = positions[stock_code]
-                            executed_buy_stages = position.get('executed_buy_stages', [])
-
-                            # 이미 실행된 단계는 스킵
-                            if stage_num in executed_buy_stages:
-                                continue
-
-                            # 남은 자본금의 비율로 매수 (설명: 남은 자금의 position_ratio%만큼 매수)
-                            buy_amount_target = capital * position_ratio
-
-                        # 신규 진입인 경우
-                        else:
-                            buy_amount_target = capital * position_ratio
-
-                        # 슬리피지 적용
-                        buy_price = price * (1 + slippage)
-                        buy_quantity = int(buy_amount_target / buy_price)
-
-                        if buy_quantity > 0:
-                            buy_amount = buy_quantity * buy_price
-                            commission_fee = buy_amount * commission
-
-                            # 자본금 확인
-                            if buy_amount + commission_fee <= capital:
-                                # 거래 기록
-                                # 매수 이유 포맷팅
-                                buy_reason_detail = buy_signal_info.get('reason', 'Signal')
-                                buy_reason = f"매수 {stage_num}단계 ({buy_reason_detail})"
-                                print(f"[Engine] Recording staged buy trade: stock={stock_code}, stage={stage_num}, reason={buy_reason}")
-
-                                # 거래 시점의 모든 지표 값 기록
-                                indicators_at_trade = self._collect_indicators_at_trade(row)
-
-                                trades.append({
-                                    'trade_id': str(uuid.uuid4()),
-                                    'date': date,
-                                    'stock_code': stock_code,
-                                    'type': 'buy',
-                                    'quantity': buy_quantity,
-                                    'price': buy_price,
-                                    'amount': buy_amount,
-                                    'commission': commission_fee,
-                                    'reason': buy_reason,
-                                    'stage': stage_num,
-                                    'indicators': indicators_at_trade  # 거래 시점 모든 지표 기록
-                                })
-
-                                # 포지션 업데이트 또는 생성
-                                if stock_code in positions:
-                                    # 기존 포지션에 추가 (평단가 계산)
-                                    old_position = positions[stock_code]
-                                    total_quantity = old_position['quantity'] + buy_quantity
-                                    total_cost = old_position['total_cost'] + buy_amount + commission_fee
-                                    new_avg_price = (old_position['quantity'] * old_position['avg_price'] +
-                                                   buy_quantity * buy_price) / total_quantity
-
-                                    positions[stock_code] = {
-                                        'quantity': total_quantity,
-                                        'avg_price': new_avg_price,
-                                        'total_cost': total_cost,
-                                        'entry_date': old_position['entry_date'],
-                                        'executed_buy_stages': old_position.get('executed_buy_stages', []) + [stage_num],
-                                        'executed_exit_stages': old_position.get('executed_exit_stages', []),
-                                        'highest_stage_reached': old_position.get('highest_stage_reached', 0)
-                                    }
-                                else:
-                                    # 신규 포지션 생성
-                                    positions[stock_code] = {
-                                        'quantity': buy_quantity,
-                                        'avg_price': buy_price,
-                                        'total_cost': buy_amount + commission_fee,
-                                        'entry_date': date,
-                                        'executed_buy_stages': [stage_num],
-                                        'executed_exit_stages': [],
-                                        'highest_stage_reached': 0
-                                    }
-
-                                # 자본금 업데이트
-                                capital -= buy_amount + commission_fee
-
-                    # 기존 단일 매수 처리
-                    elif stock_code not in positions:
-                        # 매수 가능 금액 계산
-                        position_size = strategy_config.get('position_size', 0.3)  # 기본값 30%
-                        max_buy_amount = capital * position_size
-                        # 슬리피지 적용 (매수 시 불리한 가격)
-                        buy_price = price * (1 + slippage)
-                        buy_quantity = int(max_buy_amount / buy_price)
-
-                        if buy_quantity > 0:
-                            buy_amount = buy_quantity * buy_price
-                            commission_fee = buy_amount * commission
-
-                            # 거래 기록
-                            buy_reason = row.get('buy_reason', 'Signal')
-                            print(f"[Engine] Recording buy trade: stock={stock_code}, reason={buy_reason}")
-
-                            # 거래 시점의 모든 지표 값 기록
-                            indicators_at_trade = self._collect_indicators_at_trade(row)
-
-                            trades.append({
-                                'trade_id': str(uuid.uuid4()),
-                                'date': date,
-                                'stock_code': stock_code,
-                                'type': 'buy',
-                                'quantity': buy_quantity,
-                                'price': buy_price,
-                                'amount': buy_amount,
-                                'commission': commission_fee,
-                                'reason': buy_reason,
-                                'indicators': indicators_at_trade  # 거래 시점 RSI 기록
-                            })
-
-                            # 포지션 추가
-                            positions[stock_code] = {
-                                'quantity': buy_quantity,
-                                'avg_price': buy_price,
-                                'total_cost': buy_amount + commission_fee,
-                                'entry_date': date,
-                                'executed_buy_stages': [],
-                                'executed_exit_stages': [],  # 단계별 매도 추적
-                                'highest_stage_reached': 0  # 도달한 최고 단계 (동적 손절선 용)
-                            }
-
-                            # 자본금 업데이트
-                            capital -= buy_amount + commission_fee
-
-                # 일별 자산 가치 계산
-                total_value = capital
-                for code, pos in positions.items():
-                    if code in price_data:
-                        current_price = price_data[code].loc[date, 'close'] if date in price_data[code].index else pos['avg_price']
-                        total_value += pos['quantity'] * current_price
-
-                daily_values.append({
-                    'date': date,
-                    'capital': capital,
-                    'total_value': total_value,
-                    'positions': len(positions)
-                })
+    async def _load_benchmark(self, frames: Dict[str, pd.DataFrame]) -> Optional[pd.Series]:
+        """백테스트 기간의 KOSPI 종가 (프로세스 캐시 사용, 실패 시 None)"""
+        calendar = PortfolioSimulator.build_calendar(frames)
+        if len(calendar) < 2:
+            return None
+        return await asyncio.to_thread(benchmark_cache.get, calendar[0], calendar[-1])
+
+    def _simulate_portfolio(
+        self,
+        strategy_config: Dict[str, Any],
+        signal_frames: Dict[str, pd.DataFrame],
+        price_data: Dict[str, pd.DataFrame],
+        initial_capital: float,
+        commission: float,
+        slippage: float,
+        benchmark: Optional[pd.Series] = None,
+        resume: Optional[SimulatorSnapshot] = None,
+        capture_state: bool = False
+    ) -> Dict[str, Any]:
+        """
+        신호가 계산된 종목별 데이터로 거래 시뮬레이션 + 성과지표 계산
+
+        benchmark: KOSPI 종가 시계열 (없으면 베타=1.0 가정)
+        """
+
+        # 거래 실행 - 전 종목을 하나의 캘린더에서 날짜 순으로 시뮬레이션
+        print(f"[Engine] Step 3: Executing trades...")
+        simulator = PortfolioSimulator(self, strategy_config, initial_capital, commission, slippage)
+        simulation = simulator.run(signal_frames, resume)
+
+        capital = simulation['capital']
+        positions = simulation['positions']
+        ledger = simulation['ledger']
+        equity = simulation['equity']
 
         # 최종 결과 계산
         print(f"[Engine] Step 4: Calculating final results...")
         final_value = capital
-        for code, pos in positions.items():
+        for code in positions:
             # 미청산 포지션 현재가로 평가
-            last_price = price_data[code]['close'].iloc[-1] if code in price_data else pos['avg_price']
-            final_value += pos['quantity'] * last_price
-
-        # 위험조정 성과지표 계산 (샤프, 소르티노, 트레이너)
-        sharpe_ratio = None
-        sortino_ratio = None
-        treynor_ratio = None
-
-        if daily_values and len(daily_values) > 1:
-            # 일별 수익률 계산
-            daily_returns = []
-            for i in range(1, len(daily_values)):
-                prev_value = daily_values[i-1]['total_value']
-                curr_value = daily_values[i]['total_value']
-                if prev_value > 0:
-                    daily_return = (curr_value - prev_value) / prev_value
-                    daily_returns.append(daily_return)
-
-            if daily_returns and len(daily_returns) > 0:
-                avg_return = np.mean(daily_returns)
-                std_return = np.std(daily_returns, ddof=1)  # 표본 표준편차
-
-                # 무위험 이자율 (연 3% 가정, 일별로 환산)
-                risk_free_rate_daily = 0.03 / 252
-                excess_return = avg_return - risk_free_rate_daily
-
-                # 1. 샤프 비율: (평균 수익률 - 무위험 이자율) / 전체 변동성
-                if std_return > 0:
-                    sharpe_ratio = (excess_return / std_return) * np.sqrt(252)  # 연율화
-                else:
-                    sharpe_ratio = 0
-
-                # 2. 소르티노 비율: (평균 수익률 - 무위험 이자율) / 하방 편차
-                # 하방 편차: 목표수익률(무위험이자율) 미달 부분만의 표준편차
-                downside_deviations = [min(r - risk_free_rate_daily, 0) for r in daily_returns]
-                downside_variance = np.mean([d**2 for d in downside_deviations])
-
-                if downside_variance > 0:
-                    downside_std = np.sqrt(downside_variance)
-                    sortino_ratio = (excess_return / downside_std) * np.sqrt(252)  # 연율화
-                else:
-                    # 하방 편차가 0이면 손실이 전혀 없음 (매우 우수한 성과)
-                    sortino_ratio = sharpe_ratio * 2 if sharpe_ratio else 0
-
-                # 3. 트레이너 비율: (평균 수익률 - 무위험 이자율) / 베타
-                # 베타 계산을 위해서는 시장 수익률이 필요 (KOSPI 지수 등)
-                # 현재는 시장 데이터가 없으므로 베타=1로 가정 (시장과 동일한 변동성)
-                # TODO: 향후 KOSPI 지수 데이터를 추가하여 실제 베타 계산
-                assumed_beta = 1.0  # 시장 베타 (향후 실제 계산 필요)
-                if assumed_beta != 0:
-                    treynor_ratio = (excess_return * 252) / assumed_beta  # 연율화
-                else:
-                    treynor_ratio = 0
+            pos = positions.get(code)
+            last_price = price_data[code]['close'].iloc[-1] if code in price_data else pos.avg_price
+            final_value += pos.quantity * last_price
+
+        # 위험조정 성과지표 계산 (샤프, 소르티노, 칼마, 트레이너, 베타/알파)
+        risk_metrics = None
+        sharpe_ratio = sortino_ratio = treynor_ratio = None
+        if len(equity) > 1:
+            risk_metrics = compute_risk_metrics(equity.total_value, equity.calendar, benchmark)
+            sharpe_ratio = risk_metrics['sharpe_ratio']
+            sortino_ratio = risk_metrics['sortino_ratio']
+            treynor_ratio = risk_metrics['treynor_ratio']
 
         results = {
             'initial_capital': initial_capital,
@@ -665,18 +536,70 @@ class BacktestEngine:
             'sharpe_ratio': sharpe_ratio,
             'sortino_ratio': sortino_ratio,
             'treynor_ratio': treynor_ratio,
-            'trades': trades,
-            'positions': positions,
-            'daily_values': daily_values
+            'risk_metrics': risk_metrics,
+            'ledger': ledger,  # 거래 dict/지표 스냅샷은 _prepare_results에서 생성
+            'equity': equity,
+            'signal_frames': signal_frames,
+            'positions': positions.to_dicts()
         }
+        if capture_state:
+            results['snapshot'] = simulator.snapshot(equity)
 
         print(f"[Engine] Backtest completed successfully")
-        print(f"[Engine] Results: Total trades: {len(trades)}, Final capital: {final_value:,.0f}, Return: {results['total_return_rate']:.2f}%")
+        print(f"[Engine] Results: Total trades: {len(ledger)}, Final capital: {final_value:,.0f}, Return: {results['total_return_rate']:.2f}%")
         if sharpe_ratio is not None:
-            print(f"[Engine] Risk Metrics: Sharpe={sharpe_ratio:.2f}, Sortino={sortino_ratio:.2f}, Treynor={treynor_ratio:.2f}")
+            print(f"[Engine] Risk Metrics: Sharpe={sharpe_ratio:.2f}, Sortino={sortino_ratio:.2f}, Treynor={treynor_ratio:.2f}, Beta={risk_metrics['beta']:.2f} ({risk_metrics['beta_source']})")
 
         return results
 
+    async def _prepare_signal_frame(
+        self,
+        df: pd.DataFrame,
+        strategy_config: Dict[str, Any],
+        stock_code: Optional[str] = None
+    ) -> Tuple[pd.DataFrame, List[str]]:
+        """
+        종목 하나의 지표 계산 + 신호 생성
+
+        Returns:
+            (신호가 포함된 데이터프레임, 신호 생성 전 컬럼 목록 - 조건 검증용)
+        """
+        print(f"[Engine] Processing {stock_code} with {len(df)} rows")
+
+        # 지표 계산
+        print(f"[Engine] Step 1: Calculating indicators...")
+        df = await self._calculate_indicators(df, strategy_config, stock_code)
+        indicator_columns = list(df.columns)
+
+        # 신호 생성
+        print(f"[Engine] Step 2: Evaluating signals...")
+        df = await self._evaluate_strategy_signals(df, strategy_config)
+
+        return df, indicator_columns
+
+    def _prepare_signal_frame_sync(
+        self,
+        df: pd.DataFrame,
+        strategy_config: Dict[str, Any],
+        stock_code: Optional[str] = None
+    ) -> Tuple[pd.DataFrame, List[str]]:
+        """_prepare_signal_frame 동기 실행 (asyncio.to_thread 스레드용)"""
+        return asyncio.run(self._prepare_signal_frame(df, strategy_config, stock_code))
+
+    async def _evaluate_strategy_signals(self, df: pd.DataFrame, strategy_config: Dict[str, Any]) -> pd.DataFrame:
+        """전략 설정에 따라 일반/단계별 신호 생성 (시뮬레이션 전이므로 보유 포지션 없음)"""
+        if strategy_config.get('useStageBasedStrategy', False):
+            return await self._evaluate_staged_signals(
+                df,
+                strategy_config.get('buyStageStrategy', {}).get('stages', []),
+                strategy_config.get('sellStageStrategy', {}).get('stages', [])
+            )
+        return await self._evaluate_signals(
+            df,
+            strategy_config.get('buyConditions', []),
+            strategy_config.get('sellConditions', [])
+        )
+
     def _validate_strategy_conditions(
         self,
         strategy_config: Dict[str, Any],
@@ -753,6 +676,32 @@ class BacktestEngine:
             'warnings': warnings
         }
 
+    async def _calculate_snapshot_indicators(
+        self,
+        df: pd.DataFrame,
+        strategy_config: Dict[str, Any],
+        stock_code: str
+    ) -> pd.DataFrame:
+        """스냅샷 지표 계산: 증분 커널 대상은 스트림에서 가져오고 나머지만 전체 계산"""
+        indicators = strategy_config.get('indicators', [])
+        if not self.streaming_snapshots or not indicators:
+            return await self._calculate_indicators(df, strategy_config, stock_code)
+
+        try:
+            streamed, remaining = self.indicator_calculator.streaming_columns(df, indicators, stock_code)
+        except Exception as e:
+            print(f"[Engine] Streaming indicators failed for {stock_code}, falling back: {e}")
+            streamed, remaining = {}, indicators
+        if not streamed:
+            return await self._calculate_indicators(df, strategy_config, stock_code)
+
+        for col_name, col_data in streamed.items():
+            df[col_name] = col_data
+        print(f"[Engine] Streamed {len(indicators) - len(remaining)}/{len(indicators)} indicators for {stock_code}")
+        if remaining:
+            df = await self._calculate_indicators(df, dict(strategy_config, indicators=remaining), stock_code)
+        return df
+
     async def _calculate_indicators(
         self,
         df: pd.DataFrame,
@@ -770,47 +719,49 @@ class BacktestEngine:
             print(f"[Engine] WARNING: No indicators to calculate!")
             return df
 
-        for idx, indicator in enumerate(indicators):
-            try:
-                print(f"[Engine] Calculating indicator {idx+1}/{len(indicators)}: {indicator}")
-                print(f"[Engine] DEBUG: About to call calculator.calculate()")
-                print(f"[Engine] DEBUG: df.shape={df.shape}, df.columns={list(df.columns)}")
+        # 같은 종목의 지표들은 EMA/SMA/std/true range 등 중간 시계열을 한 번만 계산해 공유
+        with self.indicator_calculator.shared_intermediates(df):
+            for idx, indicator in enumerate(indicators):
+                try:
+                    print(f"[Engine] Calculating indicator {idx+1}/{len(indicators)}: {indicator}")
+                    print(f"[Engine] DEBUG: About to call calculator.calculate()")
+                    print(f"[Engine] DEBUG: df.shape={df.shape}, df.columns={list(df.columns)}")
 
-                # calculate 메서드는 IndicatorResult를 반환하므로 이를 처리
-                # stock_code를 전달하여 캐시 충돌 방지
-                result = self.indicator_calculator.calculate(df, indicator, stock_code=stock_code)
+                    # calculate 메서드는 IndicatorResult를 반환하므로 이를 처리
+                    # stock_code를 전달하여 캐시 충돌 방지 (디스크 저장소에 있는 구간은 재사용, 이후 봉만 계산)
+                    result = self.indicator_calculator.calculate_stored(df, indicator, stock_code=stock_code)
 
-                print(f"[Engine] DEBUG: calculate() returned")
-                print(f"[Engine] DEBUG: result type={type(result)}")
-                print(f"[Engine] DEBUG: result is None? {result is None}")
+                    print(f"[Engine] DEBUG: calculate() returned")
+                    print(f"[Engine] DEBUG: result type={type(result)}")
+                    print(f"[Engine] DEBUG: result is None? {result is None}")
 
-                if result is None:
-                    print(f"[Engine] WARNING: calculate() returned None for indicator {indicator.get('name')}")
-                    continue
+                    if result is None:
+                        print(f"[Engine] WARNING: calculate() returned None for indicator {indicator.get('name')}")
+                        continue
 
-                print(f"[Engine] DEBUG: hasattr(result, 'columns')={hasattr(result, 'columns')}")
+                    print(f"[Engine] DEBUG: hasattr(result, 'columns')={hasattr(result, 'columns')}")
 
-                # IndicatorResult의 columns 속성에서 데이터를 가져와 DataFrame에 추가
-                if hasattr(result, 'columns'):
-                    print(f"[Engine] DEBUG: result.columns type={type(result.columns)}")
-                    print(f"[Engine] DEBUG: result.columns keys={list(result.columns.keys()) if result.columns else 'empty'}")
+                    # IndicatorResult의 columns 속성에서 데이터를 가져와 DataFrame에 추가
+                    if hasattr(result, 'columns'):
+                        print(f"[Engine] DEBUG: result.columns type={type(result.columns)}")
+                        print(f"[Engine] DEBUG: result.columns keys={list(result.columns.keys()) if result.columns else 'empty'}")
 
-                    if not result.columns:
-                        print(f"[Engine] WARNING: result.columns is empty for indicator {indicator.get('name')}")
-                        continue
+                        if not result.columns:
+                            print(f"[Engine] WARNING: result.columns is empty for indicator {indicator.get('name')}")
+                            continue
 
-                    for col_name, col_data in result.columns.items():
-                        print(f"[Engine] DEBUG: Adding column {col_name}, type={type(col_data)}, len={len(col_data) if hasattr(col_data, '__len__') else 'N/A'}")
-                        df[col_name] = col_data
-                        print(f"[Engine] Added column: {col_name}")
-                else:
-                    print(f"[Engine] WARNING: result has no 'columns' attribute, result={result}")
+                        for col_name, col_data in result.columns.items():
+                            print(f"[Engine] DEBUG: Adding column {col_name}, type={type(col_data)}, len={len(col_data) if hasattr(col_data, '__len__') else 'N/A'}")
+                            df[col_name] = col_data
+                            print(f"[Engine] Added column: {col_name}")
+                    else:
+                        print(f"[Engine] WARNING: result has no 'columns' attribute, result={result}")
 
-            except Exception as e:
-                print(f"[Engine] Error calculating indicator {indicator.get('name', 'unknown')}: {e}")
-                import traceback
-                traceback.print_exc()
-                # 에러가 발생해도 계속 진행
+                except Exception as e:
+                    print(f"[Engine] Error calculating indicator {indicator.get('name', 'unknown')}: {e}")
+                    import traceback
+                    traceback.print_exc()
+                    # 에러가 발생해도 계속 진행
 
         # 추가 컬럼은 Supabase 지표 정의를 통해서만 계산
         # 하드코딩 금지 - ENFORCE_DB_INDICATORS 정책 준수
@@ -833,7 +784,7 @@ class BacktestEngine:
         positions: Dict = None,
         stock_code: str = None
     ) -> pd.DataFrame:
-        """신호 평가"""
+        """신호 평가 - 조건을 컬럼 단위 마스크로 컴파일하여 평가"""
         df['buy_signal'] = False
         df['sell_signal'] = False
         df['buy_reason'] = ''
@@ -843,10 +794,11 @@ class BacktestEngine:
         print(f"[Engine] Buy conditions: {buy_conditions}")
         print(f"[Engine] Sell conditions: {sell_conditions}")
 
-        # 이전 값 컬럼 추가 (cross 연산을 위해)
-        for col in df.columns:
-            if col not in ['buy_signal', 'sell_signal', 'buy_reason', 'sell_reason']:
-                df['prev_' + col] = df[col].shift(1)
+        # cross 연산용 이전 값 원본 (profit_rate 갱신 전 상태 기준)
+        prev_source = {
+            col: (df[col].copy() if col == 'profit_rate' else df[col])
+            for col in df.columns if col not in SIGNAL_COLUMNS
+        }
 
         # 현재 포지션의 수익률 추가 (매도 조건 평가를 위해)
         if positions and stock_code and stock_code in positions:
@@ -856,6 +808,44 @@ class BacktestEngine:
         else:
             df['profit_rate'] = 0
 
+        try:
+            frame = SignalFrame(df, prev_source)
+            compiler = ConditionCompiler(self)
+            compiled = {}
+            for side, conditions in (('buy', buy_conditions), ('sell', sell_conditions)):
+                if conditions:
+                    mask, reason_bits = compiler.compile_conditions(frame, conditions)
+                    compiled[side] = (mask, compiler.format_reasons(conditions, mask, reason_bits))
+        except UncompilableCondition as e:
+            print(f"[Engine] Falling back to row-wise signal evaluation: {e}")
+            return self._evaluate_signals_rowwise(df, buy_conditions, sell_conditions, prev_source)
+
+        for side, (mask, reasons) in compiled.items():
+            df[f'{side}_signal'] = mask
+            df[f'{side}_reason'] = reasons
+
+        # 기존 경로와 동일하게 원본에 있던 prev_ 컬럼은 제거
+        prev_cols = [col for col in df.columns if col.startswith('prev_')]
+        if prev_cols:
+            df.drop(columns=prev_cols, inplace=True)
+
+        buy_signal_count = int(compiled['buy'][0].sum()) if 'buy' in compiled else 0
+        sell_signal_count = int(compiled['sell'][0].sum()) if 'sell' in compiled else 0
+        print(f"[Engine] Signal evaluation complete: {buy_signal_count} buy signals, {sell_signal_count} sell signals")
+        return df
+
+    def _evaluate_signals_rowwise(
+        self,
+        df: pd.DataFrame,
+        buy_conditions: List[Dict],
+        sell_conditions: List[Dict],
+        prev_source: Dict[str, pd.Series]
+    ) -> pd.DataFrame:
+        """행 단위 신호 평가 (컴파일할 수 없는 조건용 대체 경로)"""
+        # 이전 값 컬럼 추가 (cross 연산을 위해)
+        for col, series in prev_source.items():
+            df['prev_' + col] = series.shift(1)
+
         # 매수/매도 조건 평가
         buy_signal_count = 0
         sell_signal_count = 0
@@ -917,115 +907,70 @@ class BacktestEngine:
         """
         단계별 신호 평가
 
-        각 행(날짜)마다 모든 단계의 조건을 체크하고,
-        조건이 만족되면 해당 단계 정보를 신호에 포함
+        단계별 조건 마스크로 (행 × 단계) 행렬을 만들고 첫 번째 만족 단계를 선택.
+        단계 번호와 비율은 compact 컬럼(buy_stage, buy_position_percent, sell_stage,
+        sell_exit_percent)에 저장되며, 거래 시점에 staged_signal_payload()로 dict 복원
         """
-        df['buy_signal'] = None
-        df['buy_reason'] = ''
-        df['sell_signal'] = None  # Changed from False to None to support dict values
-        df['sell_reason'] = ''
+        frame = SignalFrame(df, {})
+        evaluator = StagedSignalEvaluator(ConditionCompiler(self))
 
-        buy_signal_count = 0
-        sell_signal_count = 0
+        try:
+            buy = evaluator.evaluate(frame, buy_stages, 30, 'positionPercent')
+            sell = evaluator.evaluate(frame, sell_stages, 100, 'exitPercent')
+        except UncompilableCondition as e:
+            print(f"[Engine] Falling back to row-wise staged signal evaluation: {e}")
+            buy = self._evaluate_stages_rowwise(df, buy_stages, 30, 'positionPercent')
+            sell = self._evaluate_stages_rowwise(df, sell_stages, 100, 'exitPercent')
+
+        df['buy_signal'] = buy['stage'] > 0
+        df['buy_reason'] = buy['reason']
+        df['sell_signal'] = sell['stage'] > 0
+        df['sell_reason'] = sell['reason']
+        df['buy_stage'] = buy['stage']
+        df['buy_position_percent'] = buy['percent']
+        df['sell_stage'] = sell['stage']
+        df['sell_exit_percent'] = sell['percent']
+
+        buy_signal_count = int(df['buy_signal'].sum())
+        sell_signal_count = int(df['sell_signal'].sum())
+        print(f"[Engine] Staged signal evaluation complete: {buy_signal_count} buy signals, {sell_signal_count} sell signals")
+        return df
 
-        for i in range(len(df)):
+    def _evaluate_stages_rowwise(
+        self,
+        df: pd.DataFrame,
+        stages: List[Dict],
+        default_percent: float,
+        percent_key: str
+    ) -> Dict[str, np.ndarray]:
+        """행 단위 단계별 평가 (컴파일할 수 없는 단계용 대체 경로, StagedSignalEvaluator.evaluate와 같은 형식)"""
+        length = len(df)
+        active = [s for s in stages if s.get('enabled', False) and s.get('conditions', [])]
+
+        stage_out = np.zeros(length, dtype=np.int16)
+        percent_out = np.full(length, np.nan)
+        reason_out = np.full(length, '', dtype=object)
+
+        for i in range(length if active else 0):
             row = df.iloc[i]
-
-            # 매수 단계 체크
-            for stage in buy_stages:
-                if not stage.get('enabled', False):
-                    continue
-
-                stage_num = stage.get('stage', 1)
-                conditions = stage.get('conditions', [])
-                position_percent = stage.get('positionPercent', 30)
-                pass_all_required = stage.get('passAllRequired', True)
-
-                if not conditions:
-                    continue
-
-                # 조건 평가
-                results = []
-                reasons = []
-
-                for condition in conditions:
-                    result = self._check_condition(row, condition)
-                    results.append(result)
-                    if result:
-                        reasons.append(self._format_condition_reason(condition))
-
-                    # RSI 조건 디버깅
-                    if condition.get('left') == 'rsi' or condition.get('indicator') == 'rsi':
-                        rsi_value = row.get('rsi', None)
-                        compare_val = condition.get('right', condition.get('value'))
-                        operator = condition.get('operator')
-                        if not pd.isna(rsi_value):
-                            print(f"[Debug] Stage {stage_num} - RSI check: {rsi_value:.2f} {operator} {compare_val} = {result}")
-
-                # passAllRequired에 따라 판단
-                if pass_all_required:
-                    # AND: 모든 조건 만족
-                    stage_satisfied = all(results) if results else False
-                else:
-                    # OR: 하나라도 만족
-                    stage_satisfied = any(results) if results else False
-
-                if stage_satisfied:
-                    # 신호 설정 (dict 형태로 stage 정보 포함)
-                    rsi_debug = row.get('rsi', 'N/A')
-                    print(f"[Debug] BUY SIGNAL GENERATED: Stage {stage_num}, RSI={rsi_debug}, Conditions={conditions}")
-
-                    df.at[df.index[i], 'buy_signal'] = {
-                        'stage': stage_num,
-                        'positionPercent': position_percent,
-                        'reason': ' AND '.join(reasons) if pass_all_required else ' OR '.join(reasons)
-                    }
-                    df.at[df.index[i], 'buy_reason'] = f"Stage {stage_num}: {' AND '.join(reasons) if pass_all_required else ' OR '.join(reasons)}"
-                    buy_signal_count += 1
-                    break  # 첫 번째 만족한 단계만 실행 (중복 방지)
-
-            # 매도 단계 체크
-            for stage in sell_stages:
-                if not stage.get('enabled', False):
-                    continue
-
-                stage_num = stage.get('stage', 1)
-                conditions = stage.get('conditions', [])
-                position_percent = stage.get('positionPercent', 100)
+            for stage in active:
                 pass_all_required = stage.get('passAllRequired', True)
-
-                if not conditions:
-                    continue
-
-                # 조건 평가
-                results = []
-                reasons = []
-
-                for condition in conditions:
+                results, reasons = [], []
+                for condition in stage['conditions']:
                     result = self._check_condition(row, condition)
                     results.append(result)
                     if result:
                         reasons.append(self._format_condition_reason(condition))
 
-                # passAllRequired에 따라 판단
-                if pass_all_required:
-                    stage_satisfied = all(results) if results else False
-                else:
-                    stage_satisfied = any(results) if results else False
-
-                if stage_satisfied:
-                    # 단계별 매도는 dict 형태로 저장 (exitPercent 포함)
-                    df.at[df.index[i], 'sell_signal'] = {
-                        'stage': stage_num,
-                        'exitPercent': stage.get('exitPercent', 100),
-                        'reason': f"Stage {stage_num}: {' AND '.join(reasons) if pass_all_required else ' OR '.join(reasons)}"
-                    }
-                    df.at[df.index[i], 'sell_reason'] = f"Stage {stage_num}: {' AND '.join(reasons) if pass_all_required else ' OR '.join(reasons)}"
-                    sell_signal_count += 1
+                if all(results) if pass_all_required else any(results):
+                    stage_num = stage.get('stage', 1)
+                    joiner = ' AND ' if pass_all_required else ' OR '
+                    stage_out[i] = stage_num
+                    percent_out[i] = stage.get(percent_key, default_percent)
+                    reason_out[i] = f"Stage {stage_num}: {joiner.join(reasons)}"
                     break
 
-        print(f"[Engine] Staged signal evaluation complete: {buy_signal_count} buy signals, {sell_signal_count} sell signals")
-        return df
+        return {'stage': stage_out, 'percent': percent_out, 'reason': reason_out}
 
     def _resolve_indicator_name(self, row: pd.Series, indicator_name: Any) -> Optional[str]:
         """
@@ -1469,7 +1414,9 @@ class BacktestEngine:
         """결과 정리"""
         print(f"[Engine] Preparing final results for API response...")
 
-        trades = results.get('trades', [])
+        # _simulate_portfolio 결과는 항상 원장(ledger)과 자산 곡선(equity)을 포함
+        trades = results['ledger'].to_dicts(results.get('signal_frames'), self._collect_indicators_at_trade)
+        daily_values = results['equity'].to_dicts()
 
         # 승률 계산
         winning_trades = [t for t in trades if t.get('type') == 'sell' and t.get('profit', 0) > 0]
@@ -1480,16 +1427,19 @@ class BacktestEngine:
         win_rate = (len(winning_trades) / len(sell_trades) * 100) if sell_trades else 0
 
         # 최대 손실 계산
-        max_drawdown = 0
-        daily_values = results.get('daily_values', [])
-        if daily_values:
-            peak = daily_values[0].get('total_value', results['initial_capital'])
-            for dv in daily_values:
-                value = dv.get('total_value', 0)
-                peak = max(peak, value)
-                if peak > 0:
-                    drawdown = (peak - value) / peak * 100
-                    max_drawdown = max(max_drawdown, drawdown)
+        max_drawdown = results['equity'].max_drawdown()
+
+        # 몬테카를로 강건성 분석 (일별 수익률 / 실현 거래 수익률 재표본추출)
+        monte_carlo = None
+        if self.monte_carlo_paths:
+            try:
+                monte_carlo = run_monte_carlo(
+                    results['equity'].total_value,
+                    [t['profit_rate'] for t in sell_trades],
+                    n_paths=self.monte_carlo_paths
+                )
+            except Exception as e:
+                print(f"[Engine] WARNING: Monte Carlo analysis failed: {e}")
 
         final_results = {
             'backtest_id': str(uuid.uuid4()),
@@ -1509,7 +1459,9 @@ class BacktestEngine:
             'sharpe_ratio': results.get('sharpe_ratio'),
             'sortino_ratio': results.get('sortino_ratio'),
             'treynor_ratio': results.get('treynor_ratio'),
+            'risk_metrics': results.get('risk_metrics'),
             'daily_values': daily_values,
+            'monte_carlo': monte_carlo,
             'status': 'completed'  # 완료 상태 추가
         }
 
@@ -1517,3 +1469,17 @@ class BacktestEngine:
 
         return final_results
 
+
+
+_shared_engine: Optional[BacktestEngine] = None
+_shared_engine_lock = threading.Lock()
+
+
+def get_engine() -> BacktestEngine:
+    """API 요청 간 공유 엔진 (Supabase 클라이언트/지표 카탈로그/지표 실행 캐시를 요청마다 다시 만들지 않음)"""
+    global _shared_engine
+    if _shared_engine is None:
+        with _shared_engine_lock:
+            if _shared_engine is None:
+                _shared_engine = BacktestEngine()
+    return _shared_engine
@@ -0,0 +1,103 @@
+"""
+증분 백테스트 상태 저장
+- 실행 종료 시점의 시뮬레이터 상태(현금, 포지션/단계 진행, 원장, 자산 곡선)와 종목별 OHLCV를 저장
+- 연장 시 end_date 이후 추가된 일봉만 불러와 이어 붙이고, 새 거래일만 시뮬레이션
+- 지표/신호는 이어 붙인 전체 이력에 대해 벡터 연산으로 다시 계산
+  (EMA 같은 재귀형 지표도 전체 재실행과 같은 값이 되도록 잘린 꼬리 상태 대신 원본 OHLCV를 보관)
+"""
+
+import os
+import pickle
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .portfolio import SimulatorSnapshot
+
+STATE_DIR_ENV = 'BACKTEST_STATE_DIR'
+DEFAULT_STATE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'backtest_state'
+)
+STATE_VERSION = 1
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+@dataclass
+class BacktestState:
+    """저장된 백테스트 한 건의 재개 상태"""
+    backtest_id: str
+    strategy: Dict[str, Any]  # {'id', 'config', ...}
+    strategy_id: str
+    start_date: str
+    end_date: str
+    initial_capital: float
+    commission: float
+    slippage: float
+    price_data: Dict[str, pd.DataFrame]  # 종목별 OHLCV (연장 시 새 일봉을 이어 붙임)
+    snapshot: SimulatorSnapshot
+    version: int = STATE_VERSION
+
+    @staticmethod
+    def compact_prices(price_data: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """지표 컬럼을 제외한 OHLCV만 보관"""
+        return {
+            code: df[[col for col in OHLCV_COLUMNS if col in df.columns]].copy()
+            for code, df in price_data.items()
+        }
+
+    def merge_new_bars(self, new_data: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """저장된 OHLCV 뒤에 마지막 저장일 이후의 일봉만 이어 붙임"""
+        merged = {}
+        for code, df in self.price_data.items():
+            new_df = new_data.get(code)
+            if new_df is not None and not new_df.empty:
+                new_df = new_df.loc[new_df.index > df.index[-1], df.columns]
+                df = pd.concat([df, new_df]) if not new_df.empty else df
+            merged[code] = df
+        return merged
+
+
+class BacktestStateStore:
+    """backtest_id → BacktestState 파일 저장소 (pickle)"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.getenv(STATE_DIR_ENV) or DEFAULT_STATE_DIR
+
+    def _path(self, backtest_id: str) -> str:
+        return os.path.join(self.directory, f"{backtest_id}.pkl")
+
+    def save(self, state: BacktestState):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(state.backtest_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        print(f"[Incremental] Saved state for {state.backtest_id} (through {state.end_date})")
+
+    def load(self, backtest_id: str) -> Optional[BacktestState]:
+        try:
+            with open(self._path(backtest_id), 'rb') as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        if getattr(state, 'version', None) != STATE_VERSION:
+            print(f"[Incremental] Ignoring state {backtest_id}: unsupported version")
+            return None
+        return state
+
+    def delete(self, backtest_id: str) -> bool:
+        try:
+            os.remove(self._path(backtest_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def list_ids(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-4] for name in os.listdir(self.directory) if name.endswith('.pkl'))
+
+
+state_store = BacktestStateStore()
@@ -0,0 +1,297 @@
+"""
+백테스트 거래 원장 / 포지션 북 / 일별 자산 곡선
+- 거래는 청크 단위로 늘어나는 NumPy 구조화 배열에 기록
+- 거래 시점 지표 스냅샷은 (종목, 행 위치)만 저장하고 결과 직렬화 시점에 생성
+- 포지션은 __slots__ 레코드 + 보유 수량 벡터로 관리
+"""
+
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set
+
+import numpy as np
+import pandas as pd
+
+from .metrics import max_drawdown
+
+BUY, SELL = 0, 1
+NO_STAGE = -1
+
+TRADE_DTYPE = np.dtype([
+    ('t', np.int64),            # 캘린더 위치
+    ('stock', np.int32),        # 종목 위치
+    ('bar', np.int64),          # 종목 데이터프레임 행 위치 (지표 스냅샷용)
+    ('side', np.int8),          # BUY / SELL
+    ('quantity', np.int64),
+    ('price', np.float64),
+    ('amount', np.float64),
+    ('commission', np.float64),
+    ('profit', np.float64),
+    ('profit_rate', np.float64),
+    ('exit_ratio', np.float64),
+    ('stage', np.int16),        # 분할 매수 단계 (없으면 NO_STAGE)
+])
+
+
+def _plain_number(value: float):
+    """정수로 표현 가능한 비율은 int로 반환 (기존 dict 기록과 동일한 형태)"""
+    return int(value) if float(value).is_integer() else float(value)
+
+
+class TradeLedger:
+    """청크 단위로 확장되는 컬럼형 거래 원장"""
+
+    def __init__(self, codes: Sequence[str], calendar: pd.DatetimeIndex, chunk_size: int = 1024):
+        self.codes = list(codes)
+        self.calendar = calendar
+        self.chunk_size = chunk_size
+        self._records = np.zeros(chunk_size, dtype=TRADE_DTYPE)
+        self._reasons: List[str] = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @classmethod
+    def restore(
+        cls, codes: Sequence[str], calendar: pd.DatetimeIndex, records: np.ndarray, reasons: Sequence[str]
+    ) -> 'TradeLedger':
+        """저장된 기록으로 원장 복원 (캘린더는 이어 붙인 전체 캘린더)"""
+        ledger = cls(codes, calendar)
+        ledger._records = np.zeros(len(records) + ledger.chunk_size, dtype=TRADE_DTYPE)
+        ledger._records[:len(records)] = records
+        ledger._reasons = list(reasons)
+        ledger._size = len(records)
+        return ledger
+
+    @property
+    def reasons(self) -> List[str]:
+        return self._reasons
+
+    @property
+    def records(self) -> np.ndarray:
+        """기록된 구간의 구조화 배열 (뷰)"""
+        return self._records[:self._size]
+
+    def _next_slot(self) -> np.void:
+        if self._size == len(self._records):
+            grown = np.zeros(len(self._records) + self.chunk_size, dtype=TRADE_DTYPE)
+            grown[:self._size] = self._records
+            self._records = grown
+        slot = self._records[self._size]
+        self._size += 1
+        return slot
+
+    def record_buy(
+        self, t: int, stock: int, bar: int, quantity: int, price: float,
+        amount: float, commission: float, reason: str, stage: int = NO_STAGE
+    ):
+        """매수 기록"""
+        slot = self._next_slot()
+        slot['t'], slot['stock'], slot['bar'], slot['side'] = t, stock, bar, BUY
+        slot['quantity'], slot['price'], slot['amount'], slot['commission'] = quantity, price, amount, commission
+        slot['stage'] = stage
+        self._reasons.append(reason)
+
+    def record_sell(
+        self, t: int, stock: int, bar: int, quantity: int, price: float, amount: float,
+        commission: float, profit: float, profit_rate: float, reason: str, exit_ratio: float
+    ):
+        """매도 기록"""
+        slot = self._next_slot()
+        slot['t'], slot['stock'], slot['bar'], slot['side'] = t, stock, bar, SELL
+        slot['quantity'], slot['price'], slot['amount'], slot['commission'] = quantity, price, amount, commission
+        slot['profit'], slot['profit_rate'], slot['exit_ratio'] = profit, profit_rate, exit_ratio
+        slot['stage'] = NO_STAGE
+        self._reasons.append(reason)
+
+    def win_rate(self) -> float:
+        """매도 거래 중 수익 거래 비율 (%)"""
+        sells = self.records[self.records['side'] == SELL]
+        if len(sells) == 0:
+            return 0
+        return float((sells['profit'] > 0).sum()) / len(sells) * 100
+
+    def to_dicts(
+        self,
+        frames: Optional[Dict[str, pd.DataFrame]] = None,
+        snapshot: Optional[Callable[[pd.Series], Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        API 응답용 거래 dict 목록 생성
+
+        Args:
+            frames: 종목코드 → 지표가 계산된 데이터프레임 (지표 스냅샷 생성용)
+            snapshot: 행 → 지표 dict 변환 함수 (BacktestEngine._collect_indicators_at_trade)
+        """
+        trades = []
+        for rec, reason in zip(self.records, self._reasons):
+            code = self.codes[rec['stock']]
+            trade = {
+                'trade_id': str(uuid.uuid4()),
+                'date': self.calendar[rec['t']],
+                'stock_code': code,
+                'type': 'buy' if rec['side'] == BUY else 'sell',
+                'quantity': int(rec['quantity']),
+                'price': float(rec['price']),
+                'amount': float(rec['amount']),
+                'commission': float(rec['commission']),
+            }
+            if rec['side'] == SELL:
+                trade['profit'] = float(rec['profit'])
+                trade['profit_rate'] = float(rec['profit_rate'])
+                trade['reason'] = reason
+                trade['exit_ratio'] = _plain_number(rec['exit_ratio'])
+            else:
+                trade['reason'] = reason
+                if rec['stage'] != NO_STAGE:
+                    trade['stage'] = int(rec['stage'])
+
+            if frames is not None and snapshot is not None:
+                trade['indicators'] = snapshot(frames[code].iloc[rec['bar']])
+            trades.append(trade)
+        return trades
+
+
+class Position:
+    """보유 포지션 레코드 (기존 dict 인터페이스와 호환되는 키 접근 지원)"""
+
+    __slots__ = (
+        'stock', 'quantity', 'avg_price', 'total_cost', 'entry_date',
+        'buy_stages', 'exit_stages', 'highest_stage_reached'
+    )
+
+    def __init__(self, stock: int, quantity: int, avg_price: float, total_cost: float, entry_date: Any):
+        self.stock = stock
+        self.quantity = quantity
+        self.avg_price = avg_price
+        self.total_cost = total_cost
+        self.entry_date = entry_date
+        self.buy_stages: Set[int] = set()  # 실행된 분할 매수 단계 (단계 번호는 사용자 설정값이라 비트마스크 대신 집합)
+        self.exit_stages: Set[int] = set()  # 실행된 단계별 매도 단계
+        self.highest_stage_reached = 0  # 도달한 최고 단계 (동적 손절선 용)
+
+    @property
+    def executed_buy_stages(self) -> List[int]:
+        return sorted(self.buy_stages)
+
+    @property
+    def executed_exit_stages(self) -> List[int]:
+        return sorted(self.exit_stages)
+
+    def has_buy_stage(self, stage: int) -> bool:
+        return stage in self.buy_stages
+
+    def mark_buy_stage(self, stage: int):
+        self.buy_stages.add(stage)
+
+    def mark_exit_stage(self, stage: int):
+        self.exit_stages.add(stage)
+
+    # _check_profit_based_exit 등 dict 기반 코드 호환
+    def __getitem__(self, key: str) -> Any:
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        setattr(self, key, value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'quantity': self.quantity,
+            'avg_price': self.avg_price,
+            'total_cost': self.total_cost,
+            'entry_date': self.entry_date,
+            'executed_buy_stages': self.executed_buy_stages,
+            'executed_exit_stages': self.executed_exit_stages,
+            'highest_stage_reached': self.highest_stage_reached
+        }
+
+
+class PositionBook:
+    """종목코드 → Position 매핑과 평가용 보유 수량 벡터"""
+
+    def __init__(self, codes: Sequence[str]):
+        self.codes = list(codes)
+        self.quantities = np.zeros(len(self.codes), dtype=np.float64)
+        self._positions: Dict[str, Position] = {}
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._positions)
+
+    def get(self, code: str) -> Optional[Position]:
+        return self._positions.get(code)
+
+    def open(self, stock: int, quantity: int, price: float, total_cost: float, entry_date: Any) -> Position:
+        """신규 포지션 생성"""
+        position = Position(stock, quantity, price, total_cost, entry_date)
+        self._positions[self.codes[stock]] = position
+        self.quantities[stock] = quantity
+        return position
+
+    def add(self, position: Position, quantity: int, price: float, cost: float):
+        """기존 포지션에 추가 매수 (평단가 재계산)"""
+        total_quantity = position.quantity + quantity
+        position.avg_price = (position.quantity * position.avg_price + quantity * price) / total_quantity
+        position.quantity = total_quantity
+        position.total_cost += cost
+        self.quantities[position.stock] = total_quantity
+
+    def reduce(self, position: Position, quantity: int, cost: float):
+        """부분 매도 (평단가 유지)"""
+        position.quantity -= quantity
+        position.total_cost -= cost
+        self.quantities[position.stock] = position.quantity
+
+    def close(self, code: str):
+        """전량 매도"""
+        position = self._positions.pop(code)
+        self.quantities[position.stock] = 0.0
+
+    def to_dicts(self) -> Dict[str, Dict[str, Any]]:
+        return {code: position.to_dict() for code, position in self._positions.items()}
+
+
+class EquityCurve:
+    """캘린더 길이로 미리 할당된 일별 현금/평가액/보유 종목 수"""
+
+    def __init__(self, calendar: pd.DatetimeIndex):
+        self.calendar = calendar
+        self.capital = np.zeros(len(calendar), dtype=np.float64)
+        self.total_value = np.zeros(len(calendar), dtype=np.float64)
+        self.positions = np.zeros(len(calendar), dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.calendar)
+
+    def restore(self, capital: np.ndarray, total_value: np.ndarray, positions: np.ndarray):
+        """앞 구간(저장 시점까지)의 기록 복원"""
+        n = len(capital)
+        self.capital[:n] = capital
+        self.total_value[:n] = total_value
+        self.positions[:n] = positions
+
+    def record(self, t: int, capital: float, total_value: float, positions: int):
+        self.capital[t] = capital
+        self.total_value[t] = total_value
+        self.positions[t] = positions
+
+    def max_drawdown(self) -> float:
+        """최대 낙폭 (%) - 누적 최고 평가액 대비 하락률의 최대값"""
+        return max_drawdown(self.total_value)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """API 응답용 daily_values 목록"""
+        return [
+            {'date': date, 'capital': float(capital), 'total_value': float(value), 'positions': int(count)}
+            for date, capital, value, count in zip(
+                self.calendar, self.capital, self.total_value, self.positions
+            )
+        ]
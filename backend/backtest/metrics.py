@@ -0,0 +1,297 @@
+"""
+백테스트 위험조정 성과지표
+- 일별 평가액 배열에서 직접 계산 (샤프, 소르티노, 칼마, MDD/낙폭 기간, 롤링 샤프)
+- KOSPI(KS11) 대비 베타/알파/트레이너 비율
+- 벤치마크 시계열은 프로세스 내 캐시에 보관해 반복 백테스트 시 재다운로드하지 않음
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+RISK_FREE_RATE_DAILY = 0.03 / TRADING_DAYS  # 무위험 이자율 (연 3% 가정)
+ROLLING_SHARPE_WINDOW = 63  # 약 3개월
+ASSUMED_BETA = 1.0  # 벤치마크를 불러오지 못했을 때 사용
+
+BENCHMARK_SYMBOL = 'KS11'  # KOSPI 지수 (FinanceDataReader)
+BENCHMARK_TTL_SECONDS = 6 * 60 * 60
+BENCHMARK_RETRY_SECONDS = 10 * 60  # 조회 실패 후 재시도 대기
+
+
+def daily_returns(values: np.ndarray) -> np.ndarray:
+    """일별 수익률 (직전 평가액이 양수인 구간만)"""
+    values = np.asarray(values, dtype=np.float64)
+    prev, curr = values[:-1], values[1:]
+    valid = prev > 0
+    return (curr[valid] - prev[valid]) / prev[valid]
+
+
+def drawdown_stats(values: np.ndarray) -> Dict[str, Any]:
+    """
+    최대 낙폭(%)과 낙폭 기간
+
+    Returns:
+        max_drawdown: 최대 낙폭 (%)
+        max_drawdown_duration: 고점 이후 고점을 회복하기까지 가장 긴 기간 (거래일, 미회복이면 마지막 날까지)
+        peak_index / trough_index / recovery_index: 최대 낙폭 구간의 위치 (미회복이면 recovery_index=None)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return {'max_drawdown': 0, 'max_drawdown_duration': 0,
+                'peak_index': None, 'trough_index': None, 'recovery_index': None}
+
+    peaks = np.maximum.accumulate(values)
+    positive = peaks > 0
+    drawdowns = np.zeros_like(values)
+    drawdowns[positive] = (peaks[positive] - values[positive]) / peaks[positive] * 100
+
+    trough = int(np.argmax(drawdowns))
+    max_drawdown = max(float(drawdowns[trough]), 0)
+
+    # 고점 갱신 위치 → 각 시점이 속한 낙폭 구간의 시작 고점
+    at_peak = values >= peaks
+    last_peak = np.maximum.accumulate(np.where(at_peak, np.arange(len(values)), 0))
+    underwater = np.arange(len(values)) - last_peak
+    max_duration = int(underwater.max())
+
+    peak_index = int(last_peak[trough])
+    recovered = np.flatnonzero(at_peak[trough:])
+    recovery_index = int(trough + recovered[0]) if max_drawdown > 0 and len(recovered) else None
+
+    return {
+        'max_drawdown': max_drawdown,
+        'max_drawdown_duration': max_duration,
+        'peak_index': peak_index if max_drawdown > 0 else None,
+        'trough_index': trough if max_drawdown > 0 else None,
+        'recovery_index': recovery_index
+    }
+
+
+def max_drawdown(values: np.ndarray) -> float:
+    """최대 낙폭 (%)"""
+    return drawdown_stats(values)['max_drawdown']
+
+
+def sharpe_sortino(returns: np.ndarray) -> Tuple[Optional[float], Optional[float]]:
+    """연율화 샤프/소르티노 비율 (하방 편차가 0이면 소르티노 = 샤프 × 2)"""
+    if len(returns) == 0:
+        return None, None
+
+    excess = returns.mean() - RISK_FREE_RATE_DAILY
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    sharpe = (excess / std) * np.sqrt(TRADING_DAYS) if std > 0 else 0
+
+    downside_variance = np.mean(np.minimum(returns - RISK_FREE_RATE_DAILY, 0) ** 2)
+    if downside_variance > 0:
+        sortino = (excess / np.sqrt(downside_variance)) * np.sqrt(TRADING_DAYS)
+    else:
+        # 하방 편차가 0이면 손실이 전혀 없음 (매우 우수한 성과)
+        sortino = sharpe * 2 if sharpe else 0
+    return float(sharpe), float(sortino)
+
+
+def rolling_sharpe(returns: np.ndarray, window: int = ROLLING_SHARPE_WINDOW) -> np.ndarray:
+    """
+    롤링 샤프 비율 (누적합 기반, 길이 = len(returns) - window + 1)
+
+    i번째 값은 returns[i : i + window] 구간의 연율화 샤프 비율
+    """
+    n = len(returns)
+    if n < window or window < 2:
+        return np.array([], dtype=np.float64)
+
+    csum = np.concatenate([[0.0], np.cumsum(returns)])
+    csq = np.concatenate([[0.0], np.cumsum(returns ** 2)])
+    total = csum[window:] - csum[:-window]
+    squares = csq[window:] - csq[:-window]
+    mean = total / window
+    std = np.sqrt(np.maximum(squares - total * mean, 0) / (window - 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(std > 1e-12, (mean - RISK_FREE_RATE_DAILY) / std * np.sqrt(TRADING_DAYS), 0.0)
+
+
+def benchmark_beta(
+    values: np.ndarray,
+    dates: pd.DatetimeIndex,
+    benchmark: pd.Series
+) -> Tuple[Optional[float], Optional[float]]:
+    """
+    벤치마크 대비 베타와 연율화 젠센 알파
+
+    전략 평가일 기준으로 벤치마크 종가를 맞춘 뒤(직전 종가 보정) 같은 날의 수익률 쌍으로 계산
+    """
+    bench = benchmark.sort_index()
+    bench = bench[~bench.index.duplicated(keep='last')]
+    bench_values = bench.reindex(dates, method='ffill').to_numpy(dtype=np.float64)
+
+    values = np.asarray(values, dtype=np.float64)
+    prev, curr = values[:-1], values[1:]
+    bench_prev, bench_curr = bench_values[:-1], bench_values[1:]
+    valid = (prev > 0) & np.isfinite(bench_prev) & np.isfinite(bench_curr) & (bench_prev > 0)
+    if valid.sum() < 2:
+        return None, None
+
+    strategy = (curr[valid] - prev[valid]) / prev[valid]
+    market = (bench_curr[valid] - bench_prev[valid]) / bench_prev[valid]
+
+    market_var = market.var(ddof=1)
+    if market_var <= 0:
+        return None, None
+    beta = float(np.cov(strategy, market, ddof=1)[0, 1] / market_var)
+    alpha = float(
+        ((strategy.mean() - RISK_FREE_RATE_DAILY) - beta * (market.mean() - RISK_FREE_RATE_DAILY)) * TRADING_DAYS
+    )
+    return beta, alpha
+
+
+def compute_risk_metrics(
+    values: np.ndarray,
+    dates: pd.DatetimeIndex,
+    benchmark: Optional[pd.Series] = None,
+    rolling_window: int = ROLLING_SHARPE_WINDOW
+) -> Dict[str, Any]:
+    """
+    일별 평가액 → 위험조정 성과지표
+
+    benchmark가 없으면 베타=1.0 가정으로 트레이너 비율 계산 (beta_source='assumed')
+    """
+    values = np.asarray(values, dtype=np.float64)
+    returns = daily_returns(values)
+    sharpe, sortino = sharpe_sortino(returns)
+    drawdown = drawdown_stats(values)
+
+    metrics: Dict[str, Any] = {
+        'sharpe_ratio': sharpe,
+        'sortino_ratio': sortino,
+        'treynor_ratio': None,
+        'calmar_ratio': None,
+        'annualized_return': None,
+        'max_drawdown': drawdown['max_drawdown'],
+        'max_drawdown_duration': drawdown['max_drawdown_duration'],
+        'max_drawdown_period': {
+            key: (str(dates[drawdown[f'{key}_index']].date()) if drawdown[f'{key}_index'] is not None else None)
+            for key in ('peak', 'trough', 'recovery')
+        },
+        'beta': None,
+        'alpha': None,
+        'beta_source': None,
+        'rolling_sharpe': {'window': rolling_window, 'dates': [], 'values': []}
+    }
+
+    if len(returns) == 0:
+        return metrics
+
+    # 연율화 수익률(CAGR) / 칼마 비율
+    if values[0] > 0 and values[-1] > 0 and len(values) > 1:
+        annualized = (values[-1] / values[0]) ** (TRADING_DAYS / (len(values) - 1)) - 1
+        metrics['annualized_return'] = float(annualized * 100)
+        if drawdown['max_drawdown'] > 0:
+            metrics['calmar_ratio'] = float(annualized * 100 / drawdown['max_drawdown'])
+
+    # 베타/알파/트레이너
+    beta, alpha = (None, None)
+    if benchmark is not None and len(benchmark) > 1:
+        beta, alpha = benchmark_beta(values, dates, benchmark)
+    if beta is None:
+        beta, source = ASSUMED_BETA, 'assumed'
+    else:
+        source = BENCHMARK_SYMBOL
+    excess_return = returns.mean() - RISK_FREE_RATE_DAILY
+    metrics['beta'] = beta
+    metrics['alpha'] = alpha
+    metrics['beta_source'] = source
+    metrics['treynor_ratio'] = float((excess_return * TRADING_DAYS) / beta) if beta != 0 else 0
+
+    # 롤링 샤프 (수익률이 모두 유효한 경우에만 날짜 정렬 가능)
+    if len(returns) == len(values) - 1:
+        rolling = rolling_sharpe(returns, rolling_window)
+        metrics['rolling_sharpe']['dates'] = [str(d.date()) for d in dates[rolling_window:]]
+        metrics['rolling_sharpe']['values'] = rolling.tolist()
+
+    return metrics
+
+
+def _load_kospi(start: pd.Timestamp, end: pd.Timestamp) -> Optional[pd.Series]:
+    """FinanceDataReader로 KOSPI 종가 조회"""
+    import FinanceDataReader as fdr
+
+    df = fdr.DataReader(BENCHMARK_SYMBOL, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+    if df is None or df.empty:
+        return None
+    close = df['Close'].astype(float)
+    close.index = pd.to_datetime(close.index)
+    return close
+
+
+class BenchmarkCache:
+    """벤치마크 종가 캐시 (조회 구간 확장 시에만 재조회, TTL 경과 시 갱신)"""
+
+    def __init__(
+        self,
+        loader: Callable[[pd.Timestamp, pd.Timestamp], Optional[pd.Series]] = _load_kospi,
+        ttl: float = BENCHMARK_TTL_SECONDS
+    ):
+        self.loader = loader
+        self.ttl = ttl
+        self._series: Optional[pd.Series] = None
+        self._range: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None
+        self._loaded_at = 0.0
+        self._failed_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, start: Any, end: Any) -> Optional[pd.Series]:
+        """start~end 구간 벤치마크 종가 (조회 실패 시 None)"""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        with self._lock:
+            now = time.time()
+            fresh = now - self._loaded_at < self.ttl
+            if fresh and self._range and self._range[0] <= start and end <= self._range[1]:
+                self.hits += 1
+                return self._series.loc[start:end]
+
+            if now - self._failed_at < BENCHMARK_RETRY_SECONDS:
+                return None
+
+            self.misses += 1
+            # 기존 캐시 구간과 합쳐서 조회 (다음 요청 재사용)
+            if fresh and self._range:
+                start, end = min(start, self._range[0]), max(end, self._range[1])
+            try:
+                series = self.loader(start, end)
+            except Exception as e:
+                print(f"[Metrics] Benchmark {BENCHMARK_SYMBOL} load failed: {e}")
+                series = None
+
+            if series is None or series.empty:
+                self._failed_at = now
+                return None
+
+            self._series = series.sort_index()
+            self._range = (start, end)
+            self._loaded_at = now
+            print(f"[Metrics] Benchmark {BENCHMARK_SYMBOL} cached: {len(series)} rows ({start.date()} ~ {end.date()})")
+            return self._series.loc[start:end]
+
+    def set(self, series: pd.Series):
+        """외부에서 받은 벤치마크 시계열로 캐시 채우기"""
+        with self._lock:
+            self._series = series.sort_index()
+            self._range = (self._series.index[0], self._series.index[-1])
+            self._loaded_at = time.time()
+            self._failed_at = 0.0
+
+    def clear(self):
+        with self._lock:
+            self._series = None
+            self._range = None
+            self._loaded_at = 0.0
+            self._failed_at = 0.0
+
+
+benchmark_cache = BenchmarkCache()
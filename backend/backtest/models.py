@@ -19,6 +19,36 @@ class BacktestRequest(BaseModel):
     filter_id: Optional[str] = None
     filter_rules: Optional[Dict[str, Any]] = None
     filtering_mode: Optional[str] = None
+    workers: Optional[int] = None  # 지표/신호 병렬 계산 프로세스 수 (0 이하: 전체 코어)
+    persist_state: bool = False  # 종료 상태 저장 (이후 /extend로 증분 연장)
+
+class BacktestExtendRequest(BaseModel):
+    """저장된 백테스트 증분 연장 요청 모델"""
+    backtest_id: str
+    end_date: str
+    workers: Optional[int] = None
+
+class BacktestSweepRequest(BaseModel):
+    """파라미터 스윕 요청 모델"""
+    strategy_id: Optional[str] = None
+    strategy_config: Optional[Dict[str, Any]] = None
+    parameters: List[Dict[str, Any]]  # [{'path': 'indicators.0.params.period', 'values': [9, 14, 21]}]
+    stock_codes: List[str]
+    start_date: str
+    end_date: str
+    initial_capital: float = 10000000
+    commission: float = 0.00015
+    slippage: float = 0.001
+    workers: Optional[int] = None
+    sort_by: str = "total_return_rate"
+    top_n: Optional[int] = None
+
+class BacktestWalkForwardRequest(BacktestSweepRequest):
+    """워크포워드 최적화 요청 모델 (거래일 수 기준 구간)"""
+    in_sample_days: int = 252
+    out_of_sample_days: int = 63
+    step_days: Optional[int] = None
+    anchored: bool = False
 
 class Position(BaseModel):
     """포지션 모델"""
@@ -0,0 +1,160 @@
+"""
+몬테카를로 / 부트스트랩 강건성 분석
+- 일별 수익률과 실현 거래 수익률을 재표본추출(bootstrap) 또는 순서 섞기(shuffle)
+- 전체 경로를 (경로 × 기간) NumPy 배열 한 번에 계산 (경로별 파이썬 루프 없음)
+- 메모리 사용량을 제한하기 위해 경로를 큰 청크 단위로 나눠 처리
+"""
+
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from .metrics import RISK_FREE_RATE_DAILY, TRADING_DAYS
+
+DEFAULT_PATHS = 10000
+PERCENTILES = (5, 25, 50, 75, 95)
+MAX_BATCH_ELEMENTS = 2_000_000  # 청크당 (경로 × 기간) 최대 원소 수 (캐시 친화적인 크기)
+HISTOGRAM_BINS = 20
+
+METHODS = ('bootstrap', 'shuffle')
+
+
+def _resample_index(rng: np.random.Generator, n: int, n_paths: int, method: str) -> np.ndarray:
+    """(n_paths × n) 재표본 인덱스 행렬"""
+    if method == 'bootstrap':
+        return rng.integers(0, n, size=(n_paths, n), dtype=np.int32)
+    # shuffle: 행마다 독립적인 순열
+    return rng.permuted(np.broadcast_to(np.arange(n, dtype=np.int32), (n_paths, n)), axis=1)
+
+
+def _path_statistics(log_paths: np.ndarray, raw_paths: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    로그 수익률 경로 행렬 → 경로별 최종 수익률(%), 최대 낙폭(%), 샤프 비율
+
+    누적 로그 수익률로 계산하므로 경로 전체에 대한 나눗셈/곱셈이 필요 없다
+    """
+    log_equity = np.cumsum(log_paths, axis=1)
+    stats = {'final_return': np.expm1(log_equity[:, -1].astype(np.float64)) * 100}
+
+    # 시작 자본(로그 0)을 고점 후보에 포함, 고점 대비 하락폭을 제자리 계산
+    peaks = np.maximum.accumulate(log_equity, axis=1)
+    np.maximum(peaks, 0, out=peaks)
+    np.subtract(peaks, log_equity, out=peaks)
+    stats['max_drawdown'] = -np.expm1(-peaks.max(axis=1).astype(np.float64)) * 100
+
+    if raw_paths is not None:
+        n = raw_paths.shape[1]
+        if n > 1:
+            # 합/제곱합으로 평균·표본표준편차 계산 (행렬을 한 번씩만 순회)
+            total = raw_paths.sum(axis=1, dtype=np.float64)
+            squares = np.einsum('ij,ij->i', raw_paths, raw_paths, dtype=np.float64)
+            mean = total / n
+            std = np.sqrt(np.maximum(squares - total * mean, 0) / (n - 1))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                stats['sharpe_ratio'] = np.where(std > 0, (mean - RISK_FREE_RATE_DAILY) / std * np.sqrt(TRADING_DAYS), 0.0)
+        else:
+            stats['sharpe_ratio'] = np.zeros(len(raw_paths))
+    return stats
+
+
+def _simulate(
+    rng: np.random.Generator,
+    returns: np.ndarray,
+    n_paths: int,
+    method: str,
+    with_sharpe: bool
+) -> Dict[str, np.ndarray]:
+    """청크 단위 배치 시뮬레이션 (float32 경로 행렬) 후 경로별 지표를 이어 붙임"""
+    raw = returns.astype(np.float32)
+    log_returns = np.log1p(returns).astype(np.float32)
+    chunk = max(1, MAX_BATCH_ELEMENTS // max(len(returns), 1))
+
+    collected: Dict[str, list] = {}
+    for start in range(0, n_paths, chunk):
+        index = _resample_index(rng, len(returns), min(chunk, n_paths - start), method)
+        stats = _path_statistics(log_returns[index], raw[index] if with_sharpe else None)
+        for name, values in stats.items():
+            collected.setdefault(name, []).append(values)
+    return {name: np.concatenate(values) for name, values in collected.items()}
+
+
+def _describe(values: np.ndarray, observed: Optional[float] = None) -> Dict[str, Any]:
+    """분포 요약 (백분위수, 평균, 표준편차, 히스토그램)"""
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+    summary = {
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'percentiles': {
+            f'p{p}': float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))
+        },
+        'histogram': {'counts': counts.tolist(), 'bin_edges': edges.tolist()}
+    }
+    if observed is not None:
+        # 실제 결과가 분포에서 차지하는 위치 (백분위)
+        summary['observed'] = float(observed)
+        summary['observed_percentile'] = float((values <= observed).mean() * 100)
+    return summary
+
+
+def run_monte_carlo(
+    equity: Sequence[float],
+    trade_returns: Optional[Sequence[float]] = None,
+    n_paths: int = DEFAULT_PATHS,
+    method: str = 'bootstrap',
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    백테스트 결과의 몬테카를로 분석
+
+    Args:
+        equity: 일별 평가액 시계열
+        trade_returns: 실현 거래 수익률 (%) - 매도 거래의 profit_rate
+        n_paths: 시뮬레이션 경로 수
+        method: 'bootstrap' (복원추출) 또는 'shuffle' (순서 섞기)
+        seed: 난수 시드 (재현용)
+
+    Returns:
+        daily: 일별 수익률 경로의 최종 수익률/MDD/샤프 분포
+        trades: 거래 수익률 경로의 최종 수익률/MDD 분포 (거래가 있을 때)
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unsupported method: {method} (choose from {METHODS})")
+    if n_paths <= 0:
+        raise ValueError("n_paths must be positive")
+
+    rng = np.random.default_rng(seed)
+    result: Dict[str, Any] = {'n_paths': n_paths, 'method': method, 'seed': seed}
+
+    # 1. 일별 수익률 경로
+    values = np.asarray(equity, dtype=np.float64)
+    prev, curr = values[:-1], values[1:]
+    valid = prev > 0
+    daily_returns = (curr[valid] - prev[valid]) / prev[valid]
+
+    if len(daily_returns) >= 2:
+        observed = _path_statistics(np.log1p(daily_returns)[np.newaxis, :], daily_returns[np.newaxis, :])
+        # shuffle은 수익률 집합이 같으므로 샤프 비율이 관측값과 동일 → 계산 생략
+        stats = _simulate(rng, daily_returns, n_paths, method, with_sharpe=(method == 'bootstrap'))
+        if 'sharpe_ratio' not in stats:
+            stats['sharpe_ratio'] = np.full(n_paths, observed['sharpe_ratio'][0])
+        result['daily'] = {
+            name: _describe(stats[name], observed[name][0]) for name in stats
+        }
+        result['daily']['probability_of_loss'] = float((stats['final_return'] < 0).mean() * 100)
+    else:
+        result['daily'] = None
+
+    # 2. 거래 수익률 경로 (전액 재투자 가정의 거래 순서 민감도)
+    trades = np.asarray(trade_returns if trade_returns is not None else [], dtype=np.float64) / 100
+    trades = trades[np.isfinite(trades)]
+    if len(trades) >= 2:
+        observed = _path_statistics(np.log1p(trades)[np.newaxis, :])
+        stats = _simulate(rng, trades, n_paths, method, with_sharpe=False)
+        result['trades'] = {
+            name: _describe(stats[name], observed[name][0]) for name in stats
+        }
+        result['trades']['count'] = int(len(trades))
+    else:
+        result['trades'] = None
+
+    return result
@@ -0,0 +1,372 @@
+"""
+파라미터 스윕(그리드 서치) 최적화
+- 가격 데이터는 한 번만 로드
+- 그리드 전체에서 서로 다른 지표 설정만 종목별로 한 번씩 계산해 공유
+- 그리드 포인트별 신호 생성 + 포트폴리오 시뮬레이션은 프로세스 풀에서 병렬 평가
+- 순차 실행 시 CPU 작업은 asyncio.to_thread로 실행해 이벤트 루프를 막지 않음
+"""
+
+import asyncio
+import copy
+import itertools
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import parallel
+from .parallel import map_in_pool, resolve_worker_count
+
+MAX_GRID_POINTS = 500
+
+SORT_KEYS = {
+    # 지표: 내림차순 여부
+    'total_return_rate': True,
+    'sharpe_ratio': True,
+    'win_rate': True,
+    'max_drawdown': False,
+}
+
+
+def _parse_path(path: str) -> List[Any]:
+    """'indicators.0.params.period' → ['indicators', 0, 'params', 'period']"""
+    return [int(part) if part.isdigit() else part for part in path.split('.')]
+
+
+def set_config_value(config: Dict[str, Any], path: str, value: Any):
+    """점 표기 경로로 전략 설정 값 변경 (중간 dict가 없으면 생성)"""
+    keys = _parse_path(path)
+    target = config
+    for key in keys[:-1]:
+        if isinstance(key, int):
+            target = target[key]
+        else:
+            target = target.setdefault(key, {})
+    target[keys[-1]] = value
+
+
+def expand_parameter(spec: Dict[str, Any]) -> List[Any]:
+    """
+    파라미터 범위 → 값 목록
+
+    {'path': ..., 'values': [9, 14, 21]} 또는
+    {'path': ..., 'start': 10, 'stop': 30, 'step': 5} (stop 포함)
+    """
+    if 'path' not in spec:
+        raise ValueError(f"Parameter spec requires 'path': {spec}")
+    if 'values' in spec:
+        values = list(spec['values'])
+    elif {'start', 'stop'} <= set(spec):
+        step = spec.get('step', 1)
+        if step <= 0:
+            raise ValueError(f"Parameter step must be positive: {spec}")
+        values = list(np.arange(spec['start'], spec['stop'] + step / 2, step))
+        if all(isinstance(spec[k], int) for k in ('start', 'stop')) and isinstance(step, int):
+            values = [int(v) for v in values]
+        else:
+            values = [round(float(v), 10) for v in values]
+    else:
+        raise ValueError(f"Parameter spec requires 'values' or 'start'/'stop': {spec}")
+
+    if not values:
+        raise ValueError(f"Parameter range is empty: {spec}")
+    return values
+
+
+def build_grid(
+    strategy_config: Dict[str, Any],
+    parameters: List[Dict[str, Any]],
+    max_points: int = MAX_GRID_POINTS
+) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """(그리드 포인트 파라미터, 적용된 전략 설정) 목록"""
+    value_lists = [expand_parameter(spec) for spec in parameters]
+    paths = [spec['path'] for spec in parameters]
+
+    total = int(np.prod([len(values) for values in value_lists])) if value_lists else 1
+    if total > max_points:
+        raise ValueError(f"Parameter grid too large: {total} points (max {max_points})")
+
+    grid = []
+    for combo in itertools.product(*value_lists):
+        config = copy.deepcopy(strategy_config)
+        for path, value in zip(paths, combo):
+            set_config_value(config, path, value)
+        grid.append((dict(zip(paths, combo)), config))
+    return grid
+
+
+def _indicator_key(indicator: Dict[str, Any]) -> str:
+    return json.dumps(indicator, sort_keys=True, default=str)
+
+
+def summarize(results: Dict[str, Any]) -> Dict[str, Any]:
+    """시뮬레이션 결과 → 순위표 한 행 (거래 dict 생성 없이 원장/자산 곡선에서 계산)"""
+    return {
+        'total_return_rate': results['total_return_rate'],
+        'max_drawdown': results['equity'].max_drawdown(),
+        'sharpe_ratio': results['sharpe_ratio'],
+        'sortino_ratio': results['sortino_ratio'],
+        'win_rate': results['ledger'].win_rate(),
+        'total_trades': len(results['ledger']),
+        'final_capital': results['final_capital'],
+    }
+
+
+def _slice_frames(frames: Dict[str, pd.DataFrame], start: Any, end: Any) -> Dict[str, pd.DataFrame]:
+    """기간으로 종목별 데이터 자르기 (해당 기간 데이터가 없는 종목 제외)"""
+    sliced = {code: df.loc[start:end] for code, df in frames.items()}
+    return {code: df for code, df in sliced.items() if not df.empty}
+
+
+async def _evaluate_point_async(
+    engine,
+    config: Dict[str, Any],
+    frames: Dict[str, pd.DataFrame],
+    price_data: Dict[str, pd.DataFrame],
+    initial_capital: float,
+    commission: float,
+    slippage: float,
+    windows: Optional[List[Tuple[Any, Any]]] = None
+):
+    """
+    그리드 포인트 하나: 조건 검증 → 신호 생성 → 시뮬레이션 → 요약
+
+    windows가 주어지면 전체 기간 신호를 한 번 생성한 뒤 구간별로 잘라 시뮬레이션하고
+    구간별 요약 목록을 반환
+    """
+    validation = engine._validate_strategy_conditions(config, list(next(iter(frames.values())).columns))
+    if not validation['valid']:
+        error = {'error': '; '.join(validation['errors'])}
+        return error if windows is None else [error] * len(windows)
+
+    signal_frames = {}
+    for code, df in frames.items():
+        signal_frames[code] = await engine._evaluate_strategy_signals(df.copy(), config)
+
+    if windows is None:
+        results = engine._simulate_portfolio(
+            config, signal_frames, price_data, initial_capital, commission, slippage
+        )
+        return summarize(results)
+
+    summaries = []
+    for start, end in windows:
+        window_frames = _slice_frames(signal_frames, start, end)
+        if not window_frames:
+            summaries.append({'error': f'No price data between {start} and {end}'})
+            continue
+        results = engine._simulate_portfolio(
+            config, window_frames, _slice_frames(price_data, start, end),
+            initial_capital, commission, slippage
+        )
+        summaries.append(summarize(results))
+    return summaries
+
+
+def _run_point(engine, config, frames, price_data, initial_capital, commission, slippage, windows=None):
+    """그리드 포인트 하나를 동기 실행 (워커 프로세스 또는 asyncio.to_thread 스레드), 실패는 error 요약으로"""
+    try:
+        return asyncio.run(_evaluate_point_async(
+            engine, config, frames, price_data, initial_capital, commission, slippage, windows
+        ))
+    except Exception as e:
+        error = {'error': str(e)}
+        return error if windows is None else [error] * len(windows)
+
+
+def _evaluate_point(config, frames, initial_capital, commission, slippage, windows=None):
+    """워커에서 실행 (parallel 모듈의 워커 엔진 재사용)"""
+    price_data = {code: df[['close']] for code, df in frames.items()}
+    return _run_point(
+        parallel._worker_engine, config, frames, price_data, initial_capital, commission, slippage, windows
+    )
+
+
+def rank_rows(rows: List[Dict[str, Any]], sort_by: str) -> List[Dict[str, Any]]:
+    """sort_by 기준 순위 매기기 (실패/값 없음은 맨 뒤)"""
+    descending = SORT_KEYS[sort_by]
+
+    def sort_key(row):
+        value = row.get(sort_by)
+        if 'error' in row or value is None:
+            return (1, 0)
+        return (0, -value if descending else value)
+
+    rows.sort(key=sort_key)
+    for rank, row in enumerate(rows, start=1):
+        row['rank'] = rank
+    return rows
+
+
+class ParameterSweep:
+    """전략 설정 + 파라미터 범위로 그리드 서치 실행"""
+
+    def __init__(self, engine, max_grid_points: int = MAX_GRID_POINTS):
+        self.engine = engine
+        self.max_grid_points = max_grid_points
+
+    async def _compute_indicator_columns(
+        self,
+        price_data: Dict[str, pd.DataFrame],
+        grid: List[Tuple[Dict[str, Any], Dict[str, Any]]]
+    ) -> Dict[Tuple[str, str], Dict[str, np.ndarray]]:
+        """
+        그리드 전체의 서로 다른 지표 설정을 종목별로 한 번씩 계산
+
+        지표 계산 결과는 (종목, 기간, 지표 설정)에만 의존한다 (IndicatorCalculator 캐시 키와 동일한 가정)
+        """
+        distinct = {}
+        for _, config in grid:
+            for indicator in config.get('indicators', []):
+                distinct.setdefault(_indicator_key(indicator), indicator)
+
+        print(f"[Sweep] Calculating {len(distinct)} distinct indicators for {len(price_data)} stocks")
+
+        columns = {}
+        for code, df in price_data.items():
+            symbol_columns = await asyncio.to_thread(self._symbol_indicator_columns, code, df, distinct)
+            for key, values in symbol_columns.items():
+                columns[(code, key)] = values
+        return columns
+
+    def _symbol_indicator_columns(
+        self,
+        code: str,
+        df: pd.DataFrame,
+        distinct: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        종목 하나의 서로 다른 지표 설정 계산 (지표 설정 키 → {컬럼: 값})
+
+        같은 종목의 설정들은 하나의 shared_intermediates 범위에서 계산해
+        기간만 다른 설정끼리도 EMA/SMA/true range 등 중간 시계열을 공유
+        """
+        calculator = self.engine.indicator_calculator
+        columns = {}
+        with calculator.shared_intermediates(df):
+            for key, indicator in distinct.items():
+                try:
+                    result = calculator.calculate_stored(df, indicator, stock_code=code)
+                except Exception as e:
+                    # _calculate_indicators와 동일하게 실패한 지표는 컬럼 없이 진행 (조건 검증에서 걸러짐)
+                    print(f"[Sweep] Error calculating indicator {indicator.get('name', 'unknown')} for {code}: {e}")
+                    result = None
+                columns[key] = {
+                    col: values.reindex(df.index).to_numpy() if isinstance(values, pd.Series) else np.asarray(values)
+                    for col, values in (result.columns if result is not None else {}).items()
+                }
+        return columns
+
+    @staticmethod
+    def _assemble_frames(
+        price_data: Dict[str, pd.DataFrame],
+        indicator_columns: Dict[Tuple[str, str], Dict[str, np.ndarray]],
+        config: Dict[str, Any]
+    ) -> Dict[str, pd.DataFrame]:
+        """그리드 포인트의 지표 순서대로 공유 지표 컬럼을 붙인 종목별 데이터프레임"""
+        frames = {}
+        for code, df in price_data.items():
+            data = {col: df[col] for col in df.columns}
+            for indicator in config.get('indicators', []):
+                for col, values in indicator_columns[(code, _indicator_key(indicator))].items():
+                    data[col] = values
+            frames[code] = pd.DataFrame(data, index=df.index)
+        return frames
+
+    async def _evaluate_grid(
+        self,
+        grid: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+        price_data: Dict[str, pd.DataFrame],
+        indicator_columns: Dict[Tuple[str, str], Dict[str, np.ndarray]],
+        initial_capital: float,
+        commission: float,
+        slippage: float,
+        workers: Optional[int] = None,
+        windows: Optional[List[Tuple[Any, Any]]] = None,
+        point_windows: Optional[List[List[Tuple[Any, Any]]]] = None
+    ) -> List[Any]:
+        """
+        그리드 포인트별 요약
+
+        windows: 모든 포인트에 공통으로 적용할 (시작, 종료) 구간 목록 → 포인트별 구간 요약 목록 반환
+        point_windows: 포인트마다 다른 구간 목록 (windows 대신 사용)
+        """
+        if point_windows is None:
+            point_windows = [windows] * len(grid)
+        worker_count = resolve_worker_count(workers)
+        if worker_count > 1 and len(grid) > 1:
+            print(f"[Sweep] Evaluating grid with {worker_count} workers...")
+            return await map_in_pool(_evaluate_point, [
+                (config, self._assemble_frames(price_data, indicator_columns, config),
+                 initial_capital, commission, slippage, config_windows)
+                for (_, config), config_windows in zip(grid, point_windows)
+            ], worker_count)
+
+        summaries = []
+        for (_, config), config_windows in zip(grid, point_windows):
+            summaries.append(await asyncio.to_thread(
+                _run_point, self.engine, config, self._assemble_frames(price_data, indicator_columns, config),
+                price_data, initial_capital, commission, slippage, config_windows
+            ))
+        return summaries
+
+    async def run(
+        self,
+        strategy_config: Dict[str, Any],
+        parameters: List[Dict[str, Any]],
+        stock_codes: List[str],
+        start_date: str,
+        end_date: str,
+        initial_capital: float = 10000000,
+        commission: float = 0.00015,
+        slippage: float = 0.001,
+        workers: Optional[int] = None,
+        sort_by: str = 'total_return_rate',
+        top_n: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        파라미터 스윕 실행
+
+        Args:
+            strategy_config: 기준 전략 설정
+            parameters: [{'path': 'indicators.0.params.period', 'values': [9, 14, 21]},
+                         {'path': 'stopLoss.value', 'start': 3, 'stop': 7, 'step': 1}, ...]
+            sort_by: total_return_rate | sharpe_ratio | win_rate | max_drawdown
+            top_n: 상위 N개만 반환 (None이면 전체)
+
+        Returns:
+            순위가 매겨진 그리드 포인트별 수익률/MDD/샤프/승률 표
+        """
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort_by: {sort_by} (choose from {list(SORT_KEYS)})")
+
+        grid = build_grid(strategy_config, parameters, self.max_grid_points)
+        print(f"[Sweep] {len(grid)} grid points, sort_by={sort_by}")
+
+        # 1. 가격 데이터 1회 로드
+        price_data = await self.engine._load_price_data(stock_codes, start_date, end_date)
+        if not price_data:
+            raise ValueError("No price data available")
+
+        # 2. 서로 다른 지표 설정만 계산
+        indicator_columns = await self._compute_indicator_columns(price_data, grid)
+
+        # 3. 그리드 포인트 평가 + 순위
+        summaries = await self._evaluate_grid(
+            grid, price_data, indicator_columns, initial_capital, commission, slippage, workers
+        )
+        rows = rank_rows(
+            [{'params': params, **summary} for (params, _), summary in zip(grid, summaries)],
+            sort_by
+        )
+
+        failed = sum(1 for row in rows if 'error' in row)
+        print(f"[Sweep] Completed: {len(rows) - failed} succeeded, {failed} failed")
+
+        return {
+            'grid_points': len(rows),
+            'distinct_indicators': len({key for _, key in indicator_columns}),
+            'sort_by': sort_by,
+            'results': rows[:top_n] if top_n else rows
+        }
@@ -0,0 +1,188 @@
+"""
+종목별 지표/신호 계산 병렬 실행
+- ProcessPoolExecutor 워커마다 BacktestEngine(IndicatorCalculator 포함)을 한 번만 생성해 재사용
+- 결과는 float64 블록 + 비수치 컬럼 배열(SymbolSignals)로 압축해 부모 프로세스로 반환
+- 이벤트 루프는 run_in_executor로 대기하므로 백테스트 중에도 다른 API 요청을 처리
+- 풀은 한 번만 생성, 요청별 workers는 세마포어로 동시 실행 수만 제한 (실행 중인 다른 요청에 영향 없음)
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+WORKERS_ENV = 'BACKTEST_WORKERS'
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_size = 0
+_worker_engine = None
+
+
+def resolve_worker_count(workers: Optional[int] = None) -> int:
+    """
+    워커 수 결정
+
+    workers 인자 > BACKTEST_WORKERS 환경변수 > 1(순차 실행)
+    0 이하 값은 전체 CPU 코어 사용
+    """
+    if workers is None:
+        env_value = os.getenv(WORKERS_ENV, '').strip()
+        if not env_value:
+            return 1
+        try:
+            workers = int(env_value)
+        except ValueError:
+            print(f"[Parallel] Invalid {WORKERS_ENV}={env_value!r}, running sequentially")
+            return 1
+
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+@dataclass
+class SymbolSignals:
+    """프로세스 간 전달용 압축 신호 프레임"""
+    stock_code: str
+    index: np.ndarray
+    index_name: Optional[str]
+    columns: List[str]  # 원래 컬럼 순서
+    float_columns: List[str]
+    float_block: np.ndarray  # (행 × float 컬럼) float64
+    other_columns: Dict[str, np.ndarray] = field(default_factory=dict)  # bool/int/문자열 컬럼
+    indicator_columns: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_frame(cls, stock_code: str, df: pd.DataFrame, indicator_columns: List[str]) -> 'SymbolSignals':
+        float_columns = [col for col in df.columns if df[col].dtype == np.float64]
+        return cls(
+            stock_code=stock_code,
+            index=df.index.to_numpy(),
+            index_name=df.index.name,
+            columns=list(df.columns),
+            float_columns=float_columns,
+            float_block=df[float_columns].to_numpy(dtype=np.float64),
+            other_columns={
+                col: df[col].to_numpy() for col in df.columns if col not in set(float_columns)
+            },
+            indicator_columns=indicator_columns
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """데이터프레임 복원 (컬럼 순서/타입 유지)"""
+        data = {col: self.float_block[:, i] for i, col in enumerate(self.float_columns)}
+        data.update(self.other_columns)
+        index = pd.Index(self.index, name=self.index_name)
+        return pd.DataFrame({col: data[col] for col in self.columns}, index=index)
+
+
+def _init_worker():
+    """워커 프로세스 초기화 - 지표 계산기를 미리 로드"""
+    global _worker_engine
+    from .engine import BacktestEngine
+
+    _worker_engine = BacktestEngine()
+    print(f"[Parallel] Worker {os.getpid()} ready")
+
+
+def _compute_symbol(stock_code: str, df: pd.DataFrame, strategy_config: Dict[str, Any]) -> SymbolSignals:
+    """워커에서 실행: 종목 하나의 지표/신호 계산"""
+    signal_df, indicator_columns = asyncio.run(
+        _worker_engine._prepare_signal_frame(df, strategy_config, stock_code)
+    )
+    return SymbolSignals.from_frame(stock_code, signal_df, indicator_columns)
+
+
+def pool_size() -> int:
+    """공용 풀 프로세스 수: BACKTEST_WORKERS가 있으면 그 값, 없으면 전체 CPU 코어"""
+    if os.getenv(WORKERS_ENV, '').strip():
+        return resolve_worker_count()
+    return os.cpu_count() or 1
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """
+    공용 프로세스 풀 (프로세스당 한 번 생성해 요청 간 재사용)
+
+    요청별 workers는 풀 크기를 바꾸지 않고 map_in_pool의 동시 실행 수로만 적용.
+    워커가 비정상 종료돼 깨진 풀(BrokenProcessPool)만 새로 만든다.
+    """
+    global _pool, _pool_size
+    if _pool is not None and getattr(_pool, '_broken', False):
+        print("[Parallel] Process pool is broken, restarting")
+        _discard_pool(_pool)
+    if _pool is None:
+        _pool_size = pool_size()
+        # 스레드를 사용하는 서버 프로세스에서 fork는 안전하지 않으므로 spawn 사용
+        _pool = ProcessPoolExecutor(
+            max_workers=_pool_size,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker
+        )
+        print(f"[Parallel] Started process pool with {_pool_size} workers")
+    return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """깨진 풀 교체 (대기하지 않음 - 이벤트 루프를 막지 않도록)"""
+    global _pool, _pool_size
+    if _pool is pool:
+        _pool = None
+        _pool_size = 0
+    pool.shutdown(wait=False)
+
+
+def shutdown_pool():
+    """공용 프로세스 풀 종료 (프로세스 종료/테스트 정리용, 남은 작업은 끝까지 실행)"""
+    global _pool, _pool_size
+    if _pool is not None:
+        pool, _pool, _pool_size = _pool, None, 0
+        pool.shutdown(wait=True)
+
+
+async def map_in_pool(fn, calls: Iterable[Tuple], workers: int) -> List[Any]:
+    """
+    공용 풀에서 fn(*args)를 호출별로 실행, 결과는 calls 순서
+
+    workers: 이 요청이 동시에 점유할 수 있는 최대 워커 수 (풀 크기 이내)
+    """
+    pool = get_pool()
+    loop = asyncio.get_running_loop()
+    limit = asyncio.Semaphore(max(1, min(workers, _pool_size)))
+
+    async def submit(args):
+        async with limit:
+            return await loop.run_in_executor(pool, fn, *args)
+
+    try:
+        return await asyncio.gather(*[submit(args) for args in calls])
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+
+
+async def compute_signal_frames(
+    price_data: Dict[str, pd.DataFrame],
+    strategy_config: Dict[str, Any],
+    workers: int
+) -> Dict[str, Tuple[pd.DataFrame, List[str]]]:
+    """
+    전 종목 지표/신호 병렬 계산
+
+    Returns:
+        종목코드 → (신호 데이터프레임, 신호 생성 전 컬럼 목록), price_data 순서 유지
+    """
+    results = await map_in_pool(
+        _compute_symbol, [(code, df, strategy_config) for code, df in price_data.items()], workers
+    )
+
+    return {
+        signals.stock_code: (signals.to_frame(), signals.indicator_columns)
+        for signals in results
+    }
@@ -0,0 +1,351 @@
+"""
+시간축 기준 다종목 포트폴리오 시뮬레이터
+- 모든 종목을 하나의 거래일 캘린더에 정렬한 종가 행렬로 변환
+- 날짜를 한 번만 순회하며 매 시점 전 종목의 매도 → 매수 순으로 처리
+- 일별 평가액은 보유 수량 벡터와 종가 벡터의 내적으로 계산
+- 거래/포지션/자산 곡선은 ledger 모듈의 컬럼형 구조에 기록
+"""
+
+import copy
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .ledger import EquityCurve, PositionBook, TradeLedger
+from .signals import staged_signal_payload
+
+
+@dataclass
+class SimulatorSnapshot:
+    """시뮬레이션 종료 시점 상태 (증분 실행 재개용)"""
+    codes: List[str]
+    calendar: pd.DatetimeIndex
+    capital: float
+    positions: PositionBook  # 분할 매수/매도 단계 진행 포함
+    trade_records: np.ndarray
+    trade_reasons: List[str]
+    equity_capital: np.ndarray
+    equity_total_value: np.ndarray
+    equity_positions: np.ndarray
+
+
+class PortfolioSimulator:
+    """신호가 계산된 종목별 데이터프레임으로 공유 자본 포트폴리오를 시뮬레이션"""
+
+    def __init__(
+        self,
+        engine,
+        strategy_config: Dict[str, Any],
+        initial_capital: float,
+        commission: float,
+        slippage: float
+    ):
+        self.engine = engine
+        self.strategy_config = strategy_config
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.slippage = slippage
+
+    @staticmethod
+    def build_calendar(frames: Dict[str, pd.DataFrame]) -> pd.DatetimeIndex:
+        """전 종목 거래일의 합집합 캘린더"""
+        calendar = pd.Index([])
+        for df in frames.values():
+            calendar = calendar.union(df.index)
+        return pd.DatetimeIndex(calendar.sort_values())
+
+    @staticmethod
+    def build_close_matrix(frames: Dict[str, pd.DataFrame], calendar: pd.DatetimeIndex) -> np.ndarray:
+        """
+        (날짜 × 종목) 종가 행렬
+        거래가 없는 날은 직전 종가로 채우고, 상장 전 구간은 0으로 둔다 (보유 불가 구간)
+        """
+        closes = pd.DataFrame(
+            {code: df['close'] for code, df in frames.items()},
+            index=calendar
+        )
+        return closes.ffill().fillna(0.0).to_numpy(dtype=np.float64)
+
+    @staticmethod
+    def _signal_active(df: pd.DataFrame, side: str) -> np.ndarray:
+        """행 단위로 매수/매도 신호가 존재하는지 여부"""
+        stage_col = f'{side}_stage'
+        if stage_col in df.columns:
+            active = df[stage_col].to_numpy() > 0
+        else:
+            active = np.zeros(len(df), dtype=bool)
+        if f'{side}_signal' in df.columns:
+            active |= df[f'{side}_signal'].astype(bool).to_numpy()
+        return active
+
+    def run(self, frames: Dict[str, pd.DataFrame], resume: Optional[SimulatorSnapshot] = None) -> Dict[str, Any]:
+        """
+        날짜 순회 시뮬레이션 실행
+
+        Args:
+            frames: 종목코드 → 지표/신호가 계산된 데이터프레임
+            resume: 이전 실행의 종료 상태 (주어지면 저장된 마지막 거래일 다음 날부터 시뮬레이션)
+
+        Returns:
+            capital, positions(PositionBook), ledger(TradeLedger), equity(EquityCurve)
+        """
+        self.codes = list(frames.keys())
+        self.frames = frames
+        calendar = self.build_calendar(frames)
+        closes = self.build_close_matrix(frames, calendar)
+
+        # 캘린더 위치 → 종목별 행 위치 (-1: 해당일 거래 없음)
+        row_index = np.full((len(calendar), len(self.codes)), -1, dtype=np.int64)
+        buy_active = np.zeros((len(calendar), len(self.codes)), dtype=bool)
+        for j, code in enumerate(self.codes):
+            df = frames[code]
+            locs = calendar.get_indexer(df.index)
+            row_index[locs, j] = np.arange(len(df))
+            buy_active[locs, j] = self._signal_active(df, 'buy')
+
+        equity = EquityCurve(calendar)
+        if resume is not None:
+            start = len(resume.calendar)
+            if resume.codes != self.codes or not calendar[:start].equals(resume.calendar):
+                raise ValueError("Resume state does not match the stocks/calendar of the extended data")
+            self.capital = resume.capital
+            self.positions = copy.deepcopy(resume.positions)
+            self.ledger = TradeLedger.restore(self.codes, calendar, resume.trade_records, resume.trade_reasons)
+            equity.restore(resume.equity_capital, resume.equity_total_value, resume.equity_positions)
+            print(f"[Portfolio] Resuming {len(self.codes)} stocks from day {start}: {len(calendar) - start} new trading days")
+        else:
+            start = 0
+            self.capital = self.initial_capital
+            self.positions = PositionBook(self.codes)
+            self.ledger = TradeLedger(self.codes, calendar)
+            print(f"[Portfolio] Simulating {len(self.codes)} stocks over {len(calendar)} trading days")
+
+        for t in range(start, len(calendar)):
+            date = calendar[t]
+            if (t + 1) % 50 == 0:  # 50일마다 진행상황 출력
+                print(f"[Portfolio] Processed {t + 1}/{len(calendar)} days")
+
+            bar_rows = row_index[t]
+
+            # 1. 매도: 보유 종목 전체
+            for code in list(self.positions):
+                position = self.positions.get(code)
+                bar = bar_rows[position.stock]
+                if bar >= 0:
+                    self._process_exit(t, bar, position, frames[code].iloc[bar])
+
+            # 2. 매수: 신호가 있는 종목 전체
+            for j in np.flatnonzero(buy_active[t]):
+                bar = bar_rows[j]
+                self._process_entry(t, j, bar, date, frames[self.codes[j]].iloc[bar])
+
+            # 3. 일별 자산 가치 (보유 수량 · 종가)
+            total_value = self.capital + float(self.positions.quantities @ closes[t])
+            equity.record(t, self.capital, total_value, len(self.positions))
+
+        return {
+            'capital': self.capital,
+            'positions': self.positions,
+            'ledger': self.ledger,
+            'equity': equity
+        }
+
+    def snapshot(self, equity: EquityCurve) -> SimulatorSnapshot:
+        """run() 종료 상태 복사본"""
+        return SimulatorSnapshot(
+            codes=list(self.codes),
+            calendar=equity.calendar,
+            capital=self.capital,
+            positions=copy.deepcopy(self.positions),
+            trade_records=self.ledger.records.copy(),
+            trade_reasons=list(self.ledger.reasons),
+            equity_capital=equity.capital.copy(),
+            equity_total_value=equity.total_value.copy(),
+            equity_positions=equity.positions.copy()
+        )
+
+    def _process_exit(self, t: int, bar: int, position, row: pd.Series):
+        """매도 체크 - 목표수익률과 지표 조건 OR 처리"""
+        stock_code = self.codes[position.stock]
+        price = row['close']
+        should_exit = False
+        exit_reason = None
+        exit_ratio = 0  # 최대 비율을 선택
+        exit_reasons = []
+
+        # 1. 목표수익률/손절 체크
+        target_profit_config = self.strategy_config.get('targetProfit')
+        stop_loss_config = self.strategy_config.get('stopLoss')
+
+        profit_exit, profit_reason, profit_exit_ratio = self.engine._check_profit_based_exit(
+            position, price, target_profit_config, stop_loss_config
+        )
+
+        # 2. 시그널 기반 매도 체크 (단계별 매도)
+        sell_signal_info = staged_signal_payload(row, 'sell')
+        signal_exit = False
+        signal_reason = None
+        signal_exit_ratio = 0
+
+        if sell_signal_info:
+            if isinstance(sell_signal_info, dict):
+                # 단계별 매도 (dict 형태)
+                signal_exit = True
+                signal_reason = sell_signal_info.get('reason', 'Signal')
+                signal_exit_ratio = sell_signal_info.get('exitPercent', 100)
+            else:
+                # 기존 boolean 형태 (하위 호환성)
+                signal_exit = True
+                signal_reason = row.get('sell_reason', 'Signal')
+                signal_exit_ratio = 100
+
+        # 3. OR 조건: 목표수익률 OR 지표 조건 중 큰 비율 선택
+        # 손절은 항상 최우선 (100% 매도)
+        if profit_exit and 'Stop loss' in profit_reason:
+            should_exit = True
+            exit_reason = profit_reason
+            exit_ratio = 100
+        else:
+            if profit_exit:
+                exit_reasons.append(profit_reason)
+                exit_ratio = max(exit_ratio, profit_exit_ratio)
+
+            if signal_exit:
+                exit_reasons.append(signal_reason)
+                exit_ratio = max(exit_ratio, signal_exit_ratio)
+
+            if exit_ratio > 0:
+                should_exit = True
+                exit_reason = ' OR '.join(exit_reasons)
+
+        if not should_exit:
+            return
+
+        # 매도 수량 계산 (exit_ratio 적용)
+        sell_quantity = int(position.quantity * exit_ratio / 100)
+        if sell_quantity <= 0:
+            return
+
+        # 슬리피지 적용 (매도 시 불리한 가격)
+        sell_price = price * (1 - self.slippage)
+        sell_amount = sell_quantity * sell_price
+        commission_fee = sell_amount * self.commission
+
+        # 수익 계산 (매도한 비율만큼의 원가 계산)
+        sold_cost = position.total_cost * (sell_quantity / position.quantity)
+        # 매도 금액에서 수수료를 뺀 실수령액
+        net_sell_amount = sell_amount - commission_fee
+        # 수익 = 실수령액 - 원가 (원가에는 이미 매수 수수료 포함)
+        profit = net_sell_amount - sold_cost
+        profit_rate = profit / sold_cost * 100
+
+        print(f"[Engine] Recording sell trade: stock={stock_code}, reason={exit_reason}, ratio={exit_ratio}%")
+
+        self.ledger.record_sell(
+            t, position.stock, bar, sell_quantity, sell_price, sell_amount,
+            commission_fee, profit, profit_rate, exit_reason, exit_ratio
+        )
+
+        # 자본금 업데이트 (실수령액 = 매도금액 - 수수료)
+        self.capital += net_sell_amount
+
+        if exit_ratio >= 100:
+            # 전량 매도
+            self.positions.close(stock_code)
+            return
+
+        # 부분 매도: 포지션 업데이트 (평단가 유지, 분할 매수 단계 기록은 초기화)
+        self.positions.reduce(position, sell_quantity, sold_cost)
+        position.buy_stages.clear()
+
+        # 단계별 매도인 경우 실행된 단계 기록
+        if 'stage_' in exit_reason:
+            position.mark_exit_stage(int(exit_reason.split('_')[1]))
+
+    def _process_entry(self, t: int, stock: int, bar: int, date: Any, row: pd.Series):
+        """매수 체크 - 단일 매수 또는 분할 매수"""
+        buy_signal_info = staged_signal_payload(row, 'buy')
+        if not buy_signal_info:
+            return
+
+        stock_code = self.codes[stock]
+        price = row['close']
+
+        # 분할 매수 처리 (단계별)
+        if isinstance(buy_signal_info, dict) and 'stage' in buy_signal_info:
+            self._process_staged_entry(t, stock, bar, date, price, buy_signal_info)
+            return
+
+        # 기존 단일 매수 처리
+        if stock_code in self.positions:
+            return
+
+        position_size = self.strategy_config.get('position_size', 0.3)  # 기본값 30%
+        max_buy_amount = self.capital * position_size
+        # 슬리피지 적용 (매수 시 불리한 가격)
+        buy_price = price * (1 + self.slippage)
+        buy_quantity = int(max_buy_amount / buy_price)
+        if buy_quantity <= 0:
+            return
+
+        buy_amount = buy_quantity * buy_price
+        commission_fee = buy_amount * self.commission
+
+        buy_reason = row.get('buy_reason', 'Signal')
+        print(f"[Engine] Recording buy trade: stock={stock_code}, reason={buy_reason}")
+
+        self.ledger.record_buy(t, stock, bar, buy_quantity, buy_price, buy_amount, commission_fee, buy_reason)
+        self.positions.open(stock, buy_quantity, buy_price, buy_amount + commission_fee, date)
+        self.capital -= buy_amount + commission_fee
+
+    def _process_staged_entry(
+        self,
+        t: int,
+        stock: int,
+        bar: int,
+        date: Any,
+        price: float,
+        buy_signal_info: Dict[str, Any]
+    ):
+        """분할 매수 - 남은 자본금의 positionPercent만큼 매수 (단계당 1회)"""
+        stock_code = self.codes[stock]
+        stage_num = buy_signal_info['stage']
+        position_ratio = buy_signal_info.get('positionPercent', 30) / 100.0
+
+        position = self.positions.get(stock_code)
+        if position is not None and position.has_buy_stage(stage_num):
+            return  # 이미 실행된 단계는 스킵
+
+        buy_amount_target = self.capital * position_ratio
+
+        # 슬리피지 적용
+        buy_price = price * (1 + self.slippage)
+        buy_quantity = int(buy_amount_target / buy_price)
+        if buy_quantity <= 0:
+            return
+
+        buy_amount = buy_quantity * buy_price
+        commission_fee = buy_amount * self.commission
+
+        # 자본금 확인
+        if buy_amount + commission_fee > self.capital:
+            return
+
+        buy_reason = f"매수 {stage_num}단계 ({buy_signal_info.get('reason', 'Signal')})"
+        print(f"[Engine] Recording staged buy trade: stock={stock_code}, stage={stage_num}, reason={buy_reason}")
+
+        self.ledger.record_buy(
+            t, stock, bar, buy_quantity, buy_price, buy_amount, commission_fee, buy_reason, stage=stage_num
+        )
+
+        if position is not None:
+            # 기존 포지션에 추가 (평단가 계산)
+            self.positions.add(position, buy_quantity, buy_price, buy_amount + commission_fee)
+        else:
+            # 신규 포지션 생성
+            position = self.positions.open(stock, buy_quantity, buy_price, buy_amount + commission_fee, date)
+        position.mark_buy_stage(stage_num)
+
+        self.capital -= buy_amount + commission_fee
@@ -227,18 +227,13 @@ class IndicatorColumnMapper:
         if cache_key in self._cache:
             return self._cache[cache_key]
 
-        # 1. 먼저 지표 정의에서 formula 확인하여 동적 컬럼 여부 체크
+        # 1. 먼저 지표 정의에서 formula 확인하여 동적 컬럼 여부 체크 (프로세스 전역 카탈로그, DB 왕복 없음)
         try:
-            definition = self.calculator.supabase.table('indicators') \
-                .select('output_columns, formula') \
-                .eq('name', indicator_name) \
-                .eq('is_active', True) \
-                .single() \
-                .execute()
+            definition = self.calculator.indicators_cache.get(indicator_name)
 
-            if definition.data:
-                formula_code = definition.data.get('formula', {}).get('code', '')
-                static_columns = definition.data.get('output_columns', [])
+            if definition:
+                formula_code = definition.get('formula', {}).get('code', '')
+                static_columns = definition.get('output_columns', [])
 
                 # 동적 컬럼명 계산: formula에서 f-string 패턴 찾기
                 dynamic_columns = self._extract_dynamic_columns(formula_code, params or {})
@@ -502,23 +497,18 @@ class PreflightValidator:
 
             name = ind['name']
 
-            # Supabase에 지표 존재 확인
+            # Supabase 지표 정의(카탈로그)에 존재 확인
             try:
-                definition = self.calculator.supabase.table('indicators') \
-                    .select('id, output_columns') \
-                    .eq('name', name) \
-                    .eq('is_active', True) \
-                    .single() \
-                    .execute()
-
-                if not definition.data:
+                definition = self.calculator.indicators_cache.get(name)
+
+                if not definition:
                     results.append(ValidationResult(
                         level=ValidationLevel.ERROR,
                         message=f"indicators[{i}]: Indicator '{name}' not found in Supabase"
                     ))
                 else:
                     # output_columns 확인
-                    columns = definition.data.get('output_columns', [])
+                    columns = definition.get('output_columns', [])
                     if not columns:
                         results.append(ValidationResult(
                             level=ValidationLevel.ERROR,
@@ -0,0 +1,307 @@
+"""
+백테스트 결과 캐시 (내용 주소 기반)
+- 키: 정규화된 전략 설정 + 종목 목록 + 기간 + 자본/수수료/슬리피지 + 가격 데이터 버전의 SHA-256
+- 가격 데이터 버전: 실제로 읽은 일봉(인덱스 + OHLCV)의 내용 해시
+  (kw_price_daily에 updated_at이 없고 upsert는 행 수/id를 바꾸지 않으므로, 어떤 배치가 봉을 고쳐도 키가 달라지도록)
+- 메모리 LRU(pickle 바이트로 보관해 적중마다 새 객체 반환) + 선택적 디스크 계층 (BACKTEST_CACHE_DIR, 기본 비활성)
+- 최근 요청 매핑: 데이터 버전을 빼고 종목별 무효화 세대를 넣은 요청 키 → 결과 키
+  · BACKTEST_CACHE_FRESH_SECONDS(기본 60초) 안의 같은 요청은 가격을 다시 읽지 않고 결과 키를 바로 사용
+  · invalidate_symbols(일봉 upsert 후크)는 세대를 올려 매핑을 끊음, 후크 없이 바뀐 봉은 최대 이 시간까지 늦게 반영
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from indicators.execution_cache import frame_fingerprint
+
+CACHE_SIZE_ENV = 'BACKTEST_CACHE_SIZE'
+CACHE_DIR_ENV = 'BACKTEST_CACHE_DIR'
+FRESH_SECONDS_ENV = 'BACKTEST_CACHE_FRESH_SECONDS'
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_FRESH_SECONDS = 60.0
+MAX_RECENT_REQUESTS = 256
+INDEX_FILE = 'index.json'
+
+
+def _normalize(value: Any) -> Any:
+    """해시용 정규화 (정수값 float → int, 튜플 → 리스트, dict 키는 문자열)"""
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _normalize_date(value: Any) -> str:
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+def cache_key(
+    strategy_config: Dict[str, Any],
+    stock_codes: Sequence[str],
+    start_date: str,
+    end_date: str,
+    initial_capital: float,
+    commission: float,
+    slippage: float,
+    data_version: str = '',
+    extra: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    백테스트 입력의 내용 해시
+
+    종목 순서는 같은 날 진입 우선순위에 영향을 주므로 유지 (중복만 제거)
+    """
+    payload = {
+        'config': _normalize(strategy_config or {}),
+        'stocks': list(dict.fromkeys(stock_codes)),
+        'period': [_normalize_date(start_date), _normalize_date(end_date)],
+        'capital': _normalize(float(initial_capital)),
+        'commission': _normalize(float(commission)),
+        'slippage': _normalize(float(slippage)),
+        'data_version': data_version,
+        'extra': _normalize(extra or {})
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def data_fingerprint(price_data: Dict[str, pd.DataFrame]) -> str:
+    """종목별 일봉 내용 해시 (결과 캐시 키의 가격 데이터 버전)"""
+    hasher = hashlib.sha256()
+    for code in sorted(price_data):
+        hasher.update(f"{code}:{frame_fingerprint(price_data[code])};".encode('utf-8'))
+    return hasher.hexdigest()
+
+
+class BacktestResultCache:
+    """메모리 LRU + 디스크 계층 결과 캐시 (스레드 안전)"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, disk_dir: Optional[str] = None,
+                 fresh_seconds: float = DEFAULT_FRESH_SECONDS):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.fresh_seconds = fresh_seconds
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()  # 키 → pickle된 결과
+        self._symbols: Dict[str, List[str]] = {}  # 키 → 포함 종목
+        self._recent: 'OrderedDict[str, Tuple[str, float]]' = OrderedDict()  # 요청 키 → (결과 키, 시각)
+        self._generations: Dict[str, int] = {}  # 종목 → 무효화 세대
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> 'BacktestResultCache':
+        """BACKTEST_CACHE_SIZE / BACKTEST_CACHE_DIR / BACKTEST_CACHE_FRESH_SECONDS 환경변수로 생성"""
+        try:
+            max_entries = int(os.getenv(CACHE_SIZE_ENV, DEFAULT_MAX_ENTRIES))
+        except ValueError:
+            max_entries = DEFAULT_MAX_ENTRIES
+        try:
+            fresh_seconds = float(os.getenv(FRESH_SECONDS_ENV, DEFAULT_FRESH_SECONDS))
+        except ValueError:
+            fresh_seconds = DEFAULT_FRESH_SECONDS
+        return cls(max_entries=max_entries, disk_dir=os.getenv(CACHE_DIR_ENV) or None, fresh_seconds=fresh_seconds)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or bool(self.disk_dir)
+
+    def generation_stamp(self, stock_codes: Iterable[str]) -> str:
+        """
+        종목별 무효화 세대 (요청 키 전용)
+
+        결과 키는 읽은 일봉 내용 해시로 충분하지만, 가격을 읽기 전의 요청 키에는 데이터 버전이 없으므로
+        세대를 넣어 무효화 이후 요청이 이전 매핑을 쓰지 않게 함
+        """
+        with self._lock:
+            return ','.join(f"{code}:{self._generations.get(code, 0)}" for code in stock_codes)
+
+    def recent_key(self, request_key: str) -> Optional[str]:
+        """fresh_seconds 안에 같은 요청이 읽은 데이터의 결과 키 (없거나 만료면 None → 가격을 읽어 결과 키 계산)"""
+        with self._lock:
+            item = self._recent.get(request_key)
+            if item is None or time.time() - item[1] > self.fresh_seconds:
+                return None
+            return item[0]
+
+    def remember_request(self, request_key: str, key: str):
+        if self.fresh_seconds <= 0:
+            return
+        with self._lock:
+            self._recent[request_key] = (key, time.time())
+            self._recent.move_to_end(request_key)
+            while len(self._recent) > MAX_RECENT_REQUESTS:
+                self._recent.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # 조회 / 저장
+    # ------------------------------------------------------------------
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """저장된 결과 (적중마다 새로 unpickle한 객체 - 호출자가 바꿔도 캐시는 그대로)"""
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pickle.loads(blob)
+
+            entry = self._read_disk(key)
+            if entry is not None:
+                self.disk_hits += 1
+                self._remember(key, entry['symbols'], pickle.dumps(entry['result'], protocol=pickle.HIGHEST_PROTOCOL))
+                return entry['result']
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, stock_codes: Sequence[str], result: Dict[str, Any]):
+        with self._lock:
+            self._remember(key, list(stock_codes), pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+            self._write_disk(key, list(stock_codes), result)
+
+    def _remember(self, key: str, symbols: List[str], blob: bytes):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = blob
+        self._entries.move_to_end(key)
+        self._symbols[key] = symbols
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._symbols.pop(evicted, None)
+
+    # ------------------------------------------------------------------
+    # 무효화
+    # ------------------------------------------------------------------
+    def invalidate_symbols(self, stock_codes: Iterable[str]) -> int:
+        """
+        일봉 upsert 후크: 해당 종목을 포함한 결과 제거
+
+        Returns:
+            제거된 항목 수 (메모리 + 디스크)
+        """
+        codes = set(stock_codes)
+        if not codes:
+            return 0
+
+        with self._lock:
+            for code in codes:
+                self._generations[code] = self._generations.get(code, 0) + 1
+
+            stale = [key for key, symbols in self._symbols.items() if codes.intersection(symbols)]
+            for key in stale:
+                self._entries.pop(key, None)
+                self._symbols.pop(key, None)
+
+            removed = len(stale)
+            if self.disk_dir:
+                index = self._read_index()
+                disk_stale = [key for key, symbols in index.items() if codes.intersection(symbols)]
+                for key in disk_stale:
+                    index.pop(key)
+                    try:
+                        os.remove(self._disk_path(key))
+                    except FileNotFoundError:
+                        pass
+                if disk_stale:
+                    self._write_index(index)
+                removed += len(set(disk_stale) - set(stale))
+
+            self.invalidations += removed
+
+        if removed:
+            print(f"[ResultCache] Invalidated {removed} cached results for {sorted(codes)}")
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._symbols.clear()
+            self._recent.clear()
+            if self.disk_dir:
+                for key in self._read_index():
+                    try:
+                        os.remove(self._disk_path(key))
+                    except FileNotFoundError:
+                        pass
+                self._write_index({})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'fresh_seconds': self.fresh_seconds,
+                'recent_requests': len(self._recent),
+                'disk_dir': self.disk_dir,
+                'disk_entries': len(self._read_index()) if self.disk_dir else 0,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations
+            }
+
+    # ------------------------------------------------------------------
+    # 디스크 계층
+    # ------------------------------------------------------------------
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def _read_index(self) -> Dict[str, List[str]]:
+        try:
+            with open(os.path.join(self.disk_dir, INDEX_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_index(self, index: Dict[str, List[str]]):
+        path = os.path.join(self.disk_dir, INDEX_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, path)
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"[ResultCache] Failed to read disk entry {key[:12]}: {e}")
+            return None
+
+    def _write_disk(self, key: str, symbols: List[str], result: Dict[str, Any]):
+        if not self.disk_dir:
+            return
+        try:
+            path = self._disk_path(key)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'symbols': symbols, 'result': result}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            index = self._read_index()
+            index[key] = symbols
+            self._write_index(index)
+        except Exception as e:
+            print(f"[ResultCache] Failed to write disk entry {key[:12]}: {e}")
+
+
+result_cache = BacktestResultCache.from_env()
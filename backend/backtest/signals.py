@@ -0,0 +1,357 @@
+"""
+조건 컴파일러
+buyConditions/sellConditions를 컬럼 단위 NumPy 불리언 마스크로 변환
+
+행 단위 경로(_check_condition + _evaluate_conditions_with_combine)와
+동일한 결과를 내도록 설계되었으며, 이유(reason) 문자열은 신호가 발생한 행에 대해서만 생성
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Tuple
+
+# _evaluate_signals가 생성하는 신호 컬럼 (prev_ 컬럼 생성 대상에서 제외)
+SIGNAL_COLUMNS = ('buy_signal', 'sell_signal', 'buy_reason', 'sell_reason')
+
+CROSS_ABOVE_OPERATORS = ('cross_above', 'crossAbove', 'crossover')
+CROSS_BELOW_OPERATORS = ('cross_below', 'crossBelow', 'crossunder')
+
+# 이유 조합을 int64 비트마스크로 추적하므로 조건 수 제한
+MAX_COMPILED_CONDITIONS = 63
+
+
+class UncompilableCondition(Exception):
+    """벡터화할 수 없는 조건 (행 단위 경로로 대체)"""
+    pass
+
+
+class SignalFrame:
+    """
+    신호 평가용 컬럼 컨텍스트
+
+    행 단위 경로가 df에 추가하던 prev_<col> 컬럼을 실제로 만들지 않고
+    요청 시 shift된 배열로 제공
+    """
+
+    def __init__(self, df: pd.DataFrame, prev_source: Dict[str, pd.Series]):
+        self.df = df
+        self._prev_source = prev_source
+        self._cache: Dict[str, np.ndarray] = {}
+        self.length = len(df)
+
+        names = list(df.columns)
+        names.extend('prev_' + col for col in prev_source if 'prev_' + col not in df.columns)
+        # 컬럼명 해석(_resolve_indicator_name)은 row.index만 참조하므로 빈 Series로 충분
+        self.probe = pd.Series(index=pd.Index(names, dtype=object), dtype=float)
+
+    def values(self, name: str) -> np.ndarray:
+        """컬럼 값을 float64 배열로 반환 (prev_ 컬럼은 shift 적용)"""
+        cached = self._cache.get(name)
+        if cached is not None:
+            return cached
+
+        if name in SIGNAL_COLUMNS:
+            # 평가 도중 갱신되는 컬럼은 행 단위 경로와 동일하게 재현 불가
+            raise UncompilableCondition(f"Condition references signal column '{name}'")
+
+        if name.startswith('prev_') and name[5:] in self._prev_source:
+            base = self._to_float(name[5:], self._prev_source[name[5:]])
+            values = np.empty_like(base)
+            if self.length:
+                values[0] = np.nan
+                values[1:] = base[:-1]
+        else:
+            values = self._to_float(name, self.df[name])
+
+        self._cache[name] = values
+        return values
+
+    @staticmethod
+    def _to_float(name: str, series: pd.Series) -> np.ndarray:
+        if pd.api.types.is_bool_dtype(series.dtype) or pd.api.types.is_numeric_dtype(series.dtype):
+            return series.to_numpy(dtype=np.float64, na_value=np.nan)
+        raise UncompilableCondition(f"Column '{name}' is not numeric (dtype={series.dtype})")
+
+
+class ConditionCompiler:
+    """
+    조건 컴파일러
+
+    조건 해석은 BacktestEngine의 _resolve_indicator_name/_resolve_operand/_format_condition_reason을
+    그대로 재사용하여 행 단위 경로와 같은 규칙을 따름
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def compile_condition(self, frame: SignalFrame, condition: Dict) -> np.ndarray:
+        """단일 조건 → 불리언 마스크 (_check_condition과 동일한 의미)"""
+        false_mask = np.zeros(frame.length, dtype=bool)
+
+        left = condition.get('left')
+        right = condition.get('right')
+        indicator = condition.get('indicator')
+        value = condition.get('value')
+        compare_to = condition.get('compareTo')
+        operator = condition.get('operator')
+
+        if left is not None:
+            indicator = left
+            compare_to = right
+        elif indicator is None:
+            print(f"[Engine] Warning: No indicator/left specified in condition")
+            return false_mask
+
+        resolved_indicator = self.engine._resolve_indicator_name(frame.probe, indicator)
+        if not resolved_indicator:
+            print(f"[Engine] Warning: Indicator '{indicator}' not found in row")
+            print(f"[Engine] Available columns: {list(frame.probe.index)}")
+            return false_mask
+
+        indicator_values = frame.values(resolved_indicator)
+        valid = ~np.isnan(indicator_values)
+
+        # 비교 대상 값 결정
+        operand = compare_to if compare_to is not None else value
+        if operand is not None:
+            operand_type, operand_value = self.engine._resolve_operand(frame.probe, operand)
+            if operand_type == 'const':
+                compare_values = operand_value
+            elif operand_type == 'column':
+                compare_values = frame.values(operand_value)
+                valid &= ~np.isnan(compare_values)
+            else:
+                label = 'compareTo/right' if compare_to is not None else 'value'
+                print(f"[Engine] Warning: Cannot resolve {label} '{operand}'")
+                return false_mask
+        else:
+            compare_values = 0.0
+
+        with np.errstate(invalid='ignore'):
+            if operator == '>':
+                result = indicator_values > compare_values
+            elif operator == '<':
+                result = indicator_values < compare_values
+            elif operator == '>=':
+                result = indicator_values >= compare_values
+            elif operator == '<=':
+                result = indicator_values <= compare_values
+            elif operator == '==':
+                result = indicator_values == compare_values
+            elif operator in CROSS_ABOVE_OPERATORS or operator in CROSS_BELOW_OPERATORS:
+                result = self._compile_cross(frame, operator, resolved_indicator, compare_to,
+                                             indicator_values, compare_values)
+            else:
+                print(f"[Engine] Unknown operator: {operator}")
+                return false_mask
+
+        return np.asarray(result, dtype=bool) & valid
+
+    def _compile_cross(
+        self,
+        frame: SignalFrame,
+        operator: str,
+        resolved_indicator: str,
+        compare_to: Any,
+        indicator_values: np.ndarray,
+        compare_values: Any
+    ) -> np.ndarray:
+        """크로스 업/다운 - 이전 행과 현재 행 비교"""
+        false_mask = np.zeros(frame.length, dtype=bool)
+
+        # 숫자와 cross는 의미 없음 (compareTo가 비어 있으면 항상 False)
+        if not compare_to:
+            return false_mask
+
+        compare_type, compare_col = self.engine._resolve_operand(frame.probe, compare_to)
+        if compare_type != 'column':
+            return false_mask
+
+        prev_indicator_name = 'prev_' + resolved_indicator
+        prev_compare_name = 'prev_' + compare_col
+        if prev_indicator_name not in frame.probe.index or prev_compare_name not in frame.probe.index:
+            return false_mask
+
+        prev_indicator = frame.values(prev_indicator_name)
+        prev_compare = frame.values(prev_compare_name)
+        prev_valid = ~np.isnan(prev_indicator) & ~np.isnan(prev_compare)
+
+        if operator in CROSS_ABOVE_OPERATORS:
+            crossed = (prev_indicator <= prev_compare) & (indicator_values > compare_values)
+        else:
+            crossed = (prev_indicator >= prev_compare) & (indicator_values < compare_values)
+
+        return crossed & prev_valid
+
+    def compile_conditions(self, frame: SignalFrame, conditions: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        combineWith 체인 → (결과 마스크, 이유 비트마스크)
+
+        비트 i가 켜져 있으면 i번째 조건이 해당 행의 이유 목록에 포함됨
+        (_evaluate_conditions_with_combine의 satisfied_reasons와 동일)
+        """
+        if len(conditions) > MAX_COMPILED_CONDITIONS:
+            raise UncompilableCondition(f"Too many conditions: {len(conditions)}")
+
+        result = self.compile_condition(frame, conditions[0])
+        reason_bits = np.where(result, np.int64(1), np.int64(0))
+
+        for i, condition in enumerate(conditions[1:], 1):
+            current = self.compile_condition(frame, condition)
+            bit = np.int64(1) << np.int64(i)
+            both = result & current
+            combine_with = condition.get('combineWith', 'AND').upper()
+
+            if combine_with == 'AND':
+                reason_bits = np.where(both, reason_bits | bit, reason_bits)
+                result = both
+            else:  # OR
+                reason_bits = np.where(~result & current, bit,
+                                       np.where(both, reason_bits | bit, reason_bits))
+                result = result | current
+
+        return result, reason_bits
+
+    def format_reasons(self, conditions: List[Dict], mask: np.ndarray, reason_bits: np.ndarray) -> np.ndarray:
+        """신호가 발생한 행에 대해서만 이유 문자열 생성 (비트 조합별 1회)"""
+        reasons = np.full(len(mask), '', dtype=object)
+        fired = np.flatnonzero(mask)
+        if len(fired) == 0:
+            return reasons
+
+        condition_texts = [self.engine._format_condition_reason(c) for c in conditions]
+        fired_bits = reason_bits[fired]
+
+        for bits in np.unique(fired_bits):
+            satisfied = [condition_texts[i] for i in range(len(conditions)) if (int(bits) >> i) & 1]
+            # 기존 포맷 유지: k번째 이유(k>0)는 conditions[k]의 combineWith를 접두어로 사용
+            reason_parts = []
+            for idx, reason in enumerate(satisfied):
+                if idx > 0:
+                    combine = conditions[idx].get('combineWith', 'AND').upper()
+                    reason_parts.append(f"{combine} {reason}")
+                else:
+                    reason_parts.append(reason)
+            reasons[fired[fired_bits == bits]] = ' '.join(reason_parts)
+
+        return reasons
+
+
+# 단계별 신호 컬럼 (0 = 신호 없음)
+STAGED_SIGNAL_COLUMNS = ('buy_stage', 'buy_position_percent', 'sell_stage', 'sell_exit_percent')
+
+
+def _as_number(value: float) -> Any:
+    """정수로 표현 가능한 비율은 int로 복원 (설정값 형태 유지)"""
+    return int(value) if float(value).is_integer() else float(value)
+
+
+def staged_signal_payload(row: pd.Series, side: str) -> Any:
+    """
+    신호 행에서 거래가 소비할 신호 정보를 생성
+
+    단계별 신호는 compact 컬럼에서 dict로 복원하고,
+    일반 신호는 기존 boolean 값을 그대로 반환
+    """
+    stage = row.get(f'{side}_stage', 0)
+    if pd.isna(stage) or stage <= 0:
+        return row.get(f'{side}_signal')
+
+    stage = int(stage)
+    reason = row.get(f'{side}_reason', '')
+    if side == 'buy':
+        prefix = f"Stage {stage}: "
+        return {
+            'stage': stage,
+            'positionPercent': _as_number(row['buy_position_percent']),
+            'reason': reason[len(prefix):] if reason.startswith(prefix) else reason
+        }
+    return {
+        'stage': stage,
+        'exitPercent': _as_number(row['sell_exit_percent']),
+        'reason': reason
+    }
+
+
+class StagedSignalEvaluator:
+    """
+    단계별 신호 평가기
+
+    단계마다 조건 마스크를 결합(passAllRequired AND/OR)해 (행 × 단계) 행렬을 만들고
+    argmax로 첫 번째 만족 단계를 선택
+    """
+
+    def __init__(self, compiler: ConditionCompiler):
+        self.compiler = compiler
+
+    def _condition_mask(self, frame: SignalFrame, condition: Dict) -> np.ndarray:
+        try:
+            return self.compiler.compile_condition(frame, condition)
+        except UncompilableCondition as e:
+            # 벡터화할 수 없는 조건만 행 단위로 평가
+            print(f"[Engine] Row-wise evaluation for staged condition: {e}")
+            df = frame.df
+            return np.array([bool(self.compiler.engine._check_condition(df.iloc[i], condition))
+                             for i in range(len(df))], dtype=bool)
+
+    def evaluate(
+        self,
+        frame: SignalFrame,
+        stages: List[Dict],
+        default_percent: float,
+        percent_key: str
+    ) -> Dict[str, np.ndarray]:
+        """
+        Returns:
+            {'stage': int16 배열, 'percent': float64 배열, 'reason': object 배열}
+        """
+        length = frame.length
+        active = [s for s in stages if s.get('enabled', False) and s.get('conditions', [])]
+
+        stage_out = np.zeros(length, dtype=np.int16)
+        percent_out = np.full(length, np.nan)
+        reason_out = np.full(length, '', dtype=object)
+        if not active or length == 0:
+            return {'stage': stage_out, 'percent': percent_out, 'reason': reason_out}
+
+        satisfied = np.zeros((length, len(active)), dtype=bool)
+        stage_bits = []
+        for j, stage in enumerate(active):
+            conditions = stage['conditions']
+            if len(conditions) > MAX_COMPILED_CONDITIONS:
+                raise UncompilableCondition(f"Too many conditions in stage: {len(conditions)}")
+
+            bits = np.zeros(length, dtype=np.int64)
+            combined = None
+            for i, condition in enumerate(conditions):
+                mask = self._condition_mask(frame, condition)
+                bits |= np.where(mask, np.int64(1) << np.int64(i), np.int64(0))
+                if combined is None:
+                    combined = mask
+                elif stage.get('passAllRequired', True):
+                    combined = combined & mask
+                else:
+                    combined = combined | mask
+            satisfied[:, j] = combined
+            stage_bits.append(bits)
+
+        fired = satisfied.any(axis=1)
+        first = satisfied.argmax(axis=1)
+
+        for j, stage in enumerate(active):
+            rows = np.flatnonzero(fired & (first == j))
+            if len(rows) == 0:
+                continue
+
+            stage_num = stage.get('stage', 1)
+            stage_out[rows] = stage_num
+            percent_out[rows] = stage.get(percent_key, default_percent)
+
+            joiner = ' AND ' if stage.get('passAllRequired', True) else ' OR '
+            texts = [self.compiler.engine._format_condition_reason(c) for c in stage['conditions']]
+            row_bits = stage_bits[j][rows]
+            for bits in np.unique(row_bits):
+                reasons = [texts[i] for i in range(len(texts)) if (int(bits) >> i) & 1]
+                reason_out[rows[row_bits == bits]] = f"Stage {stage_num}: {joiner.join(reasons)}"
+
+        return {'stage': stage_out, 'percent': percent_out, 'reason': reason_out}
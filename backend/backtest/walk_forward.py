@@ -0,0 +1,171 @@
+"""
+워크포워드 최적화
+- 전체 기간을 롤링(또는 앵커드) 학습/검증 구간으로 분할
+- 학습 구간에서 파라미터 그리드를 평가해 최적 설정을 고르고, 바로 다음 검증 구간에 적용
+- 지표는 전체 기간에 대해 한 번만 계산한 뒤 구간별로 잘라서 사용
+- 그리드 포인트별 신호도 전체 기간에서 한 번 생성하고 모든 구간을 함께 평가 (구간 동시 처리)
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .optimizer import SORT_KEYS, ParameterSweep, build_grid, rank_rows
+from .portfolio import PortfolioSimulator
+
+
+def build_windows(
+    calendar: pd.DatetimeIndex,
+    in_sample_days: int,
+    out_of_sample_days: int,
+    step_days: Optional[int] = None,
+    anchored: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    거래일 캘린더 → 학습/검증 구간 목록
+
+    Args:
+        in_sample_days: 학습 구간 거래일 수
+        out_of_sample_days: 검증 구간 거래일 수 (마지막 구간은 남은 거래일만큼 짧을 수 있음)
+        step_days: 구간 이동 거래일 수 (기본값: 검증 구간 길이)
+        anchored: True면 학습 구간 시작을 첫 거래일로 고정 (확장 구간)
+    """
+    if in_sample_days <= 0 or out_of_sample_days <= 0:
+        raise ValueError("in_sample_days and out_of_sample_days must be positive")
+    step = step_days or out_of_sample_days
+    if step <= 0:
+        raise ValueError("step_days must be positive")
+
+    windows = []
+    offset = 0
+    while offset + in_sample_days < len(calendar):
+        is_start = 0 if anchored else offset
+        is_end = offset + in_sample_days - 1
+        oos_end = min(is_end + out_of_sample_days, len(calendar) - 1)
+        windows.append({
+            'window': len(windows) + 1,
+            'in_sample': (calendar[is_start], calendar[is_end]),
+            'out_of_sample': (calendar[is_end + 1], calendar[oos_end])
+        })
+        offset += step
+
+    if not windows:
+        raise ValueError(
+            f"Not enough trading days ({len(calendar)}) for in_sample_days={in_sample_days}"
+        )
+    return windows
+
+
+class WalkForwardOptimizer(ParameterSweep):
+    """ParameterSweep의 공유 지표/병렬 평가를 이용한 워크포워드 최적화"""
+
+    async def run(
+        self,
+        strategy_config: Dict[str, Any],
+        parameters: List[Dict[str, Any]],
+        stock_codes: List[str],
+        start_date: str,
+        end_date: str,
+        in_sample_days: int = 252,
+        out_of_sample_days: int = 63,
+        step_days: Optional[int] = None,
+        anchored: bool = False,
+        initial_capital: float = 10000000,
+        commission: float = 0.00015,
+        slippage: float = 0.001,
+        workers: Optional[int] = None,
+        sort_by: str = 'total_return_rate'
+    ) -> Dict[str, Any]:
+        """
+        워크포워드 실행
+
+        Returns:
+            구간별 최적 파라미터, 학습/검증 성과, 검증 구간 누적 성과
+        """
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort_by: {sort_by} (choose from {list(SORT_KEYS)})")
+
+        grid = build_grid(strategy_config, parameters, self.max_grid_points)
+
+        # 1. 가격 데이터 1회 로드 + 전체 기간 지표 1회 계산
+        price_data = await self.engine._load_price_data(stock_codes, start_date, end_date)
+        if not price_data:
+            raise ValueError("No price data available")
+
+        calendar = PortfolioSimulator.build_calendar(price_data)
+        windows = build_windows(calendar, in_sample_days, out_of_sample_days, step_days, anchored)
+        print(f"[WalkForward] {len(windows)} windows x {len(grid)} grid points, sort_by={sort_by}")
+
+        indicator_columns = await self._compute_indicator_columns(price_data, grid)
+
+        # 2. 학습 구간: 그리드 포인트마다 전 구간을 한 번에 평가
+        in_sample = await self._evaluate_grid(
+            grid, price_data, indicator_columns, initial_capital, commission, slippage, workers,
+            windows=[w['in_sample'] for w in windows]
+        )
+
+        # 3. 구간별 최적 설정 선택
+        best_points = []
+        for w_index, window in enumerate(windows):
+            ranked = rank_rows(
+                [{'point': p_index, **in_sample[p_index][w_index]} for p_index in range(len(grid))],
+                sort_by
+            )
+            best = ranked[0]
+            if 'error' in best or best.get(sort_by) is None:
+                best_points.append(None)
+                print(f"[WalkForward] Window {window['window']}: no valid grid point")
+            else:
+                best_points.append(best['point'])
+
+        # 4. 검증 구간: 최적 설정별로 해당 구간들을 묶어 동시 평가
+        oos_points = sorted({p for p in best_points if p is not None})
+        oos_windows = [
+            [w['out_of_sample'] for w, p in zip(windows, best_points) if p == point]
+            for point in oos_points
+        ]
+        oos_results = await self._evaluate_grid(
+            [grid[point] for point in oos_points], price_data, indicator_columns,
+            initial_capital, commission, slippage, workers, point_windows=oos_windows
+        ) if oos_points else []
+
+        oos_by_window = {}
+        for point, summaries in zip(oos_points, oos_results):
+            targets = [i for i, p in enumerate(best_points) if p == point]
+            for w_index, summary in zip(targets, summaries):
+                oos_by_window[w_index] = summary
+
+        # 5. 결과 정리
+        results = []
+        for w_index, window in enumerate(windows):
+            point = best_points[w_index]
+            results.append({
+                'window': window['window'],
+                'in_sample': {'start': str(window['in_sample'][0].date()), 'end': str(window['in_sample'][1].date())},
+                'out_of_sample': {'start': str(window['out_of_sample'][0].date()), 'end': str(window['out_of_sample'][1].date())},
+                'best_params': grid[point][0] if point is not None else None,
+                'in_sample_metrics': in_sample[point][w_index] if point is not None else None,
+                'out_of_sample_metrics': oos_by_window.get(w_index)
+            })
+
+        oos_returns = [
+            r['out_of_sample_metrics']['total_return_rate'] for r in results
+            if r['out_of_sample_metrics'] and 'error' not in r['out_of_sample_metrics']
+        ]
+        compounded = (np.prod([1 + ret / 100 for ret in oos_returns]) - 1) * 100 if oos_returns else 0.0
+
+        print(f"[WalkForward] Completed: out-of-sample compounded return {compounded:.2f}%")
+
+        return {
+            'windows': results,
+            'grid_points': len(grid),
+            'distinct_indicators': len({key for _, key in indicator_columns}),
+            'sort_by': sort_by,
+            'out_of_sample_summary': {
+                'windows_evaluated': len(oos_returns),
+                'compounded_return_rate': float(compounded),
+                'average_return_rate': float(np.mean(oos_returns)) if oos_returns else 0.0,
+                'positive_windows': int(sum(1 for ret in oos_returns if ret > 0))
+            }
+        }
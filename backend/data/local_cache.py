@@ -0,0 +1,362 @@
+"""
+kw_price_daily 로컬 컬럼형 캐시 (종목당 파일 1개)
+- 백테스트/신호 확인마다 바뀌지 않은 일봉을 Supabase에서 다시 받던 것을 디스크 읽기로 대체
+- 파일: <PRICE_CACHE_DIR>/<종목>.npz
+  · trade_date(ns) + open/high/low/close(float64) + volume(int64) 컬럼 배열 + manifest(JSON) (tmp → os.replace로 원자적 교체)
+  · manifest: covered_from(캐시가 보장하는 시작일), synced_through(동기화 완료일), last_trade_date, 행 수
+- 조회 구간이 캐시 범위를 벗어난 부분(gap)만 Supabase에서 받아 합침
+  · 앞쪽: start ~ covered_from 전날
+  · 뒤쪽: last_trade_date(마지막 봉 다시 받음) ~ end  (synced_through는 어제까지만 → 오늘 봉은 매번 갱신)
+  · 수정 구간: 조회가 최근 PRICE_CACHE_REVISION_DAYS일(기본 7일)에 걸치면 그 구간은 매번 다시 받음
+    (장 마감 후 정정/당일 재수집처럼 최근 봉이 바뀌는 경우 대비)
+  · 수정 구간 길이는 트레이드오프: 길수록 알리지 않고 과거 봉을 고치는 쓰기에도 안전하지만
+    조회마다 종목당 그만큼의 행을 다시 받음 (150일이면 종목당 ~100행 → 캐시 이점 대부분 상실).
+    과거 봉을 upsert로 다시 쓰는 경로(update_daily_prices.py, /api/market 백필)는 invalidate()를 호출하므로
+    기본값은 짧게 두고, invalidate를 부르지 않는 외부 쓰기가 있으면 환경변수로 늘림
+  · 다시 받은 구간의 캐시 행은 버리고 새 행으로 교체, 결과가 기존 파일과 같으면 파일을 다시 쓰지 않음
+  · 같은 gap 구간의 종목들은 묶어서 한 번에 조회 (fetch_price_rows)
+- 수정 구간보다 오래된 봉을 고치는 경로(백필)는 invalidate(symbols, since)로 해당 구간부터 다시 받게 함
+- PRICE_CACHE_ENABLED=false로 비활성화, 동기화 스크립트: sync_price_cache.py
+- pyarrow가 의존성에 없어 Parquet 대신 NumPy npz 사용 (indicators/store.py와 같은 형식)
+"""
+
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .price_reader import PRICE_COLUMNS, concat_price_chunks, price_frames_from_table
+
+CACHE_DIR_ENV = 'PRICE_CACHE_DIR'
+CACHE_ENABLED_ENV = 'PRICE_CACHE_ENABLED'
+REVISION_DAYS_ENV = 'PRICE_CACHE_REVISION_DAYS'
+DEFAULT_REVISION_DAYS = 7  # 최근 5거래일 (더 오래된 봉을 다시 쓰는 경로는 invalidate 호출)
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'price_cache'
+)
+CACHE_VERSION = 1
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def _shift_date(date: str, days: int) -> str:
+    return (pd.Timestamp(date) + pd.Timedelta(days=days)).strftime(DATE_FORMAT)
+
+
+def _today() -> str:
+    return datetime.now().strftime(DATE_FORMAT)
+
+
+def _yesterday() -> str:
+    return _shift_date(_today(), -1)
+
+
+class CachedPrices:
+    """캐시된 종목 일봉 (manifest + 날짜 + 컬럼 배열)"""
+
+    def __init__(self, manifest: Dict[str, Any], dates: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.manifest = manifest
+        self.dates = dates
+        self.columns = columns
+
+    def frame(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> pd.DataFrame:
+        """기간 구간 → get_historical_data와 같은 형식의 DataFrame"""
+        lo = 0 if start_date is None else int(np.searchsorted(self.dates, pd.Timestamp(start_date).value, 'left'))
+        hi = len(self.dates) if end_date is None else int(np.searchsorted(self.dates, pd.Timestamp(end_date).value, 'right'))
+        index = pd.DatetimeIndex(self.dates[lo:hi].view('datetime64[ns]'), name='date')
+        return pd.DataFrame({col: self.columns[col][lo:hi] for col in PRICE_COLUMNS}, index=index)
+
+    def gaps(self, start_date: str, end_date: str, revision_from: Optional[str] = None) -> List[Tuple[str, str]]:
+        """
+        캐시에 없거나 다시 받아야 하는 조회 구간 [(시작, 끝)]
+
+        revision_from: 이 날짜 이후 캐시 봉은 원천에서 수정됐을 수 있으므로 조회 구간에 걸치면 다시 받음
+        """
+        manifest = self.manifest
+        gaps = []
+        if start_date < manifest['covered_from']:
+            gaps.append((start_date, _shift_date(manifest['covered_from'], -1)))
+        revising = revision_from is not None and end_date >= revision_from
+        if end_date > manifest['synced_through'] or revising:
+            tail_from = manifest.get('last_trade_date') or _shift_date(manifest['synced_through'], 1)
+            tail_from = min(tail_from, _shift_date(manifest['synced_through'], 1))
+            if revising:
+                tail_from = min(tail_from, revision_from)
+            gaps.append((max(tail_from, manifest['covered_from']), end_date))
+        return gaps
+
+
+class PriceCache:
+    """종목별 일봉 파일 캐시"""
+
+    def __init__(self, directory: Optional[str] = None, enabled: Optional[bool] = None,
+                 revision_days: Optional[int] = None):
+        self.directory = directory or os.getenv(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+        if enabled is None:
+            enabled = os.getenv(CACHE_ENABLED_ENV, 'true').lower() in ('true', '1', 'yes')
+        self.enabled = enabled
+        if revision_days is None:
+            try:
+                revision_days = int(os.getenv(REVISION_DAYS_ENV, DEFAULT_REVISION_DAYS))
+            except ValueError:
+                revision_days = DEFAULT_REVISION_DAYS
+        self.revision_days = max(0, revision_days)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self.fetched_rows = 0
+        self.requests = 0
+        self.writes = 0
+        self.unchanged = 0
+
+    def revision_from(self) -> str:
+        """원천에서 수정될 수 있어 매 조회마다 다시 받는 구간의 시작일"""
+        return _shift_date(_today(), -self.revision_days)
+
+    def _path(self, symbol: str) -> str:
+        safe_symbol = ''.join(ch if ch.isalnum() or ch in '-_' else '_' for ch in str(symbol))
+        return os.path.join(self.directory, f"{safe_symbol}.npz")
+
+    # ------------------------------------------------------------
+    # 파일 읽기/쓰기
+    # ------------------------------------------------------------
+
+    def load(self, symbol: str) -> Optional[CachedPrices]:
+        try:
+            with np.load(self._path(symbol), allow_pickle=False) as data:
+                manifest = json.loads(str(data['__manifest__']))
+                if manifest.get('version') != CACHE_VERSION:
+                    return None
+                dates = data['trade_date']
+                columns = {col: data[col] for col in PRICE_COLUMNS}
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"[PriceCache] Failed to read {symbol}: {e}")
+            return None
+        return CachedPrices(manifest, dates, columns)
+
+    def save(self, symbol: str, frame: pd.DataFrame, covered_from: str, synced_through: str) -> bool:
+        """종목 전체 일봉 저장 (frame: date 인덱스, OHLCV 컬럼)"""
+        manifest = {
+            'version': CACHE_VERSION,
+            'symbol': symbol,
+            'covered_from': covered_from,
+            'synced_through': synced_through,
+            'first_trade_date': frame.index[0].strftime(DATE_FORMAT) if len(frame) else None,
+            'last_trade_date': frame.index[-1].strftime(DATE_FORMAT) if len(frame) else None,
+            'rows': len(frame),
+            'updated_at': datetime.now().isoformat()
+        }
+        arrays = {
+            'trade_date': np.asarray(pd.DatetimeIndex(frame.index).as_unit('ns').asi8, dtype=np.int64),
+            **{col: frame[col].to_numpy(dtype='int64' if col == 'volume' else 'float64') for col in PRICE_COLUMNS}
+        }
+        path = self._path(symbol)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, __manifest__=np.array(json.dumps(manifest)), **arrays)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[PriceCache] Failed to write {symbol}: {e}")
+            return False
+        with self._lock:
+            self.writes += 1
+        return True
+
+    # ------------------------------------------------------------
+    # 조회 / 동기화
+    # ------------------------------------------------------------
+
+    async def sync(self, supabase, stock_codes: List[str], start_date: str, end_date: str,
+                   concurrency: Optional[int] = None) -> Dict[str, CachedPrices]:
+        """조회 구간의 gap만 Supabase에서 받아 캐시에 합침 → {종목: 캐시 항목}"""
+        from .provider import fetch_price_rows  # provider가 이 모듈을 가져오므로 지연 임포트
+
+        loop = asyncio.get_running_loop()
+        codes = list(dict.fromkeys(stock_codes))
+        entries = dict(zip(codes, await loop.run_in_executor(None, lambda: [self.load(code) for code in codes])))
+
+        # gap 구간별로 종목 묶기 (매일 동기화하면 대부분 같은 꼬리 구간)
+        groups: Dict[Tuple[str, str], List[str]] = {}
+        revision_from = self.revision_from()
+        for code in codes:
+            entry = entries[code]
+            gaps = [(start_date, end_date)] if entry is None else entry.gaps(start_date, end_date, revision_from)
+            for gap in gaps:
+                groups.setdefault(gap, []).append(code)
+            with self._lock:
+                if entry is None:
+                    self.misses += 1
+                elif gaps:
+                    self.partial_hits += 1
+                else:
+                    self.hits += 1
+        if not groups:
+            return entries
+
+        fetched: Dict[str, List[pd.DataFrame]] = {}
+        for (gap_start, gap_end), group_codes in groups.items():
+            result = await fetch_price_rows(supabase, group_codes, gap_start, gap_end, concurrency, decode=True)
+            table = concat_price_chunks(result.pop('chunks'))
+            for code, frame in price_frames_from_table(table, group_codes).items():
+                fetched.setdefault(code, []).append(frame)
+            with self._lock:
+                self.requests += result['requests']
+                self.fetched_rows += result['row_count']
+
+        synced_through = min(end_date, _yesterday())
+
+        def merge_and_save():
+            refetched: Dict[str, List[Tuple[str, str]]] = {}
+            for gap, group_codes in groups.items():
+                for code in group_codes:
+                    refetched.setdefault(code, []).append(gap)
+            for code, code_gaps in refetched.items():
+                entry = entries[code]
+                kept = None
+                if entry is not None:
+                    # 다시 받은 구간의 기존 봉은 버림 (원천에서 수정/삭제된 봉 반영)
+                    kept = entry.frame()
+                    stale = np.zeros(len(kept), dtype=bool)
+                    for gap_start, gap_end in code_gaps:
+                        stale |= (kept.index >= pd.Timestamp(gap_start)) & (kept.index <= pd.Timestamp(gap_end))
+                    kept = kept[~stale]
+                parts = ([kept] if kept is not None else []) + fetched.get(code, [])
+                parts = [part for part in parts if len(part)]
+                frame = pd.concat(parts) if parts else pd.DataFrame(
+                    {col: np.array([], dtype='int64' if col == 'volume' else 'float64') for col in PRICE_COLUMNS},
+                    index=pd.DatetimeIndex([], name='date')
+                )
+                frame = frame[~frame.index.duplicated(keep='last')].sort_index(kind='stable')
+                covered_from = start_date if entry is None else min(entry.manifest['covered_from'], start_date)
+                through = synced_through if entry is None else max(entry.manifest['synced_through'], synced_through)
+                if (entry is not None and covered_from == entry.manifest['covered_from']
+                        and through == entry.manifest['synced_through'] and frame.equals(entry.frame())):
+                    with self._lock:
+                        self.unchanged += 1  # 다시 받은 봉이 캐시와 같음 → 파일 유지
+                    continue
+                if self.save(code, frame, covered_from, through):
+                    entries[code] = self.load(code)
+                else:
+                    entries[code] = CachedPrices(
+                        {'covered_from': covered_from, 'synced_through': through},
+                        np.asarray(frame.index.as_unit('ns').asi8, dtype=np.int64),
+                        {col: frame[col].to_numpy() for col in PRICE_COLUMNS}
+                    )
+
+        await loop.run_in_executor(None, merge_and_save)
+        return entries
+
+    async def read(self, supabase, stock_codes: List[str], start_date: str, end_date: str,
+                   concurrency: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+        """캐시 우선 조회 (gap만 Supabase) → {종목: 주가 DataFrame} (행이 없는 종목은 제외)"""
+        entries = await self.sync(supabase, stock_codes, start_date, end_date, concurrency)
+        frames = {}
+        for code, entry in entries.items():
+            if entry is not None:
+                frame = entry.frame(start_date, end_date)
+                if len(frame):
+                    frames[code] = frame
+        return frames
+
+    async def refresh(self, supabase, symbols: Optional[List[str]] = None, start_date: Optional[str] = None,
+                      end_date: Optional[str] = None, concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """
+        새 봉만 받아 캐시 갱신 (sync_price_cache.py)
+
+        Args:
+            symbols: 대상 종목 (None이면 캐시된 전체 종목)
+            start_date: 캐시에 없는 종목의 시작일 (캐시된 종목은 기존 covered_from 유지)
+            end_date: 종료일 (기본 오늘)
+        """
+        end_date = end_date or datetime.now().strftime(DATE_FORMAT)
+        if symbols is None:
+            symbols = [entry['symbol'] for entry in self.manifest()]
+        before = self.stats()
+        by_start: Dict[str, List[str]] = {}
+        for symbol in dict.fromkeys(symbols):
+            entry = self.load(symbol)
+            if entry is None and start_date is None:
+                continue
+            by_start.setdefault(entry.manifest['covered_from'] if entry else start_date, []).append(symbol)
+        for covered_from, codes in by_start.items():
+            await self.sync(supabase, codes, covered_from, end_date, concurrency)
+        after = self.stats()
+        return {
+            'symbols': sum(len(codes) for codes in by_start.values()),
+            'requests': after['requests'] - before['requests'],
+            'fetched_rows': after['fetched_rows'] - before['fetched_rows'],
+            'end_date': end_date
+        }
+
+    # ------------------------------------------------------------
+    # 무효화 / 조회
+    # ------------------------------------------------------------
+
+    def invalidate(self, symbols: Optional[List[str]] = None, since: Optional[str] = None) -> int:
+        """
+        캐시 무효화
+
+        Args:
+            symbols: 대상 종목 (None이면 전체)
+            since: 지정 시 해당 날짜 이후 구간만 버리고 다음 조회에서 다시 받음 (None이면 파일 삭제)
+        """
+        if not os.path.isdir(self.directory):
+            return 0
+        if symbols is None:
+            symbols = [name[:-4] for name in os.listdir(self.directory) if name.endswith('.npz')]
+        removed = 0
+        for symbol in symbols:
+            path = self._path(symbol)
+            if not os.path.isfile(path):
+                continue
+            entry = self.load(symbol) if since else None
+            if entry is None or since <= entry.manifest['covered_from']:
+                os.remove(path)
+            else:
+                frame = entry.frame(end_date=_shift_date(since, -1))
+                self.save(symbol, frame, entry.manifest['covered_from'],
+                          min(entry.manifest['synced_through'], _shift_date(since, -1)))
+            removed += 1
+        return removed
+
+    def manifest(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """종목별 manifest (마지막 동기화 trade_date 등)"""
+        if symbol is not None:
+            entry = self.load(symbol)
+            return [entry.manifest] if entry is not None else []
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith('.npz'):
+                entry = self.load(name[:-4])
+                if entry is not None:
+                    entries.append(entry.manifest)
+        return entries
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'directory': self.directory,
+                'hits': self.hits,
+                'partial_hits': self.partial_hits,
+                'misses': self.misses,
+                'requests': self.requests,
+                'fetched_rows': self.fetched_rows,
+                'writes': self.writes,
+                'unchanged': self.unchanged,
+                'revision_days': self.revision_days
+            }
+
+
+price_cache = PriceCache()
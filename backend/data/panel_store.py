@@ -0,0 +1,312 @@
+"""
+날짜 x 종목 OHLCV 패널 저장소 (메모리 맵 파일)
+- 유니버스 전체 작업(verify-all, 스크리닝, 다종목 백테스트)용: 필드마다 (거래일 x 종목) 배열 하나
+  · open/high/low/close: float32 (봉이 없는 칸은 NaN, 원화 정수 가격은 16,777,216까지 정확히 표현)
+  · volume: int64 (봉이 없는 칸은 0)
+  · calendar.npy: 거래일(ns), symbols.json: 종목 순서
+- 파일: <PANEL_STORE_DIR>/<버전>/*.npy, 현재 버전은 <PANEL_STORE_DIR>/CURRENT (tmp → os.replace로 교체)
+  · 다시 만들면 새 버전 디렉터리에 쓰고 CURRENT만 바꿈 → 열려 있는 맵은 이전 파일을 계속 읽음
+- np.load(mmap_mode='r')로 열어 여러 워커 프로세스가 페이지 캐시의 한 벌을 공유
+- 기간 슬라이스와 연속(또는 등간격) 종목 구간은 복사 없는 뷰, 임의 종목 부분집합은 해당 열만 모아서 복사
+- 원천: 로컬 일봉 캐시(data/local_cache.py) 또는 kw_price_daily (fetch_price_rows)
+- verify-all/batch-check 스냅샷 조회: recent_history()의 패널 이력 + read_recent_frame()으로 패널 이후/수정 구간만 원천 조회
+"""
+
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .local_cache import price_cache
+from .price_reader import PRICE_COLUMNS, concat_price_chunks, price_frames_from_table, read_price_frame
+
+STORE_DIR_ENV = 'PANEL_STORE_DIR'
+DEFAULT_STORE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'panel_store'
+)
+STORE_VERSION = 1
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+FIELD_DTYPES = {'open': np.float32, 'high': np.float32, 'low': np.float32, 'close': np.float32, 'volume': np.int64}
+KEEP_VERSIONS = 2  # 현재 + 직전 (교체 중 여는 프로세스용)
+
+
+class PanelView:
+    """패널 구간 (기간 x 종목), 필드 배열은 가능한 한 메모리 맵의 뷰"""
+
+    def __init__(self, calendar: pd.DatetimeIndex, symbols: List[str], arrays: Dict[str, np.ndarray],
+                 is_view: bool = True, missing: Optional[List[str]] = None):
+        self.calendar = calendar
+        self.symbols = symbols
+        self.arrays = arrays
+        self.is_view = is_view
+        self.missing = missing or []
+        self._positions = {symbol: j for j, symbol in enumerate(symbols)}
+
+    @property
+    def shape(self):
+        return (len(self.calendar), len(self.symbols))
+
+    @property
+    def mask(self) -> np.ndarray:
+        """봉 존재 여부 (종가가 있는 칸)"""
+        return ~np.isnan(self.arrays['close'])
+
+    def field(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def frame(self, name: str) -> pd.DataFrame:
+        """필드 → (날짜 x 종목) DataFrame (배열을 복사하지 않고 감쌈)"""
+        return pd.DataFrame(self.arrays[name], index=self.calendar, columns=self.symbols, copy=False)
+
+    def column(self, symbol: str, name: str = 'close') -> np.ndarray:
+        """종목 하나의 필드 (1차원 strided 뷰)"""
+        return self.arrays[name][:, self._positions[symbol]]
+
+    def symbol_frame(self, symbol: str) -> pd.DataFrame:
+        """종목 OHLCV (봉이 있는 날짜만, get_historical_data와 같은 형식: float64 가격 / int64 거래량)"""
+        j = self._positions[symbol]
+        rows = ~np.isnan(self.arrays['close'][:, j])
+        data = {name: self.arrays[name][rows, j].astype(np.float64) for name in PRICE_FIELDS}
+        data['volume'] = self.arrays['volume'][rows, j].astype(np.int64)
+        return pd.DataFrame(data, index=pd.DatetimeIndex(self.calendar[rows], name='date'))[PRICE_COLUMNS]
+
+    def frames(self) -> Dict[str, pd.DataFrame]:
+        """종목별 OHLCV DataFrame (봉이 하나도 없는 종목은 제외)"""
+        frames = {symbol: self.symbol_frame(symbol) for symbol in self.symbols}
+        return {symbol: df for symbol, df in frames.items() if len(df)}
+
+    def to_symbol_panel(self):
+        """유니버스 일괄 지표 계산용 SymbolPanel (float64 변환)"""
+        from indicators.panel import SymbolPanel
+
+        columns = {name: pd.DataFrame(self.arrays[name].astype(np.float64), index=self.calendar, columns=self.symbols)
+                   for name in PRICE_COLUMNS}
+        return SymbolPanel(columns, self.mask)
+
+
+class OpenPanel:
+    """열린 패널 버전 (필드별 읽기 전용 메모리 맵)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        with open(os.path.join(path, 'symbols.json'), encoding='utf-8') as f:
+            self.symbols: List[str] = json.load(f)
+        self.calendar_ns = np.load(os.path.join(path, 'calendar.npy'))
+        self.calendar = pd.DatetimeIndex(self.calendar_ns.view('datetime64[ns]'), name='date')
+        self.arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in FIELD_DTYPES}
+        self._positions = {symbol: j for j, symbol in enumerate(self.symbols)}
+
+    def slice(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+              symbols: Optional[List[str]] = None) -> PanelView:
+        """기간/종목 구간 (기간과 연속·등간격 종목은 뷰, 그 외 종목 부분집합은 열 복사)"""
+        lo = 0 if start_date is None else int(np.searchsorted(self.calendar_ns, pd.Timestamp(start_date).value, 'left'))
+        hi = len(self.calendar_ns) if end_date is None else int(
+            np.searchsorted(self.calendar_ns, pd.Timestamp(end_date).value, 'right'))
+        calendar = self.calendar[lo:hi]
+        if symbols is None:
+            return PanelView(calendar, list(self.symbols), {name: arr[lo:hi] for name, arr in self.arrays.items()})
+
+        missing = [symbol for symbol in symbols if symbol not in self._positions]
+        selected = [symbol for symbol in dict.fromkeys(symbols) if symbol in self._positions]
+        positions = np.array([self._positions[symbol] for symbol in selected], dtype=np.intp)
+        columns = self._as_slice(positions)
+        if columns is not None:
+            arrays = {name: arr[lo:hi, columns] for name, arr in self.arrays.items()}
+            return PanelView(calendar, selected, arrays, is_view=True, missing=missing)
+        arrays = {name: np.take(arr[lo:hi], positions, axis=1) for name, arr in self.arrays.items()}
+        return PanelView(calendar, selected, arrays, is_view=False, missing=missing)
+
+    @staticmethod
+    def _as_slice(positions: np.ndarray) -> Optional[slice]:
+        """종목 위치가 등간격 오름차순이면 slice (뷰로 선택 가능)"""
+        if len(positions) == 0:
+            return slice(0, 0)
+        if len(positions) == 1:
+            return slice(int(positions[0]), int(positions[0]) + 1)
+        steps = np.diff(positions)
+        if steps[0] > 0 and np.all(steps == steps[0]):
+            return slice(int(positions[0]), int(positions[-1]) + 1, int(steps[0]))
+        return None
+
+
+class PanelStore:
+    """날짜 x 종목 OHLCV 메모리 맵 패널 저장소"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.getenv(STORE_DIR_ENV) or DEFAULT_STORE_DIR
+        self._lock = threading.Lock()
+        self._open: Optional[OpenPanel] = None
+        self.builds = 0
+
+    def _current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, 'CURRENT'), encoding='utf-8') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    # ------------------------------------------------------------
+    # 생성
+    # ------------------------------------------------------------
+
+    def build_from_frames(self, frames: Dict[str, pd.DataFrame], source: str = 'frames') -> Dict[str, Any]:
+        """종목별 OHLCV DataFrame → 새 패널 버전 (거래일은 전 종목 날짜 합집합)"""
+        frames = {symbol: df for symbol, df in frames.items() if df is not None and len(df)}
+        symbols = sorted(frames)
+        stamps = [pd.DatetimeIndex(df.index).as_unit('ns').asi8 for df in frames.values()]
+        calendar = np.unique(np.concatenate(stamps)) if stamps else np.array([], dtype=np.int64)
+        version = datetime.now().strftime('%Y%m%d%H%M%S%f')
+        path = os.path.join(self.directory, version)
+        os.makedirs(path, exist_ok=True)
+
+        shape = (len(calendar), len(symbols))
+        for name, dtype in FIELD_DTYPES.items():
+            arr = np.lib.format.open_memmap(os.path.join(path, f"{name}.npy"), mode='w+', dtype=dtype, shape=shape)
+            arr[:] = np.nan if name in PRICE_FIELDS else 0
+            for j, symbol in enumerate(symbols):
+                df = frames[symbol]
+                rows = np.searchsorted(calendar, pd.DatetimeIndex(df.index).as_unit('ns').asi8)
+                arr[rows, j] = df[name].to_numpy(dtype=dtype)
+            arr.flush()
+            del arr
+        np.save(os.path.join(path, 'calendar.npy'), calendar.astype(np.int64))
+        with open(os.path.join(path, 'symbols.json'), 'w', encoding='utf-8') as f:
+            json.dump(symbols, f)
+        meta = {
+            'version': STORE_VERSION,
+            'build': version,
+            'source': source,
+            'symbols': len(symbols),
+            'days': len(calendar),
+            'first_date': pd.Timestamp(calendar[0]).strftime('%Y-%m-%d') if len(calendar) else None,
+            'last_date': pd.Timestamp(calendar[-1]).strftime('%Y-%m-%d') if len(calendar) else None,
+            'bytes': int(sum(np.dtype(dtype).itemsize for dtype in FIELD_DTYPES.values()) * shape[0] * shape[1]),
+            'built_at': datetime.now().isoformat()
+        }
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        tmp_path = os.path.join(self.directory, f"CURRENT.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(self.directory, 'CURRENT'))
+        self._prune(version)
+        with self._lock:
+            self.builds += 1
+        print(f"[PanelStore] Built {meta['days']} days x {meta['symbols']} symbols ({meta['bytes'] / 1e6:.1f} MB) from {source}")
+        return meta
+
+    async def build(self, supabase=None, symbols: Optional[List[str]] = None, start_date: Optional[str] = None,
+                    end_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        로컬 캐시 또는 kw_price_daily에서 패널 생성
+
+        Args:
+            supabase: None이면 로컬 캐시 파일만 사용 (네트워크 없음)
+            symbols: 대상 종목 (None이면 로컬 캐시의 전체 종목)
+            start_date / end_date: 기간 (None이면 캐시 전체 구간)
+        """
+        if symbols is None:
+            symbols = [entry['symbol'] for entry in price_cache.manifest()]
+        if supabase is None:
+            frames = {}
+            for symbol in symbols:
+                entry = price_cache.load(symbol)
+                if entry is not None:
+                    frames[symbol] = entry.frame(start_date, end_date)
+            return self.build_from_frames(frames, source='local_cache')
+
+        if start_date is None or end_date is None:
+            raise ValueError("start_date and end_date are required when building from Supabase")
+        if price_cache.enabled:
+            frames = await price_cache.read(supabase, symbols, start_date, end_date)
+            return self.build_from_frames(frames, source='local_cache+supabase')
+
+        from .provider import fetch_price_rows
+        fetched = await fetch_price_rows(supabase, symbols, start_date, end_date, decode=True)
+        frames = price_frames_from_table(concat_price_chunks(fetched.pop('chunks')), symbols)
+        return self.build_from_frames(frames, source='supabase')
+
+    def _prune(self, current: str):
+        """현재/직전 버전만 남기고 삭제 (이미 열린 맵은 삭제 후에도 유효)"""
+        versions = sorted(name for name in os.listdir(self.directory)
+                          if os.path.isdir(os.path.join(self.directory, name)))
+        for name in versions[:-KEEP_VERSIONS]:
+            if name != current:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    # ------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------
+
+    def open(self) -> Optional[OpenPanel]:
+        """현재 버전 패널 (CURRENT가 바뀌면 다시 엶, 패널이 없으면 None)"""
+        version = self._current_version()
+        if version is None:
+            return None
+        with self._lock:
+            if self._open is None or os.path.basename(self._open.path) != version:
+                self._open = OpenPanel(os.path.join(self.directory, version))
+            return self._open
+
+    def slice(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+              symbols: Optional[List[str]] = None) -> Optional[PanelView]:
+        panel = self.open()
+        return panel.slice(start_date, end_date, symbols) if panel is not None else None
+
+    def recent_history(self, symbols: List[str], bars: int, revision_from: Optional[str] = None
+                       ) -> Dict[str, Tuple[pd.DataFrame, str]]:
+        """
+        종목별 최근 일봉 조회용 패널 이력 {종목: (refetch_from 이전 최근 봉 bars개, refetch_from)}
+
+        - refetch_from: 패널 마지막 거래일 다음 날과 revision_from(원천 수정 구간 시작) 중 이른 날짜
+          → read_recent_frame()이 그 이후 봉만 원천에서 받아 이어 붙임
+        - 패널이 없거나, 패널에 없는 종목, refetch_from 이전 봉이 bars개 미만인 종목은 제외 (원천 전체 조회)
+        """
+        panel = self.open()
+        if panel is None or not panel.meta.get('last_date'):
+            return {}
+        refetch_from = (pd.Timestamp(panel.meta['last_date']) + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        if revision_from is not None:
+            refetch_from = min(refetch_from, revision_from)
+        end_date = (pd.Timestamp(refetch_from) - pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        view = panel.slice(None, end_date, symbols)
+        history = {}
+        for symbol in view.symbols:
+            df = view.symbol_frame(symbol)
+            if len(df) >= bars:
+                history[symbol] = (df.iloc[-bars:], refetch_from)
+        return history
+
+    def stats(self) -> Dict[str, Any]:
+        panel = self.open()
+        return {
+            'directory': self.directory,
+            'builds': self.builds,
+            'current': dict(panel.meta, path=panel.path) if panel is not None else None
+        }
+
+
+def read_recent_frame(supabase, stock_code: str, bars: int, history: Optional[Tuple[pd.DataFrame, str]] = None,
+                      index_name: str = 'date') -> pd.DataFrame:
+    """
+    스냅샷용 종목 일봉
+
+    history(recent_history() 항목)가 있으면 패널 이력 + refetch_from 이후 원천 봉의 최근 bars개,
+    없으면 기존 원천 조회(read_price_frame limit=bars)
+    """
+    if history is None:
+        return read_price_frame(supabase, stock_code, limit=bars, index_name=index_name)
+    base, refetch_from = history
+    recent = read_price_frame(supabase, stock_code, start_date=refetch_from, index_name=index_name)
+    return pd.concat([base.rename_axis(index_name), recent]).iloc[-bars:]
+
+
+panel_store = PanelStore()
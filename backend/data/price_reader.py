@@ -0,0 +1,243 @@
+"""
+kw_price_daily 스트리밍 리더
+- 단일 .execute()는 PostgREST max-rows(기본 1000행)에서 조용히 잘리므로 (stock_code, trade_date) 키셋 페이지로 끝까지 읽음
+- 페이지마다 JSON 행을 바로 타입 컬럼 청크(numpy 배열)로 변환해 yield → JSON 페이로드는 한 페이지분만 메모리에 유지
+- 청크는 마지막에 한 번만 이어 붙임 (concat_price_chunks)
+
+키셋 조건 (stock_code, trade_date) > (c, d)는 PostgREST의 AND 필터만으로 두 단계로 표현
+  1) 꽉 찬 페이지가 종목 c 중간에서 끝나면: stock_code = c AND trade_date > d
+  2) 종목 c를 다 읽으면: stock_code IN (c보다 큰 종목들)
+첫 페이지는 count='exact'로 전체 행 수를 받아, 서버 max-rows가 요청한 페이지 크기보다 작아도 누락 없이 종료 시점을 판단
+
+디코딩 (모든 일봉 조회 경로 공용)
+- 필요한 컬럼만 select, 응답은 CSV(Accept: text/csv)로 받아 pandas C 파서로 바로 고정 dtype 배열 생성
+  (JSON → dict 목록 → DataFrame → 컬럼별 pd.to_numeric/pd.to_datetime 단계를 건너뜀)
+- 고정 dtype: 가격 float64, volume int64 (빈 값 0), trade_date datetime64[D] (DataFrame으로 합칠 때 ns로 한 번 변환)
+- PRICE_RESPONSE_FORMAT=json이면 JSON 응답을 같은 dtype으로 디코딩 (CSV를 지원하지 않는 클라이언트용)
+"""
+
+import io
+import os
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+PAGE_SIZE_ENV = 'PRICE_PAGE_SIZE'
+DEFAULT_PAGE_SIZE = 1000  # PostgREST max-rows 기본값
+STREAM_COLUMNS = 'stock_code,trade_date,open,high,low,close,volume'
+FORMAT_ENV = 'PRICE_RESPONSE_FORMAT'
+FLOAT_COLUMNS = ('open', 'high', 'low', 'close', 'change_rate')
+INT_COLUMNS = ('volume',)
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def response_format() -> str:
+    """일봉 응답 형식 ('csv' 기본, 'json')"""
+    return 'json' if os.getenv(FORMAT_ENV, 'csv').strip().lower() == 'json' else 'csv'
+
+
+def _dates(values) -> np.ndarray:
+    try:
+        return np.asarray(values, dtype=object).astype('datetime64[D]')
+    except (ValueError, TypeError):
+        return pd.to_datetime(values).to_numpy().astype('datetime64[D]')
+
+
+def _floats(values) -> np.ndarray:
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (ValueError, TypeError):
+        return pd.to_numeric(np.asarray(values, dtype=object), errors='coerce').astype(np.float64)
+
+
+def _typed(col: str, values) -> np.ndarray:
+    if col == 'trade_date':
+        return _dates(values)
+    if col in FLOAT_COLUMNS:
+        return _floats(values)
+    if col in INT_COLUMNS:
+        return np.nan_to_num(_floats(values)).astype(np.int64)
+    return np.asarray(values, dtype=object)
+
+
+def decode_price_rows(rows: List[Dict[str, Any]], columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """JSON 행 목록 → 타입 컬럼 청크 {컬럼: numpy 배열} (trade_date: datetime64[D], 가격: float64, volume: int64)"""
+    if columns is None:
+        columns = rows[0].keys() if rows else []
+    return {col: _typed(col, [row.get(col) for row in rows]) for col in columns}
+
+
+def decode_price_csv(text: str, columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """CSV 응답 본문 → 타입 컬럼 청크 (dict 목록을 만들지 않음)"""
+    if not text or not text.strip():
+        return {col: _typed(col, []) for col in (columns or [])}
+    dtypes = {col: np.float64 for col in FLOAT_COLUMNS + INT_COLUMNS}
+    dtypes.update({'stock_code': str, 'trade_date': str})
+    frame = pd.read_csv(io.StringIO(text), dtype=dtypes, keep_default_na=False, na_values=[''])
+    columns = list(frame.columns) if columns is None else list(columns)
+    chunk = {}
+    for col in columns:
+        values = frame[col].to_numpy()
+        if col == 'trade_date':
+            chunk[col] = _dates(values)
+        elif col in INT_COLUMNS:
+            chunk[col] = np.nan_to_num(values).astype(np.int64)
+        elif col in FLOAT_COLUMNS:
+            chunk[col] = values
+        else:
+            chunk[col] = values.astype(object)
+    return chunk
+
+
+def decode_price_response(data: Any, columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """응답 본문(CSV 문자열 또는 JSON 행 목록) → 타입 컬럼 청크"""
+    if isinstance(data, str):
+        return decode_price_csv(data, columns)
+    return decode_price_rows(data or [], columns)
+
+
+def chunk_rows(chunk: Dict[str, np.ndarray]) -> int:
+    return len(next(iter(chunk.values()))) if chunk else 0
+
+
+def iter_price_chunks(
+    supabase,
+    stock_codes: Iterable[str],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    columns: str = STREAM_COLUMNS,
+    page_size: Optional[int] = None,
+    limit: Optional[int] = None
+) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    (stock_code, trade_date) 순서로 kw_price_daily를 키셋 페이지 단위로 읽어 타입 컬럼 청크를 yield
+
+    Args:
+        supabase: Supabase 클라이언트
+        stock_codes: 종목 코드 목록
+        start_date / end_date: 기간 (YYYY-MM-DD, None이면 제한 없음)
+        columns: 조회 컬럼 (stock_code, trade_date 포함 필수)
+        page_size: 요청당 행 수 (기본: PRICE_PAGE_SIZE 환경변수, 1000)
+        limit: 최대 행 수 (None이면 전체)
+    """
+    codes = sorted(set(stock_codes))
+    if not codes:
+        return
+    if page_size is None:
+        page_size = int(os.getenv(PAGE_SIZE_ENV, DEFAULT_PAGE_SIZE))
+    names = [name.strip() for name in columns.split(',')]
+    use_csv = response_format() == 'csv'
+
+    def fetch(subset: List[str], after: Optional[str] = None, count: bool = False, size: int = page_size):
+        table = supabase.table('kw_price_daily')
+        builder = table.select(columns, count='exact') if count else table.select(columns)
+        builder = builder.eq('stock_code', subset[0]) if len(subset) == 1 else builder.in_('stock_code', subset)
+        if start_date:
+            builder = builder.gte('trade_date', start_date)
+        if end_date:
+            builder = builder.lte('trade_date', end_date)
+        if after is not None:
+            builder = builder.gt('trade_date', after)
+        builder = builder.order('stock_code,trade_date').limit(size)
+        return (builder.csv() if use_csv else builder).execute()
+
+    cap = page_size  # 서버가 실제로 돌려주는 최대 행 수
+    total = None
+    received = 0
+    cursor = None  # 마지막 행 (stock_code, trade_date)
+    tail = False  # 커서 종목의 남은 구간을 읽는 중
+    while limit is None or received < limit:
+        size = page_size if limit is None else min(page_size, limit - received)
+        if cursor is None:
+            response = fetch(codes, count=True, size=size)
+            total = response.count
+        elif tail:
+            response = fetch([cursor[0]], after=cursor[1], size=size)
+        else:
+            rest = codes[bisect_right(codes, cursor[0]):]
+            if not rest:
+                return
+            response = fetch(rest, size=size)
+        chunk = decode_price_response(response.data, names)
+        del response
+        rows = chunk_rows(chunk)
+        if not rows:
+            if tail:
+                tail = False
+                continue
+            return
+
+        received += rows
+        if not tail and total is not None and rows < size and received < total:
+            cap = rows  # 서버 max-rows가 page_size보다 작음
+        full = rows >= min(cap, size)
+        cursor = (str(chunk['stock_code'][-1]), str(chunk['trade_date'][-1]))
+        yield chunk
+
+        if total is not None and received >= total:
+            return
+        if full:
+            tail = True
+        elif tail:
+            tail = False
+        else:
+            return
+
+
+def concat_price_chunks(chunks: Iterable[Dict[str, np.ndarray]], columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """타입 컬럼 청크 → DataFrame (컬럼별로 한 번만 이어 붙임)"""
+    chunks = list(chunks)
+    if not chunks:
+        return pd.DataFrame(columns=columns or [name.strip() for name in STREAM_COLUMNS.split(',')])
+    columns = columns or list(chunks[0])
+    data = {}
+    for col in columns:
+        values = np.concatenate([chunk[col] for chunk in chunks])
+        data[col] = values.astype('datetime64[ns]') if values.dtype.kind == 'M' else values
+    return pd.DataFrame(data)
+
+
+def price_frames_from_table(table: pd.DataFrame, stock_codes: List[str]) -> Dict[str, pd.DataFrame]:
+    """(stock_code, trade_date) 정렬된 일봉 테이블 → 종목별 OHLCV DataFrame (get_historical_data와 같은 형식, 행이 없는 종목은 제외)"""
+    if table.empty:
+        return {}
+    table = table.assign(date=pd.to_datetime(table['trade_date']).astype('datetime64[ns]'))
+    table['volume'] = table['volume'].astype('int64')
+    table = table.sort_values(['stock_code', 'date'], kind='stable')
+
+    frames = {}
+    for code, group in table.groupby('stock_code', sort=False):
+        frames[str(code)] = group.set_index('date')[PRICE_COLUMNS]
+    return {code: frames[code] for code in stock_codes if code in frames}
+
+
+def read_price_history(
+    supabase,
+    stock_codes: Iterable[str],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    columns: str = STREAM_COLUMNS,
+    page_size: Optional[int] = None,
+    limit: Optional[int] = None
+) -> pd.DataFrame:
+    """기간 내 전체 일봉 (stock_code, trade_date 순, max-rows 제한 없이)"""
+    return concat_price_chunks(iter_price_chunks(supabase, stock_codes, start_date, end_date, columns, page_size, limit))
+
+
+def read_price_frame(
+    supabase,
+    stock_code: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: Optional[int] = None,
+    index_name: str = 'date'
+) -> pd.DataFrame:
+    """단일 종목 OHLCV DataFrame (trade_date 오름차순, 행이 없으면 빈 DataFrame)"""
+    table = read_price_history(supabase, [stock_code], start_date, end_date, limit=limit)
+    frame = price_frames_from_table(table, [stock_code]).get(stock_code)
+    if frame is None:
+        frame = pd.DataFrame({col: np.array([], dtype=np.int64 if col == 'volume' else np.float64) for col in PRICE_COLUMNS},
+                             index=pd.DatetimeIndex([], dtype='datetime64[ns]'))
+    return frame.rename_axis(index_name)
@@ -5,16 +5,111 @@
 
 import pandas as pd
 import numpy as np
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 import os
+import time
 from supabase import create_client
 import asyncio
 
+from .local_cache import price_cache
+from .price_reader import (
+    PRICE_COLUMNS, chunk_rows, concat_price_chunks, decode_price_response, decode_price_rows, price_frames_from_table,
+    read_price_history, response_format
+)
+
+# 일괄 로드: 요청 1건당 종목 수 (in_ 필터 URL 길이), 페이지 행 수 (PostgREST max-rows 기본값), 동시 페이지 요청 수
+BULK_SYMBOLS_PER_REQUEST = 50
+BULK_PAGE_SIZE = 1000
+BULK_CONCURRENCY_ENV = 'PRICE_LOAD_CONCURRENCY'
+DEFAULT_BULK_CONCURRENCY = 8
+
+
+def price_frames_from_rows(rows: List[Dict[str, Any]], stock_codes: List[str]) -> Dict[str, pd.DataFrame]:
+    """kw_price_daily 행 목록 → 종목별 OHLCV DataFrame"""
+    if not rows:
+        return {}
+    return price_frames_from_table(pd.DataFrame(decode_price_rows(rows)), stock_codes)
+
+
+async def fetch_price_rows(
+    supabase,
+    stock_codes: List[str],
+    start_date: str,
+    end_date: str,
+    concurrency: Optional[int] = None,
+    columns: str = 'stock_code,trade_date,open,high,low,close,volume',
+    decode: bool = False
+) -> Dict[str, Any]:
+    """
+    여러 종목 일봉을 종목 묶음(in_) x 페이지 단위로 조회
+
+    묶음마다 첫 페이지에서 전체 행 수(count='exact')를 받아 나머지 페이지를 동시에 요청
+    (전체 동시 요청 수는 concurrency로 제한, 페이지 간격은 서버가 실제로 돌려준 첫 페이지 크기)
+
+    Args:
+        decode: True면 페이지마다 타입 컬럼 청크로 바로 변환 (JSON 행을 모아 두지 않음)
+
+    Returns:
+        {'rows': 행 목록 (decode=True면 청크 목록 'chunks'), 'row_count': 행 수, 'requests': 요청 수, 'seconds': 소요 시간}
+    """
+    if concurrency is None:
+        concurrency = int(os.getenv(BULK_CONCURRENCY_ENV, DEFAULT_BULK_CONCURRENCY))
+    sem = asyncio.Semaphore(max(1, concurrency))
+    loop = asyncio.get_running_loop()
+    names = [name.strip() for name in columns.split(',')] if columns != '*' else None
+    use_csv = response_format() == 'csv'
+    requests = 0
+    started = time.perf_counter()
+
+    def query(batch: List[str], offset: int, count: bool):
+        builder = supabase.table('kw_price_daily').select(columns, count='exact') if count else \
+            supabase.table('kw_price_daily').select(columns)
+        builder = builder.in_('stock_code', batch).gte('trade_date', start_date).lte('trade_date', end_date) \
+            .order('stock_code,trade_date').limit(BULK_PAGE_SIZE).offset(offset)
+        if not decode:
+            response = builder.execute()
+            return response.data or [], len(response.data or []), response.count
+        # 워커 스레드에서 바로 타입 청크로 변환 (CSV 응답이면 dict 목록을 만들지 않음)
+        response = (builder.csv() if use_csv else builder).execute()
+        chunk = decode_price_response(response.data, names)
+        return chunk, chunk_rows(chunk), response.count
+
+    async def page(batch: List[str], offset: int, count: bool = False):
+        nonlocal requests
+        async with sem:
+            requests += 1
+            return await loop.run_in_executor(None, lambda: query(batch, offset, count))
+
+    async def load_batch(batch: List[str]) -> List[Any]:
+        first, size, total = await page(batch, 0, count=True)
+        pages = [first] if size else []
+        total = size if total is None else total
+        if size == 0 or total <= size:
+            return pages
+        rest = await asyncio.gather(*[page(batch, offset) for offset in range(size, total, size)])
+        pages.extend(data for data, rows, _ in rest if rows)
+        return pages
+
+    batches = [stock_codes[i:i + BULK_SYMBOLS_PER_REQUEST] for i in range(0, len(stock_codes), BULK_SYMBOLS_PER_REQUEST)]
+    results = await asyncio.gather(*[load_batch(batch) for batch in batches])
+    pages = [data for batch_pages in results for data in batch_pages]
+    fetched = {'requests': requests, 'seconds': time.perf_counter() - started}
+    if decode:
+        fetched['chunks'] = pages
+        fetched['row_count'] = sum(chunk_rows(chunk) for chunk in pages)
+    else:
+        fetched['rows'] = [row for rows in pages for row in rows]
+        fetched['row_count'] = len(fetched['rows'])
+    return fetched
+
+
 class DataProvider:
     """데이터 제공자"""
 
     def __init__(self):
+        self.last_bulk_stats: Optional[Dict[str, Any]] = None
+        self.price_cache = price_cache if price_cache.enabled else None  # 로컬 일봉 캐시 (gap만 Supabase 조회)
         self._init_database()
 
     def _init_database(self):
@@ -58,46 +153,27 @@ class DataProvider:
             try:
                 print(f"[DataProvider] Fetching data for {stock_code} from {start_date} to {end_date}")
 
-                # kw_price_daily 테이블 사용 - 올바른 컬럼명 사용
+                if self.price_cache is not None:
+                    frames = await self._read_price_cache([stock_code], start_date, end_date)
+                    if frames is not None:
+                        if stock_code in frames:
+                            print(f"[DataProvider] Loaded {len(frames[stock_code])} rows for {stock_code} from local cache")
+                            return frames[stock_code]
+                        print(f"[DataProvider] No data found for {stock_code} in the given date range")
+                        print(f"[DataProvider] WARNING: Using mock data for {stock_code}")
+                        return self._generate_mock_data(stock_code, start_date, end_date)
+
+                # kw_price_daily 키셋 페이지 스트리밍 (max-rows 제한으로 잘리지 않음, 페이지마다 타입 청크로 변환)
                 loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(None, lambda: self.supabase.table('kw_price_daily').select('*').eq(
-                    'stock_code', stock_code
-                ).gte('trade_date', start_date).lte('trade_date', end_date).order('trade_date').execute())
-
-                if response.data and len(response.data) > 0:
-                    print(f"[DataProvider] Found {len(response.data)} rows for {stock_code}")
-                    df = pd.DataFrame(response.data)
-
-                    # 컬럼명 확인
-                    print(f"[DataProvider] Available columns: {df.columns.tolist()}")
-
-                    # trade_date를 date로 변경하고 인덱스로 설정
-                    if 'trade_date' in df.columns:
-                        df['date'] = pd.to_datetime(df['trade_date'])
-                        df.set_index('date', inplace=True)
-                    elif 'date' in df.columns:
-                        df['date'] = pd.to_datetime(df['date'])
-                        df.set_index('date', inplace=True)
-
-                    # 숫자형 컬럼 변환 (numeric 타입을 float로)
-                    numeric_columns = ['open', 'high', 'low', 'close']
-                    for col in numeric_columns:
-                        if col in df.columns:
-                            df[col] = pd.to_numeric(df[col], errors='coerce')
-
-                    # volume은 bigint이므로 int로 변환
-                    if 'volume' in df.columns:
-                        df['volume'] = pd.to_numeric(df['volume'], errors='coerce').fillna(0).astype('int64')
-
-                    # 필수 컬럼 확인
-                    required_columns = ['open', 'high', 'low', 'close', 'volume']
-                    if all(col in df.columns for col in required_columns):
-                        print(f"[DataProvider] Successfully loaded real data for {stock_code}")
-                        return df[required_columns]
-                    else:
-                        missing = [col for col in required_columns if col not in df.columns]
-                        print(f"[DataProvider] Missing columns: {missing}")
-                        print(f"[DataProvider] Available columns after mapping: {df.columns.tolist()}")
+                table = await loop.run_in_executor(
+                    None, lambda: read_price_history(self.supabase, [stock_code], start_date, end_date)
+                )
+
+                if len(table) > 0:
+                    print(f"[DataProvider] Found {len(table)} rows for {stock_code}")
+                    df = price_frames_from_table(table, [stock_code])[stock_code]
+                    print(f"[DataProvider] Successfully loaded real data for {stock_code}")
+                    return df
                 else:
                     print(f"[DataProvider] No data found for {stock_code} in the given date range")
 
@@ -110,6 +186,67 @@ class DataProvider:
         print(f"[DataProvider] WARNING: Using mock data for {stock_code}")
         return self._generate_mock_data(stock_code, start_date, end_date)
 
+    async def get_bulk_historical_data(
+        self,
+        stock_codes: List[str],
+        start_date: str,
+        end_date: str,
+        concurrency: Optional[int] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        여러 종목 과거 주가 일괄 조회 (종목당 1회 왕복 대신 종목 묶음 x 페이지 단위 동시 조회)
+
+        Args:
+            stock_codes: 종목 코드 목록
+            start_date: 시작일 (YYYY-MM-DD)
+            end_date: 종료일 (YYYY-MM-DD)
+            concurrency: 동시 페이지 요청 수 (기본: PRICE_LOAD_CONCURRENCY 환경변수, 8)
+
+        Returns:
+            {종목코드: 주가 DataFrame} (stock_codes 순서, 조회 결과가 없는 종목은 get_historical_data 경로로 처리)
+        """
+        stock_codes = list(dict.fromkeys(stock_codes))
+        frames: Dict[str, pd.DataFrame] = {}
+        cached = None
+        if self.supabase and stock_codes and self.price_cache is not None:
+            cached = await self._read_price_cache(stock_codes, start_date, end_date)
+            if cached is not None:
+                frames = cached
+                print(f"[DataProvider] Loaded {len(frames)}/{len(stock_codes)} stocks via local cache: {self.price_cache.stats()}")
+
+        if self.supabase and stock_codes and cached is None:
+            try:
+                fetched = await fetch_price_rows(self.supabase, stock_codes, start_date, end_date, concurrency, decode=True)
+                frames = price_frames_from_table(concat_price_chunks(fetched.pop('chunks')), stock_codes)
+                rows, seconds = fetched['row_count'], fetched['seconds']
+                self.last_bulk_stats = {
+                    'symbols': len(stock_codes), 'loaded_symbols': len(frames), 'rows': rows,
+                    'requests': fetched['requests'], 'seconds': round(seconds, 3),
+                    'rows_per_sec': round(rows / seconds, 1) if seconds > 0 else None
+                }
+                print(f"[DataProvider] Bulk loaded {rows} rows for {len(frames)}/{len(stock_codes)} stocks "
+                      f"in {fetched['requests']} requests, {seconds:.2f}s ({self.last_bulk_stats['rows_per_sec']} rows/s)")
+            except Exception as e:
+                print(f"[DataProvider] Bulk load failed, falling back to per-stock queries: {e}")
+                frames = {}
+
+        # 일괄 조회에 없는 종목 (Mock 모드 포함) → 기존 단건 경로
+        missing = [code for code in stock_codes if code not in frames]
+        if missing:
+            singles = await asyncio.gather(*[
+                self.get_historical_data(stock_code=code, start_date=start_date, end_date=end_date) for code in missing
+            ])
+            frames.update({code: df for code, df in zip(missing, singles) if df is not None})
+        return {code: frames[code] for code in stock_codes if code in frames}
+
+    async def _read_price_cache(self, stock_codes: List[str], start_date: str, end_date: str) -> Optional[Dict[str, pd.DataFrame]]:
+        """로컬 캐시 조회 (gap만 Supabase), 실패 시 None → 기존 Supabase 직접 조회 경로"""
+        try:
+            return await self.price_cache.read(self.supabase, stock_codes, start_date, end_date)
+        except Exception as e:
+            print(f"[DataProvider] Local price cache failed, querying Supabase directly: {e}")
+            return None
+
     def _generate_mock_data(
         self,
         stock_code: str,
@@ -6,20 +6,47 @@ Supabase 연동 + 표준 지표 정의 + 보안 샌드박스
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, Optional, List, Tuple, Union
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import os
 import json
 import ast
 import traceback
 import time
 import logging
+import threading
+import inspect
+import hashlib
+from contextlib import contextmanager
 from functools import wraps, lru_cache
-from supabase import create_client
+
+from .catalog import indicator_catalog
+from .code_cache import code_cache
+from .dag import IndicatorGraph, declared_dependencies
+from .execution_cache import IndicatorExecutionCache, frame_fingerprint
+from .panel import SymbolPanel
+from .sandbox_pool import inprocess_guard, sandbox_pool
+from .frame_view import frame_nbytes, is_readonly_error, owned_result, readonly_frame, readonly_series
+from .store import TAIL_KERNELS, indicator_store, kernel_manifest, run_kernel, splice
+from .streaming import KERNELS as STREAMING_KERNELS, StreamSpec, StreamingKernel, make_kernel, stream_store
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 호출(스레드)별 입력 프레임 사용 기록: 모드(direct/readonly/copy) + 복사한 바이트 수
+_input_usage = threading.local()
+
+# 호출(스레드)별 공유 중간 시계열 범위: shared_intermediates() 안에서 같은 프레임에 대한 calculate() 호출이 그래프 공유
+_evaluation = threading.local()
+
+@lru_cache(maxsize=None)
+def _function_source(function) -> Optional[str]:
+    """내장 지표 함수 소스 (구현이 바뀌면 저장소 수식 해시도 바뀜)"""
+    try:
+        return inspect.getsource(function)
+    except (OSError, TypeError):
+        return None
+
 @dataclass
 class ExecOptions:
     """지표 실행 옵션"""
@@ -69,7 +96,7 @@ class SecuritySandbox:
         # Pandas
         'pd', 'DataFrame', 'Series', 'rolling', 'ewm', 'shift', 'diff',
         # 지표 관련
-        'df', 'params', 'result', 'calculate'
+        'df', 'params', 'result', 'calculate', 'deps'
     }
 
     @staticmethod
@@ -143,60 +170,72 @@ class IndicatorRegistry:
     def _register_builtin_indicators(self):
         """내장 지표 등록"""
         # 이동평균
-        self.register('sma', self._calc_sma, ['close'], ['sma'])
-        self.register('ema', self._calc_ema, ['close'], ['ema'])
+        self.register('sma', self._calc_sma, ['close'], ['sma'], shared=True, batch=True)
+        self.register('ema', self._calc_ema, ['close'], ['ema'], shared=True, batch=True)
         self.register('wma', self._calc_wma, ['close'], ['wma'])
 
         # 오실레이터
-        self.register('rsi', self._calc_rsi_wilder, ['close'], ['rsi'])
-        self.register('stochastic', self._calc_stochastic, ['high', 'low', 'close'], ['stochastic_k', 'stochastic_d'])
-        self.register('cci', self._calc_cci_optimized, ['high', 'low', 'close'], ['cci'])
-        self.register('williams_r', self._calc_williams_r, ['high', 'low', 'close'], ['williams_r'])
+        self.register('rsi', self._calc_rsi_wilder, ['close'], ['rsi'], batch=True)
+        self.register('stochastic', self._calc_stochastic, ['high', 'low', 'close'], ['stochastic_k', 'stochastic_d'], shared=True, batch=True)
+        self.register('cci', self._calc_cci_optimized, ['high', 'low', 'close'], ['cci'], shared=True)
+        self.register('williams_r', self._calc_williams_r, ['high', 'low', 'close'], ['williams_r'], shared=True)
 
         # 변동성
-        self.register('bb', self._calc_bollinger_bands, ['close'], ['bb_upper', 'bb_middle', 'bb_lower'])
-        self.register('atr', self._calc_atr_wilder, ['high', 'low', 'close'], ['atr'])
+        self.register('bb', self._calc_bollinger_bands, ['close'], ['bb_upper', 'bb_middle', 'bb_lower'], shared=True, batch=True)
+        self.register('atr', self._calc_atr_wilder, ['high', 'low', 'close'], ['atr'], shared=True, batch=True)
 
         # 트렌드
-        self.register('macd', self._calc_macd, ['close'], ['macd_line', 'macd_signal', 'macd_hist'])
-        self.register('adx', self._calc_adx_wilder, ['high', 'low', 'close'], ['adx', 'plus_di', 'minus_di'])
+        self.register('macd', self._calc_macd, ['close'], ['macd_line', 'macd_signal', 'macd_hist'], shared=True, batch=True)
+        self.register('adx', self._calc_adx_wilder, ['high', 'low', 'close'], ['adx', 'plus_di', 'minus_di'], shared=True)
         self.register('psar', self._calc_psar_clamped, ['high', 'low'], ['psar'])
 
         # 볼륨
         self.register('obv', self._calc_obv_vectorized, ['close', 'volume'], ['obv'])
-        self.register('vwap', self._calc_vwap_session, ['high', 'low', 'close', 'volume'], ['vwap'])
+        self.register('vwap', self._calc_vwap_session, ['high', 'low', 'close', 'volume'], ['vwap'], shared=True)
 
         # 일목균형표
         self.register('ichimoku', self._calc_ichimoku, ['high', 'low', 'close'],
-                      ['tenkan', 'kijun', 'senkou_a', 'senkou_b', 'chikou'])
+                      ['tenkan', 'kijun', 'senkou_a', 'senkou_b', 'chikou'], shared=True)
 
-    def register(self, name: str, func: callable, required_cols: List[str], output_cols: List[str]):
-        """지표 등록"""
+    def register(self, name: str, func: callable, required_cols: List[str], output_cols: List[str],
+                 shared: bool = False, batch: bool = False):
+        """
+        지표 등록
+        - shared=True: func(df, options, graph)로 호출해 중간 시계열 그래프 사용
+        - batch=True: 같은 함수를 열=종목 DataFrame 컬럼에 그대로 적용할 수 있음 (execute_batch)
+        """
         self._indicators[name] = {
             'function': func,
             'required_columns': required_cols,
-            'output_columns': output_cols
+            'output_columns': output_cols,
+            'shared': shared,
+            'batch': batch
         }
 
     def get(self, name: str) -> Optional[Dict]:
         """지표 정보 반환"""
         return self._indicators.get(name)
 
-    def execute(self, name: str, df: pd.DataFrame, options: ExecOptions) -> Dict[str, pd.Series]:
-        """지표 실행"""
+    def execute(self, name: str, df: pd.DataFrame, options: ExecOptions,
+                graph: Optional[IndicatorGraph] = None) -> Dict[str, pd.Series]:
+        """지표 실행 (graph: 같은 종목의 다른 지표와 공유할 중간 시계열 그래프)"""
         indicator = self.get(name)
         if not indicator:
             raise ValueError(f"Unknown indicator: {name}")
 
         # Realtime 모드 처리 (현재 봉 제외)
         if options.realtime:
-            df = df.copy()
+            df = df.copy(deep=False)  # shift 결과로 컬럼을 교체하므로 얕은 복사로 충분
             for col in indicator['required_columns']:
                 if col in df.columns:
                     df[col] = df[col].shift(1)
+            graph = None  # shift된 입력은 공유 그래프와 다른 데이터
 
         # 지표 함수 실행
-        result = indicator['function'](df, options)
+        if indicator['shared']:
+            result = indicator['function'](df, options, graph if graph is not None else IndicatorGraph(df))
+        else:
+            result = indicator['function'](df, options)
 
         # 결과 정렬
         if isinstance(result, dict):
@@ -205,17 +244,41 @@ class IndicatorRegistry:
 
         return result
 
+    def execute_batch(self, name: str, panel: SymbolPanel, options: ExecOptions) -> Dict[str, pd.DataFrame]:
+        """
+        유니버스 일괄 실행: 종목별 봉을 압축한 (봉 순번 x 종목) 행렬에 지표 함수를 한 번 적용
+
+        Returns:
+            {출력 컬럼: 날짜 x 종목 DataFrame} (종목 이력에 없는 날짜는 NaN)
+        """
+        indicator = self.get(name)
+        if not indicator:
+            raise ValueError(f"Unknown indicator: {name}")
+        if not indicator['batch']:
+            raise ValueError(f"Indicator '{name}' does not support batch execution")
+
+        frames = panel.packed()
+        if options.realtime:
+            frames = {col: frame.shift(1) if col in indicator['required_columns'] else frame
+                      for col, frame in frames.items()}
+
+        if indicator['shared']:
+            result = indicator['function'](frames, options, IndicatorGraph(frames))
+        else:
+            result = indicator['function'](frames, options)
+        return {key: panel.unpack(value) for key, value in result.items()}
+
     # === 표준 지표 구현 (수학적 정의 준수) ===
 
     @staticmethod
-    def _calc_sma(df: pd.DataFrame, options: ExecOptions) -> Dict[str, pd.Series]:
+    def _calc_sma(df: pd.DataFrame, options: ExecOptions, graph: IndicatorGraph) -> Dict[str, pd.Series]:
         """Simple Moving Average"""
-        return {'sma': df['close'].rolling(window=options.period, min_periods=options.min_periods).mean()}
+        return {'sma': graph.sma(options.period, 'close', options.min_periods)}
 
     @staticmethod
-    def _calc_ema(df: pd.DataFrame, options: ExecOptions) -> Dict[str, pd.Series]:
+    def _calc_ema(df: pd.DataFrame, options: ExecOptions, graph: IndicatorGraph) -> Dict[str, pd.Series]:
         """Exponential Moving Average"""
-        return {'ema': df['close'].ewm(span=options.period, min_periods=options.min_periods, adjust=False).mean()}
+        return {'ema': graph.ema(options.period, 'close', options.min_periods)}
 
     @staticmethod
     def _calc_wma(df: pd.DataFrame, options: ExecOptions) -> Dict[str, pd.Series]:
@@ -244,13 +307,13 @@ class IndicatorRegistry:
         return {'rsi': rsi}
 
     @staticmethod
-    def _calc_stochastic(df: pd.DataFrame, options: ExecOptions) -> Dict[str, pd.Series]:
+    def _calc_stochastic(df: pd.DataFrame, options: ExecOptions, graph: IndicatorGraph) -> Dict[str, pd.Series]:
         """Stochastic Oscillator"""
         k_period = options.period
         d_period = options.period // 3 if options.period >= 6 else 3
 
-        low_min = df['low'].rolling(window=k_period, min_periods=options.min_periods).min()
-        high_max = df['high'].rolling(window=k_period, min_periods=options.min_periods).max()
+        low_min = graph.rolling_min(k_period, 'low', options.min_periods)
+        high_max = graph.rolling_max(k_period, 'high', options.min_periods)
 
         # 분모 0 방지
         denominator = high_max - low_min
@@ -263,10 +326,10 @@ class IndicatorRegistry:
         return {'stochastic_k': stochastic_k, 'stochastic_d': stochastic_d}
 
     @staticmethod
-    def _calc_cci_optimized(df: pd.DataFrame, options: ExecOptions) -> Dict[str, pd.Series]:
+    def _calc_cci_optimized(df: pd.DataFrame, options: ExecOptions, graph: IndicatorGraph) -> Dict[str, pd.Series]:
         """CCI - Optimized with MAD"""
-        typical_price = (df['high'] + df['low'] + df['close']) / 3
-        sma = typical_price.rolling(window=options.period, min_periods=options.min_periods).mean()
+        typical_price = graph.typical_price()
+        sma = graph.sma(options.period, 'typical_price', options.min_periods)
 
         # Mean Absolute Deviation (MAD) - 벡터화
         mad = typical_price.rolling(window=options.period, min_periods=options.min_periods).apply(
@@ -280,10 +343,10 @@ class IndicatorRegistry:
         return {'cci': cci}
 
     @staticmethod
-    def _calc_williams_r(df: pd.DataFrame, options: ExecOptions) -> Dict[str, pd.Series]:
+    def _calc_williams_r(df: pd.DataFrame, options: ExecOptions, graph: IndicatorGraph) -> Dict[str, pd.Series]:
         """Williams %R"""
-        highest = df['high'].rolling(window=options.period, min_periods=options.min_periods).max()
-        lowest = df['low'].rolling(window=options.period, min_periods=options.min_periods).min()
+        highest = graph.rolling_max(options.period, 'high', options.min_periods)
+        lowest = graph.rolling_min(options.period, 'low', options.min_periods)
 
         # 분모 0 방지
         denominator = highest - lowest
@@ -295,10 +358,10 @@ class IndicatorRegistry:
         return {'williams_r': williams_r}
 
     @staticmethod
-    def _calc_bollinger_bands(df: pd.DataFrame, options: ExecOptions) -> Dict[str, pd.Series]:
+    def _calc_bollinger_bands(df: pd.DataFrame, options: ExecOptions, graph: IndicatorGraph) -> Dict[str, pd.Series]:
         """Bollinger Bands with ddof=0"""
-        middle = df['close'].rolling(window=options.period, min_periods=options.min_periods).mean()
-        std = df['close'].rolling(window=options.period, min_periods=options.min_periods).std(ddof=0)  # ddof=0
+        middle = graph.sma(options.period, 'close', options.min_periods)
+        std = graph.rolling_std(options.period, 'close', options.min_periods, ddof=0)  # ddof=0
 
         std_mult = 2  # 기본값
         upper = middle + (std * std_mult)
@@ -307,32 +370,19 @@ class IndicatorRegistry:
         return {'bb_upper': upper, 'bb_middle': middle, 'bb_lower': lower}
 
     @staticmethod
-    def _calc_atr_wilder(df: pd.DataFrame, options: ExecOptions) -> Dict[str, pd.Series]:
-        """ATR - Wilder's method"""
-        high = df['high']
-        low = df['low']
-        close = df['close'].shift(1)
-
-        tr1 = high - low
-        tr2 = (high - close).abs()
-        tr3 = (low - close).abs()
-
-        true_range = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-
-        # Wilder's smoothing
-        atr = true_range.ewm(alpha=1/options.period, min_periods=options.min_periods, adjust=False).mean()
-
-        return {'atr': atr}
+    def _calc_atr_wilder(df: pd.DataFrame, options: ExecOptions, graph: IndicatorGraph) -> Dict[str, pd.Series]:
+        """ATR - Wilder's method (true range의 Wilder 평활)"""
+        return {'atr': graph.wilder(options.period, 'true_range', options.min_periods)}
 
     @staticmethod
-    def _calc_macd(df: pd.DataFrame, options: ExecOptions) -> Dict[str, pd.Series]:
+    def _calc_macd(df: pd.DataFrame, options: ExecOptions, graph: IndicatorGraph) -> Dict[str, pd.Series]:
         """MACD"""
         fast = 12
         slow = 26
         signal = 9
 
-        ema_fast = df['close'].ewm(span=fast, min_periods=fast, adjust=False).mean()
-        ema_slow = df['close'].ewm(span=slow, min_periods=slow, adjust=False).mean()
+        ema_fast = graph.ema(fast, 'close', fast)
+        ema_slow = graph.ema(slow, 'close', slow)
 
         macd_line = ema_fast - ema_slow
         macd_signal = macd_line.ewm(span=signal, min_periods=signal, adjust=False).mean()
@@ -345,7 +395,7 @@ class IndicatorRegistry:
         }
 
     @staticmethod
-    def _calc_adx_wilder(df: pd.DataFrame, options: ExecOptions) -> Dict[str, pd.Series]:
+    def _calc_adx_wilder(df: pd.DataFrame, options: ExecOptions, graph: IndicatorGraph) -> Dict[str, pd.Series]:
         """ADX/DMI - Wilder's method"""
         high = df['high']
         low = df['low']
@@ -360,15 +410,8 @@ class IndicatorRegistry:
         plus_dm[plus_dm < minus_dm] = 0
         minus_dm[minus_dm < plus_dm] = 0
 
-        # True Range
-        tr = pd.concat([
-            high - low,
-            (high - close.shift()).abs(),
-            (low - close.shift()).abs()
-        ], axis=1).max(axis=1)
-
-        # Wilder's smoothing
-        atr = tr.ewm(alpha=1/options.period, min_periods=options.min_periods, adjust=False).mean()
+        # Wilder's smoothing (true range / ATR 노드는 ATR 지표와 공유)
+        atr = graph.wilder(options.period, 'true_range', options.min_periods)
         plus_di = 100 * (plus_dm.ewm(alpha=1/options.period, adjust=False).mean() / atr)
         minus_di = 100 * (minus_dm.ewm(alpha=1/options.period, adjust=False).mean() / atr)
 
@@ -448,9 +491,9 @@ class IndicatorRegistry:
         return {'obv': obv}
 
     @staticmethod
-    def _calc_vwap_session(df: pd.DataFrame, options: ExecOptions) -> Dict[str, pd.Series]:
+    def _calc_vwap_session(df: pd.DataFrame, options: ExecOptions, graph: IndicatorGraph) -> Dict[str, pd.Series]:
         """VWAP with session reset option"""
-        typical_price = (df['high'] + df['low'] + df['close']) / 3
+        typical_price = graph.typical_price()
 
         # 세션 경계 감지 (날짜 변경)
         if isinstance(df.index, pd.DatetimeIndex):
@@ -468,7 +511,7 @@ class IndicatorRegistry:
         return {'vwap': vwap}
 
     @staticmethod
-    def _calc_ichimoku(df: pd.DataFrame, options: ExecOptions) -> Dict[str, pd.Series]:
+    def _calc_ichimoku(df: pd.DataFrame, options: ExecOptions, graph: IndicatorGraph) -> Dict[str, pd.Series]:
         """Ichimoku Cloud"""
         # 기간 설정
         tenkan_period = 9
@@ -477,19 +520,19 @@ class IndicatorRegistry:
         chikou_period = 26
 
         # Tenkan-sen
-        tenkan = (df['high'].rolling(tenkan_period).max() +
-                 df['low'].rolling(tenkan_period).min()) / 2
+        tenkan = (graph.rolling_max(tenkan_period, 'high') +
+                 graph.rolling_min(tenkan_period, 'low')) / 2
 
         # Kijun-sen
-        kijun = (df['high'].rolling(kijun_period).max() +
-                df['low'].rolling(kijun_period).min()) / 2
+        kijun = (graph.rolling_max(kijun_period, 'high') +
+                graph.rolling_min(kijun_period, 'low')) / 2
 
         # Senkou Span A (26 periods ahead)
         senkou_a = ((tenkan + kijun) / 2).shift(kijun_period)
 
         # Senkou Span B (26 periods ahead)
-        senkou_b = ((df['high'].rolling(senkou_period).max() +
-                    df['low'].rolling(senkou_period).min()) / 2).shift(kijun_period)
+        senkou_b = ((graph.rolling_max(senkou_period, 'high') +
+                    graph.rolling_min(senkou_period, 'low')) / 2).shift(kijun_period)
 
         # Chikou Span (26 periods behind)
         chikou = df['close'].shift(-chikou_period)
@@ -527,11 +570,21 @@ class IndicatorCalculator:
             logger.info("=" * 60)
             self.registry = IndicatorRegistry()
 
+        # 유니버스 일괄 계산 커널 (DB 전용 모드에서는 Supabase 정의가 formula.batch로 선언한 지표만 사용)
+        self.batch_registry = self.registry if self.registry is not None else IndicatorRegistry()
+
         self.sandbox = SecuritySandbox()
         self._init_database()
-        self.indicators_cache = {}
         self._load_indicators()
-        self._execution_cache = {}  # 중복 계산 방지
+        self._execution_cache = IndicatorExecutionCache.from_env()  # 중복 계산 방지 (입력 내용 해시 키, 크기 제한 LRU)
+
+        # 샌드박스 코드에 입력 프레임을 복사 대신 읽기 전용 뷰로 전달 (INDICATOR_ZERO_COPY=false면 기존 복사 방식)
+        self.zero_copy = os.getenv('INDICATOR_ZERO_COPY', 'true').lower() in ('true', '1', 'yes')
+
+        # 샌드박스 코드를 상주 워커 프로세스에서 실행 (기본 min(2, CPU 수), 타임아웃/메모리 제한 적용)
+        # INDICATOR_SANDBOX_WORKERS=0이면 프로세스 내 실행 (메인 스레드 타이머로 타임아웃만 적용)
+        self.sandbox_pool = sandbox_pool if sandbox_pool.enabled else None
+        self.sandbox_timeout = sandbox_pool.limits.timeout_seconds
 
     def _init_database(self):
         """Supabase 연결"""
@@ -540,8 +593,8 @@ class IndicatorCalculator:
             key = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_SERVICE_KEY')
 
             if not url or not key:
-                # DB 전용 모드에서는 Supabase 필수
-                if self.enforce_db_only:
+                # DB 전용 모드에서는 Supabase 필수 (명시한 오프라인 카탈로그 스냅샷이 있으면 허용)
+                if self.enforce_db_only and not (indicator_catalog.explicit_snapshot and indicator_catalog.has_snapshot()):
                     raise RuntimeError(
                         "FATAL: DB-only mode requires Supabase connection.\n"
                         "Please set SUPABASE_URL and SUPABASE_KEY environment variables.\n"
@@ -551,7 +604,7 @@ class IndicatorCalculator:
                     self.supabase = None
                     logger.warning("No Supabase connection - using development mode")
             else:
-                self.supabase = create_client(url, key)
+                self.supabase = indicator_catalog.client()  # 프로세스 공유 클라이언트
                 logger.info("Supabase connected successfully")
         except RuntimeError:
             raise  # Fail-fast 에러는 그대로 전파
@@ -563,18 +616,9 @@ class IndicatorCalculator:
                 self.supabase = None
 
     def _load_indicators(self):
-        """Supabase에서 지표 로드"""
-        if not self.supabase:
-            return
-
-        try:
-            response = self.supabase.table('indicators').select('*').eq('is_active', True).execute()
-            if response.data:
-                for indicator in response.data:
-                    self.indicators_cache[indicator['name']] = indicator
-                logger.info(f"Loaded {len(self.indicators_cache)} indicators from database")
-        except Exception as e:
-            logger.error(f"Failed to load indicators: {e}")
+        """지표 정의 연결 (프로세스 전역 카탈로그 - 최초 1회 로드, 이후 TTL/무효화로 갱신)"""
+        self.indicators_cache = indicator_catalog.view()
+        logger.info(f"Indicator catalog: {len(self.indicators_cache)} indicators ({indicator_catalog.source})")
 
     def calculate(self, df: pd.DataFrame, config: Dict[str, Any], options: Optional[ExecOptions] = None, stock_code: Optional[str] = None) -> IndicatorResult:
         """지표 계산 - 메인 엔트리포인트
@@ -598,6 +642,8 @@ class IndicatorCalculator:
         
         start_time = time.time()
         warnings = []
+        _input_usage.mode = 'direct'
+        _input_usage.copied_bytes = 0
 
         print(f"[Calculator] DEBUG: calculate() called with config={config}, stock_code={stock_code}")
         print(f"[Calculator] DEBUG: config keys={list(config.keys())}")
@@ -614,16 +660,22 @@ class IndicatorCalculator:
             )
 
         # 입력 검증
+        source = df
         df = self._validate_input(df, warnings)
+        graph = self._evaluation_graph(source, df, options)
+        graph_hits = graph.hits if graph is not None else 0
 
         indicator_name = config.get('name')
         calculation_type = config.get('calculation_type', 'builtin')
 
         try:
             # 캐시 확인 - 종목코드 및 params 포함
-            cache_key = self._get_cache_key(indicator_name, options, stock_code, df.index, config.get('params', {}))
-            if cache_key in self._execution_cache:
-                cached_result = self._execution_cache[cache_key]
+            cache_key = self._get_cache_key(
+                indicator_name, options, stock_code, df.index, config.get('params', {}),
+                data_hash=self._input_fingerprint(source, df)
+            )
+            cached_result = self._execution_cache.get(cache_key)
+            if cached_result is not None:
                 logger.info(f"Using cached result for {indicator_name} ({stock_code})")
                 return cached_result
 
@@ -633,7 +685,7 @@ class IndicatorCalculator:
             indicator_def = self.indicators_cache.get(indicator_name)
             if indicator_def:
                 logger.info(f"Using Supabase definition for {indicator_name}")
-                result_columns = self._calculate_from_definition(df, indicator_def, options, config.get('params', {}))
+                result_columns = self._calculate_from_definition(df, indicator_def, options, config.get('params', {}), graph)
 
             # DB 전용 모드에서는 Supabase에 없으면 에러
             elif self.enforce_db_only:
@@ -646,20 +698,20 @@ class IndicatorCalculator:
             elif config.get('base_indicator') and self.registry:
                 base_indicator = config.get('base_indicator')
                 logger.info(f"Using base indicator {base_indicator} for {indicator_name}")
-                result_columns = self._calculate_builtin(df, indicator_name, options)
+                result_columns = self._calculate_builtin(df, indicator_name, options, graph)
 
             # 3. 내장 지표 확인 (개발 모드에서만)
             elif self.registry and (indicator_name in self.registry._indicators or indicator_name.split('_')[0] in self.registry._indicators):
                 logger.info(f"Using built-in indicator for {indicator_name}")
-                result_columns = self._calculate_builtin(df, indicator_name, options)
+                result_columns = self._calculate_builtin(df, indicator_name, options, graph)
 
             # 4. config에 calculation_type이 명시된 경우 (개발 모드에서만)
             elif not self.enforce_db_only and calculation_type == 'custom_formula':
                 logger.warning(f"Using custom_formula for {indicator_name} - not recommended in production")
-                result_columns = self._calculate_custom_formula(df, config, options)
+                result_columns = self._calculate_custom_formula(df, config, options, graph)
             elif not self.enforce_db_only and calculation_type == 'python_code':
                 logger.warning(f"Using python_code for {indicator_name} - not recommended in production")
-                result_columns = self._calculate_python_code(df, config, options)
+                result_columns = self._calculate_python_code(df, config, options, graph=graph)
             else:
                 if self.enforce_db_only:
                     raise ValueError(f"Indicator '{indicator_name}' must be defined in Supabase database")
@@ -676,7 +728,11 @@ class IndicatorCalculator:
                     'indicator': indicator_name,
                     'calculation_type': calculation_type,
                     'engine': 'v3',
-                    'options': options.__dict__
+                    'options': options.__dict__,
+                    'input_mode': _input_usage.mode,
+                    'input_bytes': frame_nbytes(df),
+                    'input_copied_bytes': _input_usage.copied_bytes,
+                    'shared_intermediate_hits': (graph.hits - graph_hits) if graph is not None else 0
                 },
                 execution_time_ms=execution_time,
                 nan_ratio=nan_ratio,
@@ -684,11 +740,12 @@ class IndicatorCalculator:
             )
 
             # 캐시 저장
-            self._execution_cache[cache_key] = result
+            self._execution_cache.put(cache_key, result)
 
             # 로깅
             logger.info(f"Calculated {indicator_name}: {len(result_columns)} columns, "
-                       f"{execution_time:.2f}ms, NaN ratio: {nan_ratio:.2%}")
+                       f"{execution_time:.2f}ms, NaN ratio: {nan_ratio:.2%}, "
+                       f"input {_input_usage.mode} ({_input_usage.copied_bytes} bytes copied)")
 
             return result
 
@@ -698,10 +755,13 @@ class IndicatorCalculator:
             raise
 
     def _validate_input(self, df: pd.DataFrame, warnings: List[str]) -> pd.DataFrame:
-        """입력 데이터 검증"""
+        """입력 데이터 검증 (호출자의 프레임은 수정하지 않음)"""
+        # 얕은 복사: 변환이 필요한 컬럼만 교체하고 나머지는 원본 메모리 공유
+        df = df.copy(deep=False)
+
         # 타입 강제
         for col in ['open', 'high', 'low', 'close', 'volume']:
-            if col in df.columns:
+            if col in df.columns and df[col].dtype != np.float64:
                 df[col] = df[col].astype(np.float64)
 
         # 인덱스 정렬
@@ -717,7 +777,7 @@ class IndicatorCalculator:
         # 음수 값 체크
         if 'volume' in df.columns and (df['volume'] < 0).any():
             warnings.append("Negative volume found, setting to 0")
-            df.loc[df['volume'] < 0, 'volume'] = 0
+            df['volume'] = df['volume'].clip(lower=0)
 
         for col in ['open', 'high', 'low', 'close']:
             if col in df.columns and (df[col] <= 0).any():
@@ -725,29 +785,308 @@ class IndicatorCalculator:
 
         return df
 
-    def _calculate_builtin(self, df: pd.DataFrame, name: str, options: ExecOptions) -> Dict[str, pd.Series]:
+    def _calculate_builtin(self, df: pd.DataFrame, name: str, options: ExecOptions,
+                           graph: Optional[IndicatorGraph] = None) -> Dict[str, pd.Series]:
         """내장 지표 계산"""
         # name이 sma_5, sma_20 같은 형식일 수 있으므로 기본 지표명 추출
         base_name = name.split('_')[0] if '_' in name else name
 
         # 기본 지표가 레지스트리에 있는지 확인
         if base_name in self.registry._indicators:
-            result = self.registry.execute(base_name, df, options)
+            result = self.registry.execute(base_name, df, options, graph)
 
             # 결과 컬럼명을 요청된 이름으로 변경
             if name != base_name:
-                renamed_result = {}
-                for col_name, col_data in result.items():
-                    # sma -> sma_5 형식으로 변경
-                    new_col_name = name if col_name == base_name else f"{name}_{col_name.split('_', 1)[-1]}" if '_' in col_name else name
-                    renamed_result[new_col_name] = col_data
-                return renamed_result
+                return {self._builtin_column_name(name, base_name, col_name): col_data
+                        for col_name, col_data in result.items()}
 
             return result
         else:
             raise ValueError(f"Unknown builtin indicator: {base_name}")
 
-    def _calculate_custom_formula(self, df: pd.DataFrame, config: Dict, options: ExecOptions) -> Dict[str, pd.Series]:
+    @staticmethod
+    def _builtin_column_name(name: str, base_name: str, col_name: str) -> str:
+        """내장 지표 출력 컬럼명 변환 (sma -> sma_5, bb_upper -> bb_20_upper 형식)"""
+        if col_name == base_name or '_' not in col_name:
+            return name
+        return f"{name}_{col_name.split('_', 1)[-1]}"
+
+    def _registry_method(self, config: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        calculate()와 같은 순서로 해석했을 때 registry 함수로 바로 실행되는 지표의 (메서드, Supabase 수식)
+
+        1. Supabase 정의: 코드 없이 registry 메서드를 쓰는 built-in 정의면 메서드 (수식 dict는 항상 반환)
+        2. DB 전용 모드에서 정의가 없으면 (None, None) (calculate()가 에러 처리)
+        3. 내장 지표: sma_5 → ('sma', None)
+        """
+        name = config.get('name')
+        definition = self.indicators_cache.get(name)
+        if definition:
+            formula = definition.get('formula', {})
+            try:
+                formula = json.loads(formula) if isinstance(formula, str) else formula
+            except ValueError:
+                return None, None
+            if not isinstance(formula, dict):
+                return None, None
+            if (definition.get('calculation_type') in ('built-in', 'builtin') and 'code' not in formula
+                    and self.registry is not None):
+                return formula.get('method', name.split('_')[0]), formula
+            return None, formula
+        if self.enforce_db_only or self.registry is None or not name:
+            return None, None
+        base_name = name.split('_')[0]
+        return (base_name if base_name in self.registry._indicators else None), None
+
+    def _method_columns(self, name: str, method: str, outputs, from_definition: bool) -> Dict[str, str]:
+        """registry 출력 컬럼 → 결과 컬럼명 (Supabase 정의는 그대로, 내장 지표는 _calculate_builtin 규칙)"""
+        if from_definition or name == method:
+            return {out: out for out in outputs}
+        return {out: self._builtin_column_name(name, method, out) for out in outputs}
+
+    def streaming_spec(self, config: Dict[str, Any]) -> Optional[StreamSpec]:
+        """
+        실시간 스냅샷에서 증분 커널로 계산할 수 있는 지표면 StreamSpec, 아니면 None
+
+        _registry_method()로 registry 메서드가 정해지는 지표이거나, Supabase 정의가
+        formula.streaming {"kernel": "ema", "outputs": {"ema": "ema"}}로 커널을 선언한 경우
+        realtime(현재 봉 제외) 설정은 스트림과 입력이 달라 제외
+        """
+        if not isinstance(config, dict) or config.get('realtime') or not config.get('name'):
+            return None
+        name = config['name']
+        period = (config.get('params') or {}).get('period', 20)
+        if not isinstance(period, int) or isinstance(period, bool) or period < 1:
+            return None
+
+        method, formula = self._registry_method(config)
+        declared = formula.get('streaming') if formula else None
+        if isinstance(declared, dict):
+            kernel = declared.get('kernel')
+            outputs = declared.get('outputs') or {}
+        elif method:
+            kernel = method
+            outputs = None
+        else:
+            return None
+
+        kernel_cls = STREAMING_KERNELS.get(kernel)
+        if kernel_cls is None:
+            return None
+        if outputs is None:
+            outputs = self._method_columns(name, kernel, kernel_cls.outputs, formula is not None)
+        if not isinstance(outputs, dict) or not set(outputs) <= set(kernel_cls.outputs):
+            return None
+        return StreamSpec(kernel, period, tuple(outputs.items()))
+
+    def streaming_columns(self, df: pd.DataFrame, indicators: List[Dict[str, Any]],
+                          stock_code: Optional[str]) -> Tuple[Dict[str, pd.Series], List[Dict[str, Any]]]:
+        """
+        실시간 스냅샷용: 증분 커널 대상 지표는 종목 스트림에서 O(1) 갱신한 컬럼을 반환
+
+        Returns:
+            (스트리밍 컬럼 {컬럼명: Series 복사본}, calculate()로 계산할 나머지 지표 설정)
+        """
+        specs, remaining = [], []
+        for indicator in indicators:
+            spec = self.streaming_spec(indicator) if stock_code else None
+            (specs if spec is not None else remaining).append(spec if spec is not None else indicator)
+        if not specs:
+            return {}, list(indicators)
+
+        validated = self._validate_input(df, [])
+        if not validated.index.equals(df.index):
+            return {}, list(indicators)  # 정렬/중복 제거가 필요한 입력은 기존 경로로 계산
+        return stream_store.columns(stock_code, validated, specs), remaining
+
+    def batch_method(self, config: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, str]]]:
+        """
+        calculate_panel()로 일괄 계산할 수 있는 지표면 (batch 메서드, registry 출력 → 결과 컬럼명), 아니면 (None, None)
+
+        _registry_method()로 batch 지원 registry 메서드가 정해지는 지표이거나, Supabase 정의가
+        formula.batch {"method": "rsi", "outputs": {"rsi": "rsi"}}로 커널을 선언한 경우
+        (DB 전용 모드에서는 선언한 정의만 해당 - python_code 정의와 같은 값인지는 선언한 쪽이 보장)
+        """
+        if not isinstance(config, dict) or not config.get('name'):
+            return None, None
+        method, formula = self._registry_method(config)
+        declared = formula.get('batch') if formula else None
+        if isinstance(declared, dict):
+            method = declared.get('method')
+            outputs = declared.get('outputs') or {}
+        elif method:
+            outputs = None
+        else:
+            return None, None
+
+        indicator = self.batch_registry.get(method) if isinstance(method, str) else None
+        if not indicator or not indicator['batch']:
+            return None, None
+        if outputs is None:
+            outputs = self._method_columns(config['name'], method, indicator['output_columns'], formula is not None)
+        if not isinstance(outputs, dict) or not outputs or not set(outputs) <= set(indicator['output_columns']):
+            return None, None
+        return method, outputs
+
+    def calculate_panel(self, frames: Dict[str, pd.DataFrame], indicators: List[Dict[str, Any]]
+                        ) -> Tuple[Dict[str, pd.DataFrame], List[Dict[str, Any]]]:
+        """
+        유니버스 일괄 계산: batch_method()가 정해지는 지표(SMA/EMA/RSI/MACD/볼린저/ATR/Stochastic)를
+        종목 x 날짜 패널에서 한 번에 계산
+
+        Returns:
+            ({종목: 지표 컬럼 DataFrame}, 종목별로 calculate()해야 하는 나머지 지표 설정)
+            입력 정리(정렬/중복 제거)가 필요한 종목은 결과에서 빠지며 모든 지표를 종목별로 계산해야 함
+        """
+        batched, remaining = [], []
+        for config in indicators:
+            method, names = self.batch_method(config)
+            if method:
+                batched.append((config, method, names))
+            else:
+                remaining.append(config)
+        if not batched or not frames:
+            return {}, list(indicators)
+
+        # _validate_input의 정렬/중복 제거가 필요 없는 종목만 패널에 포함
+        # (float64 변환은 패널 생성 시 수행, batch 지표는 거래량을 쓰지 않아 음수 거래량 보정 불필요)
+        validated = {
+            code: df for code, df in frames.items()
+            if not df.empty and isinstance(df.index, pd.DatetimeIndex)
+            and df.index.is_monotonic_increasing and not df.index.has_duplicates
+        }
+        if not validated:
+            return {}, list(indicators)
+
+        start_time = time.time()
+        panel = SymbolPanel.from_frames(validated)
+        outputs: Dict[str, pd.DataFrame] = {}
+        for config, method, names in batched:
+            params = config.get('params') or {}
+            options = ExecOptions(period=params.get('period', 20), realtime=config.get('realtime', False))
+            result = self.batch_registry.execute_batch(method, panel, options)
+            outputs.update({name: result[out] for out, name in names.items()})
+        columns = panel.split(outputs)
+
+        logger.info(f"Batch-calculated {len(batched)} indicators for {len(validated)} symbols "
+                    f"in {(time.time() - start_time) * 1000:.1f}ms")
+        return columns, remaining
+
+    def _formula_hash(self, config: Dict[str, Any]) -> Optional[str]:
+        """
+        저장소 검증용 수식 해시 (calculate()와 같은 순서로 실제 실행될 정의를 해시)
+        Supabase 정의가 바뀌거나 내장 지표 구현이 바뀌면 저장 값을 쓰지 않음
+        """
+        name = config.get('name')
+        definition = self.indicators_cache.get(name)
+        if definition:
+            payload = {key: definition.get(key) for key in
+                       ('calculation_type', 'formula', 'default_params', 'output_columns')}
+        elif self.enforce_db_only:
+            return None
+        elif self.registry and name and name.split('_')[0] in self.registry._indicators:
+            source = _function_source(self.registry._indicators[name.split('_')[0]]['function'])
+            if source is None:
+                return None
+            payload = {'builtin': source}
+        elif config.get('calculation_type') in ('custom_formula', 'python_code'):
+            payload = {key: config.get(key) for key in ('calculation_type', 'formula', 'code')}
+        else:
+            return None
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def _tail_kernel(self, config: Dict[str, Any]) -> Optional[Tuple[StreamingKernel, Dict[str, str]]]:
+        """저장 상태에서 꼬리를 이어 계산할 수 있는 지표면 (커널, 커널 출력 → 결과 컬럼명)"""
+        spec = self.streaming_spec(config)
+        if spec is None or spec.kernel not in TAIL_KERNELS:
+            return None
+        return make_kernel(spec.kernel, spec.period), dict(spec.columns)
+
+    @staticmethod
+    def _verified_kernel_state(kernel: StreamingKernel, names: Dict[str, str], df: pd.DataFrame,
+                               columns: Dict[str, pd.Series]) -> Optional[Dict[str, Any]]:
+        """전체 계산 결과와 커널 출력이 비트 단위로 같을 때만 마지막 봉 직전 상태 반환"""
+        if set(names.values()) != set(columns):
+            return None
+        base, outputs = run_kernel(kernel, df, 0, kernel.initial())
+        for output, name in names.items():
+            expected = np.asarray(columns[name], dtype=np.float64)
+            if not np.array_equal(outputs[output], expected, equal_nan=True):
+                return None
+        return kernel_manifest(kernel, base)
+
+    def calculate_stored(self, df: pd.DataFrame, config: Dict[str, Any],
+                         stock_code: Optional[str] = None) -> IndicatorResult:
+        """
+        디스크 저장소를 거치는 calculate()
+
+        - 저장 구간이 df 전체를 덮으면 파일 값만 반환
+        - 저장 이후 봉이 추가/수정됐고 TAIL_KERNELS 지표면 저장된 커널 상태에서 꼬리만 계산해 이어 붙임
+        - 그 외(첫 조회/수식/과거 OHLCV 변경, 꼬리 계산 미지원 지표)에는 전체 계산
+        - 마지막 봉만 바뀐 경우(장중 임시 봉)는 파일을 다시 쓰지 않음
+        """
+        store = indicator_store
+        formula_hash = self._formula_hash(config) if store.enabled and stock_code else None
+        if formula_hash is None or df.empty or not isinstance(df.index, pd.DatetimeIndex):
+            return self.calculate(df, config, stock_code=stock_code)
+
+        validated = self._validate_input(df, [])
+        if not validated.index.equals(df.index):
+            return self.calculate(df, config, stock_code=stock_code)
+
+        key = store.entry_key(stock_code, config)
+        stored = store.load(stock_code, key)
+        rows = stored.matching_rows(validated, formula_hash) if stored is not None else 0
+        start_time = time.time()
+
+        if rows == len(df):
+            store.record('hit')
+            store.touch(stock_code, key)
+            columns = stored.series(df.index, rows)
+            return IndicatorResult(
+                columns=columns,
+                metadata={'indicator': config.get('name'), 'engine': 'v3', 'store': 'hit', 'tail_rows': 0},
+                execution_time_ms=(time.time() - start_time) * 1000,
+                nan_ratio=self._calculate_nan_ratio(columns),
+                warnings=[]
+            )
+
+        revision_only = stored is not None and rows == stored.rows - 1 == len(df) - 1
+        tail_kernel = self._tail_kernel(config)
+        if rows and tail_kernel is not None:
+            kernel, names = tail_kernel
+            state = stored.kernel_state(kernel)
+            if state is not None and set(names.values()) == set(stored.columns):
+                start = stored.rows - 1  # 저장 상태는 마지막 저장 봉 직전까지 반영
+                base, outputs = run_kernel(kernel, validated, start, state)
+                columns = splice(stored, {names[out]: values for out, values in outputs.items()}, df.index, start)
+                store.record('tail')
+                if revision_only:
+                    store.touch(stock_code, key)
+                else:
+                    store.save(stock_code, key, validated, columns, formula_hash, config.get('name'),
+                               kernel=kernel_manifest(kernel, base))
+                return IndicatorResult(
+                    columns=columns,
+                    metadata={'indicator': config.get('name'), 'engine': 'v3', 'store': 'tail',
+                              'tail_rows': len(df) - rows},
+                    execution_time_ms=(time.time() - start_time) * 1000,
+                    nan_ratio=self._calculate_nan_ratio(columns),
+                    warnings=[]
+                )
+
+        store.record('miss')
+        result = self.calculate(df, config, stock_code=stock_code)
+        if not revision_only:
+            kernel_state = None
+            if tail_kernel is not None:
+                kernel_state = self._verified_kernel_state(*tail_kernel, validated, result.columns)
+            store.save(stock_code, key, validated, result.columns, formula_hash, config.get('name'), kernel=kernel_state)
+        return replace(result, metadata=dict(result.metadata, store='miss', tail_rows=len(df)))
+
+    def _calculate_custom_formula(self, df: pd.DataFrame, config: Dict, options: ExecOptions,
+                                  graph: Optional[IndicatorGraph] = None) -> Dict[str, pd.Series]:
         """커스텀 수식 계산"""
         # formula가 문자열이거나 dict일 수 있음
         formula_data = config.get('formula', '')
@@ -767,19 +1106,29 @@ class IndicatorCalculator:
             formula = str(formula_data)
             output_column = config.get('name', 'custom')
 
-        # AST 검증
-        if not self.sandbox.validate_ast(formula):
+        # AST 검증 + 컴파일 (수식 버전별 1회)
+        compiled = code_cache.get(
+            f"result = {formula}", self.sandbox.validate_ast,
+            validate_source=formula, filename=f"<formula:{output_column}>"
+        )
+        if compiled is None:
             raise ValueError("Formula failed security validation")
 
         # 안전한 네임스페이스
         namespace = self.sandbox.create_safe_namespace()
-        namespace['df'] = df.copy()
         namespace['params'] = config.get('params', {})
+        namespace['deps'] = self._dependency_series(df, declared_dependencies(config, formula_data), graph)
+
+        def run(frame):
+            scope = dict(namespace, df=frame)
+            exec(compiled, scope)
+            return scope.get('result')
 
         try:
             # 수식 실행
-            exec(f"result = {formula}", namespace)
-            result = namespace.get('result')
+            result = self._run_sandboxed(df, run, {
+                'source': f"result = {formula}", 'scope': namespace, 'filename': f"<formula:{output_column}>"
+            })
 
             if isinstance(result, pd.Series):
                 return {output_column: result}
@@ -792,7 +1141,8 @@ class IndicatorCalculator:
             logger.error(f"Failed to execute custom formula: {e}")
             raise
 
-    def _calculate_python_code(self, df: pd.DataFrame, config: Dict, options: ExecOptions, custom_params: Dict = None) -> Dict[str, pd.Series]:
+    def _calculate_python_code(self, df: pd.DataFrame, config: Dict, options: ExecOptions, custom_params: Dict = None,
+                               graph: Optional[IndicatorGraph] = None) -> Dict[str, pd.Series]:
         """Python 코드 실행"""
         print(f"[Calculator] DEBUG: _calculate_python_code called")
         print(f"[Calculator] DEBUG: config keys={list(config.keys())}")
@@ -807,9 +1157,11 @@ class IndicatorCalculator:
             print(f"[Calculator] DEBUG: Code from config, len={len(code) if code else 0}")
 
         print(f"[Calculator] DEBUG: About to validate AST")
-        print(f"[Calculator] DEBUG: Code preview:\n{code[:500]}")
-        # AST 검증
-        ast_valid = self.sandbox.validate_ast(code)
+        # AST 검증 + 컴파일 (코드 버전별 1회, 이후에는 캐시된 코드 객체 사용)
+        compiled = code_cache.get(
+            code, self.sandbox.validate_ast, filename=f"<python_code:{config.get('name', 'custom')}>"
+        )
+        ast_valid = compiled is not None
         print(f"[Calculator] DEBUG: AST validation result={ast_valid}")
         if not ast_valid:
             print(f"[Calculator] ERROR: AST validation failed!")
@@ -819,7 +1171,6 @@ class IndicatorCalculator:
 
         # 안전한 네임스페이스
         namespace = self.sandbox.create_safe_namespace()
-        namespace['df'] = df.copy()
         namespace['params'] = {
             'period': options.period,
             'realtime': options.realtime,
@@ -845,6 +1196,7 @@ class IndicatorCalculator:
             print(f"[Calculator] DEBUG: Applied custom_params to namespace: {custom_params}")
 
         namespace['options'] = options
+        namespace['deps'] = self._dependency_series(df, declared_dependencies(config, config.get('formula')), graph)
 
         print(f"[Calculator] DEBUG: About to execute code")
         print(f"[Calculator] DEBUG: params={namespace['params']}")
@@ -854,14 +1206,20 @@ class IndicatorCalculator:
             logger.info(f"[DEBUG] Executing code with params: {namespace['params']}")
             logger.info(f"[DEBUG] Code to execute:\n{code[:200]}...")
             print(f"[Calculator] DEBUG: Calling exec()")
-            exec(code, namespace)
-            print(f"[Calculator] DEBUG: exec() completed")
 
-            # 함수 호출 또는 result 변수 확인
-            if 'calculate' in namespace:
-                result = namespace['calculate'](df, **config.get('params', {}))
-            else:
-                result = namespace.get('result')
+            def run(frame):
+                scope = dict(namespace, df=frame)
+                exec(compiled, scope)
+                # 함수 호출 또는 result 변수 확인
+                if 'calculate' in scope:
+                    return scope['calculate'](frame, **config.get('params', {}))
+                return scope.get('result')
+
+            result = self._run_sandboxed(df, run, {
+                'source': code, 'scope': namespace, 'filename': f"<python_code:{config.get('name', 'custom')}>",
+                'call_kwargs': config.get('params', {})
+            })
+            print(f"[Calculator] DEBUG: exec() completed")
 
             logger.info(f"[DEBUG] Execution result type: {type(result)}")
             if isinstance(result, dict):
@@ -882,11 +1240,11 @@ class IndicatorCalculator:
             logger.error(f"Failed to execute Python code: {e}")
             raise
 
-    def _execute_supabase_code(self, df: pd.DataFrame, code: str, definition: Dict, options: ExecOptions, custom_params: Dict = None) -> Dict[str, pd.Series]:
+    def _execute_supabase_code(self, df: pd.DataFrame, code: str, definition: Dict, options: ExecOptions, custom_params: Dict = None,
+                               graph: Optional[IndicatorGraph] = None, dependencies: Optional[List[str]] = None) -> Dict[str, pd.Series]:
         """Supabase 형식의 코드 실행"""
         # 안전한 네임스페이스 생성
         namespace = self.sandbox.create_safe_namespace()
-        namespace['df'] = df.copy()
         namespace['str'] = str  # str 함수 추가
         namespace['int'] = int  # int 함수 추가
         namespace['params'] = {
@@ -913,15 +1271,25 @@ class IndicatorCalculator:
             except:
                 pass
 
+        # 선언된 중간 시계열 (formula.dependencies) - 같은 종목의 다른 지표와 공유
+        namespace['deps'] = self._dependency_series(df, dependencies or [], graph)
+
         try:
             # 디버그: namespace params 확인
             logger.info(f"[DEBUG] Executing code with params: {namespace['params']}")
 
-            # 코드 실행
-            exec(code, namespace)
+            # 코드 실행 (컴파일은 코드 버전별 1회)
+            compiled = code_cache.get(code, filename=f"<indicator:{definition.get('name', 'custom')}>")
+
+            def run(frame):
+                scope = dict(namespace, df=frame)
+                exec(compiled, scope)
+                return scope.get('result')
 
             # result 변수 확인
-            result = namespace.get('result')
+            result = self._run_sandboxed(df, run, {
+                'source': code, 'scope': namespace, 'filename': f"<indicator:{definition.get('name', 'custom')}>"
+            })
             if result:
                 if isinstance(result, pd.Series):
                     return {definition.get('name', 'custom'): result}
@@ -936,7 +1304,82 @@ class IndicatorCalculator:
             logger.error(f"Failed to execute Supabase code: {e}")
             raise
 
-    def _calculate_from_definition(self, df: pd.DataFrame, definition: Dict, options: ExecOptions, custom_params: Dict = None) -> Dict[str, pd.Series]:
+    @contextmanager
+    def shared_intermediates(self, df: pd.DataFrame):
+        """
+        df에 대한 연속 calculate() 호출 동안 중간 시계열(EMA/SMA/std/true range 등)을 공유
+
+        사용 예 (한 종목/한 전략 평가):
+            with calculator.shared_intermediates(df):
+                for indicator in indicators:
+                    calculator.calculate(df, indicator)
+        """
+        previous = getattr(_evaluation, 'scope', None)
+        _evaluation.scope = {'source': df, 'graph': None}
+        try:
+            yield
+        finally:
+            _evaluation.scope = previous
+
+    def _evaluation_graph(self, source: pd.DataFrame, df: pd.DataFrame, options: ExecOptions) -> Optional[IndicatorGraph]:
+        """현재 평가 범위의 공유 그래프 (범위 밖이거나 다른 프레임/실시간 모드면 None)"""
+        scope = getattr(_evaluation, 'scope', None)
+        if scope is None or scope['source'] is not source or options.realtime:
+            return None
+        if scope['graph'] is None:
+            scope['graph'] = IndicatorGraph(df)
+        return scope['graph']
+
+    def _dependency_series(self, df: pd.DataFrame, specs: List[str], graph: Optional[IndicatorGraph]) -> Dict[str, pd.Series]:
+        """선언된 의존성 → 샌드박스용 읽기 전용 Series (공유 그래프가 없으면 이번 호출 전용 그래프)"""
+        if not specs:
+            return {}
+        graph = graph if graph is not None else IndicatorGraph(df)
+        return {spec: readonly_series(series) for spec, series in graph.resolve_dependencies(specs).items()}
+
+    def _input_fingerprint(self, source: pd.DataFrame, df: pd.DataFrame) -> str:
+        """입력 OHLCV 내용 해시 (공유 평가 범위 안에서는 프레임당 한 번만 계산)"""
+        scope = getattr(_evaluation, 'scope', None)
+        if scope is not None and scope['source'] is source:
+            if scope.get('fingerprint') is None:
+                scope['fingerprint'] = frame_fingerprint(df)
+            return scope['fingerprint']
+        return frame_fingerprint(df)
+
+    def _sandbox_frame(self, df: pd.DataFrame, force_copy: bool = False) -> pd.DataFrame:
+        """샌드박스 코드에 전달할 입력 프레임 (읽기 전용 뷰 또는 복사본)"""
+        if self.zero_copy and not force_copy:
+            _input_usage.mode = 'readonly'
+            return readonly_frame(df)
+        _input_usage.mode = 'copy'
+        _input_usage.copied_bytes = getattr(_input_usage, 'copied_bytes', 0) + frame_nbytes(df)
+        return df.copy()
+
+    def _run_sandboxed(self, df: pd.DataFrame, run, job: Optional[Dict[str, Any]] = None):
+        """
+        run(frame)으로 샌드박스 코드 실행
+
+        읽기 전용 뷰에서 제자리 수정을 시도하는 기존 지표 코드는 복사본으로 한 번 더 실행
+        (원본은 이미 보호된 상태이므로 결과만 기존과 동일하게 맞춤)
+
+        워커 풀이 켜져 있으면 job(source/scope/filename/call_kwargs)을 워커 프로세스에서 실행
+        (입력은 공유 메모리 뷰, 같은 재시도 규칙은 워커 안에서 적용)
+        풀을 끈 경우 프로세스 내 실행은 inprocess_guard() 타임아웃 안에서만 수행
+        """
+        if job is not None and self.sandbox_pool is not None:
+            _input_usage.mode = 'shared_memory'
+            return self.sandbox_pool.run(df=df, **job)
+        with inprocess_guard(self.sandbox_timeout):
+            try:
+                return owned_result(run(self._sandbox_frame(df)))
+            except ValueError as e:
+                if not (self.zero_copy and is_readonly_error(e)):
+                    raise
+                logger.warning(f"Indicator code writes to its input frame in place, retrying with a copy: {e}")
+                return run(self._sandbox_frame(df, force_copy=True))
+
+    def _calculate_from_definition(self, df: pd.DataFrame, definition: Dict, options: ExecOptions, custom_params: Dict = None,
+                                   graph: Optional[IndicatorGraph] = None) -> Dict[str, pd.Series]:
         """Supabase 정의로부터 계산"""
         calc_type = definition.get('calculation_type')
         print(f"[Calculator] DEBUG: _calculate_from_definition called")
@@ -965,7 +1408,9 @@ class IndicatorCalculator:
                 print(f"[Calculator] DEBUG: Using Supabase code execution")
                 # 기존 Supabase 형식 - Python 코드 실행
                 code = formula['code']
-                return self._execute_supabase_code(df, code, definition, options, custom_params)
+                return self._execute_supabase_code(
+                    df, code, definition, options, custom_params, graph, declared_dependencies(definition, formula)
+                )
             else:
                 print(f"[Calculator] DEBUG: Using registry execution")
                 # 새 형식 - registry 사용 (DB 전용 모드에서는 불가)
@@ -977,26 +1422,27 @@ class IndicatorCalculator:
                 method = formula.get('method', definition.get('name', '').split('_')[0])
                 print(f"[Calculator] DEBUG: method={method}, in registry={method in self.registry._indicators}")
                 if method in self.registry._indicators:
-                    return self.registry.execute(method, df, options)
+                    return self.registry.execute(method, df, options, graph)
                 else:
                     raise ValueError(f"Method '{method}' not found in registry")
 
         elif calc_type == 'custom_formula':
             print(f"[Calculator] DEBUG: Using custom_formula")
-            return self._calculate_custom_formula(df, definition, options)
+            return self._calculate_custom_formula(df, definition, options, graph)
         elif calc_type == 'python_code':
             print(f"[Calculator] DEBUG: Using python_code")
-            return self._calculate_python_code(df, definition, options, custom_params)
+            return self._calculate_python_code(df, definition, options, custom_params, graph)
         else:
             # 기본적으로 custom_formula로 처리
             print(f"[Calculator] DEBUG: Unknown calc_type, using custom_formula as fallback")
             logger.warning(f"Unknown calculation type '{calc_type}', treating as custom_formula")
-            return self._calculate_custom_formula(df, definition, options)
+            return self._calculate_custom_formula(df, definition, options, graph)
 
-    def _get_cache_key(self, name: str, options: ExecOptions, stock_code: Optional[str] = None, df_index: Optional[pd.Index] = None, params: Optional[Dict] = None) -> str:
-        """캐시 키 생성 - 종목, 데이터 범위 및 파라미터 포함"""
-        # 기본 키
-        key_parts = [name, str(options.period), str(options.realtime), str(options.min_periods)]
+    def _get_cache_key(self, name: str, options: ExecOptions, stock_code: Optional[str] = None, df_index: Optional[pd.Index] = None, params: Optional[Dict] = None,
+                       data_hash: Optional[str] = None) -> str:
+        """캐시 키 생성 - 종목, 데이터 내용(data_hash, 없으면 범위) 및 파라미터 포함"""
+        # 기본 키 (카탈로그 버전 포함: 지표 정의가 갱신되면 이전 결과 미사용)
+        key_parts = [name, str(options.period), str(options.realtime), str(options.min_periods), indicator_catalog.version]
 
         # params 추가 (중요: 동일 지표의 다른 파라미터 구분)
         if params:
@@ -1008,8 +1454,11 @@ class IndicatorCalculator:
         if stock_code:
             key_parts.append(stock_code)
 
+        # 데이터 내용 해시 (OHLCV 버퍼) - 마지막 봉 값만 바뀌어도 다른 키
+        if data_hash:
+            key_parts.append(data_hash)
         # 데이터 범위 해시 추가 (첫/마지막 인덱스)
-        if df_index is not None and len(df_index) > 0:
+        elif df_index is not None and len(df_index) > 0:
             index_hash = f"{df_index[0]}_{df_index[-1]}_{len(df_index)}"
             key_parts.append(str(hash(index_hash)))
 
@@ -1026,6 +1475,15 @@ class IndicatorCalculator:
 
         return nan_count / total if total > 0 else 0
 
+    def execution_cache_stats(self) -> Dict[str, Any]:
+        """지표 결과 캐시 적중/미스/제거/상주 바이트 통계"""
+        return self._execution_cache.stats()
+
+    @staticmethod
+    def code_cache_stats() -> Dict[str, Any]:
+        """컴파일된 지표 코드 캐시 적중/미스 통계 (프로세스 전역)"""
+        return code_cache.stats()
+
     def clear_cache(self):
         """캐시 초기화"""
         self._execution_cache.clear()
@@ -0,0 +1,251 @@
+"""
+프로세스 전역 지표 정의 카탈로그 (Supabase indicators 테이블)
+- IndicatorCalculator/BacktestEngine을 만들 때마다 Supabase 클라이언트를 만들고 테이블 전체를 다시 받던 것을
+  프로세스당 한 번 로드 + TTL 경과 시 백그라운드 갱신으로 변경 (갱신 중에도 기존 정의로 응답)
+- POST /api/indicators/catalog/invalidate로 즉시 다시 로드 (지표 정의 수정 직후)
+- 로컬 스냅샷(JSON, pyarrow가 있으면 Parquet)으로 부팅 가능
+  · INDICATOR_CATALOG_SNAPSHOT: 스냅샷 경로 (download_indicators_table.py가 만든 indicators_*.json 그대로 사용 가능)
+  · 미지정 시 cache/indicators_catalog.json을 Supabase 연결이 있을 때만 빠른 시작용으로 사용
+  · Supabase에서 로드할 때마다 스냅샷을 갱신 (tmp → os.replace)
+- INDICATOR_CATALOG_TTL: 갱신 주기(초, 기본 600)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import MutableMapping
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from supabase import create_client
+
+TTL_ENV = 'INDICATOR_CATALOG_TTL'
+SNAPSHOT_ENV = 'INDICATOR_CATALOG_SNAPSHOT'
+DEFAULT_TTL_SECONDS = 600.0
+DEFAULT_SNAPSHOT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'indicators_catalog.json'
+)
+
+
+def _definitions_version(definitions: Dict[str, Dict[str, Any]]) -> str:
+    encoded = json.dumps(definitions, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+
+def _active_by_name(rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {row['name']: row for row in rows if row.get('name') and row.get('is_active', True) not in (False, 'false', 0)}
+
+
+def read_snapshot(path: str) -> List[Dict[str, Any]]:
+    """스냅샷 파일 → 행 목록 (JSON: 행 배열 또는 {'indicators': [...]}, Parquet: pyarrow 필요)"""
+    if path.endswith('.parquet'):
+        import pandas as pd  # Parquet 읽기는 pyarrow/fastparquet 설치 시에만
+        frame = pd.read_parquet(path)
+        return json.loads(frame.to_json(orient='records', force_ascii=False))
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return data.get('indicators', []) if isinstance(data, dict) else data
+
+
+class IndicatorCatalog:
+    """지표 정의 싱글톤 (TTL 갱신, 명시적 무효화, 로컬 스냅샷)"""
+
+    def __init__(self, ttl_seconds: Optional[float] = None, snapshot_path: Optional[str] = None):
+        if ttl_seconds is None:
+            try:
+                ttl_seconds = float(os.getenv(TTL_ENV, DEFAULT_TTL_SECONDS))
+            except ValueError:
+                ttl_seconds = DEFAULT_TTL_SECONDS
+        self.ttl_seconds = ttl_seconds
+        self.explicit_snapshot = snapshot_path or os.getenv(SNAPSHOT_ENV) or None
+        self.snapshot_path = self.explicit_snapshot or DEFAULT_SNAPSHOT_PATH
+        self._definitions: Dict[str, Dict[str, Any]] = {}
+        self.version = ''
+        self.source = 'empty'
+        self.loaded_at = 0.0
+        self._loaded = False
+        self._client = None
+        self._client_ready = False
+        self._lock = threading.Lock()  # 클라이언트 생성
+        self._load_lock = threading.Lock()  # 최초 로드 (동시 요청은 로드 완료까지 대기)
+        self._refreshing = threading.Lock()  # 동시 갱신 1건
+        self.loads = 0
+        self.refresh_failures = 0
+        self.last_error: Optional[str] = None
+
+    # ------------------------------------------------------------
+    # Supabase 클라이언트 (프로세스당 1개)
+    # ------------------------------------------------------------
+
+    def client(self):
+        """공유 Supabase 클라이언트 (자격 증명이 없으면 None, 생성 실패는 예외 전파)"""
+        if not self._client_ready:
+            with self._lock:
+                if not self._client_ready:
+                    url = os.getenv('SUPABASE_URL')
+                    key = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_SERVICE_KEY')
+                    self._client = create_client(url, key) if url and key else None
+                    self._client_ready = True
+        return self._client
+
+    # ------------------------------------------------------------
+    # 정의 조회
+    # ------------------------------------------------------------
+
+    def definitions(self) -> Dict[str, Dict[str, Any]]:
+        """현재 정의 {이름: 행} (최초 호출 시 로드, TTL 경과 시 백그라운드 갱신)"""
+        if not self._loaded:
+            self._initial_load()
+        elif self.ttl_seconds > 0 and time.time() - self.loaded_at > self.ttl_seconds and self._safe_client() is not None:
+            self._refresh_in_background()
+        return self._definitions
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.definitions().get(name)
+
+    def has_snapshot(self) -> bool:
+        return os.path.isfile(self.snapshot_path)
+
+    def view(self) -> 'CatalogView':
+        """계산기 인스턴스용 매핑 (읽기는 카탈로그, 쓰기는 인스턴스 전용 덮어쓰기)"""
+        return CatalogView(self)
+
+    def _safe_client(self):
+        try:
+            return self.client()
+        except Exception as e:
+            self.last_error = f"client: {e}"
+            return None
+
+    def _initial_load(self):
+        with self._load_lock:
+            if self._loaded:
+                return
+            client = self._safe_client()
+            # 스냅샷: 명시 경로는 항상, 기본 경로는 Supabase 연결이 있을 때만 (빠른 시작 후 TTL 갱신)
+            if (self.explicit_snapshot or client is not None) and self.has_snapshot():
+                try:
+                    rows = read_snapshot(self.snapshot_path)
+                    self._install(_active_by_name(rows), 'snapshot', os.path.getmtime(self.snapshot_path))
+                    self._loaded = True
+                    print(f"[Catalog] Loaded {len(self._definitions)} indicators from snapshot {self.snapshot_path}")
+                    return
+                except Exception as e:
+                    self.last_error = f"snapshot: {e}"
+                    print(f"[Catalog] Failed to read snapshot {self.snapshot_path}: {e}")
+            if client is not None:
+                self.refresh()
+            self._loaded = True
+
+    def _install(self, definitions: Dict[str, Dict[str, Any]], source: str, loaded_at: Optional[float] = None):
+        version = _definitions_version(definitions)
+        # 딕셔너리 교체 (읽는 쪽은 락 없이 이전/새 정의 중 하나를 온전히 봄)
+        self._definitions = definitions
+        self.version = version
+        self.source = source
+        self.loaded_at = time.time() if loaded_at is None else loaded_at
+        self.loads += 1
+
+    # ------------------------------------------------------------
+    # 갱신
+    # ------------------------------------------------------------
+
+    def refresh(self) -> bool:
+        """Supabase에서 활성 지표 전체를 다시 로드 (실패 시 기존 정의 유지)"""
+        client = self._safe_client()
+        if client is None:
+            return False
+        with self._refreshing:
+            try:
+                response = client.table('indicators').select('*').eq('is_active', True).execute()
+                rows = response.data or []
+            except Exception as e:
+                self.refresh_failures += 1
+                self.last_error = f"refresh: {e}"
+                self.loaded_at = time.time()  # 실패해도 다음 TTL까지 재시도하지 않음
+                print(f"[Catalog] Failed to load indicators: {e}")
+                return False
+            previous = self.version
+            self._install(_active_by_name(rows), 'supabase')
+            if self.version != previous:
+                print(f"[Catalog] Loaded {len(self._definitions)} indicators from database (version {self.version})")
+            self.save_snapshot(rows)
+            return True
+
+    def _refresh_in_background(self):
+        if self._refreshing.locked():
+            return
+        self.loaded_at = time.time()  # 같은 주기에 스레드 중복 생성 방지
+        threading.Thread(target=self.refresh, name='indicator-catalog-refresh', daemon=True).start()
+
+    def invalidate(self) -> Dict[str, Any]:
+        """즉시 다시 로드 (Supabase 연결이 없으면 스냅샷을 다시 읽음)"""
+        if not self.refresh():
+            self._loaded = False
+            self._initial_load()
+        return self.stats()
+
+    def save_snapshot(self, rows: List[Dict[str, Any]]) -> bool:
+        """Supabase 로드 결과를 JSON 스냅샷으로 저장 (Parquet 경로 지정 시에는 읽기 전용)"""
+        if self.snapshot_path.endswith('.parquet'):
+            return False
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or '.', exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(rows, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self.snapshot_path)
+            return True
+        except Exception as e:
+            print(f"[Catalog] Failed to write snapshot {self.snapshot_path}: {e}")
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'indicators': len(self._definitions),
+            'version': self.version,
+            'source': self.source,
+            'loaded_at': datetime.fromtimestamp(self.loaded_at).isoformat() if self.loaded_at else None,
+            'ttl_seconds': self.ttl_seconds,
+            'snapshot_path': self.snapshot_path,
+            'loads': self.loads,
+            'refresh_failures': self.refresh_failures,
+            'last_error': self.last_error
+        }
+
+
+class CatalogView(MutableMapping):
+    """카탈로그 정의 + 인스턴스 전용 덮어쓰기 (기존 indicators_cache dict 사용처 호환)"""
+
+    def __init__(self, catalog: IndicatorCatalog):
+        self.catalog = catalog
+        self.overrides: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def version(self) -> str:
+        return self.catalog.version
+
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        if name in self.overrides:
+            return self.overrides[name]
+        return self.catalog.definitions()[name]
+
+    def __setitem__(self, name: str, definition: Dict[str, Any]):
+        self.overrides[name] = definition
+
+    def __delitem__(self, name: str):
+        del self.overrides[name]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.overrides
+        for name in self.catalog.definitions():
+            if name not in self.overrides:
+                yield name
+
+    def __len__(self) -> int:
+        return len(set(self.overrides) | set(self.catalog.definitions()))
+
+
+indicator_catalog = IndicatorCatalog()
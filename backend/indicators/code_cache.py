@@ -0,0 +1,100 @@
+"""
+지표 코드 객체 캐시
+- Supabase indicators 테이블의 수식/코드를 AST 검증 + compile()한 결과를 프로세스 전역으로 보관
+- 키는 소스 해시이므로 정의가 수정되면(새 버전) 자동으로 새 항목이 생성됨
+- 검증 실패도 기록해 같은 코드를 매번 다시 파싱하지 않음
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from types import CodeType
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_MAX_ENTRIES = 512
+
+_REJECTED = object()  # 검증 실패 표시
+
+
+class CompiledCodeCache:
+    """소스 해시 → 코드 객체 LRU 캐시 (스레드 안전)"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Any]' = OrderedDict()  # 코드 객체 또는 _REJECTED
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    @staticmethod
+    def make_key(source: str, validated: bool) -> str:
+        """검증 여부 + 소스의 SHA-256"""
+        prefix = 'v' if validated else 'u'
+        return f"{prefix}:{hashlib.sha256(source.encode('utf-8')).hexdigest()}"
+
+    def get(
+        self,
+        source: str,
+        validator: Optional[Callable[[str], bool]] = None,
+        validate_source: Optional[str] = None,
+        filename: str = '<indicator>'
+    ) -> Optional[CodeType]:
+        """
+        검증/컴파일된 코드 객체 조회 (미스 시 1회 검증 + 컴파일)
+
+        Args:
+            source: exec할 소스
+            validator: AST 검증 함수 (None이면 검증 생략)
+            validate_source: 검증 대상 소스 (기본값: source)
+            filename: 트레이스백에 표시될 이름
+
+        Returns:
+            코드 객체, 검증 실패 시 None
+
+        Raises:
+            SyntaxError: 컴파일 실패 (캐시하지 않음)
+        """
+        key = self.make_key(source, validator is not None)
+        with self._lock:
+            code = self._entries.get(key)
+            if code is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return None if code is _REJECTED else code
+            self.misses += 1
+
+        # 검증/컴파일은 락 밖에서 (같은 코드가 동시에 들어오면 중복 컴파일될 수 있으나 결과는 동일)
+        if validator is not None and not validator(validate_source if validate_source is not None else source):
+            code = _REJECTED
+        else:
+            code = compile(source, filename, 'exec')
+
+        with self._lock:
+            if code is _REJECTED:
+                self.rejected += 1
+            self._entries[key] = code
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return None if code is _REJECTED else code
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'rejected': self.rejected,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0
+            }
+
+
+code_cache = CompiledCodeCache()
@@ -0,0 +1,167 @@
+"""
+지표 중간 시계열 의존성 그래프 (DAG)
+- EMA n, SMA n, rolling std n, rolling max/min n, Wilder 평활, true range, typical price를 노드로 관리
+- 노드는 (종류, 입력, 파라미터) 키로 식별되며 한 종목/한 전략 평가 동안 한 번만 계산
+  예) MACD(12,26,9) + EMA12 + EMA26 → ema(close,12), ema(close,26) 노드를 공유
+      볼린저(20) + SMA20 → sma(close,20) 노드를 공유, ATR + ADX → true_range / wilder 노드를 공유
+- 입력이 다른 노드인 경우(예: wilder(true_range)) 의존 노드를 먼저 계산 (재귀 = 위상 순서)
+- DB 지표 정의는 formula.dependencies(또는 dependencies)에 노드 이름을 선언해 사용
+  예) "dependencies": ["ema_12", "ema_26", "std_20:close", "true_range"]
+"""
+
+import re
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+NodeKey = Tuple[Hashable, ...]
+
+# 선언형 노드 이름: <종류>_<기간>[:<입력 컬럼>] 또는 파라미터 없는 노드
+_SPEC_PATTERN = re.compile(r'^(?P<kind>[a-z]+)_(?P<period>\d+)(?::(?P<source>[a-z_]+))?$')
+_PERIOD_KINDS = {
+    'sma': 'sma', 'ma': 'sma', 'ema': 'ema', 'std': 'std', 'max': 'max', 'min': 'min',
+    'wilder': 'wilder', 'atr': 'wilder'
+}
+_PLAIN_NODES = {'true_range', 'typical_price'}
+
+
+class IndicatorGraph:
+    """
+    한 종목 가격 프레임에 대한 중간 시계열 그래프
+
+    각 노드 메서드는 같은 키로 다시 호출되면 계산된 Series를 그대로 반환
+    (반환값은 여러 지표가 공유하므로 호출자가 제자리 수정하면 안 됨)
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._nodes: Dict[NodeKey, pd.Series] = {}
+        self.edges: Dict[NodeKey, List[NodeKey]] = {}  # 노드 → 의존 노드
+        self.hits = 0
+        self.misses = 0
+
+    # === 그래프 기본 연산 ===
+
+    def _node(self, key: NodeKey, inputs: List[NodeKey], build: Callable[..., pd.Series]) -> pd.Series:
+        series = self._nodes.get(key)
+        if series is not None:
+            self.hits += 1
+            return series
+        self.misses += 1
+        self.edges[key] = inputs
+        series = build(*[self._resolve(k) for k in inputs])
+        self._nodes[key] = series
+        return series
+
+    def _resolve(self, key: NodeKey) -> pd.Series:
+        if key[0] == 'column':
+            return self.df[key[1]]
+        series = self._nodes.get(key)
+        if series is None:
+            raise KeyError(f"Intermediate node not computed: {key}")
+        return series
+
+    def _source(self, source: Any) -> NodeKey:
+        """입력 지정: 컬럼 이름, 파라미터 없는 노드 이름(true_range 등) 또는 다른 노드 키"""
+        if isinstance(source, tuple):
+            return source
+        if source in _PLAIN_NODES:
+            if (source,) not in self._nodes:
+                getattr(self, source)()
+            return (source,)
+        return ('column', source)
+
+    # === 노드 ===
+
+    def sma(self, window: int, source: Any = 'close', min_periods: Optional[int] = None) -> pd.Series:
+        mp = window if min_periods is None else min_periods
+        src = self._source(source)
+        return self._node(('sma', src, window, mp), [src],
+                          lambda s: s.rolling(window=window, min_periods=mp).mean())
+
+    def ema(self, span: int, source: Any = 'close', min_periods: Optional[int] = None) -> pd.Series:
+        mp = span if min_periods is None else min_periods
+        src = self._source(source)
+        return self._node(('ema', src, span, mp), [src],
+                          lambda s: s.ewm(span=span, min_periods=mp, adjust=False).mean())
+
+    def rolling_std(self, window: int, source: Any = 'close', min_periods: Optional[int] = None,
+                    ddof: int = 0) -> pd.Series:
+        mp = window if min_periods is None else min_periods
+        src = self._source(source)
+        return self._node(('std', src, window, mp, ddof), [src],
+                          lambda s: s.rolling(window=window, min_periods=mp).std(ddof=ddof))
+
+    def rolling_max(self, window: int, source: Any = 'high', min_periods: Optional[int] = None) -> pd.Series:
+        mp = window if min_periods is None else min_periods
+        src = self._source(source)
+        return self._node(('max', src, window, mp), [src],
+                          lambda s: s.rolling(window=window, min_periods=mp).max())
+
+    def rolling_min(self, window: int, source: Any = 'low', min_periods: Optional[int] = None) -> pd.Series:
+        mp = window if min_periods is None else min_periods
+        src = self._source(source)
+        return self._node(('min', src, window, mp), [src],
+                          lambda s: s.rolling(window=window, min_periods=mp).min())
+
+    def wilder(self, period: int, source: Any = 'true_range', min_periods: Optional[int] = None) -> pd.Series:
+        """Wilder 평활 (alpha=1/period). source='true_range'이면 ATR"""
+        mp = period if min_periods is None else min_periods
+        src = self._source(source)
+        return self._node(('wilder', src, period, mp), [src],
+                          lambda s: s.ewm(alpha=1 / period, min_periods=mp, adjust=False).mean())
+
+    def true_range(self) -> pd.Series:
+        inputs = [('column', 'high'), ('column', 'low'), ('column', 'close')]
+
+        def build(high, low, close):
+            prev_close = close.shift(1)
+            # NaN을 건너뛰는 원소별 최댓값 (Series와 열=종목 DataFrame 모두 지원)
+            return np.fmax(np.fmax(high - low, (high - prev_close).abs()), (low - prev_close).abs())
+
+        return self._node(('true_range',), inputs, build)
+
+    def typical_price(self) -> pd.Series:
+        inputs = [('column', 'high'), ('column', 'low'), ('column', 'close')]
+        return self._node(('typical_price',), inputs, lambda high, low, close: (high + low + close) / 3)
+
+    # === 선언형 의존성 (DB 지표 정의) ===
+
+    def node(self, spec: str) -> pd.Series:
+        """노드 이름으로 조회: 'ema_12', 'sma_20', 'std_20:close', 'max_9:high', 'atr_14', 'true_range' 등"""
+        name = spec.strip().lower()
+        if name in _PLAIN_NODES:
+            return getattr(self, name)()
+
+        match = _SPEC_PATTERN.match(name)
+        if not match or match.group('kind') not in _PERIOD_KINDS:
+            raise ValueError(f"Unknown intermediate node: {spec}")
+
+        kind = _PERIOD_KINDS[match.group('kind')]
+        period = int(match.group('period'))
+        source = match.group('source')
+        default_source = {'max': 'high', 'min': 'low', 'wilder': 'true_range'}.get(kind, 'close')
+        method = {'sma': self.sma, 'ema': self.ema, 'std': self.rolling_std,
+                  'max': self.rolling_max, 'min': self.rolling_min, 'wilder': self.wilder}[kind]
+        return method(period, source or default_source)
+
+    def resolve_dependencies(self, specs: List[str]) -> Dict[str, pd.Series]:
+        """선언된 의존성 목록 → {노드 이름: Series}"""
+        return {spec: self.node(spec) for spec in specs}
+
+    def stats(self) -> Dict[str, int]:
+        return {'nodes': len(self._nodes), 'hits': self.hits, 'misses': self.misses}
+
+
+def declared_dependencies(definition: Dict[str, Any], formula: Any = None) -> List[str]:
+    """지표 정의/수식에 선언된 중간 시계열 의존성 목록"""
+    specs = None
+    if isinstance(formula, dict):
+        specs = formula.get('dependencies')
+    if specs is None and isinstance(definition, dict):
+        specs = definition.get('dependencies')
+    if isinstance(specs, str):
+        specs = [s for s in specs.split(',') if s.strip()]
+    return [str(s).strip() for s in (specs or [])]
+
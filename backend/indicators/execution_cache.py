@@ -0,0 +1,122 @@
+"""
+지표 계산 결과 캐시 (크기 제한 LRU)
+- 키: 지표 이름/옵션/파라미터/종목 + 입력 OHLCV 버퍼와 인덱스의 BLAKE2b 해시
+  → 장중 실시간 병합으로 마지막 봉 종가만 바뀌어도 새 키가 되어 오래된 값을 반환하지 않음
+- 결과 Series 바이트 수를 누적해 INDICATOR_CACHE_MAX_MB를 넘으면 오래된 항목부터 제거
+- hits / misses / evictions / resident_bytes를 노출해 전체 종목(약 2,500개) 기준 크기 산정에 사용
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+MAX_MB_ENV = 'INDICATOR_CACHE_MAX_MB'
+MAX_ENTRIES_ENV = 'INDICATOR_CACHE_MAX_ENTRIES'
+DEFAULT_MAX_MB = 256
+DEFAULT_MAX_ENTRIES = 50_000
+
+FINGERPRINT_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def frame_fingerprint(df: pd.DataFrame, columns: Iterable[str] = FINGERPRINT_COLUMNS) -> str:
+    """인덱스 + OHLCV 버퍼 내용 해시 (2,500봉 기준 약 0.1ms)"""
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(str(len(df)).encode())
+    if isinstance(df.index, pd.DatetimeIndex):
+        hasher.update(np.ascontiguousarray(df.index.asi8))
+    else:
+        hasher.update(pd.util.hash_pandas_object(df.index, index=False).to_numpy())
+    for col in columns:
+        if col in df.columns:
+            hasher.update(col.encode())
+            hasher.update(np.ascontiguousarray(df[col].to_numpy(dtype=np.float64)))
+    return hasher.hexdigest()
+
+
+def result_nbytes(result: Any) -> int:
+    """IndicatorResult 출력 컬럼 바이트 수 (인덱스는 입력 프레임과 공유하므로 제외)"""
+    columns = getattr(result, 'columns', None) or {}
+    return int(sum(series.memory_usage(index=False, deep=False) for series in columns.values()))
+
+
+class IndicatorExecutionCache:
+    """바이트 수 기준 LRU 캐시 (스레드 안전)"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()  # 키 → (값, 바이트 수)
+        self._lock = threading.Lock()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> 'IndicatorExecutionCache':
+        """INDICATOR_CACHE_MAX_MB / INDICATOR_CACHE_MAX_ENTRIES 환경변수로 생성"""
+        try:
+            max_mb = float(os.getenv(MAX_MB_ENV, DEFAULT_MAX_MB))
+        except ValueError:
+            max_mb = DEFAULT_MAX_MB
+        try:
+            max_entries = int(os.getenv(MAX_ENTRIES_ENV, DEFAULT_MAX_ENTRIES))
+        except ValueError:
+            max_entries = DEFAULT_MAX_ENTRIES
+        return cls(max_bytes=int(max_mb * 1024 * 1024), max_entries=max_entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, result: Any):
+        size = result_nbytes(result)
+        with self._lock:
+            if size > self.max_bytes or self.max_entries <= 0:
+                return  # 단일 결과가 한도를 넘으면 보관하지 않음
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.resident_bytes -= previous[1]
+            self._entries[key] = (result, size)
+            self.resident_bytes += size
+            while self._entries and (self.resident_bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.resident_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.resident_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'resident_bytes': self.resident_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+                'avg_entry_bytes': int(self.resident_bytes / len(self._entries)) if self._entries else 0
+            }
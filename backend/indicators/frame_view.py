@@ -0,0 +1,62 @@
+"""
+지표 입력 프레임 읽기 전용 뷰
+- 샌드박스 코드(수식/python_code/Supabase 코드)에 df.copy() 대신 원본 컬럼 메모리를 공유하는 뷰를 전달
+- 각 컬럼은 writeable=False인 NumPy 배열 뷰이므로 제자리 수정(df.loc[...] = x, fillna(inplace=True) 등)은
+  ValueError('assignment destination is read-only')로 실패하고 원본 데이터는 보호됨
+- 새 컬럼 추가/컬럼 교체(df['x'] = ...)는 뷰 프레임 객체에만 반영되어 호출자에게 영향 없음
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+READONLY_ERROR = 'read-only'
+
+
+def readonly_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """복사 없이 원본과 메모리를 공유하는 읽기 전용 DataFrame 생성"""
+    data: Dict[str, object] = {}
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, np.dtype):
+            view = series.to_numpy().view()
+            view.flags.writeable = False
+            data[col] = view
+        else:
+            # 확장 dtype(category, tz-aware 등)은 뷰를 만들 수 없어 해당 컬럼만 복사
+            data[col] = series.copy()
+    return pd.DataFrame(data, index=df.index, columns=df.columns, copy=False)
+
+
+def readonly_series(series: pd.Series) -> pd.Series:
+    """여러 지표가 공유하는 Series를 샌드박스 코드에 넘길 때 사용하는 읽기 전용 뷰"""
+    values = series.to_numpy().view()
+    values.flags.writeable = False
+    return pd.Series(values, index=series.index, name=series.name, copy=False)
+
+
+def is_readonly_error(error: Exception) -> bool:
+    """읽기 전용 뷰에 대한 제자리 수정 시도로 발생한 오류인지 (pandas가 다른 ValueError로 감싸는 경우 포함)"""
+    while error is not None:
+        if isinstance(error, ValueError) and READONLY_ERROR in str(error):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """프레임 데이터 크기 (복사 시 할당되는 바이트 수, 인덱스 제외)"""
+    return int(df.memory_usage(index=False, deep=False).sum())
+
+
+def owned_result(result):
+    """결과 Series가 입력 뷰를 그대로 참조하면 복사 (호출자가 결과를 수정할 수 있도록)"""
+    if isinstance(result, pd.Series):
+        values = result.to_numpy() if isinstance(result.dtype, np.dtype) else None
+        if values is not None and not values.flags.writeable:
+            return result.copy()
+        return result
+    if isinstance(result, dict):
+        return {key: owned_result(value) for key, value in result.items()}
+    return result
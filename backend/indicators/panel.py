@@ -0,0 +1,95 @@
+"""
+종목 x 날짜 패널 (유니버스 전체 일괄 지표 계산용)
+- 컬럼(open/high/low/close/volume)마다 행=날짜, 열=종목인 DataFrame
+- 상장 전/거래정지 등으로 종목 이력에 없는 날짜(빈 칸)는 계산 전에 종목별로 위로 압축(pack)하고 계산 후 제자리로 되돌림(unpack)
+  → rolling/ewm/diff/shift가 빈 칸을 봉으로 세지 않아 종목별 단독 계산과 같은 값
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+PANEL_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def _union_index(indexes: List[pd.Index]) -> pd.Index:
+    """종목별 날짜 인덱스 합집합 (정렬)"""
+    if indexes and all(isinstance(ix, pd.DatetimeIndex) and ix.tz is None for ix in indexes):
+        stamps = np.unique(np.concatenate([ix.as_unit('ns').asi8 for ix in indexes]))
+        return pd.DatetimeIndex(stamps.view('datetime64[ns]'))
+    index = pd.DatetimeIndex([])
+    for ix in indexes:
+        index = index.union(ix)
+    return index
+
+
+class SymbolPanel:
+    """컬럼별 (날짜 x 종목) 행렬 + 종목별 봉 존재 마스크"""
+
+    def __init__(self, columns: Dict[str, pd.DataFrame], mask: Optional[np.ndarray] = None):
+        close = columns['close']
+        self.columns = columns
+        self.index = close.index
+        self.symbols = list(close.columns)
+        # 기본: 종가가 있는 날짜를 해당 종목의 봉으로 간주
+        self.mask = close.notna().to_numpy() if mask is None else np.asarray(mask, dtype=bool)
+        self._order = None
+        self._packed = None
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], columns: Iterable[str] = PANEL_COLUMNS) -> 'SymbolPanel':
+        """종목별 OHLCV DataFrame → 패널 (날짜는 합집합, 종목 이력에 있는 행이 그 종목의 봉)"""
+        columns = list(columns)
+        index = _union_index([df.index for df in frames.values()])
+        symbols = list(frames)
+        mask = np.zeros((len(index), len(symbols)), dtype=bool)
+        matrix = np.full((len(columns), len(index), len(symbols)), np.nan)
+        for j, df in enumerate(frames.values()):
+            rows = index.get_indexer(df.index)
+            mask[rows, j] = True
+            present = np.array([i for i, col in enumerate(columns) if col in df.columns], dtype=np.intp)
+            if len(present):
+                block = df[[columns[i] for i in present]].to_numpy(dtype=np.float64)
+                matrix[present[:, None], rows[None, :], j] = block.T
+        data = {col: pd.DataFrame(matrix[i], index=index, columns=symbols) for i, col in enumerate(columns)}
+        return cls(data, mask)
+
+    @property
+    def has_gaps(self) -> bool:
+        """종목별 봉이 위쪽으로 모여 있지 않은 경우 (중간/앞쪽 빈 칸)"""
+        counts = self.mask.sum(axis=0)
+        return not np.array_equal(self.mask, np.arange(len(self.index))[:, None] < counts[None, :])
+
+    def packed(self) -> Dict[str, pd.DataFrame]:
+        """종목별 봉을 위로 압축한 컬럼 행렬 (인덱스는 봉 순번)"""
+        if self._packed is None:
+            if self.has_gaps:
+                self._order = np.argsort(~self.mask, axis=0, kind='stable')
+            self._packed = {}
+            for col, frame in self.columns.items():
+                values = frame.to_numpy(dtype=np.float64)
+                if self._order is not None:
+                    values = np.take_along_axis(values, self._order, axis=0)
+                self._packed[col] = pd.DataFrame(values, columns=self.symbols)
+        return self._packed
+
+    def unpack(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """압축 행렬 결과를 원래 날짜 위치로 되돌림 (봉이 없는 칸은 NaN)"""
+        values = frame.to_numpy(dtype=np.float64)
+        if self._order is not None:
+            restored = np.empty_like(values)
+            np.put_along_axis(restored, self._order, values, axis=0)
+            values = restored
+        values = np.where(self.mask, values, np.nan)
+        return pd.DataFrame(values, index=self.index, columns=self.symbols)
+
+    def split(self, outputs: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """결과 패널들 {컬럼명: 날짜 x 종목} → {종목: 그 종목 봉 날짜만 담은 DataFrame(열=컬럼명)}"""
+        names = list(outputs)
+        stacked = np.stack([outputs[name].to_numpy(dtype=np.float64) for name in names], axis=-1)
+        result = {}
+        for j, symbol in enumerate(self.symbols):
+            rows = self.mask[:, j]
+            result[symbol] = pd.DataFrame(stacked[rows, j, :], index=self.index[rows], columns=names)
+        return result
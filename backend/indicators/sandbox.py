@@ -4,9 +4,6 @@ DB 코드 실행을 안전하게 제한
 """
 
 import ast
-import signal
-import resource
-import multiprocessing as mp
 from typing import Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import pandas as pd
@@ -135,6 +132,11 @@ class EnhancedSecuritySandbox:
         Returns:
             네임스페이스 dict
         """
+        return dict(cls.create_safe_scope(params), df=df.copy())  # 원본 보호
+
+    @classmethod
+    def create_safe_scope(cls, params: Dict[str, Any]) -> Dict[str, Any]:
+        """df를 제외한 네임스페이스 (워커 프로세스로 전달, df는 워커에서 공유 메모리 뷰로 생성)"""
         return {
             # 빌트인 차단
             '__builtins__': {
@@ -146,7 +148,6 @@ class EnhancedSecuritySandbox:
             },
 
             # 데이터
-            'df': df.copy(),  # 원본 보호
             'params': params,
 
             # 라이브러리 (제한된 접근)
@@ -223,8 +224,9 @@ class EnhancedSecuritySandbox:
 class SafeExecutor:
     """안전한 코드 실행기 (타임아웃/메모리 제한 적용)"""
 
-    def __init__(self, limits: SandboxLimits = None):
+    def __init__(self, limits: SandboxLimits = None, pool=None):
         self.limits = limits or SandboxLimits()
+        self.pool = pool
 
     def execute(
         self,
@@ -234,7 +236,10 @@ class SafeExecutor:
         expected_columns: list
     ) -> Dict[str, pd.Series]:
         """
-        샌드박스 내에서 코드 실행
+        샌드박스 워커 프로세스에서 코드 실행
+
+        SIGALRM/RLIMIT_AS는 메인 스레드에서만 동작하고 서버 프로세스 전체에 적용되므로
+        제한은 워커 프로세스(sandbox_pool.SandboxWorkerPool) 안에서만 건다.
 
         Args:
             code: 실행할 Python 코드
@@ -250,6 +255,8 @@ class SafeExecutor:
             MemoryLimitError: 메모리 초과
             SandboxViolationError: 샌드박스 규칙 위반
         """
+        from .sandbox_pool import pool_for
+
         # 1. AST 검증
         is_valid, error_msg = EnhancedSecuritySandbox.validate_ast(code)
         if not is_valid:
@@ -258,57 +265,16 @@ class SafeExecutor:
         # 2. 입력 검증
         EnhancedSecuritySandbox.validate_input(df, self.limits)
 
-        # 3. 네임스페이스 생성
-        namespace = EnhancedSecuritySandbox.create_safe_namespace(df, params)
-
-        # 4. 타임아웃 설정 (Unix 계열만)
-        try:
-            # 타임아웃 시그널 설정 (Windows에서는 동작하지 않음)
-            signal.signal(signal.SIGALRM, self._timeout_handler)
-            signal.alarm(int(self.limits.timeout_seconds))
-
-            # 메모리 제한 설정 (Unix 계열만)
-            if hasattr(resource, 'RLIMIT_AS'):
-                try:
-                    max_bytes = self.limits.max_memory_mb * 1024 * 1024
-                    resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
-                except (ValueError, OSError) as e:
-                    logger.warning(f"Could not set memory limit: {e}")
-
-        except AttributeError:
-            # Windows - 타임아웃/메모리 제한 미지원 경고
-            logger.warning("Timeout/memory limits not available on Windows")
-
-        try:
-            # 5. 코드 실행
-            start_time = time.time()
-            exec(code, namespace)
-            execution_time = time.time() - start_time
-
-            # 타임아웃 수동 체크 (Windows용)
-            if execution_time > self.limits.timeout_seconds:
-                raise TimeoutError(
-                    f"Execution exceeded {self.limits.timeout_seconds}s "
-                    f"(took {execution_time:.2f}s)"
-                )
+        # 3. 워커에서 실행 (입력/결과 배열은 공유 메모리)
+        pool = self.pool or pool_for(self.limits)
+        start_time = time.time()
+        result = pool.run(
+            code, df, EnhancedSecuritySandbox.create_safe_scope(params),
+            filename='<sandbox>', timeout=self.limits.timeout_seconds
+        )
+        execution_time = time.time() - start_time
 
-        except TimeoutError:
-            raise
-        except MemoryError:
-            raise MemoryLimitError(
-                f"Memory limit exceeded: {self.limits.max_memory_mb}MB"
-            )
-        except Exception as e:
-            raise SandboxViolationError(f"Execution error: {type(e).__name__}: {str(e)}")
-        finally:
-            # 타임아웃 해제
-            try:
-                signal.alarm(0)
-            except AttributeError:
-                pass
-
-        # 6. 결과 추출 및 검증
-        result = namespace.get('result')
+        # 4. 결과 추출 및 검증
         if result is None:
             raise SandboxViolationError("Code did not set 'result' variable")
 
@@ -325,10 +291,6 @@ class SafeExecutor:
 
         return result
 
-    def _timeout_handler(self, signum, frame):
-        """타임아웃 핸들러"""
-        raise TimeoutError(f"Execution timed out after {self.limits.timeout_seconds}s")
-
 
 # ============================================================
 # 편의 함수
@@ -0,0 +1,595 @@
+"""
+샌드박스 지표 코드 실행용 상주 워커 프로세스 풀
+- signal.SIGALRM / resource.setrlimit(RLIMIT_AS)는 메인 스레드에서만 동작하고 서버 프로세스 전체의 주소 공간을 줄임
+  → uvicorn 워커 스레드에서는 타임아웃이 걸리지 않음
+- 워커 프로세스를 미리 띄워 두고(spawn), 각 워커가 자기 메인 스레드에서 타이머/메모리 제한을 적용
+  · 메모리: 워커 시작 시 현재 가상 메모리 + max_memory_mb로 RLIMIT_AS 설정 (워커에만 적용)
+  · 타임아웃: 워커 안 setitimer(ITIMER_REAL) → TimeoutError, 응답이 없으면 부모가 워커를 종료 후 재시작
+- 입력 컬럼/의존 시계열과 결과 배열은 슬롯별 공유 메모리 버퍼로 전달 (DataFrame pickle 없음)
+  · 워커는 공유 메모리 위 읽기 전용 뷰로 df를 만들고, 제자리 수정 코드는 복사본으로 한 번 더 실행
+  · 결과가 출력 버퍼보다 크면 워커가 임시 공유 메모리를 만들어 전달하고 부모가 버퍼를 키움
+- INDICATOR_SANDBOX_WORKERS 환경변수로 워커 수 지정 (미설정이면 min(2, CPU 수), 음수면 CPU 수)
+  · 0이면 프로세스 내 실행: inprocess_guard()로 메인 스레드 타이머만 적용 (메모리 제한 없음, 개발용)
+- setitimer가 없는 플랫폼(Windows)에서는 워커 타이머 없이 부모 쪽 종료 타임아웃만 적용
+"""
+
+import atexit
+import contextlib
+import hashlib
+import importlib
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+import types
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .frame_view import is_readonly_error
+from .sandbox import MemoryLimitError, SandboxLimits, SandboxViolationError, TimeoutError
+
+WORKERS_ENV = 'INDICATOR_SANDBOX_WORKERS'
+TIMEOUT_ENV = 'INDICATOR_SANDBOX_TIMEOUT'
+MEMORY_ENV = 'INDICATOR_SANDBOX_MAX_MB'
+
+ALIGN = 64
+MIN_BUFFER_BYTES = 1 << 20
+KILL_GRACE_SECONDS = 1.0  # 워커 타이머가 못 끊는 경우(C 확장 루프 등) 부모가 종료시키기까지 여유
+START_TIMEOUT_SECONDS = 60.0
+DEFAULT_WORKERS = 2
+ALLOWED_MODULES = {'pandas', 'numpy'}
+
+
+class _ModuleRef:
+    """네임스페이스의 모듈(pd/np) 참조 - 워커에서 다시 import"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+def _aligned(size: int) -> int:
+    return (size + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _numeric(values: np.ndarray) -> bool:
+    return isinstance(values, np.ndarray) and values.dtype.kind in 'fiubM' and not values.dtype.hasobject
+
+
+def _pack(arrays: List[np.ndarray], buffer: Optional[shared_memory.SharedMemory]) -> Tuple[List[Tuple[str, int, int]], int]:
+    """배열들을 버퍼에 연속 배치 → [(dtype, offset, 길이)], 필요한 바이트 수 (buffer가 작거나 None이면 쓰지 않음)"""
+    layout = []
+    offset = 0
+    for values in arrays:
+        layout.append((values.dtype.str, offset, len(values)))
+        offset += _aligned(values.nbytes)
+    if buffer is not None and offset <= buffer.size:
+        for values, (dtype, start, count) in zip(arrays, layout):
+            np.ndarray(count, dtype=dtype, buffer=buffer.buf, offset=start)[:] = values
+    return layout, offset
+
+
+def _view(buffer: shared_memory.SharedMemory, entry: Tuple[str, int, int]) -> np.ndarray:
+    """공유 메모리 위 읽기 전용 배열 뷰"""
+    dtype, offset, count = entry
+    values = np.ndarray(count, dtype=dtype, buffer=buffer.buf, offset=offset)
+    values.flags.writeable = False
+    return values
+
+
+def _encode_index(index: pd.Index, arrays: List[np.ndarray]) -> Any:
+    if isinstance(index, pd.DatetimeIndex):
+        arrays.append(index.as_unit('ns').asi8)
+        return ('datetime', len(arrays) - 1, str(index.tz) if index.tz is not None else None, index.name)
+    return ('object', index)
+
+
+def _decode_index(spec: Any, views: List[np.ndarray]) -> pd.Index:
+    if spec[0] == 'datetime':
+        _, position, tz, name = spec
+        index = pd.DatetimeIndex(views[position].view('datetime64[ns]'), name=name)
+        return index.tz_localize('UTC').tz_convert(tz) if tz else index
+    return spec[1]
+
+
+def _encode_series(series: pd.Series, index: pd.Index, arrays: List[np.ndarray]) -> Tuple:
+    """입력 인덱스와 같은 수치 Series는 배열로, 그 외는 pickle"""
+    values = series.to_numpy() if isinstance(series.dtype, np.dtype) else None
+    if values is not None and _numeric(values) and (series.index is index or series.index.equals(index)):
+        arrays.append(values)
+        return ('array', len(arrays) - 1, series.name)
+    return ('object', series)
+
+
+def _decode_series(spec: Tuple, index: pd.Index, views: List[np.ndarray]) -> pd.Series:
+    if spec[0] == 'array':
+        return pd.Series(views[spec[1]], index=index, name=spec[2], copy=False)
+    return spec[1]
+
+
+# ============================================================
+# 워커 프로세스
+# ============================================================
+
+def _virtual_memory_bytes() -> Optional[int]:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _apply_memory_limit(max_memory_mb: int):
+    """워커 프로세스에만 RLIMIT_AS 적용 (현재 사용량 + 예산)"""
+    try:
+        import resource
+    except ImportError:
+        return  # Windows
+    if not hasattr(resource, 'RLIMIT_AS') or not max_memory_mb:
+        return
+    baseline = _virtual_memory_bytes() or 0
+    limit = baseline + max_memory_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError) as e:
+        print(f"[SandboxPool] Could not set memory limit in worker: {e}")
+
+
+def _timeout_handler(signum, frame):
+    raise TimeoutError('Execution timed out')
+
+
+def _has_timer() -> bool:
+    import signal
+    return hasattr(signal, 'setitimer') and hasattr(signal, 'SIGALRM')
+
+
+@contextlib.contextmanager
+def inprocess_guard(timeout: float):
+    """
+    워커 풀을 끈 경우(INDICATOR_SANDBOX_WORKERS=0)의 프로세스 내 실행 가드 - 메인 스레드 타이머로 타임아웃
+
+    타이머를 걸 수 없는 환경(메인 스레드가 아님, setitimer 미지원)에서는 제한 없이 실행하지 않고 거부
+    """
+    import signal
+
+    if not _has_timer() or threading.current_thread() is not threading.main_thread():
+        raise SandboxViolationError(
+            f"In-process sandbox execution needs a main-thread timer; set {WORKERS_ENV} > 0 to use worker processes"
+        )
+    previous = signal.signal(signal.SIGALRM, _timeout_handler)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+class _Attachments:
+    """워커가 연 공유 메모리 (이름이 바뀌면 다시 연결)"""
+
+    def __init__(self):
+        self._open: Dict[str, shared_memory.SharedMemory] = {}
+
+    def get(self, name: str) -> shared_memory.SharedMemory:
+        buffer = self._open.get(name)
+        if buffer is None:
+            buffer = shared_memory.SharedMemory(name=name)
+            self._open[name] = buffer
+        return buffer
+
+    def keep(self, names: List[str]):
+        for name in list(self._open):
+            if name not in names:
+                try:
+                    self._open.pop(name).close()
+                except BufferError:
+                    pass  # 이전 작업 배열이 아직 참조 중 → 프로세스 종료 시 해제
+
+
+def _resolve_scope(scope: Dict[str, Any], index: pd.Index, views: List[np.ndarray]) -> Dict[str, Any]:
+    resolved = {}
+    for key, value in scope.items():
+        if isinstance(value, _ModuleRef):
+            if value.name not in ALLOWED_MODULES:
+                raise SandboxViolationError(f"Module not allowed in sandbox: {value.name}")
+            resolved[key] = importlib.import_module(value.name)
+        elif isinstance(value, tuple) and value and value[0] == '__series_dict__':
+            resolved[key] = {name: _decode_series(spec, index, views) for name, spec in value[1].items()}
+        else:
+            resolved[key] = value
+    return resolved
+
+
+def _run_job(job: Dict[str, Any], attachments: _Attachments, compiled: Dict[str, types.CodeType]):
+    """작업 1건 실행 → (상태, 내용)"""
+    import signal
+
+    source_key = hashlib.sha256(job['source'].encode('utf-8')).hexdigest()
+    code = compiled.get(source_key)
+    if code is None:
+        code = compile(job['source'], job['filename'], 'exec')
+        compiled[source_key] = code
+
+    in_buffer = attachments.get(job['in_buffer'])
+    out_buffer = attachments.get(job['out_buffer'])
+    attachments.keep([job['in_buffer'], job['out_buffer']])
+    views = [_view(in_buffer, entry) for entry in job['layout']]
+    index = _decode_index(job['index'], views)
+    scope = _resolve_scope(job['scope'], index, views)
+
+    def frame(copy: bool) -> pd.DataFrame:
+        data = {}
+        for col, spec in job['columns']:
+            series = _decode_series(spec, index, views)
+            data[col] = series.to_numpy().copy() if copy and spec[0] == 'array' else series.to_numpy()
+        return pd.DataFrame(data, index=index, columns=[col for col, _ in job['columns']], copy=False)
+
+    def run(df: pd.DataFrame):
+        namespace = dict(scope, df=df)
+        exec(code, namespace)
+        if job['call_kwargs'] is not None and 'calculate' in namespace:
+            return namespace['calculate'](df, **job['call_kwargs'])
+        return namespace.get('result')
+
+    timer = _has_timer()  # 없으면 부모가 timeout + KILL_GRACE_SECONDS 후 워커 종료
+    if timer:
+        signal.setitimer(signal.ITIMER_REAL, job['timeout'])
+    try:
+        try:
+            result = run(frame(copy=False))
+        except ValueError as e:
+            if not is_readonly_error(e):
+                raise
+            result = run(frame(copy=True))
+    finally:
+        if timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    # 결과 인코딩 (수치 Series → 출력 버퍼, 그 외 pickle)
+    arrays: List[np.ndarray] = []
+    if isinstance(result, pd.Series):
+        encoded = ('series', _encode_series(result, index, arrays))
+    elif isinstance(result, dict):
+        encoded = ('dict', {key: _encode_series(value, index, arrays) if isinstance(value, pd.Series) else ('object', value)
+                            for key, value in result.items()})
+    else:
+        encoded = ('object', result)
+
+    layout, needed = _pack(arrays, out_buffer)
+    overflow = None
+    if needed > out_buffer.size:
+        overflow = shared_memory.SharedMemory(create=True, size=max(needed, 1))
+        _pack(arrays, overflow)
+        overflow.close()
+    return {'result': encoded, 'layout': layout, 'overflow': overflow.name if overflow else None, 'needed': needed}
+
+
+def _worker_main(conn, max_memory_mb: int):
+    """워커 진입점: 제한 설정 후 작업 루프 (이 프로세스의 메인 스레드)"""
+    import signal
+
+    if _has_timer():
+        signal.signal(signal.SIGALRM, _timeout_handler)
+    _apply_memory_limit(max_memory_mb)
+    attachments = _Attachments()
+    compiled: Dict[str, types.CodeType] = {}
+    conn.send(('ready', os.getpid()))
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if job is None:
+            break
+        try:
+            reply = ('ok', _run_job(job, attachments, compiled))
+        except TimeoutError:
+            reply = ('timeout', f"Execution timed out after {job['timeout']}s")
+        except MemoryError:
+            reply = ('memory', f"Memory limit exceeded: {max_memory_mb}MB")
+        except Exception as e:
+            reply = ('error', f"{type(e).__name__}: {e}")
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # 결과를 pickle할 수 없는 경우 등
+            conn.send(('error', f"Result not transferable: {type(e).__name__}: {e}"))
+    attachments.keep([])
+
+
+# ============================================================
+# 부모 프로세스
+# ============================================================
+
+class _Slot:
+    """워커 1개 + 전용 입력/출력 공유 메모리"""
+
+    def __init__(self, context, max_memory_mb: int):
+        self.context = context
+        self.max_memory_mb = max_memory_mb
+        self.in_buffer: Optional[shared_memory.SharedMemory] = None
+        self.out_buffer: Optional[shared_memory.SharedMemory] = None
+        self.process = None
+        self.conn = None
+
+    def spawn(self):
+        parent_conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_worker_main, args=(child_conn, self.max_memory_mb), daemon=True, name='indicator-sandbox'
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def wait_ready(self, timeout: float):
+        if not self.conn.poll(timeout):
+            raise RuntimeError('Sandbox worker did not start')
+        status, _ = self.conn.recv()
+        if status != 'ready':
+            raise RuntimeError(f"Unexpected sandbox worker status: {status}")
+
+    def ensure_buffers(self, in_bytes: int, out_bytes: int):
+        if self.in_buffer is None or self.in_buffer.size < in_bytes:
+            self._replace('in_buffer', in_bytes)
+        if self.out_buffer is None or self.out_buffer.size < out_bytes:
+            self._replace('out_buffer', out_bytes)
+
+    def _replace(self, attr: str, size: int):
+        old = getattr(self, attr)
+        if old is not None:
+            old.close()
+            old.unlink()
+        setattr(self, attr, shared_memory.SharedMemory(create=True, size=max(MIN_BUFFER_BYTES, int(size * 1.5))))
+
+    def kill(self):
+        if self.process is not None and self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=5)
+        if self.conn is not None:
+            self.conn.close()
+
+    def close(self):
+        try:
+            if self.process is not None and self.process.is_alive():
+                self.conn.send(None)
+                self.process.join(timeout=2)
+        except (OSError, BrokenPipeError):
+            pass
+        self.kill()
+        for attr in ('in_buffer', 'out_buffer'):
+            buffer = getattr(self, attr)
+            if buffer is not None:
+                buffer.close()
+                buffer.unlink()
+                setattr(self, attr, None)
+
+
+class SandboxWorkerPool:
+    """상주 샌드박스 워커 풀 (스레드 안전, 동시 호출 수 = 워커 수)"""
+
+    def __init__(self, workers: int = 2, limits: Optional[SandboxLimits] = None):
+        self.workers = max(0, int(workers))
+        self.limits = limits or SandboxLimits()
+        self._context = mp.get_context('spawn')  # 스레드가 많은 서버 프로세스에서 fork 회피
+        self._idle: 'queue.Queue[_Slot]' = queue.Queue()
+        self._slots: List[_Slot] = []
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.jobs = 0
+        self.timeouts = 0
+        self.memory_errors = 0
+        self.errors = 0
+        self.restarts = 0
+        self.overflows = 0
+        self.busy_ms = 0.0
+
+    @classmethod
+    def from_env(cls) -> 'SandboxWorkerPool':
+        """
+        INDICATOR_SANDBOX_WORKERS / INDICATOR_SANDBOX_TIMEOUT / INDICATOR_SANDBOX_MAX_MB
+
+        워커 수 미설정/잘못된 값이면 min(2, CPU 수) - 0을 명시한 경우에만 프로세스 내 실행
+        """
+        defaults = SandboxLimits()
+        default_workers = min(DEFAULT_WORKERS, os.cpu_count() or 1)
+        try:
+            workers = int(os.getenv(WORKERS_ENV) or default_workers)
+            timeout = float(os.getenv(TIMEOUT_ENV, defaults.timeout_seconds))
+            max_mb = int(os.getenv(MEMORY_ENV, defaults.max_memory_mb))
+        except ValueError:
+            print("[SandboxPool] Invalid sandbox pool settings, using defaults")
+            workers, timeout, max_mb = default_workers, defaults.timeout_seconds, defaults.max_memory_mb
+        if workers < 0:
+            workers = os.cpu_count() or 1
+        return cls(workers, SandboxLimits(timeout_seconds=timeout, max_memory_mb=max_mb))
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._slots)
+
+    def start(self) -> 'SandboxWorkerPool':
+        """워커 프로세스 기동 (import까지 끝난 상태로 대기)"""
+        with self._lock:
+            if self._slots or not self.enabled:
+                return self
+            started = time.perf_counter()
+            slots = [_Slot(self._context, self.limits.max_memory_mb) for _ in range(self.workers)]
+            for slot in slots:
+                slot.spawn()
+            for slot in slots:
+                slot.wait_ready(START_TIMEOUT_SECONDS)
+                self._idle.put(slot)
+            self._slots = slots
+            atexit.register(self.close)
+        print(f"[SandboxPool] {self.workers} sandbox workers ready "
+              f"({(time.perf_counter() - started) * 1000:.0f}ms, timeout {self.limits.timeout_seconds}s, "
+              f"memory {self.limits.max_memory_mb}MB)")
+        return self
+
+    def close(self):
+        with self._lock:
+            slots, self._slots = self._slots, []
+            self._idle = queue.Queue()
+        for slot in slots:
+            slot.close()
+
+    def _restart(self, slot: _Slot):
+        slot.kill()
+        slot.spawn()
+        slot.wait_ready(START_TIMEOUT_SECONDS)
+        with self._stats_lock:
+            self.restarts += 1
+
+    def _encode(self, df: pd.DataFrame, scope: Dict[str, Any]) -> Tuple[List[np.ndarray], Dict[str, Any]]:
+        """df 컬럼/인덱스/Series 의존성 → 공유 메모리 배열 목록 + 작업 메타데이터"""
+        arrays: List[np.ndarray] = []
+        index = df.index
+        index_spec = _encode_index(index, arrays)
+        columns = [(col, _encode_series(df[col], index, arrays)) for col in df.columns]
+        encoded_scope = {}
+        for key, value in scope.items():
+            if isinstance(value, types.ModuleType):
+                encoded_scope[key] = _ModuleRef(value.__name__)
+            elif isinstance(value, dict) and value and all(isinstance(v, pd.Series) for v in value.values()):
+                encoded_scope[key] = ('__series_dict__', {name: _encode_series(v, index, arrays) for name, v in value.items()})
+            else:
+                encoded_scope[key] = value
+        return arrays, {'index': index_spec, 'columns': columns, 'scope': encoded_scope}
+
+    def run(self, source: str, df: pd.DataFrame, scope: Dict[str, Any], filename: str = '<indicator>',
+            call_kwargs: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+        """
+        워커 프로세스에서 source 실행 → result (또는 calculate(df, **call_kwargs)) 반환
+
+        Args:
+            source: 검증이 끝난 코드 (워커에서 compile, 워커별 캐시)
+            df: 입력 프레임 (수치 컬럼은 공유 메모리로 전달)
+            scope: 실행 네임스페이스 (모듈은 이름으로, Series dict는 공유 메모리로 전달)
+            call_kwargs: None이 아니면 코드가 정의한 calculate(df, **call_kwargs) 호출
+
+        Raises:
+            TimeoutError / MemoryLimitError / SandboxViolationError
+        """
+        if not self.started:
+            self.start()
+        timeout = self.limits.timeout_seconds if timeout is None else timeout
+        arrays, meta = self._encode(df, scope)
+        _, in_bytes = _pack(arrays, None)
+        slot = self._idle.get()
+        started = time.perf_counter()
+        try:
+            slot.ensure_buffers(in_bytes, in_bytes * 2)
+            layout, _ = _pack(arrays, slot.in_buffer)
+            job = dict(meta, source=source, filename=filename, call_kwargs=call_kwargs, timeout=timeout,
+                       layout=layout, in_buffer=slot.in_buffer.name, out_buffer=slot.out_buffer.name)
+            try:
+                slot.conn.send(job)
+                ready = slot.conn.poll(timeout + KILL_GRACE_SECONDS)
+                reply = slot.conn.recv() if ready else None
+            except (EOFError, OSError) as e:
+                # 워커 비정상 종료 (C 레벨 메모리 초과 등)
+                self._restart(slot)
+                with self._stats_lock:
+                    self.errors += 1
+                raise SandboxViolationError(f"Sandbox worker exited: {e}")
+            if reply is None:
+                # 타이머로 끊기지 않는 코드 → 워커 종료 후 재시작
+                self._restart(slot)
+                with self._stats_lock:
+                    self.timeouts += 1
+                raise TimeoutError(f"Execution timed out after {timeout}s (worker restarted)")
+            return self._decode(slot, reply, df.index)
+        finally:
+            with self._stats_lock:
+                self.jobs += 1
+                self.busy_ms += (time.perf_counter() - started) * 1000
+            self._idle.put(slot)
+
+    def _decode(self, slot: _Slot, reply: Tuple[str, Any], index: pd.Index) -> Any:
+        status, payload = reply
+        if status != 'ok':
+            with self._stats_lock:
+                if status == 'timeout':
+                    self.timeouts += 1
+                elif status == 'memory':
+                    self.memory_errors += 1
+                else:
+                    self.errors += 1
+            if status == 'timeout':
+                raise TimeoutError(payload)
+            if status == 'memory':
+                raise MemoryLimitError(payload)
+            raise SandboxViolationError(f"Execution error: {payload}")
+
+        buffer = slot.out_buffer
+        if payload['overflow']:
+            buffer = shared_memory.SharedMemory(name=payload['overflow'])
+        try:
+            # 출력 버퍼는 다음 작업에 재사용되므로 복사
+            views = [np.array(_view(buffer, entry)) for entry in payload['layout']]
+        finally:
+            if payload['overflow']:
+                buffer.close()
+                buffer.unlink()
+        if payload['overflow']:
+            with self._stats_lock:
+                self.overflows += 1
+            slot.ensure_buffers(0, payload['needed'])
+
+        kind, encoded = payload['result']
+        if kind == 'series':
+            return _decode_series(encoded, index, views)
+        if kind == 'dict':
+            return {key: _decode_series(spec, index, views) for key, spec in encoded.items()}
+        return encoded
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                'enabled': self.enabled,
+                'workers': self.workers,
+                'started': self.started,
+                'alive': sum(1 for slot in self._slots if slot.process is not None and slot.process.is_alive()),
+                'timeout_seconds': self.limits.timeout_seconds,
+                'max_memory_mb': self.limits.max_memory_mb,
+                'jobs': self.jobs,
+                'timeouts': self.timeouts,
+                'memory_errors': self.memory_errors,
+                'errors': self.errors,
+                'restarts': self.restarts,
+                'overflows': self.overflows,
+                'avg_ms': round(self.busy_ms / self.jobs, 2) if self.jobs else 0.0
+            }
+
+
+sandbox_pool = SandboxWorkerPool.from_env()
+
+_limit_pools: Dict[int, SandboxWorkerPool] = {}
+_limit_pools_lock = threading.Lock()
+
+
+def pool_for(limits: SandboxLimits) -> SandboxWorkerPool:
+    """
+    limits의 메모리 제한으로 동작하는 풀 (SafeExecutor용)
+
+    전역 풀이 켜져 있고 메모리 제한이 같으면 공유, 아니면 메모리 제한별 풀을 만들어 재사용
+    (타임아웃은 작업마다 전달하므로 풀을 나누지 않음)
+    """
+    if sandbox_pool.enabled and sandbox_pool.limits.max_memory_mb == limits.max_memory_mb:
+        return sandbox_pool
+    with _limit_pools_lock:
+        pool = _limit_pools.get(limits.max_memory_mb)
+        if pool is None:
+            pool = SandboxWorkerPool(max(1, sandbox_pool.workers), limits)
+            _limit_pools[limits.max_memory_mb] = pool
+        return pool
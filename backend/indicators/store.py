@@ -0,0 +1,355 @@
+"""
+지표 값 디스크 저장소 (종목 x 지표 x 파라미터 단위 컬럼형 파일)
+- 일봉 이력은 하루 한 번만 바뀌므로 백테스트/신호 확인마다 전체 이력을 다시 계산하지 않도록 계산 결과를 보관
+- 파일: <INDICATOR_STORE_DIR>/<종목>/<항목 키>.npz
+  · 출력 컬럼별 float 배열 + 인덱스(ns) + manifest(JSON)를 한 파일에 저장 (tmp → os.replace로 원자적 교체)
+  · manifest: 원천 kw_price_daily 최대 trade_date, 첫 trade_date, 행 수, 수식 해시, 저장 구간 OHLCV 해시, 마지막 봉 값
+- 조회 시 저장 구간(마지막 봉 제외)의 OHLCV 해시가 같으면 재사용, 마지막 봉은 값/날짜가 같을 때만 재사용
+  (장중 현재가로 만든 임시 봉은 다음 조회에서 다시 계산, 마지막 봉만 바뀐 경우 파일은 다시 쓰지 않음)
+- 새 봉 꼬리 계산: 스트리밍 커널이 배치 결과와 비트 단위로 같은 지표(TAIL_KERNELS)만
+  manifest에 저장한 커널 상태(마지막 봉 직전)에서 이어 계산, 그 외 지표는 전체 재계산
+- 크기 제한: 저장 파일 합계가 INDICATOR_STORE_MAX_MB(기본 1024MB)를 넘으면 최근 사용(mtime) 순으로
+  오래된 파일부터 삭제해 80%까지 줄임 (조회 적중 시 mtime 갱신)
+- pyarrow가 의존성에 없어 Parquet/Feather 대신 NumPy npz 사용
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .execution_cache import FINGERPRINT_COLUMNS, frame_fingerprint
+from .streaming import INPUT_COLUMNS, StreamingKernel
+
+STORE_DIR_ENV = 'INDICATOR_STORE_DIR'
+STORE_ENABLED_ENV = 'INDICATOR_STORE_ENABLED'
+STORE_MAX_MB_ENV = 'INDICATOR_STORE_MAX_MB'
+DEFAULT_MAX_MB = 1024
+EVICT_TO = 0.8  # 제한 초과 시 이 비율까지 삭제
+DEFAULT_STORE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'indicator_store'
+)
+STORE_VERSION = 2
+
+# 저장 상태에서 꼬리를 이어 계산하는 커널 (streaming 커널 출력이 IndicatorRegistry 배치 결과와 비트 단위로 같음)
+# SMA/볼린저는 pandas rolling의 보정 누적합과 값이 ulp 단위로 달라 제외 → 새 봉이 오면 전체 재계산
+TAIL_KERNELS = ('ema', 'rsi', 'macd', 'atr', 'adx', 'obv')
+
+
+def _hash_json(payload: Any) -> str:
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _as_tuples(value: Any) -> Any:
+    """JSON 배열 → 커널 상태 튜플"""
+    return tuple(_as_tuples(item) for item in value) if isinstance(value, list) else value
+
+
+def _last_bar(df: pd.DataFrame, row: int) -> List[Optional[float]]:
+    values = []
+    for col in FINGERPRINT_COLUMNS:
+        value = float(df[col].iloc[row]) if col in df.columns else None
+        values.append(None if value is not None and np.isnan(value) else value)
+    return values
+
+
+class StoredIndicator:
+    """저장된 지표 한 항목 (manifest + 인덱스 + 출력 컬럼 배열)"""
+
+    def __init__(self, manifest: Dict[str, Any], index: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.manifest = manifest
+        self.index = index
+        self.columns = columns
+
+    @property
+    def rows(self) -> int:
+        return int(self.manifest['rows'])
+
+    def matching_rows(self, df: pd.DataFrame, formula_hash: str) -> int:
+        """df 앞부분과 일치해 재사용 가능한 행 수 (0이면 재사용 불가)"""
+        manifest = self.manifest
+        rows = self.rows
+        if (manifest.get('version') != STORE_VERSION or manifest.get('formula_hash') != formula_hash
+                or rows == 0 or rows > len(df) or len(self.index) != rows):
+            return 0
+        if df.index[0].value != self.index[0]:
+            return 0
+        if frame_fingerprint(df.iloc[:rows - 1]) != manifest['prefix_hash']:
+            return 0
+        if df.index[rows - 1].value == self.index[rows - 1] and _last_bar(df, rows - 1) == manifest['last_bar']:
+            return rows
+        return rows - 1  # 마지막 봉(장중 임시 봉 등)만 바뀜
+
+    def kernel_state(self, kernel: StreamingKernel) -> Optional[Any]:
+        """저장된 커널 상태 (마지막 봉 직전까지 반영, 같은 커널/기간일 때만)"""
+        saved = self.manifest.get('kernel')
+        if not saved or [saved.get('name'), saved.get('period')] != [kernel.name, kernel.period]:
+            return None
+        return _as_tuples(saved['state'])
+
+    def series(self, index: pd.Index, rows: int) -> Dict[str, pd.Series]:
+        return {name: pd.Series(values[:rows], index=index[:rows]) for name, values in self.columns.items()}
+
+
+class IndicatorStore:
+    """종목별 지표 값 파일 저장소"""
+
+    def __init__(self, directory: Optional[str] = None, enabled: Optional[bool] = None,
+                 max_bytes: Optional[int] = None):
+        self.directory = directory or os.getenv(STORE_DIR_ENV) or DEFAULT_STORE_DIR
+        if enabled is None:
+            enabled = os.getenv(STORE_ENABLED_ENV, 'true').lower() in ('true', '1', 'yes')
+        self.enabled = enabled
+        if max_bytes is None:
+            try:
+                max_bytes = int(float(os.getenv(STORE_MAX_MB_ENV, DEFAULT_MAX_MB)) * 1024 * 1024)
+            except ValueError:
+                max_bytes = DEFAULT_MAX_MB * 1024 * 1024
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._bytes: Optional[int] = None  # 저장 파일 합계 추정치 (첫 쓰기 때 디렉터리 스캔)
+        self._bytes_directory: Optional[str] = None
+        self.hits = 0
+        self.tail_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def entry_key(symbol: str, config: Dict[str, Any]) -> str:
+        """종목 + 지표 설정(이름/파라미터/realtime 등) 해시"""
+        return _hash_json({'symbol': symbol, 'config': config})[:32]
+
+    def _path(self, symbol: str, key: str) -> str:
+        safe_symbol = ''.join(ch if ch.isalnum() or ch in '-_' else '_' for ch in str(symbol))
+        return os.path.join(self.directory, safe_symbol, f"{key}.npz")
+
+    def load(self, symbol: str, key: str) -> Optional[StoredIndicator]:
+        try:
+            with np.load(self._path(symbol, key), allow_pickle=False) as data:
+                manifest = json.loads(str(data['__manifest__']))
+                index = data['__index__']
+                columns = {name: data[f"col_{i}"] for i, name in enumerate(manifest['columns'])}
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"[IndicatorStore] Failed to read {symbol}/{key[:12]}: {e}")
+            return None
+        return StoredIndicator(manifest, index, columns)
+
+    def touch(self, symbol: str, key: str):
+        """재사용한 항목의 mtime 갱신 (크기 제한 시 최근 사용 순서)"""
+        try:
+            os.utime(self._path(symbol, key))
+        except OSError:
+            pass
+
+    def save(self, symbol: str, key: str, df: pd.DataFrame, columns: Dict[str, pd.Series],
+             formula_hash: str, indicator: str, kernel: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        df 전체 구간의 지표 값 저장 (숫자/불리언 컬럼만, 그 외 dtype이면 저장하지 않음)
+
+        kernel: {'name', 'period', 'state'} 마지막 봉 직전 커널 상태 (꼬리 계산용, 없으면 전체 재계산 대상)
+        """
+        if df.empty:
+            return False
+        arrays = {}
+        for i, (name, series) in enumerate(columns.items()):
+            values = series.to_numpy() if isinstance(series, pd.Series) else np.asarray(series)
+            if len(values) != len(df) or values.dtype.kind not in 'fiub':
+                return False
+            arrays[f"col_{i}"] = values
+        manifest = {
+            'version': STORE_VERSION,
+            'symbol': symbol,
+            'indicator': indicator,
+            'formula_hash': formula_hash,
+            'columns': list(columns),
+            'rows': len(df),
+            'first_trade_date': df.index[0].isoformat(),
+            'max_trade_date': df.index[-1].isoformat(),
+            'prefix_hash': frame_fingerprint(df.iloc[:len(df) - 1]),
+            'last_bar': _last_bar(df, len(df) - 1),
+            'kernel': kernel,
+            'updated_at': datetime.now().isoformat()
+        }
+        path = self._path(symbol, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, __manifest__=np.array(json.dumps(manifest)),
+                         __index__=np.asarray(df.index.as_unit('ns').asi8, dtype=np.int64), **arrays)
+            written = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[IndicatorStore] Failed to write {symbol}/{key[:12]}: {e}")
+            return False
+        with self._lock:
+            self.writes += 1
+        if self._add_bytes(written - previous) > self.max_bytes:
+            self.evict()
+        return True
+
+    def _files(self) -> List[Tuple[float, int, str]]:
+        """저장 파일 [(mtime, 크기, 경로)]"""
+        files = []
+        if not os.path.isdir(self.directory):
+            return files
+        for name in os.listdir(self.directory):
+            directory = os.path.join(self.directory, name)
+            if not os.path.isdir(directory):
+                continue
+            for file_name in os.listdir(directory):
+                if file_name.endswith('.npz'):
+                    path = os.path.join(directory, file_name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _add_bytes(self, delta: int) -> int:
+        """저장 파일 합계 추정치 갱신 (디렉터리가 바뀌었거나 처음이면 스캔)"""
+        with self._lock:
+            if self._bytes is None or self._bytes_directory != self.directory:
+                self._bytes_directory = self.directory
+                self._bytes = sum(size for _, size, _ in self._files())
+            else:
+                self._bytes += delta
+            return self._bytes
+
+    def evict(self) -> int:
+        """합계가 max_bytes를 넘으면 최근 사용(mtime)이 오래된 파일부터 EVICT_TO 비율까지 삭제 → 삭제 수"""
+        with self._evict_lock:
+            files = sorted(self._files())
+            total = sum(size for _, size, _ in files)
+            removed = 0
+            if total > self.max_bytes:
+                target = self.max_bytes * EVICT_TO
+                for _, size, path in files:
+                    if total <= target:
+                        break
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        continue
+                    total -= size
+                    removed += 1
+            with self._lock:
+                self._bytes = total
+                self.evictions += removed
+        if removed:
+            print(f"[IndicatorStore] Evicted {removed} entries ({total / 1e6:.1f} MB kept, limit {self.max_bytes / 1e6:.0f} MB)")
+        return removed
+
+    def record(self, outcome: str):
+        with self._lock:
+            if outcome == 'hit':
+                self.hits += 1
+            elif outcome == 'tail':
+                self.tail_hits += 1
+            else:
+                self.misses += 1
+
+    def manifest(self, symbol: str) -> List[Dict[str, Any]]:
+        """종목의 저장 항목 manifest 목록"""
+        directory = os.path.dirname(self._path(symbol, 'x'))
+        if not os.path.isdir(directory):
+            return []
+        entries = []
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.npz'):
+                entry = self.load(symbol, name[:-4])
+                if entry is not None:
+                    entries.append(dict(entry.manifest, key=name[:-4]))
+        return entries
+
+    def clear(self, symbol: Optional[str] = None) -> int:
+        """저장 항목 삭제 (symbol 지정 시 해당 종목만)"""
+        if not os.path.isdir(self.directory):
+            return 0
+        symbols = [os.path.basename(os.path.dirname(self._path(symbol, 'x')))] if symbol else os.listdir(self.directory)
+        removed = 0
+        for name in symbols:
+            directory = os.path.join(self.directory, name)
+            if not os.path.isdir(directory):
+                continue
+            for file_name in os.listdir(directory):
+                if file_name.endswith('.npz'):
+                    os.remove(os.path.join(directory, file_name))
+                    removed += 1
+        with self._lock:
+            self._bytes = None
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'directory': self.directory,
+                'hits': self.hits,
+                'tail_hits': self.tail_hits,
+                'misses': self.misses,
+                'writes': self.writes,
+                'evictions': self.evictions,
+                'max_bytes': self.max_bytes
+            }
+
+
+def run_kernel(kernel: StreamingKernel, df: pd.DataFrame, start: int, state: Any) -> Tuple[Any, Dict[str, np.ndarray]]:
+    """
+    df의 start 행부터 끝까지 커널 실행
+
+    Returns:
+        (마지막 봉 직전 상태, 출력별 배열 [start, n))
+    """
+    offset = max(0, start - 1)  # 직전 봉(전일 종가/고가/저가) 참조용
+    inputs = {  # 파이썬 float 리스트 (numpy 스칼라 연산보다 빠르고 값은 같음)
+        col: (df[col].to_numpy(dtype=np.float64)[offset:] if col in df.columns
+              else np.full(len(df) - offset, np.nan)).tolist()
+        for col in INPUT_COLUMNS
+    }
+    base, values = state, []
+    for t in range(start - offset, len(df) - offset):
+        base = state
+        state, output = kernel.step(base, inputs, t)
+        values.append(output)
+    block = np.array(values, dtype=np.float64).reshape(len(values), len(kernel.outputs))
+    return base, {name: block[:, i] for i, name in enumerate(kernel.outputs)}
+
+
+def _as_json(value: Any) -> Any:
+    """커널 상태 튜플 → JSON 값 (numpy 스칼라는 파이썬 int/float로)"""
+    if isinstance(value, (tuple, list)):
+        return [_as_json(item) for item in value]
+    if isinstance(value, (bool, np.bool_, int, np.integer)):
+        return int(value)
+    return float(value)
+
+
+def kernel_manifest(kernel: StreamingKernel, state: Any) -> Dict[str, Any]:
+    """manifest['kernel'] 항목 (float는 repr 왕복으로 비트 단위 보존, NaN 포함)"""
+    return {'name': kernel.name, 'period': kernel.period, 'state': _as_json(state)}
+
+
+def splice(stored: StoredIndicator, computed: Dict[str, np.ndarray], index: pd.Index, start: int) -> Dict[str, pd.Series]:
+    """저장값 [0, start) + 꼬리 계산값 [start, n) 결합"""
+    result = {}
+    for name, values in stored.columns.items():
+        tail = computed[name]
+        combined = np.concatenate([values[:start], tail.astype(np.result_type(values.dtype, tail.dtype), copy=False)])
+        result[name] = pd.Series(combined, index=index)
+    return result
+
+
+indicator_store = IndicatorStore()
@@ -0,0 +1,492 @@
+"""
+실시간 봉 증분 지표 계산 (스트리밍 커널)
+- 실시간 신호 확인(check_strategy_signal / verify_all_strategies / StrategyService)은 마지막 봉을
+  추가하거나 덮어쓴 뒤 200봉 전체의 지표를 다시 계산함
+- 종목별 스트림이 입력 버퍼와 커널 상태(작은 튜플)를 보관하고, 마지막 봉 추가/수정 시 O(1)로 갱신
+  · 상태는 '마지막 봉 직전까지 확정된 상태(base)'와 '마지막 봉 반영 상태'로 나눠 보관
+    → 같은 봉의 현재가 갱신(revise)은 base에서 한 번만 다시 계산
+- 지원 커널: EMA, RSI(Wilder), MACD(12,26,9), ATR, ADX, OBV, SMA, 볼린저(Welford 누적 평균/분산)
+- EWM 커널은 pandas ewm(adjust=False, ignore_na=False) 점화식을 그대로 재현해 IndicatorRegistry 배치 결과와 일치
+- 첫 봉이 바뀌거나(조회 구간 이동) 봉 수가 맞지 않으면 해당 종목 스트림을 다시 시드(O(n), 하루 1회 수준)
+  마지막 봉 이전 봉은 확정 데이터로 간주 (중간 봉 정정은 감지하지 않음)
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+INPUT_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+DEFAULT_MAX_SYMBOLS = 5000
+
+NAN = float('nan')
+
+
+# ----------------------------------------------------------------------
+# pandas 호환 상태 전이 (순수 함수: 상태 튜플 → 새 상태 튜플)
+# ----------------------------------------------------------------------
+def span_alpha(span: float) -> float:
+    """ewm(span=...)과 같은 방식으로 alpha 계산 (center of mass 경유)"""
+    return 1.0 / (1.0 + (span - 1) / 2)
+
+
+def wilder_alpha(period: float) -> float:
+    """ewm(alpha=1/period)과 같은 방식으로 alpha 계산"""
+    alpha = 1 / period
+    return 1.0 / (1.0 + (1 - alpha) / alpha)
+
+
+EWM_START = (NAN, 1.0, 0)  # (weighted, old_wt, nobs)
+
+
+def ewm_step(state: Tuple[float, float, int], x: float, alpha: float, min_periods: int) -> Tuple[Tuple[float, float, int], float]:
+    """pandas ewm(adjust=False, ignore_na=False).mean() 한 단계"""
+    weighted, old_wt, nobs = state
+    is_observation = x == x
+    nobs += is_observation
+    if weighted == weighted:
+        old_wt *= 1.0 - alpha
+        if is_observation:
+            if weighted != x:
+                weighted = ((old_wt * weighted) + (alpha * x)) / (old_wt + alpha)
+            old_wt = 1.0
+    elif is_observation:
+        weighted = x
+    return (weighted, old_wt, nobs), (weighted if nobs >= max(min_periods, 1) else NAN)
+
+
+def rolling_step(state: Tuple[int, float, float], x: float, leaving: Optional[float]) -> Tuple[int, float, float]:
+    """Welford 누적 평균/제곱편차 (창 밖으로 나가는 값 제거 후 새 값 추가)"""
+    nobs, mean, ssqdm = state
+    if leaving is not None:
+        nobs -= 1
+        if nobs:
+            delta = leaving - mean
+            mean -= delta / nobs
+            ssqdm -= ((nobs + 1) * delta * delta) / nobs
+        else:
+            mean = ssqdm = 0.0
+    nobs += 1
+    delta = x - mean
+    mean += delta / nobs
+    ssqdm += ((nobs - 1) * delta * delta) / nobs
+    return nobs, mean, ssqdm
+
+
+class _Buffer:
+    """증가형 float 버퍼 (추가/마지막 값 수정 O(1), 조회는 뷰)"""
+
+    __slots__ = ('data', 'size')
+
+    def __init__(self, capacity: int = 256):
+        self.data = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+
+    def append(self, value: float):
+        if self.size == len(self.data):
+            grown = np.empty(len(self.data) * 2, dtype=np.float64)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+
+    def set_last(self, value: float):
+        self.data[self.size - 1] = value
+
+    def __getitem__(self, i: int) -> float:
+        return self.data[i]
+
+    def view(self) -> np.ndarray:
+        values = self.data[:self.size].view()
+        values.flags.writeable = False
+        return values
+
+
+# ----------------------------------------------------------------------
+# 커널: step(state, inputs, t) → (새 상태, 출력 튜플)
+# ----------------------------------------------------------------------
+class StreamingKernel:
+    """증분 지표 커널 기본형"""
+
+    name = ''
+    outputs: Tuple[str, ...] = ()
+
+    def __init__(self, period: int = 20):
+        self.period = period
+        self.min_periods = period
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return (self.name, self.period)
+
+    def initial(self) -> Any:
+        raise NotImplementedError
+
+    def step(self, state: Any, inputs: Dict[str, _Buffer], t: int) -> Tuple[Any, Tuple[float, ...]]:
+        raise NotImplementedError
+
+
+class EMAKernel(StreamingKernel):
+    name = 'ema'
+    outputs = ('ema',)
+
+    def initial(self):
+        return EWM_START
+
+    def step(self, state, inputs, t):
+        state, value = ewm_step(state, inputs['close'][t], span_alpha(self.period), self.min_periods)
+        return state, (value,)
+
+
+class SMAKernel(StreamingKernel):
+    name = 'sma'
+    outputs = ('sma',)
+
+    def initial(self):
+        return (0, 0.0, 0.0)
+
+    def _window(self, state, inputs, t):
+        leaving = inputs['close'][t - self.period] if t >= self.period else None
+        return rolling_step(state, inputs['close'][t], leaving)
+
+    def step(self, state, inputs, t):
+        state = self._window(state, inputs, t)
+        return state, (state[1] if state[0] >= self.min_periods else NAN,)
+
+
+class BollingerKernel(SMAKernel):
+    name = 'bb'
+    outputs = ('bb_upper', 'bb_middle', 'bb_lower')
+    std_mult = 2
+
+    def step(self, state, inputs, t):
+        state = self._window(state, inputs, t)
+        nobs, mean, ssqdm = state
+        if nobs < self.min_periods:
+            return state, (NAN, NAN, NAN)
+        std = float(np.sqrt(max(ssqdm, 0.0) / nobs)) if nobs > 1 else 0.0  # ddof=0
+        return state, (mean + std * self.std_mult, mean, mean - std * self.std_mult)
+
+
+class RSIKernel(StreamingKernel):
+    """RSI - Wilder (상태: 직전 종가, 평균 상승/하락 EWM)"""
+    name = 'rsi'
+    outputs = ('rsi',)
+
+    def initial(self):
+        return (EWM_START, EWM_START)
+
+    def step(self, state, inputs, t):
+        delta = inputs['close'][t] - inputs['close'][t - 1] if t > 0 else NAN
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        alpha = wilder_alpha(self.period)
+        gain_state, avg_gain = ewm_step(state[0], gain, alpha, self.min_periods)
+        loss_state, avg_loss = ewm_step(state[1], loss, alpha, self.min_periods)
+        rsi = NAN
+        if avg_loss == avg_loss and avg_loss != 0 and avg_gain == avg_gain:
+            rsi = min(max(100 - (100 / (1 + avg_gain / avg_loss)), 0.0), 100.0)
+        return (gain_state, loss_state), (rsi,)
+
+
+class MACDKernel(StreamingKernel):
+    """MACD(12, 26, 9) - IndicatorRegistry와 같이 기간 고정"""
+    name = 'macd'
+    outputs = ('macd_line', 'macd_signal', 'macd_hist')
+    fast, slow, signal = 12, 26, 9
+
+    def initial(self):
+        return (EWM_START, EWM_START, EWM_START)
+
+    def step(self, state, inputs, t):
+        close = inputs['close'][t]
+        fast_state, ema_fast = ewm_step(state[0], close, span_alpha(self.fast), self.fast)
+        slow_state, ema_slow = ewm_step(state[1], close, span_alpha(self.slow), self.slow)
+        macd_line = ema_fast - ema_slow
+        signal_state, macd_signal = ewm_step(state[2], macd_line, span_alpha(self.signal), self.signal)
+        return (fast_state, slow_state, signal_state), (macd_line, macd_signal, macd_line - macd_signal)
+
+
+def _true_range(inputs: Dict[str, _Buffer], t: int) -> float:
+    high, low = inputs['high'][t], inputs['low'][t]
+    if t == 0:
+        return high - low
+    prev_close = inputs['close'][t - 1]
+    ranges = [value for value in (high - low, abs(high - prev_close), abs(low - prev_close)) if value == value]
+    return float(max(ranges)) if ranges else NAN  # np.nanmax와 같음 (스칼라 3개에는 훨씬 빠름)
+
+
+class ATRKernel(StreamingKernel):
+    name = 'atr'
+    outputs = ('atr',)
+
+    def initial(self):
+        return EWM_START
+
+    def step(self, state, inputs, t):
+        state, atr = ewm_step(state, _true_range(inputs, t), wilder_alpha(self.period), self.min_periods)
+        return state, (atr,)
+
+
+class ADXKernel(StreamingKernel):
+    """ADX/DMI - Wilder (상태: ATR / +DM / -DM / DX 평활 EWM)"""
+    name = 'adx'
+    outputs = ('adx', 'plus_di', 'minus_di')
+
+    def initial(self):
+        return (EWM_START, EWM_START, EWM_START, EWM_START)
+
+    def step(self, state, inputs, t):
+        alpha = wilder_alpha(self.period)
+        if t > 0:
+            plus_dm = inputs['high'][t] - inputs['high'][t - 1]
+            minus_dm = -(inputs['low'][t] - inputs['low'][t - 1])
+            plus_dm = 0.0 if plus_dm < 0 else plus_dm
+            minus_dm = 0.0 if minus_dm < 0 else minus_dm
+            plus_dm = 0.0 if plus_dm < minus_dm else plus_dm
+            minus_dm = 0.0 if minus_dm < plus_dm else minus_dm
+        else:
+            plus_dm = minus_dm = NAN
+
+        atr_state, atr = ewm_step(state[0], _true_range(inputs, t), alpha, self.min_periods)
+        plus_state, plus_avg = ewm_step(state[1], plus_dm, alpha, 0)
+        minus_state, minus_avg = ewm_step(state[2], minus_dm, alpha, 0)
+        plus_di = 100 * (plus_avg / atr)
+        minus_di = 100 * (minus_avg / atr)
+        total = plus_di + minus_di
+        dx = 100 * (abs(plus_di - minus_di) / total) if total == total and total != 0 else NAN
+        dx_state, adx = ewm_step(state[3], dx, alpha, self.min_periods)
+        return (atr_state, plus_state, minus_state, dx_state), (adx, plus_di, minus_di)
+
+
+class OBVKernel(StreamingKernel):
+    name = 'obv'
+    outputs = ('obv',)
+
+    def initial(self):
+        return 0.0
+
+    def step(self, state, inputs, t):
+        if t > 0:
+            diff = inputs['close'][t] - inputs['close'][t - 1]
+            direction = 1 if diff > 0 else (-1 if diff < 0 else 0)
+            state = state + inputs['volume'][t] * direction
+        return state, (state,)
+
+
+KERNELS = {k.name: k for k in (
+    EMAKernel, SMAKernel, BollingerKernel, RSIKernel, MACDKernel, ATRKernel, ADXKernel, OBVKernel
+)}
+
+
+def make_kernel(name: str, period: int = 20) -> StreamingKernel:
+    return KERNELS[name](period)
+
+
+@dataclass(frozen=True)
+class StreamSpec:
+    """스트리밍 계산 요청: 커널 + 기간 + (커널 출력 → 전략 컬럼 이름)"""
+    kernel: str
+    period: int
+    columns: Tuple[Tuple[str, str], ...] = field(default=())
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return (self.kernel, self.period)
+
+
+# ----------------------------------------------------------------------
+# 종목 스트림 / 저장소
+# ----------------------------------------------------------------------
+class SymbolStream:
+    """한 종목의 입력 버퍼 + 커널별 (base 상태, 현재 상태, 출력 버퍼)"""
+
+    def __init__(self):
+        self.index: List[Any] = []
+        self.inputs = {col: _Buffer() for col in INPUT_COLUMNS}
+        self.kernels: Dict[Tuple[str, int], StreamingKernel] = {}
+        self._base: Dict[Tuple[str, int], Any] = {}
+        self._state: Dict[Tuple[str, int], Any] = {}
+        self._outputs: Dict[Tuple[str, int], List[_Buffer]] = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def add_kernel(self, kernel: StreamingKernel):
+        """커널 추가: 보관 중인 입력으로 처음부터 시드 (O(n), 커널당 1회)"""
+        key = kernel.key
+        self.kernels[key] = kernel
+        outputs = [_Buffer(max(len(self.index), 1) * 2) for _ in kernel.outputs]
+        base = state = kernel.initial()
+        for t in range(len(self.index)):
+            base = state
+            state, values = kernel.step(base, self.inputs, t)
+            for buffer, value in zip(outputs, values):
+                buffer.append(value)
+        self._base[key], self._state[key], self._outputs[key] = base, state, outputs
+
+    def append(self, timestamp: Any, bar: Sequence[float]):
+        """새 봉 추가: 직전 봉 상태를 확정하고 새 봉만 계산 (O(1))"""
+        self.index.append(timestamp)
+        for col, value in zip(INPUT_COLUMNS, bar):
+            self.inputs[col].append(value)
+        t = len(self.index) - 1
+        for key, kernel in self.kernels.items():
+            self._base[key] = self._state[key]
+            self._state[key], values = kernel.step(self._base[key], self.inputs, t)
+            for buffer, value in zip(self._outputs[key], values):
+                buffer.append(value)
+
+    def revise(self, bar: Sequence[float]):
+        """마지막 봉 값 수정 (현재가 갱신): 확정 상태에서 마지막 봉만 다시 계산 (O(1))"""
+        for col, value in zip(INPUT_COLUMNS, bar):
+            self.inputs[col].set_last(value)
+        t = len(self.index) - 1
+        for key, kernel in self.kernels.items():
+            self._state[key], values = kernel.step(self._base[key], self.inputs, t)
+            for buffer, value in zip(self._outputs[key], values):
+                buffer.set_last(value)
+
+    def last_bar(self) -> Tuple[float, ...]:
+        return tuple(self.inputs[col][len(self.index) - 1] for col in INPUT_COLUMNS)
+
+    def output(self, key: Tuple[str, int], name: str) -> np.ndarray:
+        kernel = self.kernels[key]
+        return self._outputs[key][kernel.outputs.index(name)].view()
+
+
+def _same_day(left: Any, right: Any) -> bool:
+    """같은 거래일인지 (시각 무시)"""
+    return pd.Timestamp(left).normalize() == pd.Timestamp(right).normalize()
+
+
+def _bars(df: pd.DataFrame) -> np.ndarray:
+    """OHLCV 행렬 (없는 컬럼은 NaN)"""
+    return np.column_stack([
+        df[col].to_numpy(dtype=np.float64) if col in df.columns else np.full(len(df), NAN)
+        for col in INPUT_COLUMNS
+    ])
+
+
+class StreamingIndicatorStore:
+    """종목별 스트림 LRU 저장소 (프로세스 전역, 스레드 안전)"""
+
+    def __init__(self, max_symbols: int = DEFAULT_MAX_SYMBOLS):
+        self.max_symbols = max_symbols
+        self._streams: 'OrderedDict[str, SymbolStream]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.appends = 0
+        self.revisions = 0
+        self.reseeds = 0
+
+    def _seed(self, df: pd.DataFrame, kernels: Sequence[StreamingKernel]) -> SymbolStream:
+        stream = SymbolStream()
+        for timestamp, bar in zip(df.index, _bars(df)):
+            stream.append(timestamp, bar)
+        for kernel in kernels:
+            stream.add_kernel(kernel)
+        self.reseeds += 1
+        return stream
+
+    def _sync(self, symbol: str, df: pd.DataFrame) -> SymbolStream:
+        """df(오래된 봉 → 최신 봉)에 스트림을 맞춤: 마지막 봉 수정 / 한 봉 추가 / 재시드"""
+        stream = self._streams.get(symbol)
+        n = len(df)
+        # 장중 임시 봉은 호출 시각이 찍힐 수 있으므로 마지막 봉은 거래일로 비교
+        aligned = (
+            stream is not None and len(stream) > 0 and stream.index[0] == df.index[0]
+            and (
+                (len(stream) == n and _same_day(stream.index[-1], df.index[-1]))
+                or (n > 1 and len(stream) == n - 1 and _same_day(stream.index[-1], df.index[-2]))
+            )
+        )
+        if not aligned:
+            kernels = list(stream.kernels.values()) if stream is not None else []
+            stream = self._seed(df, kernels)
+        else:
+            tail = _bars(df.iloc[-2:])
+            if len(stream) == n:
+                stream.index[-1] = df.index[-1]
+                if stream.last_bar() != tuple(tail[-1]):
+                    stream.revise(tail[-1])
+                    self.revisions += 1
+            else:
+                stream.index[-1] = df.index[-2]
+                if len(tail) == 2 and stream.last_bar() != tuple(tail[0]):
+                    stream.revise(tail[0])  # 직전 봉 확정값(일봉 종가) 반영
+                    self.revisions += 1
+                stream.append(df.index[-1], tail[-1])
+                self.appends += 1
+
+        self._streams[symbol] = stream
+        self._streams.move_to_end(symbol)
+        while len(self._streams) > self.max_symbols:
+            self._streams.popitem(last=False)
+        return stream
+
+    def columns(self, symbol: str, df: pd.DataFrame, specs: Sequence[StreamSpec]) -> Dict[str, pd.Series]:
+        """요청 지표들의 전체 컬럼 (출력 버퍼 복사본 - 이후 revise/append가 반환한 값을 바꾸지 않음)"""
+        if df.empty:
+            return {}
+        with self._lock:
+            stream = self._sync(symbol, df)
+            result = {}
+            for spec in specs:
+                if spec.key not in stream.kernels:
+                    stream.add_kernel(make_kernel(spec.kernel, spec.period))
+                for output, column in spec.columns:
+                    result[column] = pd.Series(stream.output(spec.key, output).copy(), index=df.index)
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._streams.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'symbols': len(self._streams),
+                'max_symbols': self.max_symbols,
+                'kernels': sum(len(s.kernels) for s in self._streams.values()),
+                'appends': self.appends,
+                'revisions': self.revisions,
+                'reseeds': self.reseeds
+            }
+
+
+def consistency_report(df: pd.DataFrame, registry, periods: Sequence[int] = (5, 14, 20)) -> Dict[str, float]:
+    """
+    스트리밍 커널 vs IndicatorRegistry 배치 결과 최대 상대 오차
+
+    Returns:
+        {'<커널>_<기간>.<출력>': 최대 상대 오차} (NaN 위치가 다르면 inf)
+    """
+    from .calculator import ExecOptions
+
+    report = {}
+    stream = SymbolStream()
+    for timestamp, bar in zip(df.index, _bars(df)):
+        stream.append(timestamp, bar)
+
+    for name in KERNELS:
+        for period in (periods if name not in ('macd', 'obv') else periods[:1]):
+            kernel = make_kernel(name, period)
+            stream.add_kernel(kernel)
+            batch = registry.execute(name, df, ExecOptions(period=period))
+            for output in kernel.outputs:
+                streamed = stream.output(kernel.key, output)
+                expected = batch[output].to_numpy(dtype=np.float64)
+                if not np.array_equal(np.isnan(streamed), np.isnan(expected)):
+                    report[f"{name}_{period}.{output}"] = float('inf')
+                    continue
+                mask = ~np.isnan(expected)
+                scale = np.maximum(np.abs(expected[mask]), 1.0)
+                error = np.abs(streamed[mask] - expected[mask]) / scale
+                report[f"{name}_{period}.{output}"] = float(error.max()) if error.size else 0.0
+    return report
+
+
+stream_store = StreamingIndicatorStore()
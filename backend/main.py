@@ -8,6 +8,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
 import os
 import sys
+import asyncio
 from dotenv import load_dotenv
 
 # 환경 변수 로드
@@ -58,6 +59,21 @@ async def startup_event():
     except Exception as e:
         print(f"[Warning] Failed to start market scheduler: {e}")
 
+    try:
+        # 지표 정의 카탈로그 선로드 (스냅샷 또는 Supabase 1회, 이후 요청은 메모리에서 조회)
+        from indicators.catalog import indicator_catalog
+        await asyncio.to_thread(indicator_catalog.definitions)
+    except Exception as e:
+        print(f"[Warning] Failed to load indicator catalog: {e}")
+
+    try:
+        # 샌드박스 워커를 미리 띄워 첫 지표 계산 지연 방지 (INDICATOR_SANDBOX_WORKERS=0이면 생략)
+        from indicators.sandbox_pool import sandbox_pool
+        if sandbox_pool.enabled:
+            await asyncio.to_thread(sandbox_pool.start)
+    except Exception as e:
+        print(f"[Warning] Failed to start sandbox workers: {e}")
+
 
 # Import Status Tracking
 import_status = {
@@ -0,0 +1,42 @@
+"""
+테스트용 일봉 OHLCV 생성기 (지표 테스트 공용)
+- 로그 정규 랜덤워크 종가 + 고가/저가 폭 + 거래량, 같은 seed면 항상 같은 프레임
+- 테스트마다 길이/seed/가격대만 다르게 지정해 사용
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def make_prices(
+    days: int = 250,
+    seed: int = 8,
+    start: str = '2024-01-01',
+    base: float = 100.0,
+    volatility: float = 0.01,
+    spread: float = 0.01,
+    random_spread: bool = False,
+    open_jitter: float = 0.0,
+    max_volume: int = 5000,
+    volume_dtype=float
+) -> pd.DataFrame:
+    """
+    랜덤워크 OHLCV 프레임 (영업일 인덱스)
+
+    Args:
+        spread: 고가/저가 폭 (random_spread=True면 봉마다 0~spread 균등분포)
+        open_jitter: 시가 = 종가 × (1 ± open_jitter 균등분포), 0이면 시가 = 종가
+        volume_dtype: 거래량 dtype (float: DB 조회 결과 형식, np.int64: 정수 거래량)
+    """
+    rng = np.random.default_rng(seed)
+    close = base * np.exp(np.cumsum(rng.normal(0, volatility, days)))
+    open_ = close * (1 + rng.uniform(-open_jitter, open_jitter, days)) if open_jitter else close
+    if random_spread:
+        high = close * (1 + rng.uniform(0, spread, days))
+        low = close * (1 - rng.uniform(0, spread, days))
+    else:
+        high, low = close * (1 + spread), close * (1 - spread)
+    return pd.DataFrame({
+        'open': open_, 'high': high, 'low': low, 'close': close,
+        'volume': rng.integers(1000, max_volume, days).astype(volume_dtype)
+    }, index=pd.bdate_range(start, periods=days))
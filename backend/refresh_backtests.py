@@ -0,0 +1,70 @@
+"""
+저장된 백테스트 일괄 연장 스크립트 (야간 배치)
+persist_state=True로 실행해 상태가 저장된 백테스트를 새 일봉까지 증분 연장
+
+사용법:
+  python refresh_backtests.py                      # 저장된 모든 백테스트를 오늘까지 연장
+  python refresh_backtests.py --end 2024-06-28     # 종료일 지정
+  python refresh_backtests.py --id <backtest_id>   # 특정 백테스트만
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(__file__))
+from backtest.engine import BacktestEngine
+from backtest.incremental import state_store
+
+load_dotenv()
+
+
+async def refresh(backtest_ids, end_date: str):
+    engine = BacktestEngine()
+    engine.monte_carlo_paths = 0  # 배치에서는 몬테카를로 분석 생략
+    summary = {'refreshed': [], 'skipped': [], 'failed': []}
+
+    for backtest_id in backtest_ids:
+        state = state_store.load(backtest_id)
+        if state is None:
+            summary['failed'].append(backtest_id)
+            continue
+        if state.end_date >= end_date:
+            summary['skipped'].append(backtest_id)
+            continue
+
+        started = time.perf_counter()
+        try:
+            result = await engine.extend(backtest_id, end_date)
+            elapsed = time.perf_counter() - started
+            print(f"[Refresh] {backtest_id}: {state.end_date} -> {end_date}, "
+                  f"return {result['total_return_rate']:.2f}% ({elapsed:.2f}s)")
+            summary['refreshed'].append(backtest_id)
+        except Exception as e:
+            print(f"[Refresh] {backtest_id} failed: {e}")
+            summary['failed'].append(backtest_id)
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='저장된 백테스트 증분 연장')
+    parser.add_argument('--end', default=datetime.now().strftime('%Y-%m-%d'), help='새 종료일 (YYYY-MM-DD)')
+    parser.add_argument('--id', action='append', help='연장할 백테스트 ID (여러 번 지정 가능)')
+    args = parser.parse_args()
+
+    backtest_ids = args.id or state_store.list_ids()
+    print(f"[Refresh] {len(backtest_ids)} saved backtests -> {args.end}")
+
+    summary = asyncio.run(refresh(backtest_ids, args.end))
+    print(f"[Refresh] Done: {len(summary['refreshed'])} refreshed, "
+          f"{len(summary['skipped'])} up to date, {len(summary['failed'])} failed")
+
+
+if __name__ == '__main__':
+    main()
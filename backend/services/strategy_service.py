@@ -7,6 +7,7 @@ import pandas as pd
 from datetime import datetime
 from supabase import create_client
 from backtest.engine import BacktestEngine
+from data.price_reader import read_price_frame
 from services.notification_service import NotificationService
 
 class StrategyService:
@@ -98,22 +99,15 @@ class StrategyService:
             try:
                 # Data Fetching (Threaded)
                 def fetch_data():
-                    p = self.supabase.table('kw_price_daily').select('trade_date,open,high,low,close,volume').eq('stock_code', stock_code).order('trade_date', desc=False).limit(200).execute()
+                    p = read_price_frame(self.supabase, stock_code, limit=200, index_name='trade_date')
                     c = self.supabase.table('kw_price_current').select('*').eq('stock_code', stock_code).limit(1).execute()
                     return p, c
                 
-                price_response, curr_resp = await asyncio.to_thread(fetch_data)
+                df, curr_resp = await asyncio.to_thread(fetch_data)
 
-                if not price_response.data or len(price_response.data) < 20:
+                if len(df) < 20:
                     return None
 
-                # DataFrame Prep
-                df = pd.DataFrame(price_response.data)
-                df['trade_date'] = pd.to_datetime(df['trade_date'])
-                df.set_index('trade_date', inplace=True)
-                for col in ['open', 'high', 'low', 'close', 'volume']:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-
                 # Merge Current Price
                 current_price = 0.0
                 stock_name = stock_code
@@ -126,7 +120,7 @@ class StrategyService:
                         now = datetime.now()
                         last_date = df.index[-1]
                         if last_date.date() < now.date():
-                            new_row = pd.DataFrame([{'open': current_price, 'high': current_price, 'low': current_price, 'close': current_price, 'volume': 0}], index=[pd.Timestamp(now)])
+                            new_row = pd.DataFrame([{'open': current_price, 'high': current_price, 'low': current_price, 'close': current_price, 'volume': 0}], index=[pd.Timestamp(now.date())])
                             df = pd.concat([df, new_row])
                         elif last_date.date() == now.date():
                             df.iloc[-1, df.columns.get_loc('close')] = current_price
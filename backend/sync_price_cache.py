@@ -0,0 +1,96 @@
+"""
+로컬 일봉 캐시 동기화 스크립트
+kw_price_daily에서 캐시의 마지막 trade_date 이후 봉만 받아 cache/price_cache/<종목>.npz에 합침
+
+사용법:
+  python sync_price_cache.py                         # 캐시된 모든 종목의 새 봉만
+  python sync_price_cache.py --stock 005930,000660   # 지정 종목 (캐시에 없으면 --start부터)
+  python sync_price_cache.py --all --start 2020-01-01  # 활성 전략 유니버스 종목
+  python sync_price_cache.py --show 005930           # 종목 manifest 확인
+  python sync_price_cache.py --panel                 # 동기화 후 날짜 x 종목 메모리 맵 패널 재생성
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from supabase import create_client
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from data.local_cache import price_cache
+from data.panel_store import panel_store
+
+load_dotenv()
+
+
+def get_supabase_client():
+    """Supabase 클라이언트 생성"""
+    url = os.getenv('SUPABASE_URL')
+    key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+    return create_client(url, key)
+
+
+def get_active_stocks(supabase):
+    """활성 전략 유니버스 종목 목록"""
+    try:
+        result = supabase.rpc('get_active_strategies_with_universe').execute()
+        stock_codes = set()
+        for strategy in (result.data or []):
+            for item in strategy.get('filtered_stocks', []):
+                code = item.get('stock_code') if isinstance(item, dict) else item
+                if code:
+                    stock_codes.add(code)
+        return sorted(stock_codes)
+    except Exception as e:
+        print(f"활성 종목 조회 실패: {e}")
+        return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 일봉 캐시 동기화')
+    parser.add_argument('--stock', help='종목코드 (쉼표로 구분)', default=None)
+    parser.add_argument('--all', action='store_true', help='활성 전략 유니버스 종목 + 캐시된 종목')
+    parser.add_argument('--start', help='캐시에 없는 종목의 시작일 (YYYY-MM-DD)',
+                        default=(datetime.now() - timedelta(days=365 * 3)).strftime('%Y-%m-%d'))
+    parser.add_argument('--end', help='종료일 (기본 오늘)', default=None)
+    parser.add_argument('--show', help='종목 manifest 출력', default=None)
+    parser.add_argument('--panel', action='store_true', help='동기화 후 로컬 캐시로 패널 저장소 재생성')
+
+    args = parser.parse_args()
+
+    if args.show:
+        for entry in price_cache.manifest(args.show):
+            print(entry)
+        return
+
+    print("=" * 60)
+    print("로컬 일봉 캐시 동기화")
+    print("=" * 60)
+    print(f"캐시 경로: {price_cache.directory}")
+
+    supabase = get_supabase_client()
+    symbols = None  # 캐시된 전체 종목
+    if args.stock:
+        symbols = [s.strip() for s in args.stock.split(',')]
+    elif args.all:
+        cached = [entry['symbol'] for entry in price_cache.manifest()]
+        symbols = sorted(set(cached) | set(get_active_stocks(supabase)))
+
+    result = asyncio.run(price_cache.refresh(supabase, symbols, start_date=args.start, end_date=args.end))
+
+    print()
+    print("=" * 60)
+    print(f"완료: {result['symbols']}개 종목, Supabase 요청 {result['requests']}회, "
+          f"새로 받은 행 {result['fetched_rows']}개 (~{result['end_date']})")
+    print("=" * 60)
+
+    if args.panel:
+        meta = asyncio.run(panel_store.build(symbols=symbols))
+        print(f"패널: {meta['days']}일 x {meta['symbols']}종목 ({meta['first_date']} ~ {meta['last_date']})")
+
+
+if __name__ == "__main__":
+    main()
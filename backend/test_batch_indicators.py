@@ -0,0 +1,179 @@
+"""
+종목 x 날짜 패널 일괄 지표 계산 검증 테스트
+- execute_batch 결과 == 종목별 registry.execute 결과 (상장 전/거래정지 빈 칸 포함, 비트 단위)
+- calculate_panel 컬럼명 == calculate() 컬럼명 (sma_5 등 변환 규칙)
+- DB 전용 모드: formula.batch로 커널을 선언한 Supabase 정의만 일괄 계산
+- evaluate_snapshots == 종목별 evaluate_snapshot
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+import indicators.calculator as calculator_module
+from backtest.engine import BacktestEngine
+from indicators.calculator import ExecOptions, IndicatorCalculator
+from indicators.catalog import IndicatorCatalog
+from indicators.panel import SymbolPanel
+
+BATCH_INDICATORS = ['sma', 'ema', 'rsi', 'macd', 'bb', 'atr', 'stochastic']
+
+
+def make_universe(symbols: int = 40, days: int = 260, seed: int = 21) -> dict:
+    """종목별 OHLCV (일부는 늦게 상장, 일부는 중간 거래정지)"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2023-01-02', periods=days)
+    frames = {}
+    for i in range(symbols):
+        close = 5000 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+        df = pd.DataFrame({
+            'open': close * (1 + rng.uniform(-0.01, 0.01, days)),
+            'high': close * (1 + rng.uniform(0, 0.03, days)),
+            'low': close * (1 - rng.uniform(0, 0.03, days)),
+            'close': close,
+            'volume': rng.integers(1000, 100000, days).astype(float)
+        }, index=dates)
+        if i % 4 == 1:
+            df = df.iloc[rng.integers(30, 120):]  # 늦은 상장
+        elif i % 4 == 2:
+            halt = rng.integers(50, 200)
+            df = df.drop(df.index[halt:halt + 7])  # 거래정지
+        frames[f"{i:06d}"] = df
+    return frames
+
+
+def test_batch_matches_per_symbol():
+    """빈 칸이 있는 패널에서도 종목별 계산과 비트 단위로 동일"""
+    registry = IndicatorCalculator().registry
+    frames = make_universe()
+    panel = SymbolPanel.from_frames(frames)
+    assert panel.has_gaps
+
+    for name in BATCH_INDICATORS:
+        for options in (ExecOptions(period=14), ExecOptions(period=20, realtime=True)):
+            batch = registry.execute_batch(name, panel, options)
+            for code, df in frames.items():
+                expected = registry.execute(name, df, options)
+                for out, series in expected.items():
+                    got = batch[out][code]
+                    assert got[~got.index.isin(df.index)].isna().all(), (name, code, out)
+                    np.testing.assert_array_equal(got.loc[df.index].to_numpy(), series.to_numpy(),
+                                                  err_msg=f"{name}/{code}/{out}")
+    print(f"[OK] {len(BATCH_INDICATORS)} batch kernels match per-symbol results on {len(frames)} symbols")
+
+
+def test_calculate_panel_names_and_speed():
+    """calculate_panel 컬럼 == calculate() 컬럼, 종목별 루프보다 빠름"""
+    calculator = IndicatorCalculator()
+    frames = make_universe(symbols=300, seed=4)
+    configs = [
+        {'name': 'sma_5', 'params': {'period': 5}},
+        {'name': 'rsi', 'params': {'period': 14}},
+        {'name': 'macd', 'params': {}},
+        {'name': 'bb_20', 'params': {'period': 20}},
+        {'name': 'atr', 'params': {'period': 14}},
+        {'name': 'stochastic', 'params': {'period': 14}},
+        {'name': 'adx', 'params': {'period': 14}},  # batch 미지원 → 나머지로 반환
+    ]
+
+    start = time.perf_counter()
+    columns, remaining = calculator.calculate_panel(frames, configs)
+    batch_time = time.perf_counter() - start
+    assert remaining == configs[-1:]
+
+    start = time.perf_counter()
+    for code, df in frames.items():
+        for config in configs[:-1]:
+            method = config['name'].split('_')[0]
+            calculator.registry.execute(method, df, ExecOptions(period=config['params'].get('period', 20)))
+    loop_time = time.perf_counter() - start
+
+    for code in list(frames)[:20]:
+        expected = {}
+        for config in configs[:-1]:
+            expected.update(calculator.calculate(frames[code], config).columns)
+        assert set(columns[code]) == set(expected), (sorted(columns[code]), sorted(expected))
+        for name, series in expected.items():
+            np.testing.assert_array_equal(columns[code][name].to_numpy(), series.to_numpy(), err_msg=name)
+
+    speedup = loop_time / batch_time
+    assert speedup > 3, speedup
+    print(f"[OK] calculate_panel: {len(frames)} symbols in {batch_time * 1000:.0f}ms "
+          f"(per-symbol loop {loop_time * 1000:.0f}ms, {speedup:.1f}x)")
+
+
+def test_declared_batch_kernel_in_db_only_mode():
+    """DB 전용 모드: formula.batch 선언 정의는 패널 계산, 선언 없는 정의/내장 지표는 종목별 계산으로 남음"""
+    code = ("period = params.get('period', 20)\n"
+            "result = {'db_ema': df['close'].ewm(span=period, min_periods=period, adjust=False).mean()}")
+    rows = [
+        {'name': 'db_ema', 'is_active': True, 'calculation_type': 'python_code', 'output_columns': ['db_ema'],
+         'formula': {'code': code, 'batch': {'method': 'ema', 'outputs': {'ema': 'db_ema'}}}},
+        {'name': 'db_ema_plain', 'is_active': True, 'calculation_type': 'python_code', 'output_columns': ['db_ema'],
+         'formula': {'code': code}},
+    ]
+    snapshot = os.path.join(tempfile.mkdtemp(prefix='catalog_'), 'indicators.json')
+    with open(snapshot, 'w', encoding='utf-8') as f:
+        json.dump(rows, f)
+
+    original = calculator_module.indicator_catalog
+    calculator_module.indicator_catalog = IndicatorCatalog(ttl_seconds=0, snapshot_path=snapshot)
+    os.environ['ENFORCE_DB_INDICATORS'] = 'true'
+    try:
+        calculator = IndicatorCalculator()
+        assert calculator.enforce_db_only and calculator.registry is None
+        configs = [{'name': 'db_ema', 'params': {'period': 12}}, {'name': 'db_ema_plain', 'params': {'period': 12}},
+                   {'name': 'rsi', 'params': {'period': 14}}]
+        frames = make_universe(symbols=8, seed=5)
+        columns, remaining = calculator.calculate_panel(frames, configs)
+        assert remaining == configs[1:], remaining
+        for symbol, df in frames.items():
+            expected = calculator.calculate(df, configs[0]).columns['db_ema']
+            np.testing.assert_array_equal(columns[symbol]['db_ema'].to_numpy(), expected.to_numpy(), err_msg=symbol)
+    finally:
+        os.environ['ENFORCE_DB_INDICATORS'] = 'false'
+        calculator_module.indicator_catalog = original
+    print(f"[OK] Declared batch kernel matches python_code definition in DB-only mode ({len(frames)} symbols)")
+
+
+def test_evaluate_snapshots_matches_single():
+    """일괄 스냅샷 평가 == 종목별 evaluate_snapshot"""
+    strategy = {
+        'indicators': [{'name': 'rsi', 'params': {'period': 14}}, {'name': 'macd', 'params': {}},
+                       {'name': 'bb', 'params': {'period': 20}}, {'name': 'adx', 'params': {'period': 14}}],
+        'buyConditions': [{'left': 'rsi', 'operator': '<', 'right': 55},
+                          {'left': 'macd_line', 'operator': '>', 'right': 'macd_signal', 'combineWith': 'AND'}],
+        'sellConditions': [{'left': 'close', 'operator': '>', 'right': 'bb_upper'},
+                           {'left': 'adx', 'operator': '>', 'right': 40, 'combineWith': 'OR'}]
+    }
+    frames = make_universe(symbols=12, seed=9)
+    engine = BacktestEngine()
+    batched = asyncio.run(engine.evaluate_snapshots({c: df.copy() for c, df in frames.items()}, strategy))
+
+    single_engine = BacktestEngine()
+    single_engine.streaming_snapshots = False
+    assert set(batched) == set(frames)
+    for code, df in frames.items():
+        single = asyncio.run(single_engine.evaluate_snapshot(code, df.copy(), strategy))
+        assert batched[code]['signal'] == single['signal'] and batched[code]['reasons'] == single['reasons'], code
+        for key, value in single['indicators'].items():
+            assert batched[code]['indicators'][key] == value or (np.isnan(value) and np.isnan(batched[code]['indicators'][key])), (code, key)
+    print(f"[OK] evaluate_snapshots matches evaluate_snapshot for {len(frames)} symbols")
+
+
+if __name__ == '__main__':
+    test_batch_matches_per_symbol()
+    test_calculate_panel_names_and_speed()
+    test_declared_batch_kernel_in_db_only_mode()
+    test_evaluate_snapshots_matches_single()
+    print("\nAll tests passed")
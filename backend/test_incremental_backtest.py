@@ -0,0 +1,143 @@
+"""
+증분 백테스트 검증 테스트
+- 앞 구간 실행(상태 저장) + 새 일봉 연장 결과 == 전체 기간 재실행 결과
+- 단계별 매수/매도 + 목표수익률 단계(동적 손절) 진행 상태도 이어서 동일하게 처리
+- 연장 시 새 일봉 구간만 데이터 로드
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+from backtest.engine import BacktestEngine
+from backtest.incremental import state_store
+
+STOCKS = ['005930', '000660', '035720']
+START, SPLIT, END = '2021-01-01', '2022-09-30', '2023-12-31'
+
+SIMPLE = {
+    'indicators': [{'name': 'rsi', 'params': {'period': 14}}, {'name': 'ema', 'params': {'period': 20}}],
+    'buyConditions': [{'left': 'rsi', 'operator': '<', 'right': 40}],
+    'sellConditions': [{'left': 'rsi', 'operator': '>', 'right': 60}],
+    'stopLoss': {'enabled': True, 'value': 5}
+}
+STAGED = {
+    'indicators': [{'name': 'rsi', 'params': {'period': 14}}],
+    'useStageBasedStrategy': True,
+    'buyStageStrategy': {'stages': [
+        {'stage': 1, 'enabled': True, 'positionPercent': 50, 'conditions': [{'left': 'rsi', 'operator': '<', 'right': 40}]},
+        {'stage': 2, 'enabled': True, 'positionPercent': 50, 'conditions': [{'left': 'rsi', 'operator': '<', 'right': 30}]}
+    ]},
+    'sellStageStrategy': {'stages': [
+        {'stage': 1, 'enabled': True, 'exitPercent': 50, 'conditions': [{'left': 'rsi', 'operator': '>', 'right': 60}]},
+        {'stage': 2, 'enabled': True, 'exitPercent': 100, 'conditions': [{'left': 'rsi', 'operator': '>', 'right': 70}]}
+    ]},
+    'targetProfit': {'mode': 'staged', 'staged': {'enabled': True, 'stages': [
+        {'stage': 1, 'targetProfit': 5, 'exitRatio': 50},
+        {'stage': 2, 'targetProfit': 10, 'exitRatio': 100, 'dynamicStopLoss': True}
+    ]}},
+    'stopLoss': {'enabled': True, 'value': 5}
+}
+
+
+def make_engine(loads):
+    """전체 기간 고정 가격 데이터를 요청 구간만큼 잘라 주는 엔진"""
+    engine = BacktestEngine()
+    engine.monte_carlo_paths = 0
+    full = {code: engine.data_provider._generate_mock_data(code, START, END) for code in STOCKS}
+
+    async def load(stock_codes, start_date, end_date):
+        loads.append((start_date, end_date))
+        return {code: full[code].loc[start_date:end_date].copy() for code in stock_codes}
+
+    engine._load_price_data = load
+    return engine
+
+
+def comparable(result):
+    """식별자(uuid)를 제외한 결과"""
+    trades = [{k: v for k, v in t.items() if k != 'trade_id'} for t in result['trades']]
+    fields = {k: result[k] for k in (
+        'final_capital', 'total_return_rate', 'win_rate', 'total_trades', 'max_drawdown',
+        'sharpe_ratio', 'sortino_ratio', 'treynor_ratio', 'daily_values', 'start_date', 'end_date'
+    )}
+    return trades, fields, result['risk_metrics']
+
+
+def _check_extension(config):
+    async def scenario():
+        loads = []
+        engine = make_engine(loads)
+        full = await engine.run_with_config(config, STOCKS, START, END, use_cache=False)
+
+        partial = await engine.run_with_config(config, STOCKS, START, SPLIT, persist_state=True)
+        extended = await engine.extend(partial['backtest_id'], END)
+        return full, partial, extended, loads
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = state_store.directory
+        state_store.directory = tmp
+        try:
+            full, partial, extended, loads = asyncio.run(scenario())
+            saved = state_store.load(partial['backtest_id'])
+        finally:
+            state_store.directory = directory
+
+    assert loads[-1] == ('2022-10-01', END)  # 새 일봉 구간만 로드
+    assert extended['backtest_id'] == partial['backtest_id'] and saved.end_date == END
+    assert partial['total_trades'] < full['total_trades']
+
+    full_trades, full_fields, full_risk = comparable(full)
+    ext_trades, ext_fields, ext_risk = comparable(extended)
+    assert ext_trades == full_trades
+    assert ext_fields == full_fields
+    assert ext_risk == full_risk
+    return full
+
+
+def test_extend_matches_full_rerun():
+    """단순 조건 전략: 연장 결과 == 전체 재실행"""
+    full = _check_extension(SIMPLE)
+    print(f"[OK] Simple strategy extension: {full['total_trades']} trades, {full['total_return_rate']:.2f}%")
+
+
+def test_extend_staged_strategy_matches_full_rerun():
+    """단계별 전략: 분할 매수/매도 진행 상태가 이어져 전체 재실행과 동일"""
+    full = _check_extension(STAGED)
+    stages = {t.get('stage') for t in full['trades'] if t['type'] == 'buy'}
+    assert stages & {1, 2}
+    print(f"[OK] Staged strategy extension: {full['total_trades']} trades, {full['total_return_rate']:.2f}%")
+
+
+def test_extend_requires_later_end_date():
+    """저장 종료일 이전으로는 연장 불가, 상태 없는 ID는 오류"""
+    async def scenario():
+        engine = make_engine([])
+        partial = await engine.run_with_config(SIMPLE, STOCKS, START, SPLIT, persist_state=True)
+        for backtest_id, end_date in ((partial['backtest_id'], SPLIT), ('missing', END)):
+            try:
+                await engine.extend(backtest_id, end_date)
+            except ValueError as e:
+                print(f"[OK] Rejected: {e}")
+            else:
+                raise AssertionError("extend should fail")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = state_store.directory
+        state_store.directory = tmp
+        try:
+            asyncio.run(scenario())
+        finally:
+            state_store.directory = directory
+
+
+if __name__ == '__main__':
+    test_extend_matches_full_rerun()
+    test_extend_staged_strategy_matches_full_rerun()
+    test_extend_requires_later_end_date()
+    print("\nAll tests passed")
@@ -0,0 +1,149 @@
+"""
+지표 정의 카탈로그 검증 테스트
+- 계산기를 여러 번 만들어도 indicators 테이블은 한 번만 조회
+- TTL 경과 → 백그라운드 갱신, invalidate → 즉시 갱신 (갱신된 정의로 다시 계산)
+- 스냅샷으로 Supabase 없이 부팅
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+import indicators.calculator as calculator_module
+from indicators.calculator import IndicatorCalculator
+from indicators.catalog import IndicatorCatalog
+
+
+def definition(scale: float) -> dict:
+    return {
+        'name': 'db_scaled', 'is_active': True, 'calculation_type': 'builtin', 'output_columns': ['db_scaled'],
+        'formula': {'code': f"result = {{'db_scaled': df['close'] * {scale}}}"}
+    }
+
+
+class FakeQuery:
+    def __init__(self, client):
+        self.client = client
+
+    def select(self, *args):
+        return self
+
+    def eq(self, *args):
+        return self
+
+    def execute(self):
+        self.client.gate.wait(5)
+        self.client.calls += 1
+        return type('Response', (), {'data': [dict(row) for row in self.client.rows]})()
+
+
+class FakeClient:
+    """indicators 테이블 조회 횟수를 세는 Supabase 대역"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+        self.gate = threading.Event()  # clear() 하면 조회가 set()까지 대기 (느린 DB)
+        self.gate.set()
+
+    def table(self, name):
+        assert name == 'indicators'
+        return FakeQuery(self)
+
+
+def make_catalog(rows, **kwargs) -> (IndicatorCatalog, FakeClient):
+    kwargs.setdefault('snapshot_path', os.path.join(tempfile.mkdtemp(prefix='catalog_'), 'indicators.json'))
+    catalog = IndicatorCatalog(**kwargs)
+    client = FakeClient(rows)
+    catalog._client, catalog._client_ready = client, True
+    return catalog, client
+
+
+def make_prices(days: int = 60) -> pd.DataFrame:
+    close = 100 + np.arange(days, dtype=float)
+    return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+                         'volume': np.full(days, 1000.0)}, index=pd.bdate_range('2024-01-01', periods=days))
+
+
+def test_calculators_share_one_load():
+    """계산기 N개 생성 → 테이블 조회 1회, 인스턴스별 덮어쓰기는 서로 격리"""
+    catalog, client = make_catalog([definition(2.0)], ttl_seconds=3600)
+    original = calculator_module.indicator_catalog
+    calculator_module.indicator_catalog = catalog
+    try:
+        calculators = [IndicatorCalculator() for _ in range(5)]
+        assert client.calls == 1, client.calls
+        df = make_prices()
+        for calc in calculators:
+            result = calc.calculate(df, {'name': 'db_scaled', 'params': {}})
+            np.testing.assert_array_equal(result.columns['db_scaled'].to_numpy(), df['close'].to_numpy() * 2)
+        assert client.calls == 1
+
+        calculators[0].indicators_cache['local_only'] = definition(3.0)
+        assert 'local_only' in calculators[0].indicators_cache and 'local_only' not in calculators[1].indicators_cache
+        assert set(calculators[1].indicators_cache) == {'db_scaled'}
+    finally:
+        calculator_module.indicator_catalog = original
+    print(f"[OK] 5 calculators, 1 indicators query: {catalog.stats()['source']}")
+
+
+def test_ttl_and_invalidate():
+    """TTL 경과 시 백그라운드 갱신, invalidate는 즉시 반영 + 실행 캐시 무효화"""
+    catalog, client = make_catalog([definition(2.0)], ttl_seconds=3600)
+    original = calculator_module.indicator_catalog
+    calculator_module.indicator_catalog = catalog
+    try:
+        calc = IndicatorCalculator()
+        df = make_prices()
+        first = calc.calculate(df, {'name': 'db_scaled', 'params': {}})
+        version = catalog.version
+
+        client.rows = [definition(5.0)]
+        client.gate.clear()
+        catalog.loaded_at -= 7200  # TTL 경과
+        stale = calc.indicators_cache['db_scaled']  # 갱신 중에도 기존 정의로 즉시 응답
+        assert '2.0' in stale['formula']['code']
+        client.gate.set()
+        deadline = time.time() + 5
+        while catalog.version == version and time.time() < deadline:
+            time.sleep(0.01)
+        assert client.calls == 2 and '5.0' in calc.indicators_cache['db_scaled']['formula']['code']
+
+        client.rows = [definition(7.0)]
+        stats = catalog.invalidate()
+        assert client.calls == 3 and stats['source'] == 'supabase'
+        result = calc.calculate(df, {'name': 'db_scaled', 'params': {}})
+        np.testing.assert_array_equal(result.columns['db_scaled'].to_numpy(), df['close'].to_numpy() * 7)
+        assert not np.array_equal(result.columns['db_scaled'].to_numpy(), first.columns['db_scaled'].to_numpy())
+    finally:
+        calculator_module.indicator_catalog = original
+    print("[OK] TTL refresh in background, invalidate applied immediately")
+
+
+def test_boot_from_snapshot():
+    """Supabase 로드 시 스냅샷 저장 → 다음 부팅은 DB 없이 스냅샷에서"""
+    catalog, client = make_catalog([definition(2.0), dict(definition(4.0), name='inactive', is_active=False)])
+    catalog.definitions()
+    assert os.path.isfile(catalog.snapshot_path)
+
+    offline = IndicatorCatalog(snapshot_path=catalog.snapshot_path)
+    offline._client, offline._client_ready = None, True  # Supabase 자격 증명 없음
+    assert set(offline.definitions()) == {'db_scaled'}
+    assert offline.source == 'snapshot' and offline.version == catalog.version
+    print(f"[OK] Booted {len(offline.definitions())} indicators from snapshot without Supabase")
+
+
+if __name__ == '__main__':
+    test_calculators_share_one_load()
+    test_ttl_and_invalidate()
+    test_boot_from_snapshot()
+    print("\nAll tests passed")
@@ -0,0 +1,118 @@
+"""
+지표 코드 객체 캐시 검증 테스트
+- 같은 정의는 AST 검증/컴파일 1회, 이후 캐시된 코드 객체로 실행
+- 정의 수정(소스 변경) 시 새 항목으로 다시 검증
+- 검증 실패 코드는 거부 결과도 캐시
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+from indicators.calculator import IndicatorCalculator
+from indicators.code_cache import CompiledCodeCache, code_cache
+
+SMA_CODE = """
+period = params.get('period', 20)
+result = {'db_sma': df['close'].rolling(window=period, min_periods=period).mean()}
+"""
+
+PYTHON_CODE = """
+def calculate(df, **kwargs):
+    return {'py_momentum': df['close'] - df['close'].shift(params['period'])}
+"""
+
+
+def make_prices(days: int = 120) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, days)))
+    return pd.DataFrame({
+        'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+        'volume': rng.integers(1000, 5000, days).astype(float)
+    }, index=pd.bdate_range('2024-01-01', periods=days))
+
+
+def counting_calculator():
+    calculator = IndicatorCalculator()
+    calls = []
+    validate = calculator.sandbox.validate_ast
+
+    def counting_validate(code):
+        calls.append(code)
+        return validate(code)
+
+    calculator.sandbox.validate_ast = counting_validate
+    return calculator, calls
+
+
+def test_definition_compiled_once():
+    """Supabase 형식 코드 / python_code: 파라미터를 바꿔 여러 번 계산해도 검증·컴파일 1회"""
+    code_cache.clear()
+    calculator, calls = counting_calculator()
+    calculator.indicators_cache['db_sma'] = {
+        'name': 'db_sma', 'calculation_type': 'builtin', 'formula': {'code': SMA_CODE}
+    }
+    calculator.indicators_cache['py_momentum'] = {
+        'name': 'py_momentum', 'calculation_type': 'python_code', 'formula': {'code': PYTHON_CODE}
+    }
+    df = make_prices()
+
+    before = code_cache.stats()
+    for period in (5, 10, 20, 30):
+        sma = calculator.calculate(df.copy(), {'name': 'db_sma', 'params': {'period': period}}).columns['db_sma']
+        assert np.allclose(sma.dropna(), df['close'].rolling(period).mean().dropna())
+        momentum = calculator.calculate(df.copy(), {'name': 'py_momentum', 'params': {'period': period}})
+        assert np.allclose(momentum.columns['py_momentum'].dropna(), (df['close'] - df['close'].shift(period)).dropna())
+
+    after = code_cache.stats()
+    assert len(calls) == 1  # python_code 검증 1회 (Supabase 형식 코드는 기존대로 검증 없음)
+    assert after['misses'] - before['misses'] == 2
+    assert after['hits'] - before['hits'] == 6
+    print(f"[OK] Compiled once per definition: {after}")
+
+
+def test_changed_definition_and_rejection():
+    """정의 수정 시 재검증, 위험 코드는 거부 결과 재사용"""
+    cache = CompiledCodeCache(max_entries=2)
+    validations = []
+
+    def validator(code):
+        validations.append(code)
+        return 'open(' not in code
+
+    assert cache.get("result = 1", validator) is not None
+    assert cache.get("result = 1", validator) is not None
+    assert cache.get("result = 2", validator) is not None  # 수정된 정의
+    assert cache.get("result = open('x')", validator) is None
+    assert cache.get("result = open('x')", validator) is None
+    assert len(validations) == 3 and cache.rejected == 1
+
+    # 검증 여부가 다르면 별도 항목, LRU로 최대 항목 수 유지
+    assert cache.get("result = 1") is not None
+    assert cache.stats()['entries'] == 2
+
+    code_cache.clear()
+    calculator, calls = counting_calculator()
+    config = {'name': 'bad', 'calculation_type': 'custom_formula', 'formula': "open('/etc/passwd')"}
+    for _ in range(2):
+        try:
+            calculator._calculate_custom_formula(make_prices(), config, None)
+        except ValueError as e:
+            assert 'security validation' in str(e)
+        else:
+            raise AssertionError("dangerous formula should be rejected")
+    assert len(calls) == 1
+    print(f"[OK] Re-validation on change, cached rejection: {cache.stats()}")
+
+
+if __name__ == '__main__':
+    test_definition_compiled_once()
+    test_changed_definition_and_rejection()
+    print("\nAll tests passed")
@@ -0,0 +1,142 @@
+"""
+지표 중간 시계열 공유(DAG) 검증 테스트
+- MACD(12,26,9) + EMA12 + EMA26 + 볼린저(20) + SMA20: EMA/SMA 노드를 한 번만 계산해 공유
+- 공유 여부와 관계없이 지표 값은 기존 공식과 동일
+- DB 정의 지표는 formula.dependencies로 선언한 노드를 읽기 전용으로 사용
+"""
+
+import os
+import sys
+import tempfile
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+from indicators.calculator import IndicatorCalculator
+from indicators.dag import IndicatorGraph
+import price_fixtures
+
+PPO_CODE = """
+result = {'db_ppo': (deps['ema_12'] - deps['ema_26']) / deps['ema_26'] * 100}
+"""
+
+MUTATING_DEPS_CODE = """
+deps['sma_20'].iloc[-1] = 0
+result = {'db_bad': deps['sma_20']}
+"""
+
+STRATEGY = [
+    {'name': 'macd', 'params': {}},
+    {'name': 'ema', 'params': {'period': 12}},
+    {'name': 'ema', 'params': {'period': 26}},
+    {'name': 'bb', 'params': {'period': 20}},
+    {'name': 'sma', 'params': {'period': 20}},
+    {'name': 'atr', 'params': {'period': 14}},
+    {'name': 'adx', 'params': {'period': 14}},
+]
+
+
+make_prices = partial(price_fixtures.make_prices, seed=3, start='2023-01-02', spread=0.02, random_spread=True)
+
+
+def make_calculator() -> IndicatorCalculator:
+    calculator = IndicatorCalculator()
+    calculator.sandbox_pool = None  # 프로세스 내 실행 경로 검증 (공용 풀은 첫 import 시 생성되므로 환경변수 대신 인스턴스에서 끔)
+    calculator.indicators_cache['db_ppo'] = {
+        'name': 'db_ppo', 'calculation_type': 'builtin',
+        'formula': {'code': PPO_CODE, 'dependencies': ['ema_12', 'ema_26']}
+    }
+    calculator.indicators_cache['db_bad'] = {
+        'name': 'db_bad', 'calculation_type': 'builtin',
+        'formula': {'code': MUTATING_DEPS_CODE, 'dependencies': ['sma_20']}
+    }
+    return calculator
+
+
+def test_shared_nodes_computed_once():
+    """전략 지표들이 같은 평가 범위에서 EMA/SMA/true range 노드를 공유"""
+    df = make_prices(300)
+    calculator = make_calculator()
+
+    with calculator.shared_intermediates(df):
+        results = [calculator.calculate(df, config, stock_code='TEST') for config in STRATEGY]
+    hits = [r.metadata['shared_intermediate_hits'] for r in results]
+
+    # ema12/26은 MACD가 계산, SMA20은 볼린저가 계산, true range/ATR(14)은 ATR이 계산 → 뒤의 지표는 재사용
+    assert hits == [0, 1, 1, 0, 1, 0, 1], hits
+
+    # 범위 밖에서는 공유하지 않음
+    isolated = make_calculator().calculate(df, STRATEGY[1])
+    assert isolated.metadata['shared_intermediate_hits'] == 0
+    print(f"[OK] Shared intermediate hits per indicator: {hits}")
+
+
+def test_values_match_reference_formulas():
+    """공유 그래프 경유 결과 == 기존 공식"""
+    df = make_prices(300)
+    calculator = make_calculator()
+    with calculator.shared_intermediates(df):
+        out = {}
+        for config in STRATEGY:
+            columns = calculator.calculate(df, config, stock_code='TEST').columns
+            suffix = f"_{config['params']['period']}" if config['name'] == 'ema' else ''
+            out.update({f"{k}{suffix}": v for k, v in columns.items()})
+
+    close = df['close']
+    ema12 = close.ewm(span=12, min_periods=12, adjust=False).mean()
+    ema26 = close.ewm(span=26, min_periods=26, adjust=False).mean()
+    macd_line = ema12 - ema26
+    sma20 = close.rolling(20, min_periods=20).mean()
+    std20 = close.rolling(20, min_periods=20).std(ddof=0)
+    prev_close = close.shift(1)
+    true_range = pd.concat([df['high'] - df['low'], (df['high'] - prev_close).abs(),
+                            (df['low'] - prev_close).abs()], axis=1).max(axis=1)
+
+    expected = {
+        'ema_12': ema12, 'ema_26': ema26, 'macd_line': macd_line,
+        'macd_signal': macd_line.ewm(span=9, min_periods=9, adjust=False).mean(),
+        'sma': sma20, 'bb_middle': sma20, 'bb_upper': sma20 + 2 * std20, 'bb_lower': sma20 - 2 * std20,
+        'atr': true_range.ewm(alpha=1 / 14, min_periods=14, adjust=False).mean(),
+    }
+    for key, series in expected.items():
+        np.testing.assert_allclose(out[key].to_numpy(), series.to_numpy(), equal_nan=True, err_msg=key)
+    assert not np.shares_memory(out['sma'].to_numpy(), out['bb_middle'].to_numpy())  # 출력은 각자 소유
+    print("[OK] Shared-graph values match reference formulas")
+
+
+def test_declared_dependencies():
+    """DB 정의 지표: 선언한 의존 노드를 공유, 제자리 수정은 거부"""
+    df = make_prices(300)
+    calculator = make_calculator()
+    with calculator.shared_intermediates(df):
+        calculator.calculate(df, STRATEGY[0], stock_code='TEST')  # MACD → ema_12, ema_26 계산
+        ppo = calculator.calculate(df, {'name': 'db_ppo'}, stock_code='TEST')
+        assert ppo.metadata['shared_intermediate_hits'] == 2
+
+        try:
+            calculator.calculate(df, {'name': 'db_bad'}, stock_code='TEST')
+        except ValueError as e:
+            assert 'read-only' in str(e) or 'read-only' in str(e.__context__)
+        else:
+            raise AssertionError("writing to a shared node should fail")
+
+    ema12 = df['close'].ewm(span=12, min_periods=12, adjust=False).mean()
+    ema26 = df['close'].ewm(span=26, min_periods=26, adjust=False).mean()
+    np.testing.assert_allclose(ppo.columns['db_ppo'].to_numpy(), ((ema12 - ema26) / ema26 * 100).to_numpy(), equal_nan=True)
+
+    graph = IndicatorGraph(df)
+    graph.node('atr_14')
+    assert ('true_range',) in graph.edges and graph.stats()['nodes'] == 2
+    print(f"[OK] Declared dependencies resolved from shared graph: {graph.stats()}")
+
+
+if __name__ == '__main__':
+    test_shared_nodes_computed_once()
+    test_values_match_reference_formulas()
+    test_declared_dependencies()
+    print("\nAll tests passed")
@@ -0,0 +1,75 @@
+"""
+지표 결과 캐시 검증 테스트
+- 키가 OHLCV 내용 해시이므로 마지막 봉 종가가 바뀌면(장중 실시간 병합) 다시 계산
+- 같은 내용의 다른 프레임 객체는 캐시 적중
+- 바이트 한도를 넘으면 LRU 제거, 통계(hits/misses/evictions/resident_bytes) 노출
+"""
+
+import os
+import sys
+import tempfile
+from functools import partial
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+from indicators.calculator import IndicatorCalculator
+from indicators.execution_cache import IndicatorExecutionCache, frame_fingerprint
+import price_fixtures
+
+RSI = {'name': 'rsi', 'params': {'period': 14}}
+
+
+make_prices = partial(price_fixtures.make_prices, seed=8, start='2024-01-01')
+
+
+def test_intraday_close_change_is_not_stale():
+    """마지막 봉 종가 변경 → 새 키로 재계산, 동일 내용 → 적중"""
+    calculator = IndicatorCalculator()
+    df = make_prices(250)
+    first = calculator.calculate(df, RSI, stock_code='005930')
+
+    same = calculator.calculate(df.copy(), RSI, stock_code='005930')
+    assert same is first
+
+    live = df.copy()
+    live.iloc[-1, live.columns.get_loc('close')] *= 1.05  # 실시간 현재가 병합
+    updated = calculator.calculate(live, RSI, stock_code='005930')
+    assert updated is not first
+    assert updated.columns['rsi'].iloc[-1] > first.columns['rsi'].iloc[-1]
+    assert frame_fingerprint(df) != frame_fingerprint(live)
+
+    stats = calculator.execution_cache_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 2 and stats['entries'] == 2
+    print(f"[OK] Content-hashed keys: {stats}")
+
+
+def test_byte_bounded_lru():
+    """바이트 한도 초과 시 오래된 항목부터 제거, 최근 사용 항목은 유지"""
+    calculator = IndicatorCalculator()
+    df = make_prices(250)
+    entry_bytes = len(df) * 8  # RSI 1개 컬럼
+    calculator._execution_cache = IndicatorExecutionCache(max_bytes=entry_bytes * 3)
+
+    codes = ['A', 'B', 'C']
+    for code in codes:
+        calculator.calculate(df, RSI, stock_code=code)
+    calculator.calculate(df, RSI, stock_code='A')  # A를 최근 사용으로
+    calculator.calculate(df, RSI, stock_code='D')  # B 제거
+
+    stats = calculator.execution_cache_stats()
+    assert stats['evictions'] == 1 and stats['entries'] == 3
+    assert stats['resident_bytes'] == entry_bytes * 3 <= stats['max_bytes']
+
+    calculator.calculate(df, RSI, stock_code='A')
+    calculator.calculate(df, RSI, stock_code='B')  # 제거되었으므로 미스
+    stats = calculator.execution_cache_stats()
+    assert stats['hits'] == 2 and stats['misses'] == 5
+    print(f"[OK] Byte-bounded LRU: {stats}")
+
+
+if __name__ == '__main__':
+    test_intraday_close_change_is_not_stale()
+    test_byte_bounded_lru()
+    print("\nAll tests passed")
@@ -0,0 +1,151 @@
+"""
+지표 디스크 저장소 검증 테스트
+- 같은 이력 재조회 → 파일 값 그대로 반환 (계산 없음)
+- 새 봉 추가 → 저장된 커널 상태에서 꼬리만 계산한 값 == 전체 재계산 (비트 단위), TAIL_KERNELS 전부
+- SMA/볼린저 등 꼬리 계산 미지원 지표는 꼬리 시도 없이 전체 재계산
+- 장중 마지막 봉 수정 → 파일 재작성 없음, 과거 봉 정정 / 수식 변경 → 전체 재계산
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+from backtest.engine import BacktestEngine
+from indicators.calculator import IndicatorCalculator
+from indicators.store import TAIL_KERNELS, IndicatorStore, indicator_store
+import price_fixtures
+
+CONFIGS = [
+    {'name': 'ema_20', 'params': {'period': 20}},
+    {'name': 'rsi', 'params': {'period': 14}},
+    {'name': 'macd', 'params': {}},
+    {'name': 'atr', 'params': {'period': 14}},
+    {'name': 'adx', 'params': {'period': 14}},
+    {'name': 'obv', 'params': {}},
+    {'name': 'sma_20', 'params': {'period': 20}},
+    {'name': 'bb', 'params': {'period': 20}},
+]
+FULL_ONLY = ('sma_20', 'bb')  # pandas rolling 보정 누적합 → 꼬리 계산 미지원
+
+
+make_prices = partial(price_fixtures.make_prices, seed=5, start='2022-01-03', base=10000, volatility=0.02,
+                      spread=0.03, random_spread=True, max_volume=100000)
+
+
+def use_temp_store():
+    indicator_store.directory = tempfile.mkdtemp(prefix='indicator_store_')
+    indicator_store.enabled = True
+
+
+def assert_same(result, expected):
+    assert set(result.columns) == set(expected.columns)
+    for name, series in expected.columns.items():
+        assert result.columns[name].index.equals(series.index), name
+        np.testing.assert_array_equal(result.columns[name].to_numpy(), series.to_numpy(), err_msg=name)
+
+
+def test_hit_and_tail():
+    """전체 적중 → 한 봉/여러 봉 추가 시 꼬리 계산 (TAIL_KERNELS 전부), 미지원 지표는 바로 전체 재계산"""
+    use_temp_store()
+    calculator = IndicatorCalculator()
+    prices = make_prices(1010)
+    history = prices.iloc[:1000]
+    assert {config['name'].split('_')[0] for config in CONFIGS if config['name'] not in FULL_ONLY} == set(TAIL_KERNELS)
+
+    for config in CONFIGS:
+        first = calculator.calculate_stored(history, config, stock_code='005930')
+        again = calculator.calculate_stored(history, config, stock_code='005930')
+        assert first.metadata['store'] == 'miss' and again.metadata['store'] == 'hit'
+        assert_same(again, first)
+
+        expected_mode = 'miss' if config['name'] in FULL_ONLY else 'tail'
+        for end in (1001, 1010):  # 한 봉 추가, 이어서 아홉 봉 추가
+            extended = calculator.calculate_stored(prices.iloc[:end], config, stock_code='005930')
+            assert extended.metadata['store'] == expected_mode, (config, end, extended.metadata)
+            assert_same(extended, calculator.calculate(prices.iloc[:end], config))
+        assert calculator.calculate_stored(prices, config, stock_code='005930').metadata['store'] == 'hit'
+
+    manifest = indicator_store.manifest('005930')
+    assert len(manifest) == len(CONFIGS)
+    assert all(entry['max_trade_date'] == prices.index[-1].isoformat() and entry['rows'] == 1010 for entry in manifest)
+    assert all((entry['kernel'] is None) == (entry['indicator'] in FULL_ONLY) for entry in manifest)
+    print(f"[OK] Store hit then tail-only update: {indicator_store.stats()}")
+
+
+def test_revisions_invalidate():
+    """마지막 봉 수정 → 직전 상태에서 재계산 (파일 재작성 없음), 과거 봉 정정/수식 변경 → 전체 재계산"""
+    use_temp_store()
+    calculator = IndicatorCalculator()
+    df = make_prices(1000)
+    config = CONFIGS[2]
+    calculator.calculate_stored(df, config, stock_code='000660')
+
+    intraday = df.copy()
+    writes = indicator_store.stats()['writes']
+    for step in (1.02, 1.03):  # 장중 현재가 갱신: 꼬리 한 봉만 계산, 파일은 그대로
+        intraday.iloc[-1, intraday.columns.get_loc('close')] = df['close'].iloc[-1] * step
+        revised = calculator.calculate_stored(intraday, config, stock_code='000660')
+        assert revised.metadata['store'] == 'tail' and revised.metadata['tail_rows'] == 1
+        assert_same(revised, calculator.calculate(intraday, config))
+    assert indicator_store.stats()['writes'] == writes
+
+    corrected = intraday.copy()
+    corrected.iloc[100, corrected.columns.get_loc('close')] *= 0.9
+    result = calculator.calculate_stored(corrected, config, stock_code='000660')
+    assert result.metadata['store'] == 'miss'
+    assert_same(result, calculator.calculate(corrected, config))
+
+    calculator.indicators_cache['macd'] = {'name': 'macd', 'calculation_type': 'builtin', 'formula': {'method': 'macd'}}
+    assert calculator.calculate_stored(corrected, config, stock_code='000660').metadata['store'] == 'miss'
+    print("[OK] Intraday revision, history correction and formula change handled")
+
+
+def test_engine_reads_store():
+    """_calculate_indicators 두 번째 실행은 저장소 값 사용, 결과 동일"""
+    use_temp_store()
+    engine = BacktestEngine()
+    strategy = {'indicators': CONFIGS}
+    prices = make_prices(1010)
+    first = asyncio.run(engine._calculate_indicators(prices.copy(), strategy, '035720'))
+    hits = indicator_store.stats()['hits']
+    second = asyncio.run(engine._calculate_indicators(prices.copy(), strategy, '035720'))
+    assert indicator_store.stats()['hits'] == hits + len(CONFIGS)
+    pd.testing.assert_frame_equal(first, second)
+    print("[OK] Engine indicator columns served from store")
+
+
+def test_size_limit_evicts_least_recent():
+    """합계가 max_bytes를 넘으면 최근 사용(mtime)이 오래된 항목부터 삭제, 조회 적중한 항목은 유지"""
+    store = IndicatorStore(directory=tempfile.mkdtemp(prefix='indicator_store_'), enabled=True)
+    df = make_prices(300)
+    columns = {'x': df['close'] * 2}
+    for i in range(6):
+        assert store.save('005930', f"k{i}", df, columns, 'hash', 'x')
+        os.utime(store._path('005930', f"k{i}"), (1000 + i, 1000 + i))  # 저장 순서
+    store.touch('005930', 'k0')  # 조회 적중 → 가장 최근 사용
+    size = os.path.getsize(store._path('005930', 'k0'))
+
+    store.max_bytes = int(size * 5.5)
+    assert store.save('005930', 'k6', df, columns, 'hash', 'x')
+    kept = sorted(entry['key'] for entry in store.manifest('005930'))
+    assert kept == ['k0', 'k4', 'k5', 'k6'], kept
+    assert store.stats()['evictions'] == 3
+    assert sum(os.path.getsize(store._path('005930', key)) for key in kept) <= store.max_bytes * 0.8
+    print(f"[OK] Store size limit evicted least recently used entries: kept {kept}")
+
+
+if __name__ == '__main__':
+    test_hit_and_tail()
+    test_revisions_invalidate()
+    test_engine_reads_store()
+    test_size_limit_evicts_least_recent()
+    print("\nAll tests passed")
@@ -0,0 +1,102 @@
+"""
+몬테카를로 강건성 분석 검증 테스트
+- 배치 경로 통계가 경로별 단순 계산과 일치하는지 확인
+- 관측값이 엔진 지표(MDD/샤프)와 일치하는지 확인
+- 10,000 경로 분석 시간 확인
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+from backtest.ledger import EquityCurve
+from backtest.monte_carlo import _path_statistics, run_monte_carlo
+
+
+def make_equity(days: int = 780, seed: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 10000000 * np.cumprod(1 + rng.normal(0.0004, 0.012, days))
+
+
+def test_batch_matches_per_path_loop():
+    """배치 계산 == 경로별 루프 계산"""
+    rng = np.random.default_rng(0)
+    paths = rng.normal(0.001, 0.02, (50, 120))
+    stats = _path_statistics(np.log1p(paths), paths)
+
+    for i, path in enumerate(paths):
+        equity = np.concatenate([[1.0], np.cumprod(1 + path)])
+        peak, mdd = equity[0], 0.0
+        for value in equity:
+            peak = max(peak, value)
+            mdd = max(mdd, (peak - value) / peak * 100)
+        sharpe = (path.mean() - 0.03 / 252) / path.std(ddof=1) * np.sqrt(252)
+
+        assert abs(stats['final_return'][i] - (equity[-1] - 1) * 100) < 1e-9
+        assert abs(stats['max_drawdown'][i] - mdd) < 1e-9
+        assert abs(stats['sharpe_ratio'][i] - sharpe) < 1e-9
+    print("[OK] batch == per-path loop")
+
+
+def test_observed_matches_engine_metrics():
+    """관측값 == 엔진 MDD/샤프 계산"""
+    equity = make_equity()
+    curve = EquityCurve(pd.bdate_range('2021-01-01', periods=len(equity)))
+    curve.total_value[:] = equity
+
+    result = run_monte_carlo(equity, n_paths=500, seed=1)
+    returns = np.diff(equity) / equity[:-1]
+    engine_sharpe = (returns.mean() - 0.03 / 252) / returns.std(ddof=1) * np.sqrt(252)
+
+    assert abs(result['daily']['max_drawdown']['observed'] - curve.max_drawdown()) < 1e-9
+    assert abs(result['daily']['sharpe_ratio']['observed'] - engine_sharpe) < 1e-9
+    assert abs(result['daily']['final_return']['observed'] - (equity[-1] / equity[0] - 1) * 100) < 1e-9
+    assert result['trades'] is None
+    print("[OK] observed metrics")
+
+
+def test_shuffle_and_seed():
+    """shuffle은 최종 수익률 불변, 같은 시드는 같은 결과"""
+    equity = make_equity(300)
+    trades = [5.0, -3.0, 2.5, -1.0, 8.0, -4.5]
+
+    shuffled = run_monte_carlo(equity, trades, n_paths=1000, method='shuffle', seed=7)
+    final = shuffled['daily']['final_return']
+    assert abs(final['percentiles']['p5'] - final['percentiles']['p95']) < 1e-3
+    assert shuffled['trades']['count'] == 6
+
+    a = run_monte_carlo(equity, trades, n_paths=1000, seed=7)
+    b = run_monte_carlo(equity, trades, n_paths=1000, seed=7)
+    assert a == b
+    p = a['daily']['max_drawdown']['percentiles']
+    assert p['p5'] <= p['p50'] <= p['p95']
+    print(f"[OK] shuffle/seed, MDD p50={p['p50']:.2f}%")
+
+
+def test_monte_carlo_speed():
+    """3년 일별 데이터 + 300거래, 10,000 경로"""
+    equity = make_equity(780)
+    trades = np.random.default_rng(1).normal(1, 5, 300)
+
+    start = time.perf_counter()
+    result = run_monte_carlo(equity, trades, n_paths=10000, seed=1)
+    elapsed = time.perf_counter() - start
+
+    print(f"10,000 paths: {elapsed * 1000:.0f}ms, loss probability {result['daily']['probability_of_loss']:.1f}%")
+    assert elapsed < 1.0
+
+
+if __name__ == '__main__':
+    test_batch_matches_per_path_loop()
+    test_observed_matches_engine_metrics()
+    test_shuffle_and_seed()
+    test_monte_carlo_speed()
+    print("\nAll tests passed")
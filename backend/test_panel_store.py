@@ -0,0 +1,162 @@
+"""
+날짜 x 종목 메모리 맵 패널 저장소 검증 테스트
+- 종목별 프레임 → 패널 → 종목별 프레임 왕복 (상장 전/거래정지 빈 칸 포함)
+- 기간/연속 종목 슬라이스는 메모리 맵 뷰, 임의 부분집합은 값만 동일한 복사
+- 다른 프로세스에서 같은 파일을 열어 같은 값, 재생성 시 열린 맵은 이전 버전 유지
+- 로컬 일봉 캐시에서 네트워크 없이 생성
+- 스냅샷 조회: 패널 이력 + 패널 이후/수정 구간 원천 봉 == 원천의 최근 봉
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+
+import data.panel_store as panel_module
+from data.local_cache import PriceCache
+from data.panel_store import PanelStore, read_recent_frame
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_frames(symbols: int = 12, days: int = 300) -> dict:
+    rng = np.random.default_rng(21)
+    dates = pd.bdate_range('2023-01-02', periods=days)
+    frames = {}
+    for j in range(symbols):
+        close = np.round(10000 * np.exp(np.cumsum(rng.normal(0, 0.02, days))))  # 원화 정수 가격
+        df = pd.DataFrame({
+            'open': close - 50, 'high': close + 100, 'low': close - 100, 'close': close,
+            'volume': rng.integers(1, 10 ** 7, days).astype(np.int64)
+        }, index=pd.DatetimeIndex(dates, name='date'))
+        if j % 4 == 1:
+            df = df.iloc[40 * (j % 3 + 1):]  # 기간 중간 상장
+        if j % 4 == 2:
+            df = df.drop(df.index[100:110])  # 거래정지
+        frames[f"{j:06d}"] = df
+    return frames
+
+
+def test_roundtrip_and_views():
+    """왕복 동일, 기간/연속 종목 슬라이스는 뷰, 임의 부분집합은 복사"""
+    store = PanelStore(directory=tempfile.mkdtemp(prefix='panel_'))
+    frames = make_frames()
+    meta = store.build_from_frames(frames)
+    assert meta['symbols'] == 12 and meta['days'] == 300
+
+    panel = store.open()
+    view = store.slice('2023-03-01', '2023-09-29')
+    for symbol, df in frames.items():
+        pd.testing.assert_frame_equal(view.symbol_frame(symbol), df.loc['2023-03-01':'2023-09-29'], check_freq=False)
+    assert view.is_view and np.shares_memory(view.field('close'), panel.arrays['close'])
+    assert isinstance(view.field('close'), np.memmap) and view.field('close').dtype == np.float32
+    assert view.frame('volume').shape == view.shape
+
+    stepped = store.slice('2023-06-01', None, ['000002', '000004', '000006'])  # 등간격 → strided 뷰
+    assert stepped.is_view and np.shares_memory(stepped.field('high'), panel.arrays['high'])
+    row = panel.calendar.searchsorted(pd.Timestamp('2023-06-01'))
+    np.testing.assert_array_equal(stepped.column('000004', 'high'), panel.arrays['high'][row:, 4])
+
+    subset = store.slice(symbols=['000007', '000001', '999999'])
+    assert not subset.is_view and subset.missing == ['999999'] and subset.symbols == ['000007', '000001']
+    pd.testing.assert_frame_equal(subset.symbol_frame('000001'), frames['000001'], check_freq=False)
+
+    symbol_panel = view.to_symbol_panel()
+    assert symbol_panel.has_gaps and symbol_panel.mask.sum() == view.mask.sum()
+    print(f"[OK] {meta['days']}x{meta['symbols']} panel round-trips, slices are memmap views ({meta['bytes']} bytes)")
+
+
+def test_shared_across_processes_and_rebuild():
+    """다른 프로세스가 같은 파일을 열어 같은 값, 재생성 후에도 열린 맵은 이전 값 유지"""
+    directory = tempfile.mkdtemp(prefix='panel_')
+    store = PanelStore(directory=directory)
+    frames = make_frames()
+    store.build_from_frames(frames)
+    old = store.slice()
+    expected = float(np.nansum(old.field('close'), dtype=np.float64))
+
+    code = (
+        "import sys, numpy as np; sys.path.insert(0, sys.argv[1]);"
+        "from data.panel_store import PanelStore;"
+        "view = PanelStore(directory=sys.argv[2]).slice();"
+        "print(float(np.nansum(view.field('close'), dtype=np.float64)), type(view.field('close')).__name__)"
+    )
+    output = subprocess.run([sys.executable, '-c', code, BACKEND_DIR, directory],
+                            capture_output=True, text=True, timeout=60, check=True).stdout.split()
+    assert float(output[-2]) == expected and output[-1] == 'memmap', output
+
+    frames['000000'] = frames['000000'] * 2
+    store.build_from_frames(frames)
+    assert store.slice().column('000000')[0] == old.column('000000')[0] * 2
+    assert float(np.nansum(old.field('close'), dtype=np.float64)) == expected  # 이전 버전 맵은 그대로
+    print("[OK] Panel shared by another process; rebuild swaps CURRENT without touching open maps")
+
+
+def test_build_from_local_cache():
+    """로컬 일봉 캐시 파일로 네트워크 없이 패널 생성"""
+    cache = PriceCache(directory=tempfile.mkdtemp(prefix='price_cache_'), enabled=True)
+    frames = make_frames(symbols=5, days=120)
+    for symbol, df in frames.items():
+        cache.save(symbol, df, '2023-01-02', '2023-06-16')
+    original = panel_module.price_cache
+    panel_module.price_cache = cache
+    try:
+        store = PanelStore(directory=tempfile.mkdtemp(prefix='panel_'))
+        meta = asyncio.run(store.build(start_date='2023-02-01'))
+        assert meta['source'] == 'local_cache' and meta['first_date'] == '2023-02-01'
+        for symbol, df in store.slice().frames().items():
+            pd.testing.assert_frame_equal(df, frames[symbol].loc['2023-02-01':], check_freq=False)
+    finally:
+        panel_module.price_cache = original
+    print(f"[OK] Built panel from local cache: {meta['days']} days x {meta['symbols']} symbols")
+
+
+def test_recent_history_with_source_tail():
+    """패널 이력 + refetch_from 이후 원천 봉 == 원천 전체의 최근 봉, 원천에서는 그 구간만 조회"""
+    source = make_frames(symbols=6)
+    store = PanelStore(directory=tempfile.mkdtemp(prefix='panel_'))
+    store.build_from_frames({symbol: df.iloc[:-20] for symbol, df in source.items()})  # 패널은 20봉 뒤처짐
+
+    revised = source['000000'].index[-25]  # 패널 생성 후 원천에서 수정된 봉
+    source['000000'].loc[revised, 'close'] += 7
+    revision_from = (revised - pd.Timedelta(days=2)).strftime('%Y-%m-%d')
+
+    history = store.recent_history(list(source) + ['999999'], 120, revision_from)
+    assert set(history) == set(source)
+    assert all(refetch_from == revision_from and len(base) == 120 for base, refetch_from in history.values())
+
+    requests = []
+
+    def read_source(supabase, stock_code, start_date=None, end_date=None, limit=None, index_name='date'):
+        requests.append((stock_code, start_date, limit))
+        df = source[stock_code] if start_date is None else source[stock_code].loc[start_date:]
+        return (df if limit is None else df.iloc[:limit]).rename_axis(index_name)
+
+    original = panel_module.read_price_frame
+    panel_module.read_price_frame = read_source
+    try:
+        for symbol, df in source.items():
+            got = read_recent_frame(None, symbol, 120, history[symbol], index_name='trade_date')
+            pd.testing.assert_frame_equal(got, df.iloc[-120:].rename_axis('trade_date'), check_freq=False)
+        assert [start for _, start, _ in requests] == [revision_from] * len(source)
+        read_recent_frame(None, '000000', 120)  # 이력이 없으면 기존 원천 조회
+        assert requests[-1] == ('000000', None, 120)
+    finally:
+        panel_module.read_price_frame = original
+    assert store.recent_history(['000000'], 10 ** 4, revision_from) == {}  # 이력 부족 → 원천 전체 조회
+    print(f"[OK] Snapshot history from panel + source tail since {revision_from} for {len(history)} symbols")
+
+
+if __name__ == '__main__':
+    test_roundtrip_and_views()
+    test_shared_across_processes_and_rebuild()
+    test_build_from_local_cache()
+    test_recent_history_with_source_tail()
+    print("\nAll tests passed")
@@ -0,0 +1,123 @@
+"""
+병렬 종목 파이프라인 검증 테스트
+- 프로세스 풀 결과가 순차 실행 결과와 동일한지 확인
+- 압축 신호 프레임 왕복 변환 확인
+- 요청별 workers가 달라도 풀은 하나 (동시 요청 취소 없음), 깨진 풀만 재생성
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+from backtest.engine import BacktestEngine
+from backtest import parallel
+from backtest.parallel import SymbolSignals, get_pool, map_in_pool, resolve_worker_count, shutdown_pool
+
+STRATEGY = {
+    'indicators': [
+        {'name': 'rsi', 'params': {'period': 14}},
+        {'name': 'sma', 'params': {'period': 5}},
+        {'name': 'sma', 'params': {'period': 20}},
+    ],
+    'buyConditions': [{'left': 'rsi', 'operator': '<', 'right': 40}],
+    'sellConditions': [{'left': 'rsi', 'operator': '>', 'right': 60}],
+    'stopLoss': {'enabled': True, 'value': 5}
+}
+
+STOCKS = ['005930', '000660', '035720', '051910']
+
+
+def _strip_ids(result):
+    return [{k: v for k, v in t.items() if k != 'trade_id'} for t in result['trades']]
+
+
+def test_resolve_worker_count():
+    """인자 > 환경변수 > 순차"""
+    os.environ.pop('BACKTEST_WORKERS', None)
+    assert resolve_worker_count() == 1
+    assert resolve_worker_count(3) == 3
+    assert resolve_worker_count(0) == (os.cpu_count() or 1)
+    os.environ['BACKTEST_WORKERS'] = '2'
+    assert resolve_worker_count() == 2
+    os.environ.pop('BACKTEST_WORKERS')
+    print("[OK] worker count")
+
+
+def test_symbol_signals_round_trip():
+    """float 블록 + 기타 컬럼으로 나눴다 합쳐도 원본과 동일"""
+    dates = pd.bdate_range('2024-01-01', periods=5, name='date')
+    df = pd.DataFrame({
+        'close': np.arange(5, dtype=float),
+        'volume': np.arange(5, dtype=np.int64),
+        'buy_signal': [True, False, True, False, False],
+        'buy_reason': ['a', '', 'b', '', ''],
+        'buy_stage': np.array([1, 0, 2, 0, 0], dtype=np.int16),
+        'rsi': [np.nan, 1.0, 2.0, 3.0, 4.0],
+    }, index=dates)
+
+    restored = SymbolSignals.from_frame('A', df, ['close', 'volume', 'rsi']).to_frame()
+    pd.testing.assert_frame_equal(restored, df, check_freq=False)
+    print("[OK] round trip")
+
+
+def test_parallel_matches_sequential():
+    """workers=2 결과 == 순차 실행 결과"""
+    engine = BacktestEngine()
+
+    async def run(workers):
+        return await engine.run_with_config(STRATEGY, STOCKS, '2022-01-01', '2023-12-31', workers=workers, use_cache=False)
+
+    try:
+        sequential = asyncio.run(run(1))
+        parallel = asyncio.run(run(2))
+    finally:
+        shutdown_pool()
+
+    assert parallel['final_capital'] == sequential['final_capital']
+    assert parallel['daily_values'] == sequential['daily_values']
+    assert _strip_ids(parallel) == _strip_ids(sequential)
+    print(f"[OK] parallel == sequential ({parallel['total_trades']} trades)")
+
+
+def test_shared_pool_survives_mixed_workers():
+    """workers가 다른 두 요청이 동시에 실행돼도 같은 풀, 둘 다 완료, 깨진 풀은 교체"""
+    async def both():
+        return await asyncio.gather(
+            map_in_pool(abs, [(-n,) for n in range(8)], workers=1),
+            map_in_pool(pow, [(n, 2) for n in range(8)], workers=4)
+        )
+
+    try:
+        pool = get_pool()
+        first, second = asyncio.run(both())
+        assert first == list(range(8)) and second == [n * n for n in range(8)]
+        assert get_pool() is pool
+
+        try:
+            asyncio.run(map_in_pool(os._exit, [(1,)], workers=1))  # 워커 비정상 종료
+            raise AssertionError('expected BrokenProcessPool')
+        except BrokenProcessPool:
+            pass
+        assert parallel._pool is None
+        replacement = get_pool()
+        assert replacement is not pool and asyncio.run(map_in_pool(abs, [(-3,)], workers=2)) == [3]
+    finally:
+        shutdown_pool()
+    print("[OK] one shared pool across worker counts, broken pool replaced")
+
+
+if __name__ == '__main__':
+    test_resolve_worker_count()
+    test_symbol_signals_round_trip()
+    test_parallel_matches_sequential()
+    test_shared_pool_survives_mixed_workers()
+    print("\nAll tests passed")
@@ -0,0 +1,135 @@
+"""
+파라미터 스윕 검증 테스트
+- 그리드 구성 (values / start-stop-step)
+- 서로 다른 지표 설정만 계산되는지 확인
+- 그리드 포인트 결과가 동일 설정의 단일 백테스트와 일치하는지 확인
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+from backtest.engine import BacktestEngine
+from backtest.optimizer import ParameterSweep, build_grid
+from backtest.parallel import shutdown_pool
+
+STRATEGY = {
+    'indicators': [
+        {'name': 'rsi', 'params': {'period': 14}},
+        {'name': 'sma', 'params': {'period': 20}},
+    ],
+    'buyConditions': [{'left': 'rsi', 'operator': '<', 'right': 40}],
+    'sellConditions': [{'left': 'rsi', 'operator': '>', 'right': 60}],
+    'stopLoss': {'enabled': True, 'value': 5}
+}
+
+PARAMETERS = [
+    {'path': 'indicators.0.params.period', 'values': [9, 14]},
+    {'path': 'stopLoss.value', 'start': 3, 'stop': 7, 'step': 2},
+]
+
+STOCKS = ['005930', '000660']
+
+
+def test_build_grid():
+    """values × start/stop/step 조합"""
+    grid = build_grid(STRATEGY, PARAMETERS)
+    assert len(grid) == 6
+    params, config = grid[-1]
+    assert params == {'indicators.0.params.period': 14, 'stopLoss.value': 7}
+    assert config['indicators'][0]['params']['period'] == 14
+    assert config['stopLoss']['value'] == 7
+    assert STRATEGY['stopLoss']['value'] == 5  # 원본 불변
+
+    try:
+        build_grid(STRATEGY, PARAMETERS, max_points=5)
+        assert False, "grid size limit not enforced"
+    except ValueError:
+        pass
+    print("[OK] grid")
+
+
+def test_sweep_matches_single_runs():
+    """스윕 순위표 값 == 같은 설정의 run_with_config 결과"""
+    engine = BacktestEngine()
+    sweep = ParameterSweep(engine)
+
+    async def run():
+        table = await sweep.run(STRATEGY, PARAMETERS, STOCKS, '2022-01-01', '2023-12-31', workers=1)
+        singles = {}
+        for params, config in build_grid(STRATEGY, PARAMETERS):
+            result = await engine.run_with_config(config, STOCKS, '2022-01-01', '2023-12-31')
+            singles[tuple(params.values())] = result
+        return table, singles
+
+    table, singles = asyncio.run(run())
+
+    # rsi 2개 + sma 1개 (stopLoss만 다른 포인트는 지표 공유)
+    assert table['distinct_indicators'] == 3
+    assert [row['rank'] for row in table['results']] == list(range(1, 7))
+    returns = [row['total_return_rate'] for row in table['results']]
+    assert returns == sorted(returns, reverse=True)
+
+    for row in table['results']:
+        single = singles[tuple(row['params'].values())]
+        assert abs(row['total_return_rate'] - single['total_return_rate']) < 1e-9
+        assert abs(row['max_drawdown'] - single['max_drawdown']) < 1e-9
+        assert abs(row['win_rate'] - single['win_rate']) < 1e-9
+        assert row['total_trades'] == single['total_trades']
+    best = table['results'][0]
+    print(f"[OK] best {best['params']} -> {best['total_return_rate']:.2f}%")
+
+
+def test_sweep_parallel_matches_sequential():
+    """workers=2 순위표 == 순차 순위표"""
+    sweep = ParameterSweep(BacktestEngine())
+
+    async def run(workers):
+        return await sweep.run(STRATEGY, PARAMETERS, STOCKS, '2022-01-01', '2023-12-31', workers=workers)
+
+    try:
+        sequential = asyncio.run(run(1))
+        parallel = asyncio.run(run(2))
+    finally:
+        shutdown_pool()
+
+    assert parallel['results'] == sequential['results']
+    print(f"[OK] parallel sweep == sequential ({parallel['grid_points']} points)")
+
+
+def test_sequential_sweep_keeps_event_loop_free():
+    """순차 스윕 중에도 이벤트 루프가 다른 코루틴을 실행 (지표/평가는 스레드에서 계산)"""
+    sweep = ParameterSweep(BacktestEngine())
+    ticks = []
+
+    async def ticker(done):
+        while not done.is_set():
+            ticks.append(1)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        done = asyncio.Event()
+        task = asyncio.create_task(ticker(done))
+        try:
+            return await sweep.run(STRATEGY, PARAMETERS, STOCKS, '2022-01-01', '2023-12-31', workers=1)
+        finally:
+            done.set()
+            await task
+
+    table = asyncio.run(run())
+    assert table['grid_points'] == 6
+    assert len(ticks) > 5, ticks
+    print(f"[OK] event loop ran {len(ticks)} ticks during sequential sweep")
+
+
+if __name__ == '__main__':
+    test_build_grid()
+    test_sweep_matches_single_runs()
+    test_sweep_parallel_matches_sequential()
+    test_sequential_sweep_keeps_event_loop_free()
+    print("\nAll tests passed")
@@ -0,0 +1,153 @@
+"""
+시간축 포트폴리오 시뮬레이터 검증 테스트
+- 날짜당 일별 가치 1건
+- 보유 수량 · 종가 내적 평가액이 개별 합산과 일치
+- 같은 날 매도 대금이 다른 종목 매수에 사용되는지 확인
+- 거래 원장/포지션 북 동작
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+from backtest.engine import BacktestEngine
+from backtest.ledger import NO_STAGE, PositionBook, TradeLedger
+from backtest.portfolio import PortfolioSimulator
+
+
+def make_signal_frame(dates, closes, buys=(), sells=()) -> pd.DataFrame:
+    """신호 컬럼이 채워진 테스트 데이터 생성"""
+    df = pd.DataFrame({'close': np.asarray(closes, dtype=float)}, index=pd.DatetimeIndex(dates))
+    df['buy_signal'] = False
+    df['sell_signal'] = False
+    df['buy_reason'] = ''
+    df['sell_reason'] = ''
+    for i in buys:
+        df.iloc[i, df.columns.get_loc('buy_signal')] = True
+        df.iloc[i, df.columns.get_loc('buy_reason')] = 'test buy'
+    for i in sells:
+        df.iloc[i, df.columns.get_loc('sell_signal')] = True
+        df.iloc[i, df.columns.get_loc('sell_reason')] = 'test sell'
+    return df
+
+
+def _simulator(position_size=0.5):
+    return PortfolioSimulator(
+        BacktestEngine(), {'position_size': position_size},
+        initial_capital=1_000_000, commission=0.0, slippage=0.0
+    )
+
+
+def test_one_daily_value_per_date():
+    """종목별 거래일이 달라도 캘린더 날짜당 1건"""
+    days = pd.bdate_range('2024-01-01', periods=10)
+    frames = {
+        'A': make_signal_frame(days, np.linspace(100, 110, 10), buys=[0]),
+        'B': make_signal_frame(days[3:], np.linspace(50, 60, 7), buys=[0]),
+    }
+    result = _simulator().run(frames)
+
+    dates = [dv['date'] for dv in result['equity'].to_dicts()]
+    assert dates == list(days)
+    print(f"[OK] {len(dates)} daily values for {len(frames)} stocks")
+
+
+def test_mark_to_market_matches_positions():
+    """평가액 = 현금 + Σ 보유수량 × 직전 종가"""
+    days = pd.bdate_range('2024-01-01', periods=8)
+    frames = {
+        'A': make_signal_frame(days, [100, 101, 102, 103, 104, 105, 106, 107], buys=[1]),
+        # B는 중간 거래일이 비어 있음 → 직전 종가로 평가
+        'B': make_signal_frame(days[[0, 1, 2, 5, 6, 7]], [10, 11, 12, 15, 16, 17], buys=[0]),
+    }
+    result = _simulator(position_size=0.3).run(frames)
+    daily_values = result['equity'].to_dicts()
+    trades = result['ledger'].to_dicts()
+
+    quantities = {code: pos['quantity'] for code, pos in result['positions'].to_dicts().items()}
+    closes = pd.DataFrame({c: f['close'] for c, f in frames.items()}, index=days).ffill()
+    for dv, (date, row) in zip(daily_values, closes.iterrows()):
+        held = {t['stock_code'] for t in trades if t['date'] <= date}
+        expected = dv['capital'] + sum(quantities[c] * row[c] for c in held)
+        assert abs(dv['total_value'] - expected) < 1e-6, (date, dv, expected)
+    print(f"[OK] final value {daily_values[-1]['total_value']:,.0f}")
+
+
+def test_same_day_exit_funds_entry():
+    """같은 날 A 매도 대금으로 B 매수 (종목 순서와 무관하게 매도 먼저 처리)"""
+    days = pd.bdate_range('2024-01-01', periods=4)
+    frames = {
+        'B': make_signal_frame(days, [100, 100, 100, 100], buys=[2]),
+        'A': make_signal_frame(days, [100, 100, 200, 200], buys=[0], sells=[2]),
+    }
+    result = _simulator(position_size=1.0).run(frames)
+    records = result['ledger'].to_dicts()
+
+    trades = [(t['date'], t['stock_code'], t['type']) for t in records]
+    assert trades == [(days[0], 'A', 'buy'), (days[2], 'A', 'sell'), (days[2], 'B', 'buy')]
+    b_buy = records[-1]
+    assert b_buy['quantity'] == 20000  # 200만원 전액 매수
+    print(f"[OK] trades: {[(c, t) for _, c, t in trades]}")
+
+
+def test_ledger_grows_and_snapshots_lazily():
+    """원장이 청크 단위로 늘어나고, 지표 스냅샷은 직렬화 시점의 행에서 생성"""
+    engine = BacktestEngine()
+    days = pd.bdate_range('2024-01-01', periods=6)
+    frame = make_signal_frame(days, [100, 101, 102, 103, 104, 105])
+    frame['rsi'] = [10.0, 20.0, 30.0, 40.0, 50.0, 60.0]
+
+    ledger = TradeLedger(['A'], days, chunk_size=2)
+    for bar in range(5):
+        ledger.record_buy(bar, 0, bar, 1, 100.0 + bar, 100.0 + bar, 0.0, f'buy {bar}', stage=bar % 2 or NO_STAGE)
+    ledger.record_sell(5, 0, 5, 5, 105.0, 525.0, 0.0, 15.0, 2.9, 'stage_1_target', 50.0)
+    assert len(ledger) == 6 and len(ledger.records) == 6
+
+    trades = ledger.to_dicts({'A': frame}, engine._collect_indicators_at_trade)
+    assert [t['indicators']['rsi'] for t in trades] == [10.0, 20.0, 30.0, 40.0, 50.0, 60.0]
+    assert 'stage' not in trades[0] and trades[1]['stage'] == 1
+    assert trades[-1]['exit_ratio'] == 50 and isinstance(trades[-1]['exit_ratio'], int)
+    assert len({t['trade_id'] for t in trades}) == 6
+    print(f"[OK] ledger {len(trades)} trades")
+
+
+def test_position_book_dict_compat():
+    """_check_profit_based_exit가 Position 레코드를 dict처럼 사용할 수 있는지 확인"""
+    engine = BacktestEngine()
+    book = PositionBook(['A', 'B'])
+    position = book.open(1, 10, 100.0, 1000.0, pd.Timestamp('2024-01-01'))
+    position.mark_exit_stage(1)
+
+    target = {'mode': 'staged', 'staged': {'enabled': True, 'stages': [
+        {'stage': 1, 'targetProfit': 5, 'exitRatio': 50},
+        {'stage': 2, 'targetProfit': 10, 'exitRatio': 100},
+    ]}}
+    should_exit, reason, ratio = engine._check_profit_based_exit(position, 111.0, target, None)
+    assert should_exit and reason.startswith('stage_2') and ratio == 100
+    assert position.highest_stage_reached == 2
+    assert book.quantities.tolist() == [0.0, 10.0]
+
+    for stage in (0, 70, -1):  # 단계 번호는 사용자 설정값 → 비트 범위 밖도 허용
+        position.mark_buy_stage(stage)
+    assert position.has_buy_stage(70) and not position.has_buy_stage(2)
+    assert position.to_dict()['executed_buy_stages'] == [-1, 0, 70]
+
+    book.close('B')
+    assert len(book) == 0 and book.quantities.tolist() == [0.0, 0.0]
+    print("[OK] position book")
+
+
+if __name__ == '__main__':
+    test_one_daily_value_per_date()
+    test_mark_to_market_matches_positions()
+    test_same_day_exit_funds_entry()
+    test_ledger_grows_and_snapshots_lazily()
+    test_position_book_dict_compat()
+    print("\nAll tests passed")
@@ -0,0 +1,249 @@
+"""
+로컬 일봉 캐시 검증 테스트
+- 첫 조회만 Supabase, 같은 구간 재조회는 디스크만 (요청 0건), 결과는 Supabase 직접 조회와 동일
+- 뒤쪽/앞쪽 gap만 받아 합침 (마지막 봉 수정도 반영), invalidate(since)는 해당 구간부터 다시 받음
+- refresh(): 캐시된 종목의 새 봉만 동기화, DataProvider 일괄 조회도 캐시 경유
+- 최근 수정 구간(revision_days)은 매번 다시 받아 upsert로 바뀐 과거 봉 반영, 바뀐 게 없으면 파일 유지
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+
+from data.local_cache import PriceCache
+from data.provider import DataProvider
+
+
+class FakeQuery:
+    """kw_price_daily 조회 대역 (count='exact', in_/eq, offset 페이지)"""
+
+    def __init__(self, client, count, columns='*'):
+        self.client = client
+        self.count = count
+        self.columns = columns
+        self.as_csv = False
+        self.filters = []
+        self.limit_rows = 1000
+        self.offset_rows = 0
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row[column] == value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row[column] in values)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row[column] >= value)
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda row: row[column] <= value)
+        return self
+
+    def order(self, column, desc=False):
+        return self
+
+    def limit(self, size):
+        self.limit_rows = min(size, 1000)
+        return self
+
+    def offset(self, size):
+        self.offset_rows = size
+        return self
+
+    def csv(self):
+        self.as_csv = True
+        return self
+
+    def execute(self):
+        rows = [row for row in self.client.rows if all(f(row) for f in self.filters)]
+        page = [dict(row) for row in rows[self.offset_rows:self.offset_rows + self.limit_rows]]
+        self.client.requests += 1
+        self.client.fetched_rows += len(page)
+        if self.as_csv:  # Accept: text/csv
+            names = list(page[0]) if self.columns == '*' and page else [c.strip() for c in self.columns.split(',')]
+            lines = [','.join(names)] + [','.join('' if row.get(c) is None else str(row.get(c)) for c in names) for row in page]
+            page = '\n'.join(lines) + '\n' if page else ''
+        return type('Response', (), {'data': page, 'count': len(rows) if self.count else None})()
+
+
+class FakeClient:
+    def __init__(self, rows):
+        self.rows = sorted(rows, key=lambda row: (row['stock_code'], row['trade_date']))
+        self.requests = 0
+        self.fetched_rows = 0
+
+    def table(self, name):
+        assert name == 'kw_price_daily'
+        return self
+
+    def select(self, columns='*', count=None):
+        return FakeQuery(self, count == 'exact', columns)
+
+    def reset(self):
+        self.requests = self.fetched_rows = 0
+
+
+def make_rows(codes, start: str = '2022-01-03', end: str = '2024-12-31') -> list:
+    rng = np.random.default_rng(11)
+    dates = pd.bdate_range(start, end)
+    rows = []
+    for code in codes:
+        close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+        for d, date in enumerate(dates):
+            rows.append({
+                'stock_code': code, 'trade_date': date.strftime('%Y-%m-%d'),
+                'open': str(round(close[d], 2)), 'high': str(round(close[d] * 1.01, 2)),
+                'low': str(round(close[d] * 0.99, 2)), 'close': str(round(close[d], 2)),
+                'volume': int(rng.integers(1, 10 ** 6))
+            })
+    return rows
+
+
+def direct(client: FakeClient, code: str, start: str, end: str) -> pd.DataFrame:
+    """캐시 없이 Supabase 직접 조회 (기준값)"""
+    provider = DataProvider()
+    provider.supabase, provider.price_cache = client, None
+    return asyncio.run(provider.get_historical_data(code, start, end))
+
+
+def test_second_read_is_local():
+    """같은 구간 재조회: Supabase 요청 0건, 결과는 직접 조회와 동일"""
+    codes = ['000660', '005930', '035720']
+    client = FakeClient(make_rows(codes))
+    cache = PriceCache(directory=tempfile.mkdtemp(prefix='price_cache_'), enabled=True)
+
+    first = asyncio.run(cache.read(client, codes, '2022-01-03', '2024-06-28'))
+    cold_requests = client.requests
+    client.reset()
+    second = asyncio.run(cache.read(client, codes, '2023-01-02', '2024-03-29'))
+    assert client.requests == 0 and cold_requests > 0
+    for code in codes:
+        pd.testing.assert_frame_equal(first[code], direct(client, code, '2022-01-03', '2024-06-28'), check_names=False)
+        pd.testing.assert_frame_equal(second[code], direct(client, code, '2023-01-02', '2024-03-29'), check_names=False)
+    manifest = cache.manifest('005930')[0]
+    assert manifest['last_trade_date'] == '2024-06-28' and manifest['synced_through'] == '2024-06-28'
+    print(f"[OK] Cold read {cold_requests} requests, warm read 0 requests: {cache.stats()}")
+
+
+def test_only_gaps_fetched():
+    """뒤쪽 gap: 마지막 봉부터 받음 (수정된 마지막 봉 반영), 앞쪽 gap: 그 구간만"""
+    codes = ['005930', '000660']
+    rows = make_rows(codes)
+    client = FakeClient(rows)
+    cache = PriceCache(directory=tempfile.mkdtemp(prefix='price_cache_'), enabled=True)
+    asyncio.run(cache.read(client, codes, '2023-01-02', '2024-06-28'))
+
+    # 캐시 이후 마지막 봉이 장 마감 값으로 수정됨
+    for row in client.rows:
+        if row['trade_date'] == '2024-06-28':
+            row['close'] = '12345.0'
+    client.reset()
+    frames = asyncio.run(cache.read(client, codes, '2023-01-02', '2024-07-31'))
+    assert client.fetched_rows == 2 * 24, client.fetched_rows  # 6/28 + 7월 23영업일, 종목 2개
+    assert frames['005930'].loc['2024-06-28', 'close'] == 12345.0
+
+    client.reset()
+    frames = asyncio.run(cache.read(client, codes, '2022-06-01', '2024-07-31'))
+    head_days = len(pd.bdate_range('2022-06-01', '2022-12-30'))
+    assert client.fetched_rows == 2 * head_days, (client.fetched_rows, head_days)
+    for code in codes:
+        pd.testing.assert_frame_equal(frames[code], direct(client, code, '2022-06-01', '2024-07-31'), check_names=False)
+    print(f"[OK] Tail and head gaps fetched only ({client.requests} requests for the head gap)")
+
+
+def test_invalidate_and_refresh():
+    """invalidate(since) → 그 날짜부터 다시 받음, refresh() → 캐시된 종목의 새 봉만"""
+    codes = ['005930', '035420']
+    client = FakeClient(make_rows(codes))
+    cache = PriceCache(directory=tempfile.mkdtemp(prefix='price_cache_'), enabled=True)
+    asyncio.run(cache.read(client, codes, '2024-01-02', '2024-09-30'))
+
+    for row in client.rows:
+        if row['stock_code'] == '005930' and '2024-09-02' <= row['trade_date'] <= '2024-09-30':
+            row['volume'] = 7  # 백필로 과거 봉 수정
+    assert cache.invalidate(['005930'], since='2024-09-02') == 1
+    client.reset()
+    frames = asyncio.run(cache.read(client, codes, '2024-01-02', '2024-09-30'))
+    assert client.fetched_rows == len(pd.bdate_range('2024-08-30', '2024-09-30'))
+    assert (frames['005930'].loc['2024-09-02':, 'volume'] == 7).all()
+
+    client.reset()
+    result = asyncio.run(cache.refresh(client, end_date='2024-12-31'))
+    assert result['symbols'] == 2 and result['fetched_rows'] == 2 * len(pd.bdate_range('2024-09-30', '2024-12-31'))
+    assert all(entry['last_trade_date'] == '2024-12-31' for entry in cache.manifest())
+    print(f"[OK] Invalidate since date and refresh new bars: {result}")
+
+
+def test_provider_reads_cache_first():
+    """DataProvider 일괄/단건 조회가 캐시 경유 (두 번째 백테스트 로드는 요청 0건)"""
+    codes = ['005930', '000660', '035720']
+    client = FakeClient(make_rows(codes))
+    provider = DataProvider()
+    provider.supabase = client
+    provider.price_cache = PriceCache(directory=tempfile.mkdtemp(prefix='price_cache_'), enabled=True)
+
+    first = asyncio.run(provider.get_bulk_historical_data(codes, '2023-01-02', '2024-06-28'))
+    client.reset()
+    second = asyncio.run(provider.get_bulk_historical_data(codes, '2023-01-02', '2024-06-28'))
+    single = asyncio.run(provider.get_historical_data('000660', '2023-06-01', '2023-12-29'))
+    assert client.requests == 0
+    for code in codes:
+        pd.testing.assert_frame_equal(first[code], second[code])
+    pd.testing.assert_frame_equal(single, first['000660'].loc['2023-06-01':'2023-12-29'])
+    print(f"[OK] DataProvider served repeat loads from local cache: {provider.price_cache.stats()}")
+
+
+def test_revision_window_refetched():
+    """배치 upsert로 최근 봉이 바뀌면 다음 조회에 반영, 바뀐 게 없으면 요청만 하고 파일은 그대로"""
+    today = datetime.now()
+    start, end = (today - timedelta(days=400)).strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d')
+    codes = ['005930', '000660']
+    client = FakeClient(make_rows(codes, start, end))
+    cache = PriceCache(directory=tempfile.mkdtemp(prefix='price_cache_'), enabled=True, revision_days=60)
+    asyncio.run(cache.read(client, codes, start, end))
+    writes = cache.stats()['writes']
+
+    client.reset()
+    frames = asyncio.run(cache.read(client, codes, start, end))
+    revision_from = (today - timedelta(days=60)).strftime('%Y-%m-%d')
+    recent = len(pd.bdate_range(revision_from, end))
+    assert client.fetched_rows == 2 * recent, (client.fetched_rows, recent)  # 수정 구간만 다시 받음
+    assert cache.stats()['writes'] == writes and cache.stats()['unchanged'] == 2
+
+    revised_day = (today - timedelta(days=30)).strftime('%Y-%m-%d')
+    upserted = [row for row in client.rows if row['stock_code'] == '005930' and row['trade_date'] >= revised_day][0]
+    upserted['close'] = '777.0'  # update_daily_prices.py의 on_conflict upsert
+    deleted = [row for row in client.rows if row['stock_code'] == '000660' and row['trade_date'] >= revised_day][0]
+    client.rows.remove(deleted)
+    frames = asyncio.run(cache.read(client, codes, start, end))
+    assert frames['005930'].loc[upserted['trade_date'], 'close'] == 777.0
+    assert deleted['trade_date'] not in frames['000660'].index.strftime('%Y-%m-%d')
+    for code in codes:
+        pd.testing.assert_frame_equal(frames[code], direct(client, code, start, end), check_names=False)
+
+    old = (today - timedelta(days=200)).strftime('%Y-%m-%d')
+    client.reset()
+    asyncio.run(cache.read(client, codes, start, old))  # 수정 구간 밖 조회는 캐시만
+    assert client.requests == 0
+    print(f"[OK] Revision window re-fetched each read, unchanged files kept: {cache.stats()}")
+
+
+if __name__ == '__main__':
+    test_second_read_is_local()
+    test_only_gaps_fetched()
+    test_invalidate_and_refresh()
+    test_provider_reads_cache_first()
+    test_revision_window_refetched()
+    print("\nAll tests passed")
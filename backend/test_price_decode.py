@@ -0,0 +1,119 @@
+"""
+kw_price_daily 응답 디코딩 검증 테스트
+- CSV 응답과 JSON 응답이 같은 타입 청크로 디코딩 (float64 가격, int64 volume, datetime64[D] 날짜, 종목코드 앞자리 0 유지)
+- 빈 응답/NULL 값 처리, 단일 종목 프레임 (전략 신호 경로)
+- 마이크로 벤치마크: 기존 경로 (JSON → dict 목록 → DataFrame → 컬럼별 to_numeric/to_datetime) 대비 CSV 디코딩
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+
+from data.price_reader import STREAM_COLUMNS, decode_price_csv, decode_price_response, decode_price_rows, read_price_frame
+from test_price_reader import FakeClient
+
+COLUMNS = STREAM_COLUMNS.split(',')
+
+
+def make_rows(symbols: int, days: int) -> list:
+    """PostgREST JSON 응답과 같은 모양 (numeric 컬럼은 문자열)"""
+    rng = np.random.default_rng(17)
+    dates = [d.strftime('%Y-%m-%d') for d in pd.bdate_range('2015-01-01', periods=days)]
+    rows = []
+    for j in range(symbols):
+        close = np.round(10000 * np.exp(np.cumsum(rng.normal(0, 0.02, days))), 2)
+        volume = rng.integers(1, 10 ** 7, days)
+        code = f"{j * 7:06d}"
+        for d in range(days):
+            rows.append({'stock_code': code, 'trade_date': dates[d], 'open': str(close[d]),
+                         'high': str(close[d] + 100), 'low': str(close[d] - 100), 'close': str(close[d]),
+                         'volume': int(volume[d])})
+    return rows
+
+
+def to_csv(rows: list) -> str:
+    """PostgREST text/csv 응답 본문"""
+    lines = [','.join(COLUMNS)]
+    lines += [','.join('' if row[c] is None else str(row[c]) for c in COLUMNS) for row in rows]
+    return '\n'.join(lines) + '\n'
+
+
+def legacy_frame(payload: bytes) -> pd.DataFrame:
+    """기존 경로: JSON 파싱 → dict 목록 → DataFrame → 컬럼별 변환"""
+    df = pd.DataFrame(json.loads(payload))
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        df[col] = pd.to_numeric(df[col])
+    df['trade_date'] = pd.to_datetime(df['trade_date'])
+    return df
+
+
+def test_csv_and_json_decode_identically():
+    """같은 행을 CSV/JSON으로 받아도 같은 dtype, 같은 값"""
+    rows = make_rows(3, 50)
+    rows[4]['close'] = None  # NULL 가격
+    rows[5]['volume'] = None
+    from_json = decode_price_rows(rows, COLUMNS)
+    from_csv = decode_price_csv(to_csv(rows), COLUMNS)
+    for col in COLUMNS:
+        assert from_json[col].dtype == from_csv[col].dtype, (col, from_json[col].dtype, from_csv[col].dtype)
+        np.testing.assert_array_equal(from_json[col], from_csv[col])
+    assert from_csv['trade_date'].dtype == 'datetime64[D]' and from_csv['volume'].dtype == np.int64
+    assert from_csv['close'].dtype == np.float64 and np.isnan(from_csv['close'][4]) and from_csv['volume'][5] == 0
+    assert from_csv['stock_code'][-1] == '000014'  # 앞자리 0 유지
+
+    for empty in ('', [], None):
+        chunk = decode_price_response(empty, COLUMNS)
+        assert all(len(values) == 0 for values in chunk.values()) and chunk['volume'].dtype == np.int64
+    print("[OK] CSV and JSON responses decode to the same typed chunk")
+
+
+def test_read_price_frame():
+    """단일 종목 프레임: 타입 고정, 행이 없으면 빈 프레임"""
+    client = FakeClient(make_rows(2, 300), max_rows=120)
+    df = read_price_frame(client, '000007', limit=200, index_name='trade_date')
+    assert len(df) == 200 and df.index.name == 'trade_date' and df.index.dtype == 'datetime64[ns]'
+    assert list(df.columns) == ['open', 'high', 'low', 'close', 'volume'] and df['volume'].dtype == np.int64
+    empty = read_price_frame(client, '999999')
+    assert empty.empty and empty['close'].dtype == np.float64
+    print(f"[OK] read_price_frame: {len(df)} typed rows, empty frame for unknown stock")
+
+
+def test_decode_benchmark():
+    """100k행: CSV 타입 디코딩이 기존 JSON → DataFrame → 변환 경로보다 빠름"""
+    rows = make_rows(40, 2500)
+    payload, text = json.dumps(rows).encode(), to_csv(rows)
+
+    def best(fn, repeat=3):
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - started)
+        return min(times)
+
+    legacy = best(lambda: legacy_frame(payload))
+    typed_json = best(lambda: decode_price_rows(json.loads(payload), COLUMNS))
+    typed_csv = best(lambda: decode_price_csv(text, COLUMNS))
+
+    expected = legacy_frame(payload)
+    chunk = decode_price_csv(text, COLUMNS)
+    np.testing.assert_array_equal(chunk['close'], expected['close'].to_numpy())
+    np.testing.assert_array_equal(chunk['volume'], expected['volume'].to_numpy())
+    np.testing.assert_array_equal(chunk['trade_date'].astype('datetime64[ns]'), expected['trade_date'].to_numpy())
+    assert typed_csv < legacy, (typed_csv, legacy)
+    print(f"[OK] {len(rows)} rows: legacy {legacy * 1000:.0f}ms, typed JSON {typed_json * 1000:.0f}ms, "
+          f"CSV {typed_csv * 1000:.0f}ms ({legacy / typed_csv:.1f}x)")
+
+
+if __name__ == '__main__':
+    test_csv_and_json_decode_identically()
+    test_read_price_frame()
+    test_decode_benchmark()
+    print("\nAll tests passed")
@@ -0,0 +1,166 @@
+"""
+kw_price_daily 스트리밍 리더 검증 테스트
+- 서버 max-rows보다 긴 기간도 키셋 페이지로 전부 조회 (단일 .execute()는 잘림)
+- 여러 종목: (stock_code, trade_date) 순서, 누락/중복 없음, 청크는 타입 컬럼 (datetime64 / float64 / int64)
+- 제너레이터는 페이지 단위로 지연 조회, limit 지원
+"""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+
+from data.price_reader import iter_price_chunks, read_price_history
+from data.provider import DataProvider
+
+
+class FakeQuery:
+    """PostgREST 대역: 요청당 최대 max_rows행 (limit이 더 커도 잘림)"""
+
+    def __init__(self, table, count, columns='*'):
+        self.table = table
+        self.count = count
+        self.columns = columns
+        self.as_csv = False
+        self.filters = []
+        self.limit_rows = None
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row[column] == value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row[column] in values)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row[column] > value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row[column] >= value)
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda row: row[column] <= value)
+        return self
+
+    def order(self, column, desc=False):
+        return self
+
+    def limit(self, size):
+        self.limit_rows = size
+        return self
+
+    def csv(self):
+        self.as_csv = True
+        return self
+
+    def execute(self):
+        self.table.requests += 1
+        rows = [row for row in self.table.rows if all(f(row) for f in self.filters)]
+        total = len(rows)
+        size = min(self.limit_rows or self.table.max_rows, self.table.max_rows)
+        page = [dict(row) for row in rows[:size]]
+        if self.as_csv:  # Accept: text/csv
+            names = list(page[0]) if self.columns == '*' and page else [c.strip() for c in self.columns.split(',')]
+            lines = [','.join(names)] + [','.join('' if row.get(c) is None else str(row.get(c)) for c in names) for row in page]
+            page = '\n'.join(lines) + '\n' if page else ''
+        return type('Response', (), {'data': page, 'count': total if self.count else None})()
+
+
+class FakeClient:
+    def __init__(self, rows, max_rows=300):
+        self.rows = sorted(rows, key=lambda row: (row['stock_code'], row['trade_date']))
+        self.max_rows = max_rows
+        self.requests = 0
+
+    def table(self, name):
+        assert name == 'kw_price_daily'
+        return self
+
+    def select(self, columns='*', count=None):
+        return FakeQuery(self, count == 'exact', columns)
+
+
+def make_rows(codes, days: int) -> list:
+    rng = np.random.default_rng(5)
+    dates = pd.bdate_range('2015-01-01', periods=days)
+    rows = []
+    for n, code in enumerate(codes):
+        close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+        for d in range(n * 7, days):  # 종목마다 시작일이 다름
+            rows.append({
+                'stock_code': code, 'trade_date': dates[d].strftime('%Y-%m-%d'),
+                'open': str(round(close[d], 2)), 'high': str(round(close[d] * 1.01, 2)),
+                'low': str(round(close[d] * 0.99, 2)), 'close': str(round(close[d], 2)),
+                'volume': int(rng.integers(1, 10 ** 6))
+            })
+    return rows
+
+
+def test_reads_past_max_rows():
+    """10년치 단일 종목, 서버 max-rows 300 / 요청 페이지 1000 → 전부 조회"""
+    rows = make_rows(['005930'], 2600)
+    client = FakeClient(rows, max_rows=300)
+    truncated = client.select('*').eq('stock_code', '005930').order('trade_date').execute()
+    assert len(truncated.data) == 300
+
+    history = read_price_history(client, ['005930'], '2015-01-01', '2025-12-31', page_size=1000)
+    assert len(history) == 2600 and history['trade_date'].is_monotonic_increasing
+    assert history['trade_date'].dtype == 'datetime64[ns]' and history['close'].dtype == np.float64
+    assert history['volume'].dtype == np.int64
+    np.testing.assert_array_equal(history['close'].to_numpy(), [float(row['close']) for row in rows])
+    print(f"[OK] {len(history)} rows read past max-rows 300 in {client.requests - 1} requests")
+
+
+def test_multi_symbol_keyset():
+    """여러 종목: 페이지 경계가 종목 중간에 걸려도 누락/중복 없이 (stock_code, trade_date) 순서"""
+    codes = ['000660', '005930', '035420', '035720', '999999']
+    rows = make_rows(codes[:4], 700)
+    client = FakeClient(rows, max_rows=250)
+    history = read_price_history(client, codes, '2015-03-01', '2017-06-30')
+    expected = [(row['stock_code'], row['trade_date']) for row in client.rows
+                if '2015-03-01' <= row['trade_date'] <= '2017-06-30']
+    got = list(zip(history['stock_code'], history['trade_date'].dt.strftime('%Y-%m-%d')))
+    assert got == expected, (len(got), len(expected))
+    print(f"[OK] {len(codes)} stocks, {len(history)} rows via keyset pages ({client.requests} requests)")
+
+
+def test_lazy_chunks_and_limit():
+    """제너레이터: 청크 1개 = 요청 1건, limit은 정확히 그 행 수까지만 조회"""
+    client = FakeClient(make_rows(['005930'], 2000), max_rows=500)
+    chunks = iter_price_chunks(client, ['005930'], page_size=500)
+    first = next(chunks)
+    assert client.requests == 1 and len(first['close']) == 500
+    assert sum(len(chunk['close']) for chunk in chunks) == 1500
+
+    client.requests = 0
+    limited = read_price_history(client, ['005930'], limit=1200, page_size=500)
+    assert len(limited) == 1200 and client.requests == 3
+    print("[OK] Chunks fetched lazily, limit respected")
+
+
+def test_provider_history_not_truncated():
+    """DataProvider.get_historical_data도 max-rows를 넘는 기간을 전부 반환"""
+    provider = DataProvider()
+    provider.supabase = FakeClient(make_rows(['005930'], 1500), max_rows=1000)
+    provider.price_cache = None  # Supabase 조회 경로 자체를 검증
+    df = asyncio.run(provider.get_historical_data('005930', '2015-01-01', '2025-12-31'))
+    assert len(df) == 1500 and list(df.columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert df.index.name == 'date' and df['volume'].dtype == np.int64
+    print(f"[OK] DataProvider returned {len(df)} rows (max-rows 1000)")
+
+
+if __name__ == '__main__':
+    test_reads_past_max_rows()
+    test_multi_symbol_keyset()
+    test_lazy_chunks_and_limit()
+    test_provider_history_not_truncated()
+    print("\nAll tests passed")
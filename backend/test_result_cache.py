@@ -0,0 +1,136 @@
+"""
+백테스트 결과 캐시 검증 테스트
+- 정규화된 입력이 같으면 같은 키, 입력/데이터 버전이 다르면 다른 키
+- 동일 백테스트 재실행 시 캐시 적중 (백테스트 재실행 없음), 기존 봉 수정(upsert) 시 미스
+- LRU 제거, 디스크 계층 복원, 종목 upsert 무효화 확인
+- 적중 결과를 바꿔도 캐시는 그대로, 최근 같은 요청은 가격을 다시 읽지 않음
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+from backtest.engine import BacktestEngine
+from backtest.result_cache import BacktestResultCache, cache_key, result_cache
+
+STRATEGY = {
+    'indicators': [{'name': 'rsi', 'params': {'period': 14}}],
+    'buyConditions': [{'left': 'rsi', 'operator': '<', 'right': 35}],
+    'sellConditions': [{'left': 'rsi', 'operator': '>', 'right': 65}]
+}
+STOCKS = ['005930', '000660']
+
+
+def test_cache_key_normalization():
+    """키 순서/정수형 float/날짜 표기 차이는 같은 키, 입력 차이는 다른 키"""
+    reordered = {
+        'sellConditions': [{'right': 65.0, 'operator': '>', 'left': 'rsi'}],
+        'indicators': [{'params': {'period': 14.0}, 'name': 'rsi'}],
+        'buyConditions': [{'left': 'rsi', 'operator': '<', 'right': 35}]
+    }
+    base = cache_key(STRATEGY, STOCKS, '2022-01-01', '2023-12-31', 10000000, 0.00015, 0.001, 'v1')
+    assert base == cache_key(reordered, STOCKS, '2022-1-1', '2023-12-31', 1e7, 0.00015, 0.001, 'v1')
+    assert base != cache_key(STRATEGY, STOCKS[::-1], '2022-01-01', '2023-12-31', 10000000, 0.00015, 0.001, 'v1')
+    assert base != cache_key(STRATEGY, STOCKS, '2022-01-01', '2023-12-31', 10000000, 0.00015, 0.002, 'v1')
+    assert base != cache_key(STRATEGY, STOCKS, '2022-01-01', '2023-12-31', 10000000, 0.00015, 0.001, 'v2')
+    print("[OK] Cache key normalization")
+
+
+def test_lru_and_disk_tier():
+    """메모리 LRU 제거 후 디스크에서 복원, 무효화 시 디스크 항목도 삭제"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = BacktestResultCache(max_entries=2, disk_dir=tmp)
+        cache.put('a', ['005930'], {'value': 1})
+        cache.put('b', ['000660'], {'value': 2})
+        cache.get('a')
+        cache.put('c', ['005930', '000660'], {'value': 3})  # b 제거 (가장 오래 미사용)
+        assert list(cache._entries) == ['a', 'c']
+
+        assert cache.get('b') == {'value': 2} and cache.disk_hits == 1
+
+        restarted = BacktestResultCache(max_entries=2, disk_dir=tmp)
+        assert restarted.get('c') == {'value': 3}
+
+        removed = restarted.invalidate_symbols(['000660'])
+        assert removed == 2  # 메모리 c + 디스크 b
+        assert restarted.get('b') is None and restarted.get('c') is None
+        assert restarted.get('a') == {'value': 1}
+        print(f"[OK] LRU/disk tier: {restarted.stats()}")
+
+
+def test_engine_cache_hit_and_invalidation():
+    """동일 입력 재실행은 백테스트 없이 캐시 반환, 봉 값 수정(행 수/id 불변)이나 종목 무효화 후 재계산"""
+    async def scenario():
+        result_cache.clear()
+        engine = BacktestEngine()
+        engine.monte_carlo_paths = 0
+
+        runs = []
+        original_run = engine._run_backtest
+
+        async def counting_run(*args, **kwargs):
+            runs.append(kwargs.get('price_data'))
+            return await original_run(*args, **kwargs)
+
+        engine._run_backtest = counting_run
+        loads = []
+        original_load = engine._load_price_data
+
+        async def counting_load(*args, **kwargs):
+            loads.append(args)
+            return await original_load(*args, **kwargs)
+
+        engine._load_price_data = counting_load
+
+        first = await engine.run_with_config(STRATEGY, STOCKS, '2022-01-01', '2023-12-31')
+        second = await engine.run_with_config(STRATEGY, STOCKS, '2022-01-01', '2023-12-31')
+        assert len(runs) == 1 and second['cache_hit']
+        assert len(loads) == 1  # 최근 같은 요청 → 가격 재조회 없음
+        assert second['total_return_rate'] == first['total_return_rate']
+        assert second['trades'] == first['trades'] and first['trades']
+
+        second['trades'].clear()  # 적중 결과 수정은 캐시에 영향 없음
+        again = await engine.run_with_config(STRATEGY, STOCKS, '2022-01-01', '2023-12-31')
+        assert again['cache_hit'] and again['trades'] == first['trades']
+
+        # on_conflict upsert로 기존 봉 종가만 바뀜 (행 수/최대 id는 그대로, 후크 없음 → 최근 요청 매핑 만료 후 반영)
+        fresh_seconds, result_cache.fresh_seconds = result_cache.fresh_seconds, 0
+
+        async def corrected_load(*args, **kwargs):
+            frames = await original_load(*args, **kwargs)
+            frames['000660'] = frames['000660'].copy()
+            frames['000660'].iloc[100, frames['000660'].columns.get_loc('close')] *= 1.01
+            return frames
+
+        engine._load_price_data = corrected_load
+        corrected = await engine.run_with_config(STRATEGY, STOCKS, '2022-01-01', '2023-12-31')
+        assert len(runs) == 2 and not corrected.get('cache_hit')
+        engine._load_price_data = original_load
+        result_cache.fresh_seconds = fresh_seconds
+
+        await engine.run_with_config(STRATEGY, STOCKS, '2022-01-01', '2023-12-31')  # 원래 데이터 결과 (적중)
+        assert len(runs) == 2
+        result_cache.invalidate_symbols(['000660'])  # 후크는 최근 요청 매핑도 끊음
+        third = await engine.run_with_config(STRATEGY, STOCKS, '2022-01-01', '2023-12-31')
+        assert len(runs) == 3 and not third.get('cache_hit')
+        assert third['total_return_rate'] == first['total_return_rate']
+
+        await engine.run_with_config(STRATEGY, STOCKS, '2022-01-01', '2023-12-31', use_cache=False)
+        assert len(runs) == 4
+        result_cache.clear()
+        return result_cache.stats()
+
+    stats = asyncio.run(scenario())
+    print(f"[OK] Engine cache hit/invalidation: {stats}")
+
+
+if __name__ == '__main__':
+    test_cache_key_normalization()
+    test_lru_and_disk_tier()
+    test_engine_cache_hit_and_invalidation()
+    print("\nAll tests passed")
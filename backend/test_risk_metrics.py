@@ -0,0 +1,154 @@
+"""
+위험조정 성과지표 검증 테스트
+- 벡터화 샤프/소르티노/MDD가 기존 리스트 기반 계산과 일치하는지 확인
+- 합성 벤치마크로 베타/알파가 알려진 값으로 복원되는지 확인
+- 벤치마크 캐시 재사용 및 엔진 결과의 risk_metrics 확인
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+from backtest.engine import BacktestEngine
+from backtest.metrics import (
+    BenchmarkCache, benchmark_cache, compute_risk_metrics, drawdown_stats, rolling_sharpe
+)
+
+
+def make_series(days: int = 500, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2022-01-03', periods=days)
+    market = rng.normal(0.0003, 0.01, days - 1)
+    strategy = 0.0002 + 1.5 * market + rng.normal(0, 0.002, days - 1)
+    bench = pd.Series(2500 * np.concatenate([[1.0], np.cumprod(1 + market)]), index=dates)
+    equity = 10000000 * np.concatenate([[1.0], np.cumprod(1 + strategy)])
+    return dates, equity, bench
+
+
+def test_matches_list_based_formulas():
+    """기존 엔진의 리스트 기반 샤프/소르티노/트레이너/MDD와 동일"""
+    dates, equity, _ = make_series()
+    metrics = compute_risk_metrics(equity, dates)
+
+    returns = [(equity[i] - equity[i - 1]) / equity[i - 1] for i in range(1, len(equity))]
+    rf = 0.03 / 252
+    excess = np.mean(returns) - rf
+    sharpe = excess / np.std(returns, ddof=1) * np.sqrt(252)
+    downside = np.sqrt(np.mean([min(r - rf, 0) ** 2 for r in returns]))
+    sortino = excess / downside * np.sqrt(252)
+
+    peak, mdd = equity[0], 0.0
+    for value in equity:
+        peak = max(peak, value)
+        mdd = max(mdd, (peak - value) / peak * 100)
+
+    assert np.isclose(metrics['sharpe_ratio'], sharpe)
+    assert np.isclose(metrics['sortino_ratio'], sortino)
+    assert np.isclose(metrics['treynor_ratio'], excess * 252)
+    assert np.isclose(metrics['max_drawdown'], mdd)
+    assert metrics['beta_source'] == 'assumed' and metrics['beta'] == 1.0
+    print(f"[OK] Sharpe={metrics['sharpe_ratio']:.4f}, Sortino={metrics['sortino_ratio']:.4f}, MDD={mdd:.2f}%")
+
+
+def test_drawdown_duration_and_rolling_sharpe():
+    """낙폭 기간 / 롤링 샤프가 단순 루프 계산과 일치"""
+    values = np.array([100, 110, 105, 95, 100, 111, 108, 109, 112, 90, 95])
+    stats = drawdown_stats(values)
+    assert np.isclose(stats['max_drawdown'], (112 - 90) / 112 * 100)
+    assert (stats['peak_index'], stats['trough_index'], stats['recovery_index']) == (8, 9, None)
+    assert stats['max_drawdown_duration'] == 3  # 110 고점 → 111 회복까지 4일 중 수중 3일
+
+    rng = np.random.default_rng(1)
+    returns = rng.normal(0.0005, 0.01, 200)
+    window = 63
+    rolling = rolling_sharpe(returns, window)
+    expected = [
+        (returns[i:i + window].mean() - 0.03 / 252) / returns[i:i + window].std(ddof=1) * np.sqrt(252)
+        for i in range(len(returns) - window + 1)
+    ]
+    assert np.allclose(rolling, expected)
+    print(f"[OK] Drawdown duration={stats['max_drawdown_duration']}, rolling windows={len(rolling)}")
+
+
+def test_benchmark_beta_alpha():
+    """합성 벤치마크 대비 베타 ≈ 1.5, 칼마 비율 계산"""
+    dates, equity, bench = make_series()
+    metrics = compute_risk_metrics(equity, dates, bench)
+
+    assert metrics['beta_source'] == 'KS11'
+    assert abs(metrics['beta'] - 1.5) < 0.05, metrics['beta']
+    assert metrics['alpha'] is not None
+    assert np.isclose(metrics['treynor_ratio'] * metrics['beta'], compute_risk_metrics(equity, dates)['treynor_ratio'])
+    assert np.isclose(metrics['calmar_ratio'], metrics['annualized_return'] / metrics['max_drawdown'])
+    assert len(metrics['rolling_sharpe']['values']) == len(metrics['rolling_sharpe']['dates']) == len(dates) - 63
+
+    # 벤치마크 휴장일(결측)은 직전 종가로 보정
+    gapped = compute_risk_metrics(equity, dates, bench.drop(bench.index[10:15]))
+    assert abs(gapped['beta'] - 1.5) < 0.1
+    print(f"[OK] Beta={metrics['beta']:.3f}, Alpha={metrics['alpha']:.4f}, Calmar={metrics['calmar_ratio']:.2f}")
+
+
+def test_benchmark_cache_reuse():
+    """포함 구간 재조회 시 로더를 다시 호출하지 않음, 실패는 재시도 대기"""
+    _, _, bench = make_series()
+    calls = []
+
+    def loader(start, end):
+        calls.append((start, end))
+        return bench.loc[start:end]
+
+    cache = BenchmarkCache(loader=loader)
+    first = cache.get('2022-02-01', '2022-12-30')
+    second = cache.get('2022-03-02', '2022-06-30')
+    assert len(calls) == 1 and cache.hits == 1
+    assert second.index[0] >= pd.Timestamp('2022-03-02') and len(second) < len(first)
+
+    failing = BenchmarkCache(loader=lambda s, e: (_ for _ in ()).throw(RuntimeError('offline')))
+    assert failing.get('2022-01-03', '2022-12-30') is None
+    assert failing.get('2022-01-03', '2022-12-30') is None and failing.misses == 1
+    print(f"[OK] Benchmark cache: {len(calls)} load, {cache.hits} hit")
+
+
+def test_engine_reports_risk_metrics():
+    """엔진 결과에 risk_metrics 포함 (캐시에 넣은 벤치마크 사용)"""
+    dates = pd.bdate_range('2020-12-01', '2024-01-31')
+    rng = np.random.default_rng(11)
+    benchmark_cache.set(pd.Series(2500 * np.cumprod(1 + rng.normal(0, 0.01, len(dates))), index=dates))
+
+    config = {
+        'indicators': [{'name': 'rsi', 'params': {'period': 14}}],
+        'buyConditions': [{'left': 'rsi', 'operator': '<', 'right': 35}],
+        'sellConditions': [{'left': 'rsi', 'operator': '>', 'right': 65}]
+    }
+    engine = BacktestEngine()
+    engine.monte_carlo_paths = 0
+    try:
+        result = asyncio.run(engine.run_with_config(
+            strategy_config=config, stock_codes=['005930'],
+            start_date='2021-01-01', end_date='2023-12-31', use_cache=False
+        ))
+    finally:
+        benchmark_cache.clear()
+
+    risk = result['risk_metrics']
+    assert risk['beta_source'] == 'KS11' and risk['beta'] is not None
+    assert np.isclose(risk['max_drawdown'], result['max_drawdown'])
+    assert np.isclose(risk['sharpe_ratio'], result['sharpe_ratio'])
+    print(f"[OK] Engine risk metrics: beta={risk['beta']:.3f}, MDD duration={risk['max_drawdown_duration']} days")
+
+
+if __name__ == '__main__':
+    test_matches_list_based_formulas()
+    test_drawdown_duration_and_rolling_sharpe()
+    test_benchmark_beta_alpha()
+    test_benchmark_cache_reuse()
+    test_engine_reports_risk_metrics()
+    print("\nAll tests passed")
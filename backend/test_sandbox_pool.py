@@ -0,0 +1,211 @@
+"""
+샌드박스 워커 프로세스 풀 검증 테스트
+- 워커 실행 결과 == 프로세스 내 실행 결과 (수식 / python_code / Supabase 코드, 의존 시계열 포함)
+- 워커 스레드에서 호출해도 타임아웃/메모리 제한이 걸리고, 서버 프로세스의 RLIMIT_AS는 그대로
+- 무한 루프 후에도 풀 계속 사용 가능, 여러 스레드에서 동시 실행
+- 기본 설정은 워커 풀 사용, 풀을 끈 프로세스 내 실행은 메인 스레드 타임아웃 안에서만
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+from indicators.calculator import IndicatorCalculator
+from indicators.sandbox import MemoryLimitError, SafeExecutor, SandboxLimits, SandboxViolationError, TimeoutError
+from indicators.sandbox_pool import WORKERS_ENV, SandboxWorkerPool, inprocess_guard
+
+SUPABASE_CODE = """
+period = params.get('period', 20)
+ma = deps['sma_20']
+df['close'] = df['close'] * 1  # 컬럼 교체는 허용 (뷰 프레임에만 반영)
+result = {'gap': df['close'] - ma, 'width': df['high'].rolling(period).max() - df['low'].rolling(period).min()}
+"""
+
+INPLACE_CODE = """
+df.loc[df.index[0], 'close'] = 0.0
+result = {'first_zero': df['close'].cumsum()}
+"""
+
+PYTHON_CODE = """
+def calculate(df, **kwargs):
+    return {'momentum': df['close'] - df['close'].shift(kwargs.get('lag', 3)), 'up': df['close'] > df['open']}
+"""
+
+
+def make_prices(days: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(8)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, days)))
+    return pd.DataFrame({
+        'open': close * 0.999, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+        'volume': rng.integers(1000, 5000, days).astype(float)
+    }, index=pd.bdate_range('2024-01-01', periods=days))
+
+
+def definitions(calculator: IndicatorCalculator):
+    calculator.indicators_cache['gap'] = {
+        'name': 'gap', 'calculation_type': 'builtin',
+        'formula': {'code': SUPABASE_CODE, 'dependencies': ['sma_20']}
+    }
+    calculator.indicators_cache['first_zero'] = {
+        'name': 'first_zero', 'calculation_type': 'builtin', 'formula': {'code': INPLACE_CODE}
+    }
+    calculator.indicators_cache['momentum'] = {
+        'name': 'momentum', 'calculation_type': 'python_code', 'formula': {'code': PYTHON_CODE}
+    }
+    return [
+        {'name': 'gap', 'params': {'period': 10}},
+        {'name': 'first_zero', 'params': {}},
+        {'name': 'momentum', 'params': {'lag': 5}},
+        {'name': 'spread', 'calculation_type': 'custom_formula', 'formula': "df['high'] - df['low']", 'params': {}},
+    ]
+
+
+def test_worker_results_match_in_process():
+    """워커 실행 == 프로세스 내 실행, 입력 원본은 변경되지 않음"""
+    pool = SandboxWorkerPool(workers=2, limits=SandboxLimits(timeout_seconds=5)).start()
+    try:
+        local, remote = IndicatorCalculator(), IndicatorCalculator()
+        local.sandbox_pool, remote.sandbox_pool = None, pool
+        configs = definitions(local)
+        definitions(remote)
+        df = make_prices()
+        before = df.copy()
+        for config in configs:
+            expected = local.calculate(df, config)
+            got = remote.calculate(df, config)
+            assert got.metadata.get('input_mode') == 'shared_memory', got.metadata
+            assert set(got.columns) == set(expected.columns), (config['name'], sorted(got.columns))
+            for name, series in expected.columns.items():
+                pd.testing.assert_series_equal(got.columns[name], series, check_names=False)
+        pd.testing.assert_frame_equal(df, before)
+        stats = pool.stats()
+        assert stats['jobs'] == len(configs) and stats['errors'] == 0, stats
+        print(f"[OK] {len(configs)} sandboxed indicators match in-process results: {stats}")
+    finally:
+        pool.close()
+
+
+def test_limits_from_worker_threads():
+    """uvicorn 워커 스레드처럼 메인 스레드가 아닌 곳에서도 타임아웃/메모리 제한 적용"""
+    pool = SandboxWorkerPool(workers=1, limits=SandboxLimits(timeout_seconds=0.5, max_memory_mb=256)).start()
+    executor = SafeExecutor(SandboxLimits(timeout_seconds=0.5, max_memory_mb=256), pool=pool)
+    df = make_prices(50)
+    errors = {}
+
+    def call(name, code):
+        try:
+            executor.execute(code, df, {}, ['x'])
+        except Exception as e:
+            errors[name] = e
+
+    cases = {
+        'loop': "i = 0\nwhile True:\n    i += 1\n",
+        'memory': "big = np.ones(10 ** 9)\nresult = {'x': df['close']}\n",
+        'error': "result = {'x': df['missing']}\n",
+    }
+    try:
+        for name, code in cases.items():
+            thread = threading.Thread(target=call, args=(name, code))
+            thread.start()
+            thread.join(timeout=10)
+            assert not thread.is_alive(), name
+        assert isinstance(errors['loop'], TimeoutError), errors
+        assert isinstance(errors['memory'], MemoryLimitError), errors
+        assert isinstance(errors['error'], SandboxViolationError), errors
+
+        # 제한은 워커에만 적용
+        import resource
+        assert resource.getrlimit(resource.RLIMIT_AS) == (resource.RLIM_INFINITY, resource.RLIM_INFINITY) or \
+            resource.getrlimit(resource.RLIMIT_AS)[0] > 256 * 1024 * 1024 * 16
+
+        # 제한 위반 후에도 같은 워커로 정상 실행
+        result = executor.execute("result = {'x': df['close'] * 2}", df, {}, ['x'])
+        np.testing.assert_array_equal(result['x'].to_numpy(), df['close'].to_numpy() * 2)
+        print(f"[OK] Timeout/memory limits enforced from worker threads: {pool.stats()}")
+    finally:
+        pool.close()
+
+
+def test_concurrent_calls():
+    """여러 스레드 동시 호출 → 각자 올바른 결과, 큰 결과는 출력 버퍼 확장"""
+    pool = SandboxWorkerPool(workers=2).start()
+    try:
+        frames = [make_prices(200 + 150 * i) for i in range(6)]
+        big = make_prices(60000)
+        code = "result = {'a': df['close'].rolling(5).mean(), 'b': df['volume'].cumsum(), 'c': df['high'] - df['low']}"
+
+        def call(frame):
+            return pool.run(code, frame, {'pd': pd, 'np': np})
+
+        with ThreadPoolExecutor(max_workers=4) as threads:
+            results = list(threads.map(call, frames + [big]))
+        for frame, result in zip(frames + [big], results):
+            np.testing.assert_array_equal(result['b'].to_numpy(), frame['volume'].cumsum().to_numpy())
+            assert result['a'].index.equals(frame.index)
+
+        # 입력보다 훨씬 큰 결과 → 임시 공유 메모리로 받고 출력 버퍼 확장
+        wide = "result = {f'lag_{i}': df['close'].shift(i) for i in range(40)}"
+        for _ in range(2):
+            result = pool.run(wide, big, {'pd': pd, 'np': np, 'range': range})
+            np.testing.assert_array_equal(result['lag_39'].to_numpy(), big['close'].shift(39).to_numpy())
+        assert pool.stats()['overflows'] >= 1
+        print(f"[OK] Concurrent sandbox calls: {pool.stats()}")
+    finally:
+        pool.close()
+
+
+def test_default_pool_and_inprocess_guard():
+    """워커 수 미설정이면 풀 사용, 0이면 프로세스 내 실행 - 타이머 없는 스레드에서는 실행 거부"""
+    original = os.environ.pop(WORKERS_ENV, None)
+    try:
+        assert SandboxWorkerPool.from_env().workers == min(2, os.cpu_count() or 1)
+        os.environ[WORKERS_ENV] = '0'
+        assert not SandboxWorkerPool.from_env().enabled
+    finally:
+        os.environ.pop(WORKERS_ENV, None)
+        if original is not None:
+            os.environ[WORKERS_ENV] = original
+
+    started = time.perf_counter()
+    try:
+        with inprocess_guard(0.2):
+            while True:
+                pass
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError("in-process loop should time out")
+    assert time.perf_counter() - started < 2
+
+    errors = []
+
+    def call():
+        try:
+            with inprocess_guard(0.2):
+                errors.append(None)
+        except SandboxViolationError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=call)
+    thread.start()
+    thread.join()
+    assert isinstance(errors[0], SandboxViolationError), errors
+    print("[OK] Pool on by default, in-process fallback only under a main-thread timeout")
+
+
+if __name__ == '__main__':
+    test_worker_results_match_in_process()
+    test_limits_from_worker_threads()
+    test_concurrent_calls()
+    test_default_pool_and_inprocess_guard()
+    print("\nAll tests passed")
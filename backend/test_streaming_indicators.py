@@ -0,0 +1,165 @@
+"""
+실시간 증분 지표(스트리밍 커널) 검증 테스트
+- 커널 결과 == IndicatorRegistry 배치 결과 (EMA/RSI/MACD/ATR/ADX/OBV/SMA/볼린저)
+- 마지막 봉 수정(revise) / 새 봉 추가(append) 후에도 전체 재계산과 일치
+- 조회 구간이 밀리면(첫 봉 변경) 재시드
+- evaluate_snapshot 신호/지표가 전체 재계산 경로와 동일
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+from backtest.engine import BacktestEngine
+from indicators.calculator import ExecOptions, IndicatorCalculator
+from indicators.streaming import StreamingIndicatorStore, consistency_report
+import price_fixtures
+
+INDICATORS = [
+    {'name': 'ema_12', 'params': {'period': 12}},
+    {'name': 'rsi', 'params': {'period': 14}},
+    {'name': 'macd', 'params': {}},
+    {'name': 'bb', 'params': {'period': 20}},
+    {'name': 'sma_5', 'params': {'period': 5}},
+    {'name': 'adx', 'params': {'period': 14}},
+    {'name': 'obv', 'params': {}},
+    {'name': 'stochastic', 'params': {'period': 14}},  # 커널 없음 → 기존 경로
+]
+
+
+make_prices = partial(price_fixtures.make_prices, seed=11, start='2024-01-02', base=10000, volatility=0.02,
+                      spread=0.03, random_spread=True, open_jitter=0.01, max_volume=100000, volume_dtype=np.int64)
+
+
+def batch_columns(calculator: IndicatorCalculator, df: pd.DataFrame) -> dict:
+    out = {}
+    for config in INDICATORS[:-1]:
+        out.update(calculator._calculate_builtin(df, config['name'], ExecOptions(period=config['params'].get('period', 20))))
+    return out
+
+
+def assert_columns_match(streamed: dict, expected: dict):
+    assert set(streamed) == set(expected), (sorted(streamed), sorted(expected))
+    for name, series in expected.items():
+        np.testing.assert_allclose(streamed[name].to_numpy(), series.to_numpy(), rtol=1e-9, atol=1e-9,
+                                   equal_nan=True, err_msg=name)
+
+
+def test_kernels_match_registry():
+    """모든 커널이 배치 계산과 일치"""
+    calculator = IndicatorCalculator()
+    report = consistency_report(make_prices(300).astype(float), calculator.registry)
+    worst = max(report.values())
+    assert worst < 1e-9, {k: v for k, v in report.items() if v >= 1e-9}
+    print(f"[OK] {len(report)} streaming outputs match registry (max rel error {worst:.1e})")
+
+
+def test_revise_and_append():
+    """현재가 갱신 → 새 봉 추가 → 직전 봉 확정값 반영까지 전체 재계산과 일치"""
+    calculator = IndicatorCalculator()
+    store = StreamingIndicatorStore()
+    specs = [calculator.streaming_spec(c) for c in INDICATORS]
+    assert specs[-1] is None and all(specs[:-1])
+    specs = specs[:-1]
+
+    prices = make_prices(201).astype(float)
+    df = prices.iloc[:200].copy()
+    assert_columns_match(store.columns('005930', df, specs), batch_columns(calculator, df))
+
+    # 장중 현재가 갱신 (같은 봉)
+    for price in (df['close'].iloc[-1] * 1.01, df['close'].iloc[-1] * 0.97):
+        df.iloc[-1, df.columns.get_loc('close')] = price
+        df.iloc[-1, df.columns.get_loc('low')] = min(df['low'].iloc[-1], price)
+        assert_columns_match(store.columns('005930', df, specs), batch_columns(calculator, df))
+
+    # 다음 날 봉 추가 + 직전 봉 종가 확정
+    df = pd.concat([df, prices.iloc[200:]])
+    df.iloc[-2, df.columns.get_loc('close')] = prices['close'].iloc[199]
+    assert_columns_match(store.columns('005930', df, specs), batch_columns(calculator, df))
+
+    stats = store.stats()
+    assert stats['reseeds'] == 1 and stats['appends'] == 1 and stats['revisions'] == 3, stats
+    print(f"[OK] Revise/append match full recompute: {stats}")
+
+
+def test_reseed_on_window_slide():
+    """최근 N봉 조회 구간이 하루 밀리면 재시드 후에도 정확"""
+    calculator = IndicatorCalculator()
+    store = StreamingIndicatorStore()
+    specs = [calculator.streaming_spec(c) for c in INDICATORS[:-1]]
+    prices = make_prices(201).astype(float)
+
+    store.columns('000660', prices.iloc[:200], specs)
+    window = prices.iloc[1:]
+    assert_columns_match(store.columns('000660', window, specs), batch_columns(calculator, window))
+    assert store.stats()['reseeds'] == 2
+    print("[OK] Sliding window reseeds stream")
+
+
+def test_evaluate_snapshot_matches_full_recompute():
+    """스트리밍 스냅샷 == 전체 재계산 스냅샷"""
+    strategy = {
+        'indicators': INDICATORS,
+        'buyConditions': [{'left': 'rsi', 'operator': '<', 'right': 60},
+                          {'left': 'macd_line', 'operator': '>', 'right': 'macd_signal', 'combineWith': 'AND'}],
+        'sellConditions': [{'left': 'close', 'operator': '>', 'right': 'bb_upper'}]
+    }
+    prices = make_prices(230)
+
+    streaming_engine, full_engine = BacktestEngine(), BacktestEngine()
+    full_engine.streaming_snapshots = False
+    for end in range(200, 230):
+        df = prices.iloc[:end]
+        streamed = asyncio.run(streaming_engine.evaluate_snapshot('035720', df.copy(), strategy))
+        full = asyncio.run(full_engine.evaluate_snapshot('035720', df.copy(), strategy))
+        assert streamed['signal'] == full['signal'] and streamed['reasons'] == full['reasons'], (end, streamed, full)
+        for key, value in full['indicators'].items():
+            assert np.isclose(streamed['indicators'][key], value, rtol=1e-9, equal_nan=True), (end, key)
+    print("[OK] evaluate_snapshot signals match full recompute over 30 bars")
+
+
+def test_intraday_bar_with_wall_clock_time():
+    """장중 임시 봉 시각이 호출마다 달라도 같은 거래일이면 revise, 다음 날이면 append (재시드 없음)"""
+    calculator = IndicatorCalculator()
+    store = StreamingIndicatorStore()
+    specs = [calculator.streaming_spec(c) for c in INDICATORS[:-1]]
+    prices = make_prices(202).astype(float)
+    history = prices.iloc[:200]
+
+    def with_intraday(base, day, hour, close):
+        bar = pd.DataFrame([{'open': close, 'high': close, 'low': close, 'close': close, 'volume': 0.0}],
+                           index=[day + pd.Timedelta(hours=hour)])
+        return pd.concat([base, bar])
+
+    today = prices.index[200]
+    first = store.columns('005930', with_intraday(history, today, 9.5, 10000.0), specs)
+    held = first['rsi'].copy()
+    for hour, close in ((10.25, 10100.0), (14.75, 9900.0)):
+        df = with_intraday(history, today, hour, close)
+        assert_columns_match(store.columns('005930', df, specs), batch_columns(calculator, df))
+    pd.testing.assert_series_equal(first['rsi'], held)  # 이미 반환한 값은 이후 revise에 영향받지 않음
+
+    tomorrow = prices.index[201]
+    df = with_intraday(pd.concat([history, prices.iloc[200:201]]), tomorrow, 9.0, 10050.0)
+    assert_columns_match(store.columns('005930', df, specs), batch_columns(calculator, df))
+    stats = store.stats()
+    assert stats['reseeds'] == 1 and stats['revisions'] == 3 and stats['appends'] == 1, stats
+    print(f"[OK] Wall-clock intraday bars revise/append without reseed: {stats}")
+
+
+if __name__ == '__main__':
+    test_kernels_match_registry()
+    test_revise_and_append()
+    test_reseed_on_window_slide()
+    test_evaluate_snapshot_matches_full_recompute()
+    test_intraday_bar_with_wall_clock_time()
+    print("\nAll tests passed")
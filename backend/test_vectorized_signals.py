@@ -0,0 +1,231 @@
+"""
+벡터화 조건 컴파일러 검증 테스트
+- 컴파일된 마스크 경로와 기존 행 단위 경로의 결과가 완전히 동일한지 확인
+- 단계별 신호 평가기가 기존 단계별 루프와 같은 신호 정보를 만드는지 확인
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+from backtest.engine import BacktestEngine
+from backtest.signals import SIGNAL_COLUMNS, staged_signal_payload
+
+
+def make_indicator_frame(rows: int = 300, seed: int = 7) -> pd.DataFrame:
+    """지표 컬럼이 포함된 테스트 데이터 생성"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2023-01-02', periods=rows, freq='B')
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, rows)))
+    df = pd.DataFrame({
+        'open': close * (1 + rng.uniform(-0.01, 0.01, rows)),
+        'high': close * 1.02,
+        'low': close * 0.98,
+        'close': close,
+        'volume': rng.integers(1000, 100000, rows)
+    }, index=dates)
+
+    df['rsi'] = 50 + 25 * np.sin(np.arange(rows) / 9.0)
+    df['macd_line'] = rng.normal(0, 1, rows).cumsum() / 10
+    df['macd_signal'] = df['macd_line'].ewm(span=9, adjust=False).mean()
+    df['sma_5'] = df['close'].rolling(5).mean()
+    df['sma_20'] = df['close'].rolling(20).mean()
+    df['bb_lower'] = df['sma_20'] * 0.95
+    df.iloc[::17, df.columns.get_loc('rsi')] = np.nan  # 결측 구간
+    return df
+
+
+CONDITION_SETS = [
+    # 신규 형식 + combineWith AND
+    ([{'left': 'rsi', 'operator': '<', 'right': 35},
+      {'left': 'macd_line', 'operator': '>', 'right': 'macd_signal', 'combineWith': 'AND'}],
+     [{'left': 'rsi', 'operator': '>', 'right': 65}]),
+    # OR 체인 (이유 재설정 규칙 포함)
+    ([{'left': 'rsi', 'operator': '<', 'right': 30},
+      {'left': 'close', 'operator': '<', 'right': 'bb_lower', 'combineWith': 'OR'},
+      {'left': 'macd_line', 'operator': '>', 'right': 0, 'combineWith': 'AND'},
+      {'left': 'sma_5', 'operator': 'crossover', 'right': 'sma_20', 'combineWith': 'OR'}],
+     [{'left': 'sma_5', 'operator': 'crossunder', 'right': 'sma_20'},
+      {'left': 'rsi', 'operator': '>=', 'right': '70', 'combineWith': 'OR'}]),
+    # 기존 indicator/value/compareTo 형식 + 접미사 해석
+    ([{'indicator': 'sma_5', 'operator': 'cross_above', 'compareTo': 'sma_20'},
+      {'indicator': 'rsi_14', 'operator': '<=', 'value': 60}],
+     [{'indicator': 'macd_12_26', 'operator': 'crossBelow', 'compareTo': 'macd_signal_12_26_9'},
+      {'indicator': 'rsi', 'operator': '==', 'value': 50, 'combineWith': 'OR'}]),
+    # dict 피연산자, 해석 불가 지표, 숫자와 cross, 미지원 연산자
+    ([{'left': {'type': 'indicator', 'key': 'macd_line'}, 'operator': '>',
+       'right': {'type': 'constant', 'value': 0}},
+      {'left': 'unknown_col', 'operator': '>', 'right': 1, 'combineWith': 'OR'}],
+     [{'left': 'rsi', 'operator': 'crossover', 'right': 50},
+      {'left': 'rsi', 'operator': '!~', 'right': 50, 'combineWith': 'OR'},
+      {'left': 'profit_rate', 'operator': '>=', 'right': 5, 'combineWith': 'OR'}]),
+]
+
+
+async def _evaluate_both(engine, df, buy, sell, positions=None, stock_code=None):
+    compiled = await engine._evaluate_signals(df.copy(), buy, sell, positions, stock_code)
+
+    # 기존 행 단위 경로 재현
+    legacy = df.copy()
+    for col in SIGNAL_COLUMNS:
+        legacy[col] = False if col.endswith('signal') else ''
+    prev_source = {col: legacy[col] for col in legacy.columns if col not in SIGNAL_COLUMNS}
+    if positions and stock_code in positions:
+        avg_price = positions[stock_code]['avg_price']
+        legacy['profit_rate'] = (legacy['close'] - avg_price) / avg_price * 100
+    else:
+        legacy['profit_rate'] = 0
+    legacy = engine._evaluate_signals_rowwise(legacy, buy, sell, prev_source)
+    return compiled, legacy
+
+
+def test_compiled_signals_match_rowwise():
+    """컴파일 경로 == 행 단위 경로"""
+    engine = BacktestEngine()
+    df = make_indicator_frame()
+    positions = {'005930': {'avg_price': float(df['close'].iloc[0])}}
+
+    for buy, sell in CONDITION_SETS:
+        for pos in (None, positions):
+            compiled, legacy = asyncio.run(_evaluate_both(engine, df, buy, sell, pos, '005930'))
+            assert list(compiled.columns) == list(legacy.columns)
+            pd.testing.assert_frame_equal(compiled, legacy, check_dtype=False)
+            print(f"[OK] buy={int(compiled['buy_signal'].sum())}, sell={int(compiled['sell_signal'].sum())}")
+
+
+def test_compiled_signals_are_fast():
+    """10년치 데이터에서 컴파일 경로가 행 단위 경로보다 빠른지 확인"""
+    import time
+
+    engine = BacktestEngine()
+    df = make_indicator_frame(rows=2500)
+    buy, sell = CONDITION_SETS[1]
+
+    start = time.perf_counter()
+    asyncio.run(engine._evaluate_signals(df.copy(), buy, sell))
+    compiled_time = time.perf_counter() - start
+
+    legacy = df.copy()
+    for col in SIGNAL_COLUMNS:
+        legacy[col] = False if col.endswith('signal') else ''
+    prev_source = {col: legacy[col] for col in legacy.columns if col not in SIGNAL_COLUMNS}
+    legacy['profit_rate'] = 0
+    start = time.perf_counter()
+    engine._evaluate_signals_rowwise(legacy, buy, sell, prev_source)
+    rowwise_time = time.perf_counter() - start
+
+    print(f"compiled: {compiled_time * 1000:.1f}ms, row-wise: {rowwise_time * 1000:.1f}ms")
+    assert compiled_time < rowwise_time
+
+
+BUY_STAGES = [
+    {'stage': 1, 'enabled': True, 'positionPercent': 50, 'passAllRequired': True,
+     'conditions': [{'left': 'rsi', 'operator': '<', 'right': 40}]},
+    {'stage': 2, 'enabled': True, 'positionPercent': 30, 'passAllRequired': False,
+     'conditions': [{'left': 'rsi', 'operator': '<', 'right': 45},
+                    {'left': 'close', 'operator': '<', 'right': 'bb_lower'}]},
+    {'stage': 3, 'enabled': False, 'positionPercent': 20,
+     'conditions': [{'left': 'rsi', 'operator': '<', 'right': 90}]},
+    {'stage': 4, 'enabled': True, 'positionPercent': 20, 'conditions': []},
+]
+
+SELL_STAGES = [
+    {'stage': 1, 'enabled': True, 'exitPercent': 50, 'passAllRequired': False,
+     'conditions': [{'left': 'rsi', 'operator': '>', 'right': 65},
+                    {'left': 'macd_line', 'operator': '<', 'right': 'macd_signal'}]},
+    {'stage': 2, 'enabled': True, 'passAllRequired': True,
+     'conditions': [{'indicator': 'rsi', 'operator': '>', 'value': 70},
+                    {'left': 'sma_5', 'operator': 'crossunder', 'right': 'sma_20'}]},
+]
+
+
+def _legacy_stage_signal(engine, row, stages, side):
+    """기존 단계별 루프의 신호 dict 재현"""
+    for stage in stages:
+        if not stage.get('enabled', False) or not stage.get('conditions', []):
+            continue
+        stage_num = stage.get('stage', 1)
+        pass_all_required = stage.get('passAllRequired', True)
+        results, reasons = [], []
+        for condition in stage['conditions']:
+            result = engine._check_condition(row, condition)
+            results.append(result)
+            if result:
+                reasons.append(engine._format_condition_reason(condition))
+        satisfied = all(results) if pass_all_required else any(results)
+        if satisfied:
+            joined = ' AND '.join(reasons) if pass_all_required else ' OR '.join(reasons)
+            if side == 'buy':
+                return {'stage': stage_num, 'positionPercent': stage.get('positionPercent', 30), 'reason': joined}
+            return {'stage': stage_num, 'exitPercent': stage.get('exitPercent', 100),
+                    'reason': f"Stage {stage_num}: {joined}"}
+    return None
+
+
+def test_staged_signals_match_legacy_loop():
+    """단계별 마스크 평가 == 기존 단계별 루프"""
+    engine = BacktestEngine()
+    df = make_indicator_frame()
+    result = asyncio.run(engine._evaluate_staged_signals(df.copy(), BUY_STAGES, SELL_STAGES))
+
+    assert result['buy_stage'].dtype == np.int16
+    assert result['sell_exit_percent'].dtype == np.float64
+
+    for i in range(len(df)):
+        row = df.iloc[i]
+        for side, stages in (('buy', BUY_STAGES), ('sell', SELL_STAGES)):
+            expected = _legacy_stage_signal(engine, row, stages, side)
+            actual = staged_signal_payload(result.iloc[i], side)
+            if expected is None:
+                assert not actual
+            else:
+                assert actual == expected, (i, side, actual, expected)
+                assert result.iloc[i][f'{side}_reason'] == (
+                    f"Stage {expected['stage']}: {expected['reason']}" if side == 'buy' else expected['reason']
+                )
+
+    print(f"[OK] staged buy={int(result['buy_signal'].sum())}, sell={int(result['sell_signal'].sum())}")
+
+
+def test_oversized_stage_falls_back_to_rowwise():
+    """64개 이상 조건 단계 → 행 단위 단계별 평가로 대체, 결과는 기존 단계별 루프와 동일"""
+    engine = BacktestEngine()
+    df = make_indicator_frame()
+    thresholds = np.linspace(30, 70, 64)
+    buy_stages = [
+        {'stage': 1, 'enabled': True, 'positionPercent': 40, 'passAllRequired': False,
+         'conditions': [{'left': 'rsi', 'operator': '<', 'right': float(t)} for t in thresholds[:40]]},
+        {'stage': 2, 'enabled': True, 'positionPercent': 60, 'passAllRequired': True,
+         'conditions': [{'left': 'rsi', 'operator': '>', 'right': float(t) - 40} for t in thresholds]},
+    ]
+    result = asyncio.run(engine._evaluate_staged_signals(df.copy(), buy_stages, SELL_STAGES))
+
+    assert result['buy_stage'].dtype == np.int16
+    assert result['buy_signal'].any()
+    for i in range(len(df)):
+        row = df.iloc[i]
+        for side, stages in (('buy', buy_stages), ('sell', SELL_STAGES)):
+            expected = _legacy_stage_signal(engine, row, stages, side)
+            actual = staged_signal_payload(result.iloc[i], side)
+            if expected is None:
+                assert not actual
+            else:
+                assert actual == expected, (i, side, actual, expected)
+
+    print(f"[OK] oversized stage evaluated row-wise: buy={int(result['buy_signal'].sum())}")
+
+
+if __name__ == '__main__':
+    test_compiled_signals_match_rowwise()
+    test_compiled_signals_are_fast()
+    test_staged_signals_match_legacy_loop()
+    test_oversized_stage_falls_back_to_rowwise()
+    print("\nAll tests passed")
@@ -0,0 +1,121 @@
+"""
+워크포워드 최적화 검증 테스트
+- 롤링/앵커드 구간 분할
+- 구간별 최적 파라미터가 학습 구간 순위 1위인지 확인
+- 병렬 실행 결과가 순차 실행과 동일한지 확인
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+from backtest.engine import BacktestEngine
+from backtest.optimizer import build_grid
+from backtest.parallel import shutdown_pool
+from backtest.walk_forward import WalkForwardOptimizer, build_windows
+
+STRATEGY = {
+    'indicators': [
+        {'name': 'rsi', 'params': {'period': 14}},
+    ],
+    'buyConditions': [{'left': 'rsi', 'operator': '<', 'right': 40}],
+    'sellConditions': [{'left': 'rsi', 'operator': '>', 'right': 60}],
+    'stopLoss': {'enabled': True, 'value': 5}
+}
+
+PARAMETERS = [
+    {'path': 'indicators.0.params.period', 'values': [7, 14, 21]},
+    {'path': 'buyConditions.0.right', 'values': [30, 40]},
+]
+
+STOCKS = ['005930', '000660']
+
+
+def test_build_windows():
+    """롤링/앵커드 구간 경계"""
+    calendar = pd.bdate_range('2024-01-01', periods=10)
+
+    rolling = build_windows(calendar, in_sample_days=4, out_of_sample_days=3)
+    assert [(w['in_sample'], w['out_of_sample']) for w in rolling] == [
+        ((calendar[0], calendar[3]), (calendar[4], calendar[6])),
+        ((calendar[3], calendar[6]), (calendar[7], calendar[9])),
+    ]
+
+    anchored = build_windows(calendar, in_sample_days=4, out_of_sample_days=2, anchored=True)
+    assert all(w['in_sample'][0] == calendar[0] for w in anchored)
+    assert anchored[-1]['out_of_sample'] == (calendar[8], calendar[9])
+
+    try:
+        build_windows(calendar, in_sample_days=10, out_of_sample_days=2)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    print(f"[OK] windows rolling={len(rolling)}, anchored={len(anchored)}")
+
+
+def test_best_params_are_in_sample_winners():
+    """구간별 최적 파라미터 == 학습 구간 그리드 최고 수익률"""
+    engine = BacktestEngine()
+    optimizer = WalkForwardOptimizer(engine)
+
+    async def run():
+        report = await optimizer.run(
+            STRATEGY, PARAMETERS, STOCKS, '2021-01-01', '2023-12-31',
+            in_sample_days=250, out_of_sample_days=125, workers=1
+        )
+        price_data = await engine._load_price_data(STOCKS, '2021-01-01', '2023-12-31')
+        grid = build_grid(STRATEGY, PARAMETERS)
+        columns = await optimizer._compute_indicator_columns(price_data, grid)
+        windows = [
+            (pd.Timestamp(w['in_sample']['start']), pd.Timestamp(w['in_sample']['end']))
+            for w in report['windows']
+        ]
+        in_sample = await optimizer._evaluate_grid(
+            grid, price_data, columns, 10000000, 0.00015, 0.001, 1, windows=windows
+        )
+        return report, grid, in_sample
+
+    report, grid, in_sample = asyncio.run(run())
+
+    assert len(report['windows']) == 5  # 약 780 거래일
+    assert report['distinct_indicators'] == 3
+    for w_index, window in enumerate(report['windows']):
+        best = max(in_sample[p][w_index]['total_return_rate'] for p in range(len(grid)))
+        assert window['in_sample_metrics']['total_return_rate'] == best
+        assert window['out_of_sample_metrics'] and 'error' not in window['out_of_sample_metrics']
+        assert window['out_of_sample']['start'] > window['in_sample']['end']
+    print(f"[OK] OOS compounded {report['out_of_sample_summary']['compounded_return_rate']:.2f}%")
+
+
+def test_walk_forward_parallel_matches_sequential():
+    """workers=2 결과 == 순차 결과"""
+    optimizer = WalkForwardOptimizer(BacktestEngine())
+
+    async def run(workers):
+        return await optimizer.run(
+            STRATEGY, PARAMETERS, STOCKS, '2021-01-01', '2023-12-31',
+            in_sample_days=250, out_of_sample_days=125, workers=workers
+        )
+
+    try:
+        sequential = asyncio.run(run(1))
+        parallel = asyncio.run(run(2))
+    finally:
+        shutdown_pool()
+
+    assert parallel == sequential
+    print(f"[OK] parallel walk-forward == sequential ({len(parallel['windows'])} windows)")
+
+
+if __name__ == '__main__':
+    test_build_windows()
+    test_best_params_are_in_sample_winners()
+    test_walk_forward_parallel_matches_sequential()
+    print("\nAll tests passed")
@@ -0,0 +1,144 @@
+"""
+지표 입력 프레임 zero-copy 검증 테스트
+- 읽기 전용 뷰 모드 결과 == 기존 복사 모드 결과
+- 지표 코드가 입력을 제자리 수정해도 호출자 데이터는 그대로 (복사본으로 재실행)
+- 호출별 메모리(복사 바이트)/시간 비교
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['ENFORCE_DB_INDICATORS'] = 'false'  # 개발 모드
+os.environ['INDICATOR_STORE_DIR'] = tempfile.mkdtemp(prefix='indicator_store_')  # 실제 저장소에 쓰지 않음
+
+from indicators.calculator import IndicatorCalculator
+from indicators.frame_view import readonly_frame
+import price_fixtures
+
+SMA_CODE = """
+period = params.get('period', 20)
+result = {'db_sma': df['close'].rolling(window=period, min_periods=period).mean()}
+"""
+
+# 기존 지표 코드에 있을 수 있는 입력 제자리 수정 패턴
+MUTATING_CODE = """
+df.loc[df['volume'] > 0, 'close'] = df['close'] * 2
+df['typical'] = (df['high'] + df['low'] + df['close']) / 3
+result = {'db_typical': df['typical']}
+"""
+
+
+make_prices = partial(price_fixtures.make_prices, seed=11, start='2014-01-01')
+
+
+def make_calculator(zero_copy: bool) -> IndicatorCalculator:
+    calculator = IndicatorCalculator()
+    calculator.zero_copy = zero_copy
+    calculator.sandbox_pool = None  # 프로세스 내 실행 경로 검증 (공용 풀은 첫 import 시 생성되므로 환경변수 대신 인스턴스에서 끔)
+    calculator.indicators_cache['db_sma'] = {
+        'name': 'db_sma', 'calculation_type': 'builtin', 'formula': {'code': SMA_CODE}
+    }
+    calculator.indicators_cache['db_typical'] = {
+        'name': 'db_typical', 'calculation_type': 'builtin', 'formula': {'code': MUTATING_CODE}
+    }
+    return calculator
+
+
+def test_readonly_view_shares_memory():
+    """뷰는 원본 메모리를 공유하고, 제자리 수정은 거부, 컬럼 추가는 뷰에만 반영"""
+    df = make_prices(50)
+    view = readonly_frame(df)
+    assert np.shares_memory(view['close'].to_numpy(), df['close'].to_numpy())
+
+    try:
+        view.loc[view.index[0], 'close'] = -1
+    except ValueError as e:
+        assert 'read-only' in str(e)
+    else:
+        raise AssertionError("in-place write should fail on read-only view")
+
+    view['extra'] = view['close'] * 2
+    assert 'extra' not in df.columns and df['close'].iloc[0] > 0
+    print("[OK] Read-only view shares memory and rejects in-place writes")
+
+
+def test_results_match_copy_mode():
+    """수식/python_code/Supabase 코드 결과가 복사 모드와 동일, 호출자 프레임 불변"""
+    df = make_prices(2500)
+    original = df.copy()
+    configs = [
+        {'name': 'db_sma', 'params': {'period': 20}},
+        {'name': 'ratio', 'calculation_type': 'custom_formula',
+         'formula': "df['close'] / df['close'].rolling(10).mean()"},
+        {'name': 'momentum', 'calculation_type': 'python_code',
+         'code': "result = df['close'] - df['close'].shift(params['period'])", 'params': {'period': 5}},
+    ]
+
+    for config in configs:
+        readonly = make_calculator(True).calculate(df, config)
+        copied = make_calculator(False).calculate(df, config)
+        for key, series in copied.columns.items():
+            pd.testing.assert_series_equal(readonly.columns[key], series)
+            assert readonly.columns[key].to_numpy().flags.writeable  # 결과는 호출자 소유
+        assert readonly.metadata['input_mode'] == 'readonly'
+        assert readonly.metadata['input_copied_bytes'] == 0
+        assert copied.metadata['input_copied_bytes'] == copied.metadata['input_bytes'] > 0
+
+    pd.testing.assert_frame_equal(df, original)
+    print("[OK] Zero-copy results match copy mode")
+
+
+def test_mutating_code_cannot_touch_caller_data():
+    """입력을 제자리 수정하는 지표 코드: 복사본으로 재실행해 기존 결과 유지, 원본 보호"""
+    df = make_prices(200)
+    original = df.copy()
+
+    readonly = make_calculator(True).calculate(df, {'name': 'db_typical'})
+    copied = make_calculator(False).calculate(df, {'name': 'db_typical'})
+
+    pd.testing.assert_frame_equal(df, original)
+    pd.testing.assert_series_equal(readonly.columns['db_typical'], copied.columns['db_typical'])
+    assert readonly.metadata['input_mode'] == 'copy'  # 재실행 시 복사 모드로 기록
+    print("[OK] Mutating indicator code falls back to a copy, caller data intact")
+
+
+def test_memory_and_time_per_call():
+    """8개 지표 x 반복 호출 시 복사 모드 대비 할당 메모리/시간"""
+    df = make_prices(2500)
+    configs = [{'name': 'db_sma', 'params': {'period': p}} for p in (5, 10, 20, 30, 60, 90, 120, 200)]
+
+    def measure(zero_copy: bool):
+        calculator = make_calculator(zero_copy)
+        calculator.calculate(df, configs[0])  # 코드 캐시 워밍업
+        calculator.clear_cache()
+        tracemalloc.start()
+        started = time.perf_counter()
+        results = [calculator.calculate(df, config) for config in configs]
+        elapsed = (time.perf_counter() - started) * 1000 / len(configs)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        copied = sum(r.metadata['input_copied_bytes'] for r in results) / len(configs)
+        return elapsed, peak, copied
+
+    copy_ms, copy_peak, copy_bytes = measure(False)
+    view_ms, view_peak, view_bytes = measure(True)
+
+    assert view_bytes == 0 and copy_bytes > 0
+    print(f"[OK] Per call: copy {copy_ms:.2f}ms / {copy_bytes / 1024:.0f}KB copied (peak {copy_peak / 1024:.0f}KB), "
+          f"zero-copy {view_ms:.2f}ms / {view_bytes / 1024:.0f}KB copied (peak {view_peak / 1024:.0f}KB)")
+
+
+if __name__ == '__main__':
+    test_readonly_view_shares_memory()
+    test_results_match_copy_mode()
+    test_mutating_code_cannot_touch_caller_data()
+    test_memory_and_time_per_call()
+    print("\nAll tests passed")
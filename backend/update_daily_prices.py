@@ -18,6 +18,7 @@ import argparse
 # 키움 API 클라이언트 임포트
 sys.path.append(os.path.dirname(__file__))
 from api.kiwoom_client import get_kiwoom_client
+from data.local_cache import price_cache
 
 load_dotenv()
 
@@ -57,6 +58,7 @@ def update_stock_daily_prices(stock_code: str, days: int = 100):
         # 데이터 변환 및 저장
         inserted = 0
         updated = 0
+        earliest_date = None
 
         # 모의투자 API 응답 구조 확인
         if isinstance(daily_data, dict) and 'stk_dt_pole_chart_qry' in daily_data:
@@ -91,6 +93,11 @@ def update_stock_daily_prices(stock_code: str, days: int = 100):
 
             if result.data:
                 inserted += 1
+                earliest_date = min(earliest_date or formatted_date, formatted_date)
+
+        if earliest_date:
+            # 로컬 일봉 캐시는 최근 며칠만 매번 다시 받으므로 다시 쓴 구간부터 무효화
+            price_cache.invalidate([stock_code], since=earliest_date)
 
         print(f"  [OK] 완료: {inserted}개 레코드 저장")
         return inserted